@@ -0,0 +1,272 @@
+"""Microbenchmarks for the code that runs once per item.
+
+Covers URL canonicalization, the `RawItem` dedup hash and item id,
+`normalize_raw_item`, stage-1 response parsing (clean JSON and JSON buried
+in prose, i.e. `_scan_json_object`), digest building and rendering, and the
+`/stats` histogram helper. Inputs are synthetic and seeded, so runs on one
+machine are comparable.
+
+Each benchmark runs `--repeat` times per size; the median is the figure
+compared. Save a baseline before a change, then compare after it:
+
+    python3 bench_hot_paths.py --save var/bench_hot_paths.json
+    python3 bench_hot_paths.py --compare var/bench_hot_paths.json --threshold 1.2
+
+`--compare` exits 1 when any benchmark's median is more than `--threshold`
+times its baseline. Timings are machine-specific, so keep baselines local.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from src.ai.contracts import _scan_json_object, parse_stage1_response
+from src.api.stats_helpers import histogram_from_bucket_counts
+from src.collector.base import RawItem, canonicalize_url
+from src.pipeline.digest import DigestItem, build_digest_artifact, render_digest_markdown
+from src.pipeline.ingestion import normalize_raw_item
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = "var/bench_hot_paths.json"
+NOW = datetime(2026, 5, 26, 7, 50, tzinfo=timezone.utc)
+CATEGORIES = ("vulnerability", "exploit", "research", "product", "engineering", "tool", "incident", "other")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-item hot paths")
+    parser.add_argument(
+        "--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated item counts per benchmark"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark and size")
+    parser.add_argument("--only", default=None, help="run benchmarks whose name contains this text")
+    parser.add_argument("--save", default=None, help=f"write results as a baseline (e.g. {DEFAULT_BASELINE})")
+    parser.add_argument("--compare", default=None, help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="median/baseline ratio that counts as a regression")
+    return parser.parse_args(argv)
+
+
+# -- synthetic data ---------------------------------------------------------
+
+
+def make_raw_items(n: int, seed: int = 1) -> list[RawItem]:
+    """Collector output: tracking-laden URLs, some long native ids, some URL-less text items."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        kind = i % 4
+        url = (
+            f"HTTPS://Example{rng.randrange(50)}.com/advisories/{i}/"
+            f"?utm_source=feed&utm_medium=rss&id={i}&lang=en&ref=home"
+        )
+        native_id = {0: f"CVE-2026-{10000 + i}", 1: f"https://example.com/guid/{i}/" + "x" * 80, 2: None, 3: None}[kind]
+        items.append(
+            RawItem(
+                source_id=f"source_{i % 12}",
+                title=f"  Advisory {i}: heap overflow in component {rng.randrange(1000)}  ",
+                canonical_url="" if kind == 3 else url,
+                content_text=" ".join(rng.choice(("remote", "attacker", "crafted", "packet", "kernel")) for _ in range(120)),
+                author="bench",
+                published_at=NOW - timedelta(minutes=rng.randrange(1440)),
+                native_id=native_id,
+                metadata={"rank": i},
+            )
+        )
+    return items
+
+
+def make_stage1_responses(n: int, *, prose: bool, seed: int = 2) -> list[str]:
+    """Model replies; with `prose`, the JSON follows text containing stray braces."""
+    rng = random.Random(seed)
+    replies = []
+    for i in range(n):
+        payload = json.dumps(
+            {
+                "category": rng.choice(CATEGORIES),
+                "tags": [f"tag{j}" for j in range(rng.randrange(1, 8))],
+                "summary_zh": "远程攻击者可利用该漏洞执行任意代码" * 3,
+                "insight_score": rng.randrange(101),
+                "credibility": rng.choice(("high", "medium", "low")),
+            },
+            ensure_ascii=False,
+        )
+        replies.append(f"分析如下 {{注意}} 以及 {{ 草稿 }}:\n{payload}\n以上。" if prose else payload)
+    return replies
+
+
+def make_digest_items(n: int, seed: int = 3) -> list[DigestItem]:
+    rng = random.Random(seed)
+    return [
+        DigestItem(
+            id=f"source_{i % 12}:item-{i}",
+            title=f"Advisory {i}",
+            source_id=f"source_{i % 12}",
+            category=rng.choice(CATEGORIES),
+            summary_zh="远程攻击者可利用该漏洞执行任意代码",
+            insight_score=rng.randrange(40, 100),
+            confidence=rng.choice(("tentative", "firm", "confirmed", None)),
+            action_suggestion="尽快升级",
+        )
+        for i in range(n)
+    ]
+
+
+# -- benchmarks -------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+
+
+def _render_inputs(n: int) -> dict[str, Any]:
+    artifact = build_digest_artifact(
+        digest_date=date(2026, 5, 26), domain="security", items=make_digest_items(n),
+        collected_count=n, analyzed_count=n, failed_sources=0, generated_at=NOW,
+    )
+    items = make_digest_items(n)
+    return {
+        "title": artifact.title,
+        "digest_date": artifact.date,
+        "domain": "security",
+        "overview": artifact.summary,
+        "highlights": artifact.highlights_json,
+        "high_value_items": [item for item in items if item.insight_score >= 75],
+        "lower_value_items": [item for item in items if item.insight_score < 75],
+        "stats": artifact.stats_json,
+        "generated_at": NOW,
+    }
+
+
+BENCHMARKS = (
+    Benchmark(
+        "canonicalize_url",
+        lambda n: [item.canonical_url for item in make_raw_items(n) if item.canonical_url],
+        lambda urls: [canonicalize_url(url) for url in urls],
+    ),
+    Benchmark("raw_item.dedup_hash", make_raw_items, lambda items: [item.dedup_hash for item in items]),
+    Benchmark("raw_item.item_id", make_raw_items, lambda items: [item.item_id for item in items]),
+    Benchmark(
+        "normalize_raw_item",
+        make_raw_items,
+        lambda items: [normalize_raw_item(item, source_domain="security", fetched_at=NOW, now=NOW) for item in items],
+    ),
+    Benchmark(
+        "parse_stage1_response",
+        lambda n: make_stage1_responses(n, prose=False),
+        lambda replies: [parse_stage1_response(reply) for reply in replies],
+    ),
+    Benchmark(
+        "scan_json_object",
+        lambda n: make_stage1_responses(n, prose=True),
+        lambda replies: [_scan_json_object(reply) for reply in replies],
+    ),
+    Benchmark(
+        "build_digest_artifact",
+        make_digest_items,
+        lambda items: build_digest_artifact(
+            digest_date=date(2026, 5, 26), domain="security", items=items,
+            collected_count=len(items), analyzed_count=len(items), failed_sources=0, generated_at=NOW,
+        ),
+    ),
+    Benchmark("render_digest_markdown", _render_inputs, lambda kwargs: render_digest_markdown(**kwargs)),
+    Benchmark(
+        "histogram_from_bucket_counts",
+        lambda n: [{bucket: (i + bucket) % 7 for bucket in range(0, 20, 1 + i % 3)} for i in range(n)],
+        lambda counts: [histogram_from_bucket_counts(entry) for entry in counts],
+    ),
+)
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...], *, repeat: int, only: str | None = None, log=print
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Timings per benchmark and size: median and min seconds, median per item in microseconds."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for benchmark in BENCHMARKS:
+        if only and only not in benchmark.name:
+            continue
+        for size in sizes:
+            state = benchmark.setup(size)
+            timings = []
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                benchmark.run(state)
+                timings.append(time.perf_counter() - started)
+            median = statistics.median(timings)
+            results.setdefault(benchmark.name, {})[str(size)] = {
+                "median_s": round(median, 6),
+                "min_s": round(min(timings), 6),
+                "per_item_us": round(median / size * 1e6, 3),
+            }
+            log(f"{benchmark.name:<30} {size:>7}  median {median * 1000:9.2f} ms  {median / size * 1e6:8.2f} us/item")
+    return results
+
+
+def compare(results: dict, baseline: dict, *, threshold: float) -> list[dict[str, Any]]:
+    """Benchmarks present in both runs with their median ratio; `regression` when above `threshold`."""
+    rows = []
+    for name, sizes in results.items():
+        for size, current in sizes.items():
+            previous = baseline.get(name, {}).get(size)
+            if not previous or not previous.get("median_s"):
+                continue
+            ratio = current["median_s"] / previous["median_s"]
+            rows.append({
+                "benchmark": name,
+                "size": int(size),
+                "baseline_s": previous["median_s"],
+                "median_s": current["median_s"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > threshold,
+            })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    sizes = tuple(int(size) for size in args.sizes.split(",") if size.strip())
+    results = run_benchmarks(sizes, repeat=args.repeat, only=args.only)
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                indent=2,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        print(f"baseline saved to {path}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        rows = compare(results, baseline.get("results", {}), threshold=args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['benchmark']:<30} {row['size']:>7}  x{row['ratio']:<6} {flag}")
+        regressions = [row for row in rows if row["regression"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s) above x{args.threshold}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
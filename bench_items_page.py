@@ -0,0 +1,177 @@
+"""Measure how many bytes one `/items` list page pulls from MySQL.
+
+Compares the eager row shape (every items column, i.e. the behavior before
+`content_text` / `metadata_json` were deferred) with the current list query,
+over the first N pages in the API's default order. Run against the real
+database; nothing is written.
+
+It also times the response path end to end: ORM entities serialized with
+`_serialize_item` and the stdlib encoder (the old handler) against the
+column-projected Core rows encoded by orjson (the current one), optionally
+trimmed with `--fields`, reporting seconds and response bytes per page.
+
+    python3 bench_items_page.py --pages 5 --limit 20
+    python3 bench_items_page.py --pages 5 --limit 20 --fields id,title,insight_score
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import undefer
+
+from src.config import settings
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark bytes fetched per /items page")
+    parser.add_argument("--pages", type=int, default=5, help="number of consecutive pages to fetch per variant")
+    parser.add_argument("--limit", type=int, default=settings.api_default_limit, help="items per page")
+    parser.add_argument("--fields", default=None, help="comma-separated `fields=` value for the projected variant")
+    return parser.parse_args()
+
+
+def value_size(value: Any) -> int:
+    """Approximate wire size of one column value as MySQL returns it."""
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+    if isinstance(value, (datetime, date)):
+        return len(value.isoformat())
+    if isinstance(value, (int, float, Decimal, bool)):
+        return len(str(value))
+    return len(str(value).encode("utf-8"))
+
+
+def rows_size(rows: Iterable[Any]) -> int:
+    return sum(value_size(value) for row in rows for value in row)
+
+
+def list_statement(*, eager: bool, limit: int, after: tuple[int, str] | None):
+    """The default-ordered `/items` list query, optionally with cold columns undeferred."""
+    from src.api.contracts import visible_item_filters
+    from src.models.item import Item
+
+    stmt = select(Item).where(*visible_item_filters())
+    if eager:
+        stmt = stmt.options(undefer(Item.content_text), undefer(Item.metadata_json))
+    if after is not None:
+        score, item_id = after
+        stmt = stmt.where(
+            or_(Item.insight_score < score, (Item.insight_score == score) & (Item.id > item_id))
+        )
+    return stmt.order_by(Item.insight_score.desc(), Item.id.asc()).limit(limit)
+
+
+async def measure(conn, *, eager: bool, pages: int, limit: int) -> dict[str, Any]:
+    """Fetch `pages` pages and report bytes and wall time per page."""
+    total_bytes = 0
+    total_rows = 0
+    fetched_pages = 0
+    after = None
+    started = time.perf_counter()
+    for _ in range(pages):
+        result = await conn.execute(list_statement(eager=eager, limit=limit, after=after))
+        rows = result.all()
+        if not rows:
+            break
+        fetched_pages += 1
+        total_rows += len(rows)
+        total_bytes += rows_size(rows)
+        last = rows[-1]._mapping
+        after = (last["insight_score"] or 0, last["id"])
+    elapsed = time.perf_counter() - started
+    return {
+        "pages": fetched_pages,
+        "rows": total_rows,
+        "bytes_total": total_bytes,
+        "bytes_per_page": round(total_bytes / fetched_pages) if fetched_pages else 0,
+        "seconds_per_page": round(elapsed / fetched_pages, 3) if fetched_pages else 0.0,
+    }
+
+
+def page_statement(columns, *, limit: int, after: tuple[int, str] | None):
+    """`list_statement` selecting `columns` (an entity or Core columns)."""
+    from src.api.contracts import visible_item_filters
+    from src.models.item import Item
+
+    stmt = select(*columns).where(*visible_item_filters())
+    if after is not None:
+        score, item_id = after
+        stmt = stmt.where(
+            or_(Item.insight_score < score, (Item.insight_score == score) & (Item.id > item_id))
+        )
+    return stmt.order_by(Item.insight_score.desc(), Item.id.asc()).limit(limit)
+
+
+async def measure_response(session, *, projected: bool, fields: str | None, pages: int, limit: int) -> dict[str, Any]:
+    """Fetch and encode `pages` list pages the old (ORM + stdlib json) or current (Core + orjson) way."""
+    from src.api.items import _serialize_item, item_columns, parse_item_fields, project_item_row
+    from src.api.responses import OrjsonResponse
+    from src.models.item import Item
+
+    selected = parse_item_fields(fields)
+    total_bytes = 0
+    fetched_pages = 0
+    after = None
+    started = time.perf_counter()
+    for _ in range(pages):
+        if projected:
+            rows = (await session.execute(page_statement(item_columns(selected), limit=limit, after=after))).all()
+            body = OrjsonResponse({"data": [project_item_row(row, selected) for row in rows]}).body
+        else:
+            rows = (await session.execute(page_statement([Item], limit=limit, after=after))).scalars().all()
+            body = json.dumps(
+                {"data": [_serialize_item(item) for item in rows]}, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            session.expunge_all()
+        if not rows:
+            break
+        fetched_pages += 1
+        total_bytes += len(body)
+        after = (rows[-1].insight_score or 0, rows[-1].id)
+    elapsed = time.perf_counter() - started
+    return {
+        "pages": fetched_pages,
+        "response_bytes_per_page": round(total_bytes / fetched_pages) if fetched_pages else 0,
+        "seconds_per_page": round(elapsed / fetched_pages, 4) if fetched_pages else 0.0,
+    }
+
+
+async def main() -> int:
+    """Run both variants against the configured database and print a JSON summary."""
+    from src.db import async_session, engine
+
+    args = parse_args()
+    async with engine.connect() as conn:
+        before = await measure(conn, eager=True, pages=args.pages, limit=args.limit)
+        after = await measure(conn, eager=False, pages=args.pages, limit=args.limit)
+    async with async_session() as session:
+        orm = await measure_response(session, projected=False, fields=None, pages=args.pages, limit=args.limit)
+        projected = await measure_response(
+            session, projected=True, fields=args.fields, pages=args.pages, limit=args.limit
+        )
+    await engine.dispose()
+    saved = 1 - after["bytes_per_page"] / before["bytes_per_page"] if before["bytes_per_page"] else 0.0
+    print(json.dumps({
+        "before": before,
+        "after": after,
+        "bytes_saved_ratio": round(saved, 3),
+        "response": {"orm_json": orm, "projected_orjson": projected, "fields": args.fields},
+    }, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
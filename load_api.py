@@ -0,0 +1,341 @@
+"""Load-test `/items` and check its query plans against the current indexes.
+
+Three steps, each optional:
+
+1. `--seed N` inserts N synthetic items into the configured database in
+   `--batch` sized multi-row INSERT IGNOREs (ids are deterministic, so a
+   re-run tops up instead of duplicating). Items use the catalog's visible
+   sources and domains, spread over `--days` of publication dates, with
+   stage-1/2 fields and Chinese summaries for the ngram full-text index.
+   Only loopback databases are seeded unless
+   `--allow-remote` is given: point DATABASE_URL at a scratch MySQL.
+2. `--requests` requests from a weighted mix of query shapes (plain list,
+   domain, category, min_score, since, combined filters, `q`, `q` with
+   category, a second page by cursor, item detail) are sent to the app
+   in-process, `--concurrency` at a time; p50/p99 latency and errors are
+   reported per shape.
+3. Every shape is requested once more with its SQL captured, and each items
+   SELECT is run through `EXPLAIN FORMAT=JSON`. Full table scans, full index
+   scans, filesorts and temporary tables are flagged; `--fail-on-findings`
+   exits 1 when any shape has one.
+
+    python3 load_api.py --seed 2000000 --requests 0
+    python3 load_api.py --requests 5000 --concurrency 32 --json var/load_api.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import make_url
+
+from src.config import parse_csv, settings
+from src.pipeline.profile import percentile
+
+NOW = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+CATEGORIES = ("vulnerability", "exploit", "research", "product", "engineering", "tool", "incident", "discussion", "other")
+SEARCH_TERMS = ("漏洞", "远程代码执行", "模型", "智能体", "内核", "供应链", "越狱", "勒索")
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+_captured: ContextVar[list[tuple[str, Any]] | None] = ContextVar("load_api_captured", default=None)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test /items and check its query plans")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic items to insert before the run")
+    parser.add_argument("--batch", type=int, default=5000, help="rows per INSERT while seeding")
+    parser.add_argument("--days", type=int, default=365, help="spread of seeded publication dates")
+    parser.add_argument("--allow-remote", action="store_true", help="allow seeding a non-loopback database")
+    parser.add_argument("--requests", type=int, default=1000, help="requests to send (0 skips the load step)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--no-explain", action="store_true", help="skip the EXPLAIN step")
+    parser.add_argument("--fail-on-findings", action="store_true", help="exit 1 when a plan has a finding")
+    parser.add_argument("--random-seed", type=int, default=1, help="seed for items and the query mix")
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    return parser.parse_args(argv)
+
+
+# -- seeding ------------------------------------------------------------------
+
+
+def visible_sources() -> list[tuple[str, str]]:
+    """(source id, domain) pairs the API shows, so every seeded item is visible."""
+    from src.api.contracts import allowed_domains, allowed_source_ids
+    from src.collector.catalog import catalog_by_id
+
+    catalog, domains = catalog_by_id(), set(allowed_domains())
+    return sorted(
+        (source_id, catalog[source_id].domain)
+        for source_id in allowed_source_ids()
+        if source_id in catalog and catalog[source_id].domain in domains
+    )
+
+
+def synthetic_items(start: int, count: int, sources: list[tuple[str, str]], *, days: int, seed: int) -> list[dict]:
+    """Item rows `start` .. `start + count - 1`; the same index always yields the same row."""
+    rows = []
+    for n in range(start, start + count):
+        rng = random.Random(seed * 1_000_003 + n)
+        source_id, domain = sources[n % len(sources)]
+        score = rng.randrange(101)
+        stage = 2 if score >= settings.stage2_threshold else 1
+        term = rng.choice(SEARCH_TERMS)
+        rows.append(
+            {
+                "id": f"{source_id}:load-{n:09d}",
+                "source_id": source_id,
+                "domain": domain,
+                "title": f"Load item {n}: {term} {rng.choice(CATEGORIES)}",
+                "canonical_url": f"https://load.example.com/{source_id}/{n}",
+                "content_text": f"{term} " * rng.randrange(20, 80),
+                "published_at": NOW - timedelta(seconds=rng.randrange(days * 86400)),
+                "dedup_hash": hashlib.sha256(f"load:{n}".encode()).hexdigest()[:32],
+                "category": rng.choice(CATEGORIES),
+                "tags": [term],
+                "summary_zh": f"{term}相关的合成条目 {n}",
+                "insight_score": score,
+                "credibility": rng.choice(("high", "medium", "low")),
+                "confidence": rng.choice(("tentative", "firm", "confirmed")) if stage == 2 else None,
+                "trend_signal": rng.choice(("emerging", "growing", "stable", "declining")) if stage == 2 else None,
+                "analysis_stage": stage,
+            }
+        )
+    return rows
+
+
+async def seed_items(total: int, *, batch: int, days: int, seed: int, log=print) -> int:
+    """Insert `total` synthetic items in batches; returns the rows actually inserted."""
+    from src.db import engine
+    from src.models.item import Item
+
+    sources = visible_sources()
+    if not sources:
+        raise SystemExit("no visible sources in the catalog; cannot seed items the API would show")
+    inserted = 0
+    started = time.perf_counter()
+    for start in range(0, total, batch):
+        rows = synthetic_items(start, min(batch, total - start), sources, days=days, seed=seed)
+        async with engine.begin() as conn:
+            result = await conn.execute(mysql_insert(Item).prefix_with("IGNORE"), rows)
+        inserted += max(result.rowcount or 0, 0)
+        log(f"seeded {start + len(rows):>10} / {total}  ({(start + len(rows)) / (time.perf_counter() - started):,.0f} rows/s)")
+    return inserted
+
+
+# -- query mix ----------------------------------------------------------------
+
+
+def _since(rng: random.Random) -> str:
+    return (NOW - timedelta(days=rng.choice((1, 7, 30)))).isoformat()
+
+
+QUERY_SHAPES: dict[str, tuple[int, Callable[[random.Random, list[str]], dict[str, Any]]]] = {
+    "list": (25, lambda rng, domains: {}),
+    "domain": (15, lambda rng, domains: {"domain": rng.choice(domains)}),
+    "category": (10, lambda rng, domains: {"category": rng.choice(CATEGORIES)}),
+    "min_score": (10, lambda rng, domains: {"min_score": rng.choice((60, 75, 90))}),
+    "since": (10, lambda rng, domains: {"since": _since(rng)}),
+    "category+min_score+since": (
+        5,
+        lambda rng, domains: {"category": rng.choice(CATEGORIES), "min_score": 60, "since": _since(rng)},
+    ),
+    "q": (10, lambda rng, domains: {"q": rng.choice(SEARCH_TERMS)}),
+    "q+category": (5, lambda rng, domains: {"q": rng.choice(SEARCH_TERMS), "category": rng.choice(CATEGORIES)}),
+    "cursor": (5, lambda rng, domains: {"domain": rng.choice(domains)}),
+    "detail": (5, lambda rng, domains: {"n": rng.randrange(1000)}),
+}
+
+
+def query_mix(count: int, domains: list[str], *, seed: int) -> list[tuple[str, dict[str, Any]]]:
+    """`count` (shape, params) pairs drawn by the shapes' weights."""
+    rng = random.Random(seed)
+    names = list(QUERY_SHAPES)
+    weights = [QUERY_SHAPES[name][0] for name in names]
+    return [(name, QUERY_SHAPES[name][1](rng, domains)) for name in rng.choices(names, weights, k=count)]
+
+
+def seeded_item_id(n: int, sources: list[tuple[str, str]]) -> str:
+    return f"{sources[n % len(sources)][0]}:load-{n:09d}" if sources else f"load-{n:09d}"
+
+
+async def send(client, shape: str, params: dict[str, Any], sources: list[tuple[str, str]]):
+    """One request of `shape`; a cursor request first fetches page 1 (untimed) for its cursor."""
+    if shape == "detail":
+        return await client.get(f"/api/v1/items/{seeded_item_id(params['n'], sources)}")
+    if shape == "cursor":
+        first = await client.get("/api/v1/items", params=params)
+        next_cursor = first.json().get("meta", {}).get("next_cursor") if first.status_code == 200 else None
+        params = {**params, "cursor": next_cursor} if next_cursor else params
+    return await client.get("/api/v1/items", params=params)
+
+
+async def drive(
+    client, mix: list[tuple[str, dict[str, Any]]], *, concurrency: int, sources: list[tuple[str, str]]
+) -> dict:
+    """Send `mix` through `client`; latency percentiles (ms), requests and errors per shape."""
+    timings: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(shape: str, params: dict[str, Any]) -> None:
+        async with sem:
+            started = time.perf_counter()
+            try:
+                response = await send(client, shape, params, sources)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            timings.setdefault(shape, []).append((time.perf_counter() - started) * 1000)
+            errors[shape] = errors.get(shape, 0) + int(failed)
+
+    await asyncio.gather(*(one(shape, params) for shape, params in mix))
+    return {
+        shape: {
+            "requests": len(values),
+            "errors": errors.get(shape, 0),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(max(values), 1),
+        }
+        for shape, values in sorted(timings.items())
+    }
+
+
+# -- query plans --------------------------------------------------------------
+
+
+def plan_findings(plan: Any) -> list[str]:
+    """Full scans, full index scans, filesorts and temporary tables in an `EXPLAIN FORMAT=JSON` plan."""
+    findings: list[str] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, list):
+            for child in node:
+                walk(child)
+            return
+        if not isinstance(node, dict):
+            return
+        table = node.get("table")
+        if isinstance(table, dict):
+            name, rows = table.get("table_name", "?"), table.get("rows_examined_per_scan")
+            if table.get("access_type") == "ALL":
+                findings.append(f"full scan of {name} (~{rows} rows)")
+            elif table.get("access_type") == "index":
+                findings.append(f"full index scan of {name} via {table.get('key')} (~{rows} rows)")
+        if node.get("using_filesort"):
+            findings.append("filesort")
+        if node.get("using_temporary_table"):
+            findings.append("temporary table")
+        for child in node.values():
+            walk(child)
+
+    walk(plan)
+    return list(dict.fromkeys(findings))
+
+
+def capture_statements(engine) -> None:
+    """Record statements run while a capture list is bound (see `captured_sql`)."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        captured = _captured.get()
+        if captured is not None:
+            captured.append((statement, parameters))
+
+
+async def captured_sql(
+    client, shape: str, params: dict[str, Any], sources: list[tuple[str, str]]
+) -> list[tuple[str, Any]]:
+    captured: list[tuple[str, Any]] = []
+    token = _captured.set(captured)
+    try:
+        await send(client, shape, params, sources)
+    finally:
+        _captured.reset(token)
+    return [(sql, args) for sql, args in captured if sql.lstrip().upper().startswith("SELECT") and "FROM items" in sql]
+
+
+async def explain_shapes(client, engine, domains: list[str], *, seed: int, sources: list[tuple[str, str]]) -> dict:
+    """The EXPLAIN plan findings of every items SELECT each shape issues."""
+    rng = random.Random(seed)
+    report = {}
+    for shape, (_, build) in QUERY_SHAPES.items():
+        statements = await captured_sql(client, shape, build(rng, domains), sources)
+        plans = []
+        async with engine.connect() as conn:
+            for sql, args in statements:
+                result = await conn.exec_driver_sql(f"EXPLAIN FORMAT=JSON {sql}", args)
+                plan = json.loads(result.scalar())
+                plans.append({"sql": " ".join(sql.split())[:500], "findings": plan_findings(plan)})
+        report[shape] = plans
+    return report
+
+
+# -- main ---------------------------------------------------------------------
+
+
+def format_report(latency: dict, plans: dict) -> str:
+    lines = [f"{'shape':<26} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for shape, row in latency.items():
+        lines.append(
+            f"{shape:<26} {row['requests']:>8} {row['errors']:>6} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    for shape, shape_plans in plans.items():
+        findings = sorted({finding for plan in shape_plans for finding in plan["findings"]})
+        lines.append(f"plan {shape:<21} {'FLAG ' + '; '.join(findings) if findings else 'ok'}")
+    return "\n".join(lines)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+
+    from src.db import engine
+    from src.main import app
+
+    report: dict[str, Any] = {"seeded": 0, "latency": {}, "plans": {}}
+    if args.seed:
+        host = make_url(settings.database_url).host or ""
+        if host not in LOOPBACK_HOSTS and not args.allow_remote:
+            raise SystemExit(f"refusing to seed {host}: point DATABASE_URL at a local database or pass --allow-remote")
+        report["seeded"] = await seed_items(args.seed, batch=args.batch, days=args.days, seed=args.random_seed)
+    domains = list(parse_csv(settings.digest_domains)) or ["security"]
+    sources = visible_sources()
+    headers = {"Authorization": f"Bearer {settings.api_token}"} if settings.api_token else {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-api", headers=headers, timeout=None) as client:
+        if args.requests:
+            mix = query_mix(args.requests, domains, seed=args.random_seed)
+            report["latency"] = await drive(client, mix, concurrency=args.concurrency, sources=sources)
+        if not args.no_explain:
+            capture_statements(engine)
+            report["plans"] = await explain_shapes(client, engine, domains, seed=args.random_seed, sources=sources)
+    await engine.dispose()
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print(format_report(report["latency"], report["plans"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+    flagged = [shape for shape, plans in report["plans"].items() if any(plan["findings"] for plan in plans)]
+    if flagged and args.fail_on_findings:
+        print(f"query plans flagged for: {', '.join(flagged)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
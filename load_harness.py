@@ -0,0 +1,525 @@
+"""End-to-end load harness for the daily pipeline, with nothing remote.
+
+Drives `run_daily_pipeline` against local stand-ins:
+
+- a feed server on 127.0.0.1 serving synthetic RSS, JSON API, GitHub
+  advisory (GHSA) and NVD payloads, `--feeds` sources of each kind with
+  `--items-per-feed` entries of about `--content-bytes` each, answering
+  after `--feed-latency-ms`; or, with `--replay`, a recorded production
+  day (`src.collector.recording`: its sources, window and responses);
+- a fake OpenAI-compatible `/chat/completions` server that answers after
+  `--llm-latency-ms` with valid stage-1 / stage-2 / digest JSON, except for
+  a `--llm-429-rate` share of 429s and a `--llm-malformed-rate` share of
+  replies that are not JSON (both exercise the client's retry and the
+  analyzer's repair paths);
+- an in-memory OSS bucket (`--oss-latency-ms` blocks like the real SDK);
+- a session stand-in that serves the synthetic sources, drops writes and
+  charges `--db-latency-ms` per round trip (the production database is a
+  cross-border hop away; 1000-6000 ms is realistic).
+
+Feeds, the model and OSS are reached over real sockets with the production
+collectors, client and uploader, so HTTP, parsing, retries and concurrency
+limits are all exercised. The report lists wall and CPU time, items/s and
+LLM call latency per stage (`stats_json["profile"]`) plus what each
+stand-in served. At 10x today's volume:
+
+    python3 load_harness.py --feeds 20 --items-per-feed 60
+    python3 load_harness.py --feeds 20 --stage1-concurrency 8 --json var/load.json
+    python3 load_harness.py --replay var/recordings/run_20260526_160000.jsonl.gz
+
+Nothing is written to the database, OSS or the Hexo posts directory.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from sqlalchemy import Select
+
+from src.ai.analyzer import Analyzer, model_policy_from_settings
+from src.ai.client import OpenAICompatibleClient
+from src.collector.dispatcher import collect_sources
+from src.collector.recording import TrafficRecording, replay_collector
+from src.config import parse_csv, settings
+from src.models.source import Source
+from src.pipeline.output import OSSConfig, upload_digest_backup
+from src.pipeline.runner import PipelineOptions, run_daily_pipeline
+
+FEED_KINDS = ("rss", "json", "ghsa", "nvd")
+STAGE_MODELS = {"stage1": "load-stage1", "stage2": "load-stage2", "digest": "load-digest"}
+WORDS = ("remote", "attacker", "crafted", "request", "kernel", "model", "agent", "token", "buffer", "parser")
+CATEGORIES = ("vulnerability", "exploit", "research", "product", "engineering", "tool", "incident")
+
+Handler = Callable[[str, str, dict[str, list[str]], bytes], Awaitable[tuple[int, str, bytes]]]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the daily pipeline against local stand-ins")
+    parser.add_argument("--feeds", type=int, default=2, help="sources of each kind (rss, json, ghsa, nvd)")
+    parser.add_argument("--items-per-feed", type=int, default=30, help="entries per feed payload")
+    parser.add_argument("--content-bytes", type=int, default=1500, help="approximate body size per entry")
+    parser.add_argument("--feed-latency-ms", type=float, default=50.0, help="feed server delay per response")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="model server delay per completion")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0, help="share of completions answered with 429")
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.0, help="share of completions that are not JSON")
+    parser.add_argument("--oss-latency-ms", type=float, default=0.0, help="blocking delay per OSS upload")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="delay per database round trip")
+    parser.add_argument("--stage1-concurrency", type=int, default=None, help="override STAGE1_CONCURRENCY")
+    parser.add_argument("--stage2-concurrency", type=int, default=None, help="override STAGE2_CONCURRENCY")
+    parser.add_argument("--no-retry-backoff", action="store_true", help="retry 429s immediately instead of backing off")
+    parser.add_argument("--replay", default=None, help="serve feeds from this collector recording instead")
+    parser.add_argument("--seed", type=int, default=1, help="seed for payloads and injected failures")
+    parser.add_argument("--json", default=None, help="also write the full report (with run stats) to this file")
+    return parser.parse_args(argv)
+
+
+# -- local HTTP ---------------------------------------------------------------
+
+
+class LocalHTTPServer:
+    """Minimal HTTP/1.1 server on 127.0.0.1: one request per connection, answered by an async handler."""
+
+    def __init__(self, handler: Handler):
+        self.handler = handler
+        self.base_url = ""
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = dict(line.split(":", 1) for line in header_lines if ":" in line)
+            length = int({key.strip().lower(): value for key, value in headers.items()}.get("content-length", 0))
+            body = await reader.readexactly(length) if length else b""
+            parts = urlsplit(target)
+            status, content_type, payload = await self.handler(method, parts.path, parse_qs(parts.query), body)
+        except (asyncio.IncompleteReadError, ValueError):
+            status, content_type, payload = 400, "text/plain", b"bad request"
+        writer.write(
+            f"HTTP/1.1 {status} X\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+# -- synthetic feeds ----------------------------------------------------------
+
+
+@dataclass
+class FeedServer:
+    """Serves `/<kind>/<source_id>` payloads; every source gets its own item set."""
+
+    items_per_feed: int
+    content_bytes: int
+    latency_s: float
+    now: datetime
+    seed: int = 1
+    requests: int = 0
+    bytes_served: int = 0
+
+    async def handle(self, method: str, path: str, query: dict[str, list[str]], body: bytes) -> tuple[int, str, bytes]:
+        _, kind, source_id = (path.split("/") + ["", ""])[:3]
+        render = {"rss": self.rss, "json": self.json_api, "ghsa": self.ghsa, "nvd": self.nvd}.get(kind)
+        if render is None or not source_id:
+            return 404, "text/plain", b"unknown feed"
+        await asyncio.sleep(self.latency_s)
+        content_type, payload = render(source_id)
+        self.requests += 1
+        self.bytes_served += len(payload)
+        return 200, content_type, payload
+
+    def entries(self, source_id: str) -> list[dict[str, Any]]:
+        rng = random.Random(f"{self.seed}:{source_id}")
+        words = max(1, self.content_bytes // 8)
+        return [
+            {
+                "n": i,
+                "title": f"{source_id} entry {i}: {rng.choice(WORDS)} {rng.choice(WORDS)} issue",
+                "url": f"https://{source_id.replace('_', '-')}.example.com/posts/{i}",
+                "content": " ".join(rng.choice(WORDS) for _ in range(words)),
+                "published": self.now - timedelta(minutes=rng.randrange(1, 20 * 60)),
+                "cve": f"CVE-2026-{10000 + i}",  # shared by GHSA and NVD feeds: exercises vuln merging
+            }
+            for i in range(self.items_per_feed)
+        ]
+
+    def rss(self, source_id: str) -> tuple[str, bytes]:
+        items = "".join(
+            f"<item><title>{escape(entry['title'])}</title><link>{entry['url']}</link>"
+            f"<guid>{entry['url']}</guid><pubDate>{format_datetime(entry['published'])}</pubDate>"
+            f"<description>{escape(entry['content'])}</description></item>"
+            for entry in self.entries(source_id)
+        )
+        xml = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{source_id}</title>{items}</channel></rss>'
+        return "application/rss+xml", xml.encode()
+
+    def json_api(self, source_id: str) -> tuple[str, bytes]:
+        records = [
+            {
+                "id": f"{source_id}-{entry['n']}",
+                "title": entry["title"],
+                "url": entry["url"],
+                "content": entry["content"],
+                "author": "load",
+                "published_at": entry["published"].isoformat(),
+            }
+            for entry in self.entries(source_id)
+        ]
+        return "application/json", json.dumps({"items": records}).encode()
+
+    def ghsa(self, source_id: str) -> tuple[str, bytes]:
+        advisories = [
+            {
+                "ghsa_id": f"GHSA-{entry['n']:04d}-{source_id[-4:]:x>4}-load",
+                "summary": entry["title"],
+                "description": entry["content"],
+                "html_url": entry["url"],
+                "published_at": entry["published"].isoformat().replace("+00:00", "Z"),
+                "severity": "high",
+                "identifiers": [{"type": "CVE", "value": entry["cve"]}],
+                "vulnerabilities": [],
+            }
+            for entry in self.entries(source_id)
+        ]
+        return "application/json", json.dumps(advisories).encode()
+
+    def nvd(self, source_id: str) -> tuple[str, bytes]:
+        vulnerabilities = [
+            {
+                "cve": {
+                    "id": entry["cve"],
+                    "published": entry["published"].strftime("%Y-%m-%dT%H:%M:%S.000"),
+                    "vulnStatus": "Analyzed",
+                    "descriptions": [{"lang": "en", "value": entry["content"]}],
+                    "references": [{"url": entry["url"]}],
+                    "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 7.5, "vectorString": "CVSS:3.1/AV:N"}}]},
+                    "weaknesses": [{"description": [{"value": "CWE-787"}]}],
+                }
+            }
+            for entry in self.entries(source_id)
+        ]
+        return "application/json", json.dumps({"totalResults": len(vulnerabilities), "vulnerabilities": vulnerabilities}).encode()
+
+
+def synthetic_sources(base_url: str, feeds_per_kind: int) -> list[Source]:
+    """`feeds_per_kind` approved sources per feed kind, pointed at the feed server."""
+    domains = parse_csv(settings.digest_domains) or ["security"]
+    shapes = {
+        "rss": ("rss", "l1_rss", None),
+        "json": ("internal_api", "l1_api", None),
+        "ghsa": ("github_api", "l1_github", {"collector": "github_advisories"}),
+        "nvd": ("api", "l1_api", {"collector": "nvd"}),
+    }
+    sources = []
+    for kind in FEED_KINDS:
+        source_type, strategy, config = shapes[kind]
+        for n in range(feeds_per_kind):
+            source_id = f"load_{kind}_{n:03d}"
+            domain = "security" if kind in ("ghsa", "nvd") else domains[(n + (kind == "json")) % len(domains)]
+            sources.append(
+                Source(
+                    id=source_id, name=source_id, domain=domain, type=source_type,
+                    url=f"{base_url}/{kind}/{source_id}", auth_mode="none", fetch_strategy=strategy,
+                    authority="official" if kind == "nvd" else "regular", status="approved", health="good",
+                    consecutive_failures=0, config_json=config, is_active=True,
+                )
+            )
+    return sources
+
+
+# -- fake model provider ------------------------------------------------------
+
+
+@dataclass
+class FakeLLMServer:
+    """OpenAI-compatible `/chat/completions` with injected latency, 429s and malformed replies."""
+
+    latency_s: float
+    rate_limited_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 1
+    served: dict[str, int] = field(default_factory=lambda: {"ok": 0, "rate_limited": 0, "malformed": 0})
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    async def handle(self, method: str, path: str, query: dict[str, list[str]], body: bytes) -> tuple[int, str, bytes]:
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return 404, "application/json", b'{"error": "not found"}'
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+        finally:
+            self.in_flight -= 1
+        roll = self.rng.random()
+        if roll < self.rate_limited_rate:
+            self.served["rate_limited"] += 1
+            return 429, "application/json", b'{"error": {"message": "rate limited"}}'
+        model = json.loads(body or b"{}").get("model", "")
+        if roll < self.rate_limited_rate + self.malformed_rate:
+            self.served["malformed"] += 1
+            content = "分析如下 {summary: 未完成"
+        else:
+            self.served["ok"] += 1
+            content = json.dumps(self.reply(model), ensure_ascii=False)
+        completion = {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(content) // 2},
+        }
+        return 200, "application/json", json.dumps(completion, ensure_ascii=False).encode()
+
+    def reply(self, model: str) -> dict[str, Any]:
+        if model == STAGE_MODELS["stage2"]:
+            return {
+                "recommendation_reason": "影响面广,已有公开利用",
+                "trend_signal": self.rng.choice(("emerging", "growing", "stable")),
+                "action_suggestion": "尽快升级到修复版本",
+            }
+        if model == STAGE_MODELS["digest"]:
+            return {"overview_zh": "今日要点:多个高危漏洞与新的模型发布。"}
+        return {
+            "category": self.rng.choice(CATEGORIES),
+            "tags": [self.rng.choice(WORDS) for _ in range(3)],
+            "summary_zh": "远程攻击者可利用该问题执行任意代码",
+            "insight_score": self.rng.randrange(101),
+            "credibility": self.rng.choice(("high", "medium", "low")),
+        }
+
+
+def load_analyzer(base_url: str, *, no_retry_backoff: bool = False) -> Analyzer:
+    """The production analyzer and client, with the settings' policies, pointed at the fake provider."""
+    policies = {stage: model_policy_from_settings(stage) for stage in STAGE_MODELS}
+    if no_retry_backoff:
+        policies = {stage: replace(policy, retry_backoff_s=()) for stage, policy in policies.items()}
+    return Analyzer(
+        OpenAICompatibleClient(base_url=base_url, api_key="load", provider="load"),
+        stage1_model=STAGE_MODELS["stage1"],
+        stage2_model=STAGE_MODELS["stage2"],
+        digest_model=STAGE_MODELS["digest"],
+        stage1_policy=policies["stage1"],
+        stage2_policy=policies["stage2"],
+        digest_policy=policies["digest"],
+    )
+
+
+# -- OSS and database stand-ins -----------------------------------------------
+
+
+class MemoryBucket:
+    """`oss2.Bucket` stand-in; `put_object` blocks `latency_s` like the synchronous SDK call."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.objects: dict[str, bytes] = {}
+
+    def put_object(self, key: str, data: bytes) -> None:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.objects[key] = bytes(data)
+
+
+class MemoryResult:
+    def __init__(self, rows: list[Any] | None = None):
+        self.rows = rows or []
+        self.rowcount = len(self.rows)
+
+    def scalars(self) -> MemoryResult:
+        return self
+
+    def all(self) -> list[Any]:
+        return list(self.rows)
+
+    def first(self) -> Any:
+        return self.rows[0] if self.rows else None
+
+    def scalar_one_or_none(self) -> Any:
+        return self.first()
+
+    def scalar(self) -> Any:
+        return self.first()
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class MemorySession:
+    """Session stand-in: selects on `sources` return the synthetic sources, every other statement
+    finds nothing (an empty database) and writes are dropped. Each `execute` and `commit` is one
+    round trip costing `latency_s`."""
+
+    def __init__(self, sources: list[Source], *, latency_s: float = 0.0):
+        self.sources = sources
+        self.latency_s = latency_s
+        self.round_trips = 0
+        self.added: list[Any] = []
+
+    async def execute(self, statement, *args, **kwargs) -> MemoryResult:
+        await self._round_trip()
+        if isinstance(statement, Select) and Source.__table__ in statement.get_final_froms():
+            return MemoryResult(list(self.sources))
+        return MemoryResult()
+
+    async def get(self, *args, **kwargs) -> None:
+        await self._round_trip()
+        return None
+
+    def add(self, obj: Any) -> None:
+        self.added.append(obj)
+
+    async def flush(self) -> None:
+        await self._round_trip()
+
+    async def commit(self) -> None:
+        await self._round_trip()
+
+    async def rollback(self) -> None:
+        return None
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+
+# -- run and report -----------------------------------------------------------
+
+
+async def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    """Start the stand-ins, run the pipeline once against them and return the report."""
+    if args.stage1_concurrency:
+        settings.stage1_concurrency = args.stage1_concurrency
+    if args.stage2_concurrency:
+        settings.stage2_concurrency = args.stage2_concurrency
+    now = datetime.now(timezone.utc)
+    window_start, window_end = now - timedelta(hours=24), now
+    feeds = FeedServer(args.items_per_feed, args.content_bytes, args.feed_latency_ms / 1000, now, seed=args.seed)
+    llm = FakeLLMServer(
+        args.llm_latency_ms / 1000,
+        rate_limited_rate=args.llm_429_rate,
+        malformed_rate=args.llm_malformed_rate,
+        seed=args.seed,
+    )
+    feed_http, llm_http = LocalHTTPServer(feeds.handle), LocalHTTPServer(llm.handle)
+    llm_url = await llm_http.start()
+    if args.replay:
+        recording = TrafficRecording.load(args.replay)
+        sources, collector = recording.source_models(), replay_collector(recording)
+        window_start, window_end = recording.window_start or window_start, recording.window_end or window_end
+    else:
+        sources, collector = synthetic_sources(await feed_http.start(), args.feeds), collect_sources
+    bucket = MemoryBucket(args.oss_latency_ms / 1000)
+    session = MemorySession(sources, latency_s=args.db_latency_ms / 1000)
+    analyzer = load_analyzer(llm_url, no_retry_backoff=args.no_retry_backoff)
+    try:
+        with tempfile.TemporaryDirectory(prefix="load-harness-") as posts_dir:
+            options = PipelineOptions(
+                run_id=f"load_{now:%Y%m%dT%H%M%S}",
+                window_start=window_start,
+                window_end=window_end,
+                hexo_posts_dir=posts_dir,
+                oss_config=OSSConfig(endpoint="oss-load.local", bucket="load", access_key_id="", access_key_secret=""),
+            )
+            started = time.perf_counter()
+            result = await run_daily_pipeline(
+                session,
+                analyzer,
+                options,
+                collector=collector,
+                oss_uploader=functools.partial(upload_digest_backup, bucket_factory=lambda config: bucket),
+            )
+            wall_s = time.perf_counter() - started
+    finally:
+        await analyzer.client.aclose()
+        await feed_http.close()
+        await llm_http.close()
+    return {
+        "status": result.status,
+        "wall_s": round(wall_s, 3),
+        "inserted": result.inserted_count,
+        "duplicates": result.duplicate_count,
+        "errors": result.normalized_error_count,
+        "profile": result.stats_json.get("profile", {}),
+        "feeds": _feed_report(len(sources), feeds, getattr(collector, "transport", None)),
+        "llm": {**llm.served, "max_in_flight": llm.max_in_flight},
+        "oss": {"objects": len(bucket.objects), "bytes": sum(map(len, bucket.objects.values()))},
+        "db": {"round_trips": session.round_trips, "added": len(session.added)},
+        "stats": result.stats_json,
+    }
+
+
+def _feed_report(sources: int, feeds: FeedServer, replay) -> dict[str, Any]:
+    if replay is None:
+        return {"sources": sources, "requests": feeds.requests, "bytes": feeds.bytes_served}
+    return {"sources": sources, "requests": replay.requests, "bytes": replay.bytes_served, "misses": replay.misses}
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"status {report['status']}  wall {report['wall_s']:.2f} s  inserted {report['inserted']}"
+        f"  duplicates {report['duplicates']}  errors {report['errors']}",
+        f"{'stage':<10} {'wall s':>8} {'cpu s':>8} {'items':>7} {'items/s':>9} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9}",
+    ]
+    for name, stage in report["profile"].get("stages", {}).items():
+        calls = stage.get("calls") or {}
+        lines.append(
+            f"{name:<10} {stage.get('wall_s', 0):>8.2f} {stage.get('cpu_s') or 0:>8.2f} {stage.get('items') or 0:>7}"
+            f" {stage.get('items_per_s') or 0:>9.1f} {calls.get('count', 0):>6}"
+            f" {calls.get('p50_ms') or 0:>9.1f} {calls.get('p95_ms') or 0:>9.1f}"
+        )
+    feeds, llm, oss, db = report["feeds"], report["llm"], report["oss"], report["db"]
+    missed = f", {len(feeds['misses'])} not in recording" if "misses" in feeds else ""
+    lines.append(f"feeds: {feeds['sources']} sources, {feeds['requests']} requests, {feeds['bytes']} bytes{missed}")
+    lines.append(
+        f"llm: {llm['ok']} ok, {llm['rate_limited']} rate limited, {llm['malformed']} malformed,"
+        f" max {llm['max_in_flight']} in flight"
+    )
+    lines.append(f"oss: {oss['objects']} objects, {oss['bytes']} bytes; db: {db['round_trips']} round trips")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # The stand-ins listen on loopback; keep any configured HTTP proxy out of the way.
+    os.environ["NO_PROXY"] = ",".join(filter(None, (os.environ.get("NO_PROXY"), "127.0.0.1")))
+    report = asyncio.run(run_load(args))
+    print(format_report(report))
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False, default=str)
+        print(f"report written to {args.json}")
+    return 0 if report["status"] == "succeeded" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
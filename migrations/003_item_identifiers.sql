@@ -0,0 +1,15 @@
+-- Vulnerability / package identifiers extracted at ingest time, so CVE and
+-- GHSA correlation across sources is an indexed lookup instead of a scan over
+-- items.metadata_json. Rows follow their item out via ON DELETE CASCADE.
+
+CREATE TABLE IF NOT EXISTS item_identifiers (
+    kind            VARCHAR(16) NOT NULL,
+    value           VARCHAR(200) NOT NULL,
+    item_id         VARCHAR(96) NOT NULL,
+    is_primary      BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (kind, value, item_id),
+    KEY ix_item_id (item_id),
+    CONSTRAINT fk_item_identifiers_item FOREIGN KEY (item_id) REFERENCES items (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,45 @@
+-- Optional archive for the chunked retention job (src.pipeline.cleanup).
+-- Rows are copied server-side with INSERT IGNORE ... SELECT before deletion;
+-- no FULLTEXT or dedup unique key, since the archive is write-mostly.
+
+CREATE TABLE IF NOT EXISTS items_archive (
+    id                      VARCHAR(96) PRIMARY KEY,
+    source_id               VARCHAR(64) NOT NULL,
+    domain                  ENUM('security','ai','finance','general') NOT NULL,
+    run_id                  VARCHAR(64) NULL,
+    title                   VARCHAR(500) NOT NULL,
+    canonical_url           VARCHAR(1000) NOT NULL,
+    content_text            MEDIUMTEXT NULL,
+    author                  VARCHAR(200) NULL,
+    published_at            TIMESTAMP NULL,
+    fetched_at              TIMESTAMP NULL,
+    dedup_hash              VARCHAR(64) NOT NULL,
+    also_seen_in            JSON NULL,
+    metadata_json           JSON NULL,
+    category                VARCHAR(50) NULL,
+    tags                    JSON NULL,
+    summary_zh              VARCHAR(500) NULL,
+    insight_score           TINYINT UNSIGNED NULL,
+    credibility             ENUM('high','medium','low','unknown') NOT NULL DEFAULT 'unknown',
+    confidence              ENUM('tentative','firm','confirmed') NULL,
+    recommendation_reason   TEXT NULL,
+    trend_signal            ENUM('emerging','growing','stable','declining') NULL,
+    action_suggestion       TEXT NULL,
+    analysis_stage          TINYINT NOT NULL DEFAULT 0,
+    stage1_model            VARCHAR(200) NULL,
+    stage1_provider         VARCHAR(100) NULL,
+    stage1_prompt_version   VARCHAR(50) NULL,
+    stage1_analyzed_at      TIMESTAMP NULL,
+    stage1_error            VARCHAR(200) NULL,
+    stage2_model            VARCHAR(200) NULL,
+    stage2_provider         VARCHAR(100) NULL,
+    stage2_prompt_version   VARCHAR(50) NULL,
+    stage2_analyzed_at      TIMESTAMP NULL,
+    stage2_error            VARCHAR(200) NULL,
+    expires_at              TIMESTAMP NULL,
+    created_at              TIMESTAMP NULL,
+    archived_at             TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    KEY ix_source_id (source_id),
+    KEY ix_archived_at (archived_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
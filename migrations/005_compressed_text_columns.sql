@@ -0,0 +1,8 @@
+-- Store digest markdown and deep-analysis reports through the CompressedText
+-- codec (src.models.compression). Converting MEDIUMTEXT to MEDIUMBLOB keeps
+-- each row's UTF-8 bytes as-is, which the codec reads as uncompressed values;
+-- `python3 -m src.pipeline.recompress` compresses existing rows afterwards.
+
+ALTER TABLE digests MODIFY COLUMN content_markdown MEDIUMBLOB NOT NULL;
+
+ALTER TABLE deep_analyses MODIFY COLUMN report_md MEDIUMBLOB NULL;
@@ -0,0 +1,8 @@
+-- Change watermark for the local read replica (src.replica): MySQL bumps
+-- updated_at on every row change, and the replica syncs items whose
+-- (updated_at, id) is past its last watermark through this index. Existing
+-- rows start at the migration time, so the first sync simply loads them all.
+
+ALTER TABLE items
+    ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD KEY ix_items_updated_at (updated_at, id);
@@ -0,0 +1,41 @@
+-- Per-day item counts by (domain, source, category, confidence, score bucket)
+-- so /stats is one indexed read instead of six aggregates over items. The
+-- pipeline adds to it as it persists and analyzes items, retention subtracts
+-- what it deletes, and `python3 -m src.pipeline.rollups --rebuild` recomputes
+-- it from items.
+--
+-- The backfill below counts high_value at the default STAGE2_THRESHOLD (75);
+-- deployments with a different threshold run the rebuild after migrating.
+
+CREATE TABLE IF NOT EXISTS daily_item_rollups (
+    day             DATE NOT NULL,
+    domain          VARCHAR(16) NOT NULL,
+    source_id       VARCHAR(64) NOT NULL,
+    category        VARCHAR(50) NOT NULL DEFAULT '',
+    confidence      VARCHAR(16) NOT NULL DEFAULT '',
+    score_bucket    SMALLINT NOT NULL DEFAULT -1,
+    items           INT NOT NULL DEFAULT 0,
+    high_value      INT NOT NULL DEFAULT 0,
+    failed          INT NOT NULL DEFAULT 0,
+    updated_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (day, domain, source_id, category, confidence, score_bucket)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO daily_item_rollups (day, domain, source_id, category, confidence, score_bucket, items, high_value, failed)
+SELECT
+    DATE(fetched_at),
+    domain,
+    source_id,
+    COALESCE(category, ''),
+    COALESCE(confidence, ''),
+    COALESCE(FLOOR(insight_score / 5), -1),
+    COUNT(*),
+    SUM(CASE WHEN insight_score >= 75 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN stage1_error IS NOT NULL THEN 1 ELSE 0 END)
+FROM items
+GROUP BY 1, 2, 3, 4, 5, 6
+ON DUPLICATE KEY UPDATE
+    items = VALUES(items),
+    high_value = VALUES(high_value),
+    failed = VALUES(failed);
@@ -0,0 +1,31 @@
+-- Per-source, per-day fetch and ingest counters for /sources sparklines and
+-- source history. The daily run adds its fetch results (attempts, failures,
+-- duration, bytes, last error) and newly stored items in its transaction.
+--
+-- The backfill below restores items_new from the items still stored; fetch
+-- history starts with the first run after migrating.
+
+CREATE TABLE IF NOT EXISTS source_daily_stats (
+    source_id       VARCHAR(64) NOT NULL,
+    day             DATE NOT NULL,
+    fetches         INT NOT NULL DEFAULT 0,
+    failed_fetches  INT NOT NULL DEFAULT 0,
+    items_fetched   INT NOT NULL DEFAULT 0,
+    items_new       INT NOT NULL DEFAULT 0,
+    fetch_ms        INT NOT NULL DEFAULT 0,
+    max_fetch_ms    INT NOT NULL DEFAULT 0,
+    bytes           BIGINT NOT NULL DEFAULT 0,
+    last_status     VARCHAR(50) NULL,
+    last_error      VARCHAR(50) NULL,
+    last_fetch_at   DATETIME NULL,
+    updated_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (source_id, day),
+    KEY ix_source_daily_stats_day (day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT INTO source_daily_stats (source_id, day, items_new)
+SELECT source_id, DATE(fetched_at), COUNT(*)
+FROM items
+GROUP BY 1, 2
+ON DUPLICATE KEY UPDATE items_new = VALUES(items_new);
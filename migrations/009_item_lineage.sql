@@ -0,0 +1,22 @@
+-- Time-to-insight tracking (src.pipeline.lineage).
+--
+-- items.lineage holds when the daily run fetched, stored, analyzed and first
+-- put the item in a digest, as [fetched epoch seconds, then offsets in
+-- seconds from it]. insight_latency_daily counts digested items per
+-- (day, domain, source, latency bucket), so /stats/time-to-insight reads a
+-- few hundred rows instead of the items. Both start empty: lineage begins
+-- with the first run after migrating.
+
+ALTER TABLE items
+    ADD COLUMN lineage JSON NULL;
+
+CREATE TABLE IF NOT EXISTS insight_latency_daily (
+    day             DATE NOT NULL,
+    domain          VARCHAR(16) NOT NULL,
+    source_id       VARCHAR(64) NOT NULL,
+    bucket          SMALLINT NOT NULL,
+    items           INT NOT NULL DEFAULT 0,
+    updated_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (day, domain, source_id, bucket)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
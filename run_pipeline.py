@@ -22,20 +22,57 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="maximum fetched items per domain to analyze during --dry-run; use 0 for no limit",
     )
-    return parser.parse_args()
-
-
-async def dry_run_pipeline(max_items_per_domain: int | None = 5) -> dict:
-    """Run the pipeline without committing DB changes and return a JSON summary."""
+    parser.add_argument(
+        "--profile",
+        choices=["off", "cpu", "memory", "all"],
+        default=None,
+        help="sample CPU stacks and/or take tracemalloc snapshots at stage boundaries "
+        "(written to PIPELINE_PROFILE_DIR/<run_id>/); defaults to PIPELINE_PROFILE",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        default=None,
+        help="record the collectors' HTTP traffic to DIR/<run_id>.jsonl.gz "
+        "(real runs default to COLLECTOR_RECORD_DIR)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FILE",
+        default=None,
+        help="with --dry-run: serve feeds from a recording instead of the network, using its run window",
+    )
+    args = parser.parse_args()
+    if args.replay and not args.dry_run:
+        parser.error("--replay requires --dry-run")
+    return args
+
+
+async def dry_run_pipeline(
+    max_items_per_domain: int | None = 5,
+    profile_mode: str | None = None,
+    record_dir: str | None = None,
+    replay_path: str | None = None,
+) -> dict:
+    """Run the pipeline without committing DB changes and return a JSON summary.
+
+    With `replay_path`, feeds are served from that recording and the run
+    covers its window; with `record_dir`, the collectors' traffic is saved
+    there.
+    """
     deps = _pipeline_deps()
     now = datetime.now(timezone.utc)
     stats_updates = 0
+    replay = deps.load_recording(replay_path) if replay_path else None
     with TemporaryDirectory(prefix="intelligence-pipeline-smoke-") as posts_dir:
         async with deps.async_session() as session:
             sources = await deps.load_approved_sources(session)
             source_ids = [source.id for source in sources]
             source_domains = {source.id: source.domain for source in sources}
-            window_start, window_end = await deps.compute_run_window(session, now)
+            if replay is not None and replay.window_start and replay.window_end:
+                window_start, window_end = replay.window_start, replay.window_end
+            else:
+                window_start, window_end = await deps.compute_run_window(session, now)
 
             async def runner(run):
                 nonlocal stats_updates
@@ -52,14 +89,28 @@ async def dry_run_pipeline(max_items_per_domain: int | None = 5) -> dict:
                     window_end=run.window_end,
                     hexo_posts_dir=posts_dir,
                     oss_config=None,
+                    profiler=deps.run_profiler(run.id, profile_mode),
                 )
+                recording = None
+                collect = None
+                if replay is not None:
+                    collect = deps.replay_collector(replay)
+                elif record_dir:
+                    recording = deps.TrafficRecording(run.id, window_start=run.window_start, window_end=run.window_end)
+                    collect = deps.recording_collector(recording)
                 result = await deps.run_daily_pipeline(
                     session,
                     deps.Analyzer.nvidia_from_settings(),
                     options,
-                    collector=_limited_collector(max_items_per_domain, source_domains),
+                    collector=_limited_collector(max_items_per_domain, source_domains, collect),
                     stats_updater=update_stats,
                 )
+                if recording is not None:
+                    result.stats_json["recording"] = deps.save_run_recording(
+                        recording, deps.recording_path(run.id, record_dir)
+                    )
+                if replay is not None:
+                    result.stats_json["replay"] = {"path": replay_path, "misses": collect.transport.misses}
                 return result.status, result.stats_json
 
             lifecycle = await deps.run_with_lifecycle(
@@ -87,18 +138,19 @@ async def dry_run_pipeline(max_items_per_domain: int | None = 5) -> dict:
             return summary
 
 
-def _limited_collector(max_items_per_domain: int | None, source_domains: dict[str, str] | None = None):
-    """Wrap the real collector so dry runs cap analyzed items per domain."""
-    from src.collector.dispatcher import collect_sources
+def _limited_collector(max_items_per_domain: int | None, source_domains: dict[str, str] | None = None, collect=None):
+    """Wrap the real collector (or `collect`) so dry runs cap analyzed items per domain."""
+    if collect is None:
+        from src.collector.dispatcher import collect_sources as collect
 
     if max_items_per_domain is None or max_items_per_domain <= 0:
-        return collect_sources
+        return collect
     source_domains = source_domains or {}
 
     async def collect_limited(sources, since=None):
         remaining_by_domain: dict[str, int] = {}
         limited_results = []
-        for result in await collect_sources(sources, since=since):
+        for result in await collect(sources, since=since):
             domain = source_domains.get(result.source_id, result.source_id)
             remaining = remaining_by_domain.setdefault(domain, max_items_per_domain)
             items = result.items[: max(0, remaining)]
@@ -121,8 +173,16 @@ def _pipeline_deps():
     from types import SimpleNamespace
 
     from src.ai.analyzer import Analyzer
+    from src.collector.recording import (
+        TrafficRecording,
+        recording_collector,
+        recording_path,
+        replay_collector,
+        save_run_recording,
+    )
     from src.db import async_session
     from src.pipeline.run_lifecycle import compute_run_window, run_with_lifecycle
+    from src.pipeline.run_profiler import run_profiler
     from src.pipeline.runner import PipelineOptions, load_approved_sources, run_daily_pipeline
 
     return SimpleNamespace(
@@ -133,21 +193,43 @@ def _pipeline_deps():
         load_approved_sources=load_approved_sources,
         run_daily_pipeline=run_daily_pipeline,
         run_with_lifecycle=run_with_lifecycle,
+        run_profiler=run_profiler,
+        TrafficRecording=TrafficRecording,
+        load_recording=TrafficRecording.load,
+        recording_collector=recording_collector,
+        replay_collector=replay_collector,
+        recording_path=recording_path,
+        save_run_recording=save_run_recording,
     )
 
 
-async def _daily_pipeline():
+async def _daily_pipeline(profile_mode: str | None = None, record_dir: str | None = None):
     """Run the scheduler's real daily pipeline entrypoint once."""
+    from src.config import settings
     from src.scheduler.jobs import daily_pipeline
 
-    await daily_pipeline()
+    if record_dir:
+        settings.collector_record_dir = record_dir
+    await daily_pipeline(profile_mode)
+
+
+async def _watched(coro):
+    """Await `coro` with the event-loop watchdog running, so blocking calls land in the run stats."""
+    from src.loop_watchdog import loop_watchdog, start_loop_watchdog
+
+    start_loop_watchdog()
+    try:
+        return await coro
+    finally:
+        await loop_watchdog.stop()
 
 
 if __name__ == "__main__":
     args = parse_args()
     if args.dry_run:
         collector_limit = None if args.max_items <= 0 else args.max_items
-        print(json.dumps(asyncio.run(dry_run_pipeline(collector_limit)), ensure_ascii=False, sort_keys=True))
+        summary = asyncio.run(_watched(dry_run_pipeline(collector_limit, args.profile, args.record, args.replay)))
+        print(json.dumps(summary, ensure_ascii=False, sort_keys=True))
     else:
-        asyncio.run(_daily_pipeline())
+        asyncio.run(_watched(_daily_pipeline(args.profile, args.record)))
         print("PIPELINE DONE")
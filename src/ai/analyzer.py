@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -25,6 +26,7 @@ from src.ai.prompts import (
     build_stage2_messages,
 )
 from src.config import parse_float_tuple
+from src.metrics import llm_errors, llm_request_seconds, llm_retries, llm_tokens
 
 
 class ChatCompleter(Protocol):
@@ -171,7 +173,7 @@ class Analyzer:
         messages = build_stage1_messages(item, source)
 
         try:
-            result = await self._complete(self.stage1_model, messages, self.stage1_policy)
+            result = await self._complete(self.stage1_model, messages, self.stage1_policy, stage="stage1")
             try:
                 analysis = parse_stage1_response(result.content)
             except AnalysisParseError:
@@ -179,6 +181,7 @@ class Analyzer:
                     self.stage1_model,
                     _repair_messages(messages, result.content),
                     self.stage1_policy,
+                    stage="stage1",
                 )
                 analysis = parse_stage1_response(result.content)
         except AnalysisParseError:
@@ -224,7 +227,7 @@ class Analyzer:
         source_authority = str(source.get("authority") or "regular")
 
         try:
-            result = await self._complete(self.stage2_model, messages, self.stage2_policy)
+            result = await self._complete(self.stage2_model, messages, self.stage2_policy, stage="stage2")
             try:
                 analysis = parse_stage2_response(result.content, source_authority, also_seen_in)
             except AnalysisParseError:
@@ -232,6 +235,7 @@ class Analyzer:
                     self.stage2_model,
                     _repair_messages(messages, result.content),
                     self.stage2_policy,
+                    stage="stage2",
                 )
                 analysis = parse_stage2_response(result.content, source_authority, also_seen_in)
         except AnalysisParseError:
@@ -268,7 +272,7 @@ class Analyzer:
         messages = build_digest_overview_messages(domain, items)
 
         try:
-            result = await self._complete(self.digest_model, messages, self.digest_policy)
+            result = await self._complete(self.digest_model, messages, self.digest_policy, stage="digest")
             try:
                 analysis = parse_digest_overview_response(result.content)
             except AnalysisParseError:
@@ -276,6 +280,7 @@ class Analyzer:
                     self.digest_model,
                     _repair_messages(messages, result.content),
                     self.digest_policy,
+                    stage="digest",
                 )
                 analysis = parse_digest_overview_response(result.content)
         except AnalysisParseError:
@@ -311,17 +316,36 @@ class Analyzer:
         model: str,
         messages: list[dict[str, str]],
         policy: ModelPolicy,
+        *,
+        stage: str,
     ) -> ChatCompletionResult:
-        """Dispatch one completion request using the supplied model and policy."""
-        return await self.client.complete(
-            model=model,
-            messages=messages,
-            temperature=policy.temperature,
-            max_tokens=policy.max_tokens,
-            timeout_s=policy.timeout_s,
-            retries=policy.retries,
-            retry_backoff_s=policy.retry_backoff_s,
-        )
+        """Dispatch one completion request using the supplied model and policy, recording it on /metrics."""
+        provider = getattr(self.client, "provider", "unknown")
+        started = time.perf_counter()
+        try:
+            result = await self.client.complete(
+                model=model,
+                messages=messages,
+                temperature=policy.temperature,
+                max_tokens=policy.max_tokens,
+                timeout_s=policy.timeout_s,
+                retries=policy.retries,
+                retry_backoff_s=policy.retry_backoff_s,
+            )
+        except AIClientError as exc:
+            labels = {"stage": stage, "model": model, "provider": provider}
+            llm_request_seconds.observe(time.perf_counter() - started, outcome="error", **labels)
+            llm_errors.inc(category=exc.category, **labels)
+            llm_retries.inc(max(getattr(exc, "attempts", 1) - 1, 0), **labels)
+            raise
+        labels = {"stage": stage, "model": model, "provider": result.provider}
+        llm_request_seconds.observe(time.perf_counter() - started, outcome="ok", **labels)
+        llm_retries.inc(max(getattr(result, "attempts", 1) - 1, 0), **labels)
+        for kind, tokens in (("prompt", getattr(result, "prompt_tokens", None)),
+                             ("completion", getattr(result, "completion_tokens", None))):
+            if tokens:
+                llm_tokens.inc(tokens, kind=kind, **labels)
+        return result
 
 
 def _repair_messages(messages: list[dict[str, str]], invalid_content: str) -> list[dict[str, str]]:
@@ -12,6 +12,7 @@ class AIClientError(RuntimeError):
         super().__init__(message)
         self.category = category
         self.retryable = retryable
+        self.attempts = 1
 
 
 @dataclass(frozen=True)
@@ -19,6 +20,9 @@ class ChatCompletionResult:
     provider: str
     model: str
     content: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    attempts: int = 1
 
 
 class OpenAICompatibleClient:
@@ -81,11 +85,15 @@ class OpenAICompatibleClient:
                 payload[token_field] = max_tokens
 
             try:
-                data = await self._post_with_retries(payload, timeout_s, retries, retry_backoff_s)
+                data, attempts = await self._post_with_retries(payload, timeout_s, retries, retry_backoff_s)
+                usage = data.get("usage") if isinstance(data.get("usage"), dict) else {}
                 return ChatCompletionResult(
                     provider=self.provider,
                     model=model,
                     content=_extract_message_content(data),
+                    prompt_tokens=usage.get("prompt_tokens"),
+                    completion_tokens=usage.get("completion_tokens"),
+                    attempts=attempts,
                 )
             except AIClientError as exc:
                 last_error = exc
@@ -103,12 +111,13 @@ class OpenAICompatibleClient:
         timeout_s: float,
         retries: int,
         retry_backoff_s: tuple[float, ...],
-    ) -> dict[str, Any]:
-        """Send a completion request with retry/backoff handling."""
+    ) -> tuple[dict[str, Any], int]:
+        """Send a completion request with retry/backoff handling; also returns the attempts made."""
         for attempt in range(retries + 1):
             try:
-                return await self._post_once(payload, timeout_s)
+                return await self._post_once(payload, timeout_s), attempt + 1
             except AIClientError as exc:
+                exc.attempts = attempt + 1
                 if not exc.retryable or attempt >= retries:
                     raise
                 await asyncio.sleep(_backoff_for_attempt(retry_backoff_s, attempt))
@@ -0,0 +1,204 @@
+"""Response cache for the read-mostly API routes.
+
+Only the `data` portion of an envelope (plus the meta fields a route derives
+from it) is cached; request ids are attached per request. Keys are the route
+name plus its normalized query parameters.
+
+Backends:
+
+- Redis (`REDIS_URL` set): shared by every API worker. The daily pipeline calls
+  `invalidate_response_cache()` after it commits a run (which is also when
+  digests are stored), deleting every cached entry.
+- In-process LRU (no `REDIS_URL`): the worker process cannot reach it, so
+  entries rely on their TTL to pick up new runs.
+
+Concurrent misses for the same key inside one process share a single load.
+A cache backend failure never fails a request; it degrades to a direct load.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Mapping
+
+from src.config import settings
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "intel:api:v1:"
+
+
+class MemoryBackend:
+    """Bounded LRU with per-entry expiry, for single-process deployments."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_s: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl_s, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def clear(self) -> int:
+        count = len(self.entries)
+        self.entries.clear()
+        return count
+
+
+class RedisBackend:
+    """Shared cache in Redis; invalidation deletes every key under the prefix."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> str | None:
+        value = await self.client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_s: float) -> None:
+        await self.client.set(key, value, ex=max(1, int(ttl_s)))
+
+    async def clear(self) -> int:
+        keys = [key async for key in self.client.scan_iter(match=f"{KEY_PREFIX}*", count=500)]
+        if keys:
+            await self.client.delete(*keys)
+        return len(keys)
+
+
+class ResponseCache:
+    def __init__(self, backend, *, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def get_or_load(
+        self,
+        route: str,
+        params: Mapping[str, Any],
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        ttl_s: float | None = None,
+    ) -> Any:
+        """Return the cached payload for `route` + `params`, loading it once on a miss.
+
+        `loader` must return a JSON-serializable payload. Exceptions from it
+        (e.g. 404s) propagate to every coalesced caller and are not cached.
+        """
+        if not self.enabled:
+            return await loader()
+        key = cache_key(route, params)
+        cached = await self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled (client went away); load here.
+                return await loader()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            payload = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an exception nobody else awaited is not logged.
+            future.exception()
+            raise
+        else:
+            future.set_result(payload)
+            await self._set(key, payload, settings.api_cache_ttl_s if ttl_s is None else ttl_s)
+            return payload
+        finally:
+            self.inflight.pop(key, None)
+
+    async def clear(self) -> int:
+        try:
+            return await self.backend.clear()
+        except Exception as exc:
+            self.errors += 1
+            log.warning("Response cache clear failed: %s", exc)
+            return 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+    async def _get(self, key: str) -> Any | None:
+        try:
+            raw = await self.backend.get(key)
+        except Exception as exc:
+            self.errors += 1
+            log.warning("Response cache read failed: %s", exc)
+            return None
+        return None if raw is None else json.loads(raw)
+
+    async def _set(self, key: str, payload: Any, ttl_s: float) -> None:
+        try:
+            await self.backend.set(key, json.dumps(payload, ensure_ascii=False, default=str), ttl_s)
+        except Exception as exc:
+            self.errors += 1
+            log.warning("Response cache write failed: %s", exc)
+
+
+def cache_key(route: str, params: Mapping[str, Any]) -> str:
+    """Build a stable key; unset parameters are dropped and the rest sorted."""
+    normalized = sorted((name, str(value)) for name, value in params.items() if value is not None and value != "")
+    query = "&".join(f"{name}={value}" for name, value in normalized)
+    return f"{KEY_PREFIX}{route}?{query}"
+
+
+def build_response_cache() -> ResponseCache:
+    """Pick Redis when configured, the in-process LRU otherwise."""
+    if settings.redis_url:
+        import redis.asyncio as redis
+
+        backend = RedisBackend(redis.from_url(settings.redis_url, socket_timeout=5, socket_connect_timeout=5))
+    else:
+        backend = MemoryBackend(settings.api_cache_max_entries)
+    return ResponseCache(backend, enabled=settings.api_cache_enabled)
+
+
+response_cache = build_response_cache()
+
+
+async def invalidate_response_cache() -> int:
+    """Drop every cached API response; called after a run commits."""
+    return await response_cache.clear()
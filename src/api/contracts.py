@@ -9,8 +9,9 @@ from typing import Any
 from fastapi import HTTPException, Request
 from sqlalchemy import ColumnElement
 
-from src.collector.catalog import catalog_source_ids
+from src.collector.catalog import CatalogSnapshot, catalog_snapshot, source_catalog
 from src.config import parse_csv, settings
+from src.models.daily_item_rollup import DailyItemRollup
 from src.models.item import Item
 from src.models.source import Source
 
@@ -21,6 +22,13 @@ class ScoreCursor:
     item_id: str
 
 
+@dataclass(frozen=True)
+class SearchCursor:
+    rank: float
+    insight_score: int
+    item_id: str
+
+
 def request_id(request: Request | None = None) -> str:
     """Get or assign the request id for the current request context."""
     if request is None:
@@ -61,31 +69,80 @@ def raise_api_error(code: str, message: str, status_code: int) -> None:
     raise HTTPException(status_code=status_code, detail={"code": code, "message": message})
 
 
-def allowed_domains() -> list[str]:
-    return parse_csv(settings.digest_domains)
+@dataclass(frozen=True)
+class Visibility:
+    """The Phase 1 catalog/domain allowlist and the filter expressions built from it.
+
+    Built once per catalog snapshot and `DIGEST_DOMAINS` value; the expressions
+    are immutable, so every statement shares them.
+    """
+
+    domains: tuple[str, ...]
+    source_ids: frozenset[str]
+    items: tuple[ColumnElement[bool], ...]
+    rollups: tuple[ColumnElement[bool], ...]
+    sources: tuple[ColumnElement[bool], ...]
+    active_sources: tuple[ColumnElement[bool], ...]
+
+    @classmethod
+    def build(cls, domains: tuple[str, ...], source_ids: frozenset[str]) -> "Visibility":
+        ordered_ids = sorted(source_ids)
+        sources = (Source.domain.in_(domains), Source.id.in_(ordered_ids))
+        return cls(
+            domains=domains,
+            source_ids=source_ids,
+            items=(Item.domain.in_(domains), Item.source_id.in_(ordered_ids)),
+            rollups=(DailyItemRollup.domain.in_(domains), DailyItemRollup.source_id.in_(ordered_ids)),
+            sources=sources,
+            active_sources=(*sources, Source.is_active.is_(True)),
+        )
+
+
+_visibility: tuple[CatalogSnapshot, str, Visibility] | None = None
+visibility_counters = {"builds": 0, "hits": 0}
+
+
+def visibility() -> Visibility:
+    """The current allowlist, rebuilt only when the catalog file or `DIGEST_DOMAINS` changes."""
+    global _visibility
+    snapshot = catalog_snapshot()
+    cached = _visibility
+    if cached is not None and cached[0] is snapshot and cached[1] == settings.digest_domains:
+        visibility_counters["hits"] += 1
+        return cached[2]
+    built = Visibility.build(tuple(parse_csv(settings.digest_domains)), snapshot.source_ids)
+    _visibility = (snapshot, settings.digest_domains, built)
+    visibility_counters["builds"] += 1
+    return built
+
+
+def allowed_domains() -> tuple[str, ...]:
+    return visibility().domains
 
 
-def allowed_source_ids() -> list[str]:
-    return catalog_source_ids()
+def allowed_source_ids() -> frozenset[str]:
+    return visibility().source_ids
 
 
 def visible_item_filters() -> tuple[ColumnElement[bool], ...]:
     """Keep the Phase 1 catalog/domain allowlist in one place for every item query."""
-    return (
-        Item.domain.in_(allowed_domains()),
-        Item.source_id.in_(allowed_source_ids()),
-    )
+    return visibility().items
+
+
+def visible_rollup_filters() -> tuple[ColumnElement[bool], ...]:
+    """The item allowlist applied to `daily_item_rollups` rows."""
+    return visibility().rollups
 
 
 def visible_source_filters(*, only_active: bool = False) -> tuple[ColumnElement[bool], ...]:
     """Apply the shared source visibility rules and optionally exclude inactive records."""
-    filters: list[ColumnElement[bool]] = [
-        Source.domain.in_(allowed_domains()),
-        Source.id.in_(allowed_source_ids()),
-    ]
-    if only_active:
-        filters.append(Source.is_active.is_(True))
-    return tuple(filters)
+    current = visibility()
+    return current.active_sources if only_active else current.sources
+
+
+def catalog_stats() -> dict:
+    """Catalog reload and allowlist cache counters for this process."""
+    return {**source_catalog().stats(), "filter_builds": visibility_counters["builds"], "filter_hits": visibility_counters["hits"]}
 
 
 def encode_score_cursor(insight_score: int | None, item_id: str) -> str:
@@ -105,3 +162,25 @@ def decode_score_cursor(cursor: str) -> ScoreCursor:
         raise_api_error("invalid_cursor", "Invalid cursor", 400)
         raise AssertionError("unreachable") from exc
     return ScoreCursor(insight_score=score, item_id=item_id)
+
+
+def encode_search_cursor(rank: float, insight_score: int | None, item_id: str) -> str:
+    """Relevance cursor for `/items?q=` pages served by the search index; also a valid score cursor."""
+    payload = {"rank": rank, "score": insight_score if insight_score is not None else -1, "id": item_id}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> SearchCursor | None:
+    """Decode a relevance cursor; None for a valid score cursor (a search that started on MySQL)."""
+    score_cursor = decode_score_cursor(cursor)
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank = json.loads(base64.urlsafe_b64decode(padded.encode()).decode()).get("rank")
+        if rank is None:
+            return None
+        rank = float(rank)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise_api_error("invalid_cursor", "Invalid cursor", 400)
+        raise AssertionError("unreachable") from exc
+    return SearchCursor(rank=rank, insight_score=score_cursor.insight_score, item_id=score_cursor.item_id)
@@ -0,0 +1,31 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Request
+
+from src.api.contracts import success_envelope
+from src.api.digests import cached_recent_digests
+from src.api.reads import PooledReads, pooled_reads
+from src.api.runs import cached_latest_run
+from src.api.sources import cached_source_views
+from src.api.stats import cached_stats
+
+router = APIRouter(tags=["dashboard"])
+
+
+@router.get("/dashboard")
+async def get_dashboard(request: Request, db: PooledReads = Depends(pooled_reads)):
+    """Today's stats, the latest run, sources and recent digests in one response.
+
+    Each part shares its cache entry with the standalone endpoint; the parts
+    that miss load concurrently, each query on its own pooled connection.
+    """
+    stats, latest_run, sources, digests = await asyncio.gather(
+        cached_stats(db, None),
+        cached_latest_run(db),
+        cached_source_views(db),
+        cached_recent_digests(db, None),
+    )
+    return success_envelope(
+        {"stats": stats, "latest_run": latest_run, "sources": sources, "digests": digests},
+        request=request,
+    )
@@ -3,10 +3,12 @@ from fastapi.responses import PlainTextResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.cache import response_cache
 from src.api.contracts import allowed_domains, raise_api_error, success_envelope
 from src.api.deps import get_db
 from src.config import settings
 from src.models.digest import Digest
+from src.replica import read_newest, read_one
 
 router = APIRouter(tags=["digests"])
 
@@ -18,14 +20,21 @@ async def list_digests(
     db: AsyncSession = Depends(get_db),
 ):
     """List recent digests for the configured domains, optionally filtered by domain."""
-    stmt = select(Digest).where(Digest.domain.in_(allowed_domains())).order_by(Digest.date.desc()).limit(
-        settings.api_recent_digests_limit
-    )
-    if domain and domain != "all":
-        stmt = stmt.where(Digest.domain == domain)
-    result = await db.execute(stmt)
-    digests = result.scalars().all()
-    return success_envelope([_serialize(d) for d in digests], request=request, total=len(digests))
+    data = await cached_recent_digests(db, domain)
+    return success_envelope(data, request=request, total=len(data))
+
+
+async def cached_recent_digests(db, domain: str | None) -> list[dict]:
+    async def load():
+        stmt = select(Digest).where(Digest.domain.in_(allowed_domains())).order_by(Digest.date.desc()).limit(
+            settings.api_recent_digests_limit
+        )
+        if domain and domain != "all":
+            stmt = stmt.where(Digest.domain == domain)
+        digests = await read_newest(db, stmt, limit=settings.api_recent_digests_limit)
+        return [_serialize(d) for d in digests]
+
+    return await response_cache.get_or_load("digests", {"domain": domain}, load)
 
 
 @router.get("/digests/latest")
@@ -35,16 +44,17 @@ async def latest_digest(
     format: str = "json",
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(Digest).where(Digest.domain.in_(allowed_domains())).order_by(Digest.date.desc())
-    if domain != "all":
-        stmt = stmt.where(Digest.domain == domain)
-    result = await db.execute(stmt.limit(1))
-    digest = result.scalar_one_or_none()
-    if not digest:
-        raise_api_error("not_found", "No digest found", 404)
-    if format == "markdown":
-        return PlainTextResponse(digest.content_markdown, media_type="text/markdown")
-    return success_envelope(_serialize(digest), request=request)
+    async def load():
+        stmt = select(Digest).where(Digest.domain.in_(allowed_domains())).order_by(Digest.date.desc())
+        if domain != "all":
+            stmt = stmt.where(Digest.domain == domain)
+        digest = await read_one(db, stmt.limit(1))
+        if not digest:
+            raise_api_error("not_found", "No digest found", 404)
+        return _cached_view(digest, format)
+
+    data = await response_cache.get_or_load("digests/latest", {"domain": domain, "format": format}, load)
+    return _digest_response(data, format, request)
 
 
 @router.get("/digests/{date_str}")
@@ -58,12 +68,26 @@ async def get_digest(
     digest_id = f"{date_str}:{domain}"
     if domain not in allowed_domains():
         raise_api_error("not_found", "Digest not found", 404)
-    digest = await db.get(Digest, digest_id)
-    if not digest:
-        raise_api_error("not_found", "Digest not found", 404)
+
+    async def load():
+        digest = await read_one(db, select(Digest).where(Digest.id == digest_id))
+        if not digest:
+            raise_api_error("not_found", "Digest not found", 404)
+        return _cached_view(digest, format)
+
+    data = await response_cache.get_or_load("digests/detail", {"id": digest_id, "format": format}, load)
+    return _digest_response(data, format, request)
+
+
+def _cached_view(d: Digest, format: str):
+    """The cacheable part of a digest response: markdown text or the JSON view."""
+    return d.content_markdown if format == "markdown" else _serialize(d)
+
+
+def _digest_response(data, format: str, request: Request):
     if format == "markdown":
-        return PlainTextResponse(digest.content_markdown, media_type="text/markdown")
-    return success_envelope(_serialize(digest), request=request)
+        return PlainTextResponse(data, media_type="text/markdown")
+    return success_envelope(data, request=request)
 
 
 def _serialize(d: Digest) -> dict:
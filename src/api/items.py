@@ -6,19 +6,29 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.contracts import (
     decode_score_cursor,
+    decode_search_cursor,
     encode_score_cursor,
+    encode_search_cursor,
     raise_api_error,
     success_envelope,
+    visibility,
     visible_item_filters,
 )
 from src.api.deps import get_db, require_api_token
+from src.api.responses import OrjsonResponse
 from src.config import settings
 from src.models.item import Item
+from src.models.item_identifier import ItemIdentifier
+from src.pipeline.identifiers import normalize_identifier
+from src.pipeline.lineage import lineage_times
+from src.replica import read_one, read_replica, related_index
+from src.replica.search import search_match, search_statement
+from src.replica.store import utc_naive
 
 router = APIRouter(tags=["items"], dependencies=[Depends(require_api_token)])
 
 
-@router.get("/items")
+@router.get("/items", response_class=OrjsonResponse)
 async def list_items(
     request: Request,
     domain: str | None = None,
@@ -28,15 +38,60 @@ async def list_items(
     confidence: str | None = None,
     trend_signal: str | None = None,
     source_id: str | None = None,
+    cve: str | None = None,
     q: str | None = None,
     since: str | None = None,
     until: str | None = None,
     cursor: str | None = None,
     limit: int = Query(default=settings.api_default_limit, le=settings.api_max_limit),
+    fields: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """List normalized items with cursor pagination and optional search/filter predicates."""
-    stmt = select(Item).where(*visible_item_filters())
+    """List normalized items with cursor pagination and optional search/filter predicates.
+
+    Pages bounded by a `since` inside the local replica's horizon are read from
+    the replica. `q` is answered by the replica's search index (relevance
+    order, relevance cursor) while the replica is fresh. Otherwise, and with
+    `cve`, the query runs on MySQL, where `q` is a FULLTEXT filter and pages
+    keep the score order so score cursors stay valid.
+
+    Only the serialized columns are selected (Core rows, no ORM identity map),
+    and `fields=a,b` trims both the SELECT and the payload further. Rows are
+    encoded by orjson as they come back from the driver.
+    """
+    since_at = _parse_iso_datetime(since, "since") if since else None
+    until_at = _parse_iso_datetime(until, "until") if until else None
+    selected = parse_item_fields(fields)
+    replica = read_replica()
+    match = search_match(q) if q and not cve else None
+    if replica is not None and match is not None:
+        after = decode_search_cursor(cursor) if cursor else None
+        # A score cursor means the search began on MySQL: finish it there.
+        if cursor is None or after is not None:
+            allowed = visibility()
+            hits = (
+                await replica.session.execute(
+                    search_statement(
+                        match,
+                        limit=limit + 1,
+                        after=(after.rank, after.insight_score, after.item_id) if after else None,
+                        domains=allowed.domains,
+                        source_ids=allowed.source_ids,
+                        domain=domain,
+                        category=category,
+                        min_score=min_score,
+                        analysis_stage=analysis_stage,
+                        confidence=confidence,
+                        trend_signal=trend_signal,
+                        source_id=source_id,
+                        since=utc_naive(since_at) if since_at else None,
+                        until=utc_naive(until_at) if until_at else None,
+                    )
+                )
+            ).all()
+            return await _search_page(request, db, replica, hits, limit=limit, selected=selected)
+
+    stmt = select(*item_columns(selected)).where(*visible_item_filters())
 
     if domain and domain != "all":
         stmt = stmt.where(Item.domain == domain)
@@ -52,12 +107,21 @@ async def list_items(
         stmt = stmt.where(Item.trend_signal == trend_signal)
     if source_id:
         stmt = stmt.where(Item.source_id == source_id)
+    if cve:
+        cve_id = normalize_identifier("cve", cve)
+        if cve_id is None:
+            raise_api_error("invalid_param", "cve must look like CVE-YYYY-NNNN", 400)
+        stmt = stmt.where(
+            Item.id.in_(
+                select(ItemIdentifier.item_id).where(ItemIdentifier.kind == "cve", ItemIdentifier.value == cve_id)
+            )
+        )
     if q:
         stmt = stmt.where(text("MATCH(title, summary_zh, content_text) AGAINST(:q IN BOOLEAN MODE)")).params(q=q)
-    if since:
-        stmt = stmt.where(Item.published_at >= _parse_iso_datetime(since, "since"))
+    if since_at is not None:
+        stmt = stmt.where(Item.published_at >= since_at)
     if until:
-        stmt = stmt.where(Item.published_at <= _parse_iso_datetime(until, "until"))
+        stmt = stmt.where(Item.published_at <= until_at)
     if cursor:
         score_cursor = decode_score_cursor(cursor)
         stmt = stmt.where(
@@ -67,39 +131,149 @@ async def list_items(
             )
         )
 
-    if q:
-        stmt = stmt.order_by(text("MATCH(title, summary_zh, content_text) AGAINST(:q2 IN BOOLEAN MODE) DESC")).params(q2=q)
     stmt = stmt.order_by(Item.insight_score.desc(), Item.id.asc())
     stmt = stmt.limit(limit + 1)
 
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    page_items = items[:limit]
+    reader = db
+    if replica is not None and not q and not cve and since_at is not None and replica.covers(since_at):
+        reader = replica.session
+    rows = (await reader.execute(stmt)).all()
+    page_rows = rows[:limit]
     next_cursor = None
-    if len(items) > limit and page_items:
-        last = page_items[-1]
+    if len(rows) > limit and page_rows:
+        last = page_rows[-1]
         next_cursor = encode_score_cursor(last.insight_score, last.id)
 
-    return success_envelope(
-        [_serialize_item(i) for i in page_items],
-        request=request,
-        next_cursor=next_cursor,
-        total=len(page_items),
+    return OrjsonResponse(
+        success_envelope(
+            [project_item_row(row, selected) for row in page_rows],
+            request=request,
+            next_cursor=next_cursor,
+            total=len(page_rows),
+        )
     )
 
 
+async def _search_page(request: Request, db, replica, hits: list, *, limit: int, selected: tuple[str, ...]):
+    """Serve ranked search hits, loading their rows from the replica and any it lacks from MySQL."""
+    page_hits = hits[:limit]
+    ids = [hit.id for hit in page_hits]
+    rows = await _load_rows(db, replica, ids, selected)
+    next_cursor = None
+    if len(hits) > limit and page_hits:
+        last = page_hits[-1]
+        next_cursor = encode_search_cursor(last.rank, last.insight_score, last.id)
+    data = [project_item_row(rows[item_id], selected) for item_id in ids if item_id in rows]
+    return OrjsonResponse(success_envelope(data, request=request, next_cursor=next_cursor, total=len(data)))
+
+
+async def _load_rows(db, replica, ids: list[str], fields: tuple[str, ...]) -> dict:
+    """Rows of `ids` by id: from the replica (when fresh), then any it lacks in one MySQL read."""
+    if not ids:
+        return {}
+    columns = item_columns(fields)
+    rows = {}
+    if replica is not None:
+        rows = {row.id: row for row in (await replica.session.execute(select(*columns).where(Item.id.in_(ids)))).all()}
+    missing = [item_id for item_id in ids if item_id not in rows]
+    if missing:
+        rows.update((row.id, row) for row in (await db.execute(select(*columns).where(Item.id.in_(missing)))).all())
+    return rows
+
+
 @router.get("/items/{item_id}")
 async def get_item(item_id: str, request: Request, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
+    item = await read_one(
+        db,
         select(Item).where(
             Item.id == item_id,
             *visible_item_filters(),
-        )
+        ),
     )
-    item = result.scalar_one_or_none()
     if not item:
         raise_api_error("not_found", "Item not found", 404)
-    return success_envelope(_serialize_item(item), request=request)
+    data = _serialize_item(item)
+    data["lineage"] = {
+        step: at.isoformat() if at else None for step, at in lineage_times(item.lineage).items()
+    }
+    return success_envelope(data, request=request)
+
+
+@router.get("/items/{item_id}/related", response_class=OrjsonResponse)
+async def get_related_items(
+    item_id: str,
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """Items most like `item_id` (TF-IDF cosine over titles and summaries), most similar first.
+
+    Served by the related index the worker saves and this process loads. An
+    existing item the index cannot answer for yet (newer than the last build)
+    gets an empty list; while no index is loaded (or it is disabled) the
+    endpoint answers `503 unavailable` rather than an empty list.
+    """
+    index = related_index()
+    matches = None
+    if settings.related_enabled and index.ready:
+        allowed = visibility()
+        matches = index.lookup(
+            item_id,
+            limit=limit,
+            allow=lambda domain, source_id: domain in allowed.domains and source_id in allowed.source_ids,
+        )
+    if matches is None:
+        if await read_one(db, select(Item).where(Item.id == item_id, *visible_item_filters())) is None:
+            raise_api_error("not_found", "Item not found", 404)
+        if not settings.related_enabled:
+            raise_api_error("unavailable", "Related items are disabled", 503)
+        if not index.ready:
+            raise_api_error("unavailable", "Related index is not loaded yet", 503)
+        matches = []
+    replica = read_replica()
+    rows = await _load_rows(db, replica, [match_id for match_id, _ in matches], RELATED_FIELDS) if matches else {}
+    data = [
+        {**project_item_row(rows[match_id], RELATED_FIELDS), "similarity": similarity}
+        for match_id, similarity in matches
+        if match_id in rows
+    ]
+    return OrjsonResponse(success_envelope(data, request=request, total=len(data)))
+
+
+ITEM_FIELDS = (
+    "id", "source_id", "domain", "title", "canonical_url", "author", "published_at", "fetched_at",
+    "also_seen_in", "category", "tags", "summary_zh", "insight_score", "credibility", "confidence",
+    "trend_signal", "recommendation_reason", "action_suggestion", "analysis_stage",
+    "stage1_model", "stage1_provider", "stage1_prompt_version", "stage1_analyzed_at",
+    "stage2_model", "stage2_provider", "stage2_prompt_version", "stage2_analyzed_at", "expires_at",
+)
+# Always selected: the next-page cursor is built from them.
+CURSOR_FIELDS = ("id", "insight_score")
+RELATED_FIELDS = (
+    "id", "source_id", "domain", "title", "canonical_url", "published_at", "category", "summary_zh", "insight_score",
+)
+
+
+def parse_item_fields(fields: str | None) -> tuple[str, ...]:
+    """Requested item fields in response order; every field when `fields` is empty."""
+    if not fields:
+        return ITEM_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(ITEM_FIELDS))
+    if unknown:
+        raise_api_error("invalid_param", f"unknown item fields: {', '.join(unknown)}", 400)
+    return tuple(name for name in ITEM_FIELDS if name in requested)
+
+
+def item_columns(fields: tuple[str, ...]) -> list:
+    columns = Item.__table__.c
+    return [columns[name] for name in dict.fromkeys((*CURSOR_FIELDS, *fields))]
+
+
+def project_item_row(row, fields: tuple[str, ...]) -> dict:
+    """One list entry straight from a Core row; values keep their driver types for orjson."""
+    mapping = row._mapping
+    return {name: mapping[name] for name in fields}
 
 
 def _serialize_item(item: Item) -> dict:
@@ -0,0 +1,90 @@
+"""Concurrent read queries for one API request.
+
+Every query over the cross-border link costs a full round trip (~1-6s), so
+an endpoint that awaits three independent queries on one `AsyncSession`
+pays for all three. `PooledReads` stands in for that session: each
+`execute` checks out its own pooled connection, so independent queries can
+be awaited together with `execute_all`. At most `DATABASE_POOL_SIZE`
+queries of one request are in flight at a time.
+
+Each query's wall time is recorded and returned to the caller in a
+`Server-Timing` header (see `src/main.py`).
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import Any, Callable
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+
+
+class PooledReads:
+    """The part of `AsyncSession` the read routers use, one pooled connection per call.
+
+    Safe to call concurrently. Results are buffered before the connection
+    goes back to the pool, and returned ORM objects are detached.
+    """
+
+    concurrent = True
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] | None = None, *, limit: int | None = None):
+        if session_factory is None:
+            from src.db import async_session as session_factory
+        self.session_factory = session_factory
+        self.timings: list[tuple[str, float]] = []
+        self._slots = asyncio.Semaphore(max(1, limit or settings.database_pool_size))
+
+    async def execute(self, statement, *, name: str | None = None):
+        return await self._timed(name, lambda session: session.execute(statement), freeze=True)
+
+    async def scalar(self, statement, *, name: str | None = None):
+        return await self._timed(name, lambda session: session.scalar(statement))
+
+    async def get(self, model, ident, *, name: str | None = None):
+        return await self._timed(name or model.__tablename__, lambda session: session.get(model, ident))
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value: one `name;dur=ms` entry per query, in completion order."""
+        return ", ".join(f"{name};dur={elapsed_ms:.1f}" for name, elapsed_ms in self.timings)
+
+    async def _timed(self, name: str | None, call, *, freeze: bool = False) -> Any:
+        async with self._slots:
+            started = time.perf_counter()
+            try:
+                async with self.session_factory() as session:
+                    result = await call(session)
+                    if freeze:
+                        result = result.freeze()
+            finally:
+                label = _metric_name(name or f"q{len(self.timings) + 1}")
+                self.timings.append((label, (time.perf_counter() - started) * 1000))
+        return result() if freeze else result
+
+
+async def execute_all(db, **statements) -> dict[str, Any]:
+    """Results of independent statements by name.
+
+    Run concurrently when `db` is a `PooledReads`; one after another otherwise
+    (a single `AsyncSession` or the replica session).
+    """
+    if getattr(db, "concurrent", False):
+        results = await asyncio.gather(*(db.execute(stmt, name=name) for name, stmt in statements.items()))
+        return dict(zip(statements, results))
+    return {name: await db.execute(stmt) for name, stmt in statements.items()}
+
+
+def pooled_reads(request: Request) -> PooledReads:
+    """Request-scoped `PooledReads`, kept on `request.state` so its timings reach the response."""
+    reads = PooledReads()
+    request.state.pooled_reads = reads
+    return reads
+
+
+def _metric_name(name: str) -> str:
+    # Server-Timing metric names are HTTP tokens.
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-") or "query"
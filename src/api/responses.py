@@ -0,0 +1,19 @@
+"""Response classes for the read routers."""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON encoded by orjson.
+
+    Datetimes and dates encode natively (ISO 8601, same text as `isoformat()`),
+    so handlers can return row values as they come from the driver. Returned as
+    a `Response` instance, the payload also skips FastAPI's `jsonable_encoder`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
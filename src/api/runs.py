@@ -2,11 +2,14 @@ from fastapi import APIRouter, Depends, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.cache import response_cache
 from src.api.contracts import raise_api_error, success_envelope
 from src.api.deps import get_db
 from src.config import settings
 from src.models.run import Run
+from src.pipeline.profile import compare_profiles
 from src.pipeline.run_stats import compute_progress
+from src.replica import read_newest, read_one
 
 router = APIRouter(tags=["runs"])
 
@@ -19,26 +22,84 @@ async def list_runs(
 ):
     """List recent pipeline runs with computed progress for the dashboard."""
     limit = min(limit, settings.api_max_limit)
-    result = await db.execute(select(Run).order_by(Run.started_at.desc()).limit(limit))
-    runs = result.scalars().all()
-    return success_envelope([_serialize(r) for r in runs], request=request, total=len(runs))
+
+    async def load():
+        runs = await read_newest(db, select(Run).order_by(Run.started_at.desc()).limit(limit), limit=limit)
+        return [_serialize(r) for r in runs]
+
+    data = await response_cache.get_or_load("runs", {"limit": limit}, load, ttl_s=settings.api_cache_runs_ttl_s)
+    return success_envelope(data, request=request, total=len(data))
 
 
 @router.get("/runs/latest")
 async def latest_run(request: Request, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Run).order_by(Run.started_at.desc()).limit(1))
-    run = result.scalar_one_or_none()
-    if not run:
+    data = await cached_latest_run(db)
+    if data is None:
         raise_api_error("not_found", "No runs found", 404)
-    return success_envelope(_serialize(run), request=request)
+    return success_envelope(data, request=request)
+
+
+async def cached_latest_run(db) -> dict | None:
+    async def load():
+        run = await read_one(db, select(Run).order_by(Run.started_at.desc()).limit(1))
+        return _serialize(run) if run else None
+
+    return await response_cache.get_or_load("runs/latest", {}, load, ttl_s=settings.api_cache_runs_ttl_s)
 
 
 @router.get("/runs/{run_id}")
 async def get_run(run_id: str, request: Request, db: AsyncSession = Depends(get_db)):
-    run = await db.get(Run, run_id)
-    if not run:
-        raise_api_error("not_found", "Run not found", 404)
-    return success_envelope(_serialize(run), request=request)
+    async def load():
+        run = await read_one(db, select(Run).where(Run.id == run_id))
+        if not run:
+            raise_api_error("not_found", "Run not found", 404)
+        return _serialize(run)
+
+    data = await response_cache.get_or_load("runs/detail", {"run_id": run_id}, load, ttl_s=settings.api_cache_runs_ttl_s)
+    return success_envelope(data, request=request)
+
+
+# The run itself plus the trailing runs its profile is compared against.
+PROFILE_BASELINE_RUNS = 7
+
+
+@router.get("/runs/{run_id}/profile")
+async def get_run_profile(run_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Per-stage time and throughput of one run against the median of the previous runs of its kind."""
+
+    async def load():
+        target = select(Run).where(Run.id == run_id)
+        kind = target.with_only_columns(Run.kind).scalar_subquery()
+        started_at = target.with_only_columns(Run.started_at).scalar_subquery()
+        window = PROFILE_BASELINE_RUNS + 1
+        runs = await read_newest(
+            db,
+            select(Run)
+            .where(Run.kind == kind, Run.started_at <= started_at)
+            .order_by(Run.started_at.desc())
+            .limit(window),
+            limit=window,
+        )
+        run = next((r for r in runs if r.id == run_id), None)
+        if run is None:
+            raise_api_error("not_found", "Run not found", 404)
+        profile = (run.stats_json or {}).get("profile")
+        baseline = [
+            r.stats_json["profile"]
+            for r in runs
+            if r.id != run_id and isinstance((r.stats_json or {}).get("profile"), dict)
+        ]
+        return {
+            "run_id": run.id,
+            "kind": run.kind,
+            "status": run.status,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "profile": profile,
+            "comparison": compare_profiles(profile, baseline) if profile else None,
+        }
+
+    data = await response_cache.get_or_load("runs/profile", {"run_id": run_id}, load, ttl_s=settings.api_cache_runs_ttl_s)
+    return success_envelope(data, request=request)
 
 
 def _serialize(r: Run) -> dict:
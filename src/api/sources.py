@@ -1,70 +1,138 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select, func as sa_func, cast, Date
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.cache import response_cache
 from src.api.contracts import raise_api_error, success_envelope, visible_source_filters
 from src.api.deps import get_db
+from src.api.reads import PooledReads, execute_all, pooled_reads
 from src.config import settings
-from src.models.item import Item
 from src.models.source import Source
+from src.models.source_daily_stat import SourceDailyStat
+from src.replica import read_replica
 
 router = APIRouter(tags=["sources"])
 
+HISTORY_DEFAULT_DAYS = 90
+HISTORY_MAX_DAYS = 366
+
 
 @router.get("/sources")
-async def list_sources(request: Request, db: AsyncSession = Depends(get_db)):
-    """List visible sources plus today's counts and sparkline data in batched queries."""
-    # Batched to avoid an N+1 (the app is far from the DB; every round-trip is
-    # ~1-6s over the cross-border link). One query for sources, one for today's
-    # per-source counts, one for the spark histogram — 3 round-trips total
-    # instead of 1 + 2 per source.
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    spark_days = settings.source_spark_days
-    cutoff = now - timedelta(days=spark_days)
+async def list_sources(request: Request, db: PooledReads = Depends(pooled_reads)):
+    """List visible sources with today's counts and sparklines (cached)."""
+    data = await cached_source_views(db)
+    return success_envelope(data, request=request, total=len(data))
 
-    sources = (
-        await db.execute(
-            select(Source)
-            .where(*visible_source_filters())
-            .order_by(Source.domain, Source.name)
-        )
-    ).scalars().all()
 
-    today_rows = await db.execute(
-        select(Item.source_id, sa_func.count())
-        .where(Item.fetched_at >= today_start)
-        .group_by(Item.source_id)
-    )
-    today_by_src = {sid: count for sid, count in today_rows}
+async def cached_source_views(db) -> list[dict]:
+    return await response_cache.get_or_load("sources", {}, lambda: load_source_views(_reader(db)))
+
+
+async def load_source_views(db: AsyncSession) -> list[dict]:
+    """Load visible sources plus today's counts and sparkline data in two queries."""
+    # The app is far from the DB (~1-6s per round-trip over the cross-border
+    # link): one query for sources and one indexed range read of
+    # source_daily_stats for every sparkline day, today included. They are
+    # independent, so a `PooledReads` runs them side by side.
+    now = datetime.now(timezone.utc)
+    spark_days = settings.source_spark_days
 
-    spark_rows = await db.execute(
-        select(Item.source_id, cast(Item.fetched_at, Date), sa_func.count())
-        .where(Item.fetched_at >= cutoff)
-        .group_by(Item.source_id, cast(Item.fetched_at, Date))
+    results = await execute_all(
+        db,
+        sources=select(Source).where(*visible_source_filters()).order_by(Source.domain, Source.name),
+        sources_spark=select(SourceDailyStat.source_id, SourceDailyStat.day, SourceDailyStat.items_new)
+        .where(SourceDailyStat.day >= _spark_start(now, spark_days)),
     )
+    sources = results["sources"].scalars().all()
     spark_by_src: dict[str, dict] = {}
-    for sid, day, count in spark_rows:
+    for sid, day, count in results["sources_spark"]:
         spark_by_src.setdefault(sid, {})[day] = count
+    today_by_src = {sid: days.get(now.date(), 0) for sid, days in spark_by_src.items()}
 
-    data = build_source_views(sources, today_by_src, spark_by_src, now, spark_days)
-    return success_envelope(data, request=request, total=len(data))
+    return build_source_views(sources, today_by_src, spark_by_src, now, spark_days)
 
 
 @router.get("/sources/{source_id}")
 async def get_source(source_id: str, request: Request, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Source).where(
-            Source.id == source_id,
-            *visible_source_filters(),
+    reader = _reader(db)
+
+    async def load():
+        source = await _visible_source(reader, source_id)
+        return await serialize_source(source, reader)
+
+    data = await response_cache.get_or_load("sources/detail", {"source_id": source_id}, load)
+    return success_envelope(data, request=request)
+
+
+@router.get("/sources/{source_id}/history")
+async def get_source_history(
+    source_id: str,
+    request: Request,
+    start: str | None = None,
+    end: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Daily fetch and ingest history for one source, `start`..`end` inclusive (UTC dates)."""
+    end_day = _parse_day(end, "end") if end else datetime.now(timezone.utc).date()
+    start_day = _parse_day(start, "start") if start else end_day - timedelta(days=HISTORY_DEFAULT_DAYS - 1)
+    if start_day > end_day or (end_day - start_day).days >= HISTORY_MAX_DAYS:
+        raise_api_error("invalid_param", f"start..end must be an ascending range of at most {HISTORY_MAX_DAYS} days", 400)
+
+    replica = read_replica()
+    reader = replica.session if replica is not None and replica.covers(_day_start(start_day)) else db
+
+    async def load():
+        await _visible_source(reader, source_id)
+        rows = await reader.execute(
+            select(SourceDailyStat).where(
+                SourceDailyStat.source_id == source_id,
+                SourceDailyStat.day >= start_day,
+                SourceDailyStat.day <= end_day,
+            )
         )
-    )
+        by_day = {row.day: row for row in rows.scalars().all()}
+        return [
+            serialize_source_day(day, by_day.get(day))
+            for day in (start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1))
+        ]
+
+    params = {"source_id": source_id, "start": start_day.isoformat(), "end": end_day.isoformat()}
+    data = await response_cache.get_or_load("sources/history", params, load)
+    return success_envelope(data, request=request, total=len(data))
+
+
+async def _visible_source(db: AsyncSession, source_id: str) -> Source:
+    result = await db.execute(select(Source).where(Source.id == source_id, *visible_source_filters()))
     source = result.scalar_one_or_none()
     if not source:
         raise_api_error("not_found", "Source not found", 404)
-    return success_envelope(await serialize_source(source, db), request=request)
+    return source
+
+
+def _reader(db: AsyncSession):
+    """The local replica when it is fresh and holds every sparkline day, else MySQL."""
+    replica = read_replica()
+    if replica is not None and settings.source_spark_days <= replica.horizon_days:
+        return replica.session
+    return db
+
+
+def _parse_day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise_api_error("invalid_param", f"{name} must be a YYYY-MM-DD date", 400)
+        raise AssertionError("unreachable")
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _spark_start(now: datetime, spark_days: int) -> date:
+    return (now - timedelta(days=spark_days - 1)).date()
 
 
 def _spark_series(day_counts: dict, now: datetime, spark_days: int) -> list[int]:
@@ -74,22 +142,35 @@ def _spark_series(day_counts: dict, now: datetime, spark_days: int) -> list[int]
 
 async def serialize_source(s: Source, db: AsyncSession) -> dict:
     now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    today_count = await db.scalar(
-        select(sa_func.count()).select_from(Item).where(Item.source_id == s.id, Item.fetched_at >= today_start)
-    )
-
     spark_days = settings.source_spark_days
-    cutoff = now - timedelta(days=spark_days)
-    spark_result = await db.execute(
-        select(cast(Item.fetched_at, Date), sa_func.count())
-        .where(Item.source_id == s.id, Item.fetched_at >= cutoff)
-        .group_by(cast(Item.fetched_at, Date))
-        .order_by(cast(Item.fetched_at, Date))
+    rows = await db.execute(
+        select(SourceDailyStat).where(SourceDailyStat.source_id == s.id, SourceDailyStat.day >= _spark_start(now, spark_days))
     )
-    day_counts = {row[0]: row[1] for row in spark_result}
-    return build_source_view(s, today_count or 0, _spark_series(day_counts, now, spark_days))
+    by_day = {row.day: row for row in rows.scalars().all()}
+    today = by_day.get(now.date())
+    view = build_source_view(
+        s,
+        today.items_new if today is not None else 0,
+        _spark_series({day: row.items_new for day, row in by_day.items()}, now, spark_days),
+    )
+    view["today"] = serialize_source_day(now.date(), today)
+    return view
+
+
+def serialize_source_day(day: date, row: SourceDailyStat | None) -> dict:
+    fetches = row.fetches if row is not None else 0
+    return {
+        "date": day.isoformat(),
+        "fetches": fetches,
+        "failed_fetches": row.failed_fetches if row is not None else 0,
+        "items_fetched": row.items_fetched if row is not None else 0,
+        "items_new": row.items_new if row is not None else 0,
+        "avg_fetch_ms": round(row.fetch_ms / fetches) if fetches else None,
+        "max_fetch_ms": row.max_fetch_ms if fetches else None,
+        "bytes": row.bytes if row is not None else 0,
+        "last_status": row.last_status if row is not None else None,
+        "last_error": row.last_error if row is not None else None,
+    }
 
 
 def build_source_view(s: Source, today_count: int, spark: list[int]) -> dict:
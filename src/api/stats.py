@@ -1,15 +1,34 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy import select, func as sa_func, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.contracts import success_envelope, visible_item_filters, visible_source_filters
-from src.api.deps import get_db
+from src.api.cache import response_cache
+from src.api.contracts import (
+    catalog_stats,
+    raise_api_error,
+    success_envelope,
+    visibility,
+    visible_item_filters,
+    visible_rollup_filters,
+    visible_source_filters,
+)
+from src.api.reads import PooledReads, execute_all, pooled_reads
 from src.api.stats_helpers import histogram_from_bucket_counts, retention_counts_from_bucket_counts
 from src.config import settings
+from src.loop_watchdog import loop_watchdog
+from src.models.compression import codec_stats
+from src.models.daily_item_rollup import DailyItemRollup
+from src.models.insight_latency import InsightLatencyDaily
 from src.models.item import Item
 from src.models.source import Source
+from src.pipeline.lineage import LATENCY_BUCKETS_S, latency_percentiles
+from src.pipeline.rollups import rollup_source_select
+from src.pool_monitor import pool_health
+from src.sql_telemetry import fingerprint_stats
+from src.replica import read_replica, replica_status
 
 router = APIRouter(tags=["stats"])
 
@@ -23,55 +42,60 @@ CATEGORY_VALUES = [
 async def get_stats(
     request: Request,
     date: str | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: PooledReads = Depends(pooled_reads),
 ):
-    now = datetime.now(timezone.utc)
-    if date:
-        target = datetime.fromisoformat(date).replace(tzinfo=timezone.utc)
-    else:
-        target = now
-    day_start = target.replace(hour=0, minute=0, second=0, microsecond=0)
-    day_end = day_start + timedelta(days=1)
-    yesterday_start = day_start - timedelta(days=1)
-
-    today_filter = (
-        (Item.fetched_at >= day_start)
-        & (Item.fetched_at < day_end)
-        & visible_item_filters()[0]
-        & visible_item_filters()[1]
-    )
-    yesterday_filter = (
-        (Item.fetched_at >= yesterday_start)
-        & (Item.fetched_at < day_start)
-        & visible_item_filters()[0]
-        & visible_item_filters()[1]
-    )
+    data = await cached_stats(db, date)
+    return success_envelope(data, request=request)
+
+
+async def cached_stats(db, date: str | None) -> dict:
+    """Stats for `date` through the response cache: replica when it covers both days, else MySQL rollups."""
+    async def load():
+        replica = read_replica()
+        if replica is not None and replica.covers(_day_start(date) - timedelta(days=1)):
+            return await compute_stats(replica.session, date)
+        return await compute_stats(db, date, from_rollups=True)
+
+    return await response_cache.get_or_load("stats", {"date": date}, load)
 
-    item_rollup = await db.execute(
+
+def _day_start(date: str | None) -> datetime:
+    target = datetime.fromisoformat(date).replace(tzinfo=timezone.utc) if date else datetime.now(timezone.utc)
+    return target.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _daily_counts_statement(day_start: datetime, *, from_rollups: bool):
+    """Per-day counts for the day and the one before, grouped by every breakdown /stats shows.
+
+    Against MySQL this reads the maintained `daily_item_rollups`; against the
+    local replica (which has no rollups) the same rows are grouped from items.
+    """
+    day = day_start.date()
+    if from_rollups:
+        counts = DailyItemRollup.__table__
+        where = (counts.c.day.in_([day - timedelta(days=1), day]), *visible_rollup_filters())
+    else:
+        counts = rollup_source_select(
+            Item.fetched_at >= day_start - timedelta(days=1),
+            Item.fetched_at < day_start + timedelta(days=1),
+            *visible_item_filters(),
+        ).subquery("counts")
+        where = ()
+    dimensions = [counts.c.day, counts.c.domain, counts.c.category, counts.c.confidence, counts.c.score_bucket]
+    return (
         select(
-            Item.domain,
-            sa_func.count().label("total"),
-            sa_func.sum(case((Item.insight_score >= settings.stage2_threshold, 1), else_=0)).label("high_value"),
-            sa_func.sum(case((Item.stage1_error.isnot(None), 1), else_=0)).label("failed"),
+            *dimensions,
+            sa_func.sum(counts.c["items"]),
+            sa_func.sum(counts.c.high_value),
+            sa_func.sum(counts.c.failed),
         )
-        .where(today_filter)
-        .group_by(Item.domain)
+        .where(*where)
+        .group_by(*dimensions)
     )
-    by_domain: dict[str, int] = {}
-    total = 0
-    high_value = 0
-    failed = 0
-    for domain, count, high_count, failed_count in item_rollup:
-        by_domain[domain] = count
-        total += count or 0
-        high_value += high_count or 0
-        failed += failed_count or 0
-
-    yesterday_total = await db.scalar(
-        select(sa_func.count()).select_from(Item).where(yesterday_filter)
-    ) or 0
-
-    source_result = await db.execute(
+
+
+def _source_health_statement():
+    return (
         select(
             sa_func.count().label("total"),
             sa_func.sum(case((Source.health == "good", 1), else_=0)).label("healthy"),
@@ -81,45 +105,160 @@ async def get_stats(
         .select_from(Source)
         .where(*visible_source_filters(only_active=True))
     )
-    sr = source_result.one()
 
-    cat_result = await db.execute(
-        select(Item.category, sa_func.count()).where(today_filter, Item.category.isnot(None)).group_by(Item.category)
-    )
-    category_counts = {r[0]: r[1] for r in cat_result}
 
-    conf_result = await db.execute(
-        select(Item.confidence, sa_func.count()).where(today_filter, Item.confidence.isnot(None)).group_by(Item.confidence)
+async def compute_stats(db: AsyncSession, date: str | None, *, from_rollups: bool = False) -> dict:
+    """Aggregate one day's item, source, score and category counts.
+
+    The day counts and the source health query are independent and run
+    concurrently when `db` is a `PooledReads`.
+    """
+    day_start = _day_start(date)
+    today = day_start.date()
+
+    by_domain: dict[str, int] = {}
+    category_counts: dict[str, int] = {}
+    confidence_breakdown: dict[str, int] = {}
+    bucket_counts: dict[int, int] = {}
+    total = high_value = failed = yesterday_total = 0
+    results = await execute_all(
+        db,
+        stats_daily_counts=_daily_counts_statement(day_start, from_rollups=from_rollups),
+        stats_source_health=_source_health_statement(),
     )
-    confidence_breakdown = {r[0]: r[1] for r in conf_result}
+    for day, domain, category, confidence, bucket, count, high_count, failed_count in results["stats_daily_counts"]:
+        count = int(count or 0)
+        if not count:
+            continue
+        if day != today:
+            yesterday_total += count
+            continue
+        by_domain[domain] = by_domain.get(domain, 0) + count
+        total += count
+        high_value += int(high_count or 0)
+        failed += int(failed_count or 0)
+        if category:
+            category_counts[category] = category_counts.get(category, 0) + count
+        if confidence:
+            confidence_breakdown[confidence] = confidence_breakdown.get(confidence, 0) + count
+        if int(bucket) >= 0:
+            bucket_counts[int(bucket)] = bucket_counts.get(int(bucket), 0) + count
+
+    sr = results["stats_source_health"].one()
+
+    return {
+        "date": today.isoformat(),
+        "items": {
+            "total": total,
+            "by_domain": by_domain,
+            "high_value": high_value,
+            "failed_analyses": failed,
+            "delta_vs_yesterday": total - yesterday_total,
+        },
+        "sources": {
+            "total": sr.total or 0,
+            "healthy": sr.healthy or 0,
+            "degraded": sr.degraded or 0,
+            "disabled": sr.disabled or 0,
+        },
+        "score_histogram": histogram_from_bucket_counts(bucket_counts),
+        "retention_buckets": retention_counts_from_bucket_counts(bucket_counts),
+        "category_counts": category_counts,
+        "confidence_breakdown": confidence_breakdown,
+    }
+
+
+TIME_TO_INSIGHT_MAX_DAYS = 90
 
-    score_result = await db.execute(
-        select(sa_func.floor(Item.insight_score / 5), sa_func.count())
-        .where(today_filter, Item.insight_score.isnot(None))
-        .group_by(sa_func.floor(Item.insight_score / 5))
+
+@router.get("/stats/time-to-insight")
+async def get_time_to_insight(
+    request: Request,
+    days: int = 7,
+    db: PooledReads = Depends(pooled_reads),
+):
+    """p50/p95 time from publication to first digest inclusion over the last `days` digest days."""
+    if not 1 <= days <= TIME_TO_INSIGHT_MAX_DAYS:
+        raise_api_error("invalid_param", f"days must be between 1 and {TIME_TO_INSIGHT_MAX_DAYS}", 400)
+
+    async def load():
+        return await compute_time_to_insight(db, days)
+
+    data = await response_cache.get_or_load("stats/time-to-insight", {"days": days}, load)
+    return success_envelope(data, request=request)
+
+
+async def compute_time_to_insight(db, days: int) -> dict:
+    """Percentiles overall, by domain and by source from the `insight_latency_daily` bucket counts."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    current = visibility()
+    latency = InsightLatencyDaily
+    statement = (
+        select(latency.domain, latency.source_id, latency.bucket, sa_func.sum(latency.items))
+        .where(
+            latency.day >= since,
+            latency.domain.in_(current.domains),
+            latency.source_id.in_(sorted(current.source_ids)),
+        )
+        .group_by(latency.domain, latency.source_id, latency.bucket)
     )
-    bucket_counts = {int(bucket): count for bucket, count in score_result}
+    rows = (await execute_all(db, stats_time_to_insight=statement))["stats_time_to_insight"]
+    overall: dict[int, int] = {}
+    by_domain: dict[str, dict[int, int]] = {}
+    by_source: dict[str, dict[int, int]] = {}
+    source_domain: dict[str, str] = {}
+    for domain, source_id, bucket, count in rows:
+        bucket, count = int(bucket), int(count or 0)
+        for counts in (overall, by_domain.setdefault(domain, {}), by_source.setdefault(source_id, {})):
+            counts[bucket] = counts.get(bucket, 0) + count
+        source_domain[source_id] = domain
+    return {
+        "days": days,
+        "since": since.isoformat(),
+        "buckets_s": list(LATENCY_BUCKETS_S),
+        "overall": latency_percentiles(overall),
+        "by_domain": {domain: latency_percentiles(counts) for domain, counts in sorted(by_domain.items())},
+        "by_source": {
+            source_id: {"domain": source_domain[source_id], **latency_percentiles(counts)}
+            for source_id, counts in sorted(by_source.items())
+        },
+    }
+
 
+@router.get("/stats/storage")
+async def get_storage_stats(request: Request):
+    """Compressed-column, response-cache and source-catalog counters for this API process since start."""
     return success_envelope(
         {
-            "date": day_start.date().isoformat(),
-            "items": {
-                "total": total,
-                "by_domain": by_domain,
-                "high_value": high_value,
-                "failed_analyses": failed,
-                "delta_vs_yesterday": total - yesterday_total,
-            },
-            "sources": {
-                "total": sr.total or 0,
-                "healthy": sr.healthy or 0,
-                "degraded": sr.degraded or 0,
-                "disabled": sr.disabled or 0,
-            },
-            "score_histogram": histogram_from_bucket_counts(bucket_counts),
-            "retention_buckets": retention_counts_from_bucket_counts(bucket_counts),
-            "category_counts": category_counts,
-            "confidence_breakdown": confidence_breakdown,
+            "compression": codec_stats.snapshot(),
+            "response_cache": response_cache.stats(),
+            "source_catalog": catalog_stats(),
         },
         request=request,
     )
+
+
+@router.get("/stats/pool")
+async def get_pool_stats(request: Request):
+    """Connection pool state, keepalive ping round trips and reconnect counters for this process."""
+    from src.db import engine
+
+    return success_envelope(pool_health.snapshot(engine.sync_engine.pool), request=request)
+
+
+@router.get("/stats/sql")
+async def get_sql_stats(request: Request, limit: int = 20):
+    """Statement fingerprints of this process ranked by total time, with slow-statement counts."""
+    return success_envelope(fingerprint_stats.summary(min(limit, settings.api_max_limit)), request=request)
+
+
+@router.get("/stats/loop")
+async def get_loop_stats(request: Request, limit: int = 10):
+    """Event-loop lag and the call sites that blocked this process's loop, by total stall time."""
+    return success_envelope(loop_watchdog.snapshot(min(limit, settings.api_max_limit)), request=request)
+
+
+@router.get("/stats/replica")
+async def get_replica_stats(request: Request):
+    """Lag and sync state of this API process's local read replica."""
+    return success_envelope(await asyncio.to_thread(replica_status), request=request)
@@ -1,12 +1,16 @@
 from src.collector.api import GenericAPICollector, HackerNewsCollector
 from src.collector.catalog import (
+    CatalogSnapshot,
+    SourceCatalog,
     SourceCatalogEntry,
     as_source_model,
     catalog_approved_source_ids,
     catalog_by_id,
     catalog_source_ids,
+    catalog_snapshot,
     load_source_catalog,
     seed_candidate_sources,
+    source_catalog,
 )
 from src.collector.dispatcher import (
     SourceFetchResult,
@@ -16,16 +20,23 @@ from src.collector.dispatcher import (
     fetch_source,
 )
 from src.collector.github import GitHubAdvisoryCollector
+from src.collector.recording import RecordingTransport, ReplayTransport, TrafficRecording
 
 __all__ = [
+    "CatalogSnapshot",
     "GenericAPICollector",
     "GitHubAdvisoryCollector",
     "HackerNewsCollector",
+    "RecordingTransport",
+    "ReplayTransport",
     "SourceFetchResult",
+    "SourceCatalog",
     "SourceCatalogEntry",
+    "TrafficRecording",
     "as_source_model",
     "catalog_approved_source_ids",
     "catalog_by_id",
+    "catalog_snapshot",
     "catalog_source_ids",
     "collect_sources",
     "collection_stats",
@@ -33,4 +44,5 @@ __all__ = [
     "fetch_source",
     "load_source_catalog",
     "seed_candidate_sources",
+    "source_catalog",
 ]
@@ -24,6 +24,7 @@ class GenericAPICollector(BaseCollector):
             transport=self.config.get("_transport"),
         ) as client:
             resp = await client.get(self.url, params=params)
+            self.count_bytes(resp)
             resp.raise_for_status()
             data = resp.json()
 
@@ -60,6 +61,7 @@ class HackerNewsCollector(BaseCollector):
             transport=self.config.get("_transport"),
         ) as client:
             resp = await client.get(self.url)
+            self.count_bytes(resp)
             resp.raise_for_status()
             story_ids = resp.json()
             if not isinstance(story_ids, list):
@@ -89,6 +91,7 @@ class HackerNewsCollector(BaseCollector):
         """Fetch one Hacker News story payload under the configured concurrency limit."""
         async with sem:
             item_resp = await client.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json")
+            self.count_bytes(item_resp)
             item_resp.raise_for_status()
             story = item_resp.json()
             return story if isinstance(story, dict) else None
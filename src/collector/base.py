@@ -77,6 +77,11 @@ class BaseCollector(ABC):
         self.source_id = source_id
         self.url = url
         self.config = config or {}
+        self.bytes_received = 0
+
+    def count_bytes(self, response) -> None:
+        """Add a response body's size to this collector's `bytes_received`."""
+        self.bytes_received += len(getattr(response, "content", b"") or b"")
 
     @abstractmethod
     async def fetch(self, since: datetime | None = None) -> list[RawItem]:
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import settings
 from src.models.source import Source
 
+log = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class SourceCatalogEntry:
@@ -27,31 +32,131 @@ class SourceCatalogEntry:
     config_json: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One parsed version of the catalog file, with the lookups callers need precomputed."""
+
+    entries: tuple[SourceCatalogEntry, ...] = ()
+    by_id: Mapping[str, SourceCatalogEntry] = field(default_factory=lambda: MappingProxyType({}))
+    source_ids: frozenset[str] = frozenset()
+    approved_ids: frozenset[str] = frozenset()
+    mtime_ns: int | None = None
+
+    @classmethod
+    def from_entries(cls, entries: tuple[SourceCatalogEntry, ...], mtime_ns: int | None) -> "CatalogSnapshot":
+        by_id = {entry.id: entry for entry in entries}
+        return cls(
+            entries=entries,
+            by_id=MappingProxyType(by_id),
+            source_ids=frozenset(by_id),
+            approved_ids=frozenset(entry.id for entry in entries if entry.status == "approved"),
+            mtime_ns=mtime_ns,
+        )
+
+
+class SourceCatalog:
+    """The catalog file, parsed once and re-read only when its mtime or size changes.
+
+    Every lookup costs one `stat()`. A file that fails to parse after a good
+    load keeps the last good snapshot in service (counted in `errors`) and is
+    not read again until its mtime or size changes; a missing file is an
+    empty catalog, as before.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.reloads = 0
+        self.hits = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        self._snapshot: CatalogSnapshot | None = None
+        self._signature: tuple[int, int] | None = None
+        # Signature of the last file version that failed to load.
+        self._failed_signature: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CatalogSnapshot:
+        try:
+            stat = self.path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        with self._lock:
+            if self._snapshot is not None and signature in (self._signature, self._failed_signature):
+                self.hits += 1
+                return self._snapshot
+            if signature is None:
+                snapshot = CatalogSnapshot()
+            else:
+                try:
+                    snapshot = CatalogSnapshot.from_entries(_parse_catalog(self.path), signature[0])
+                except (OSError, ValueError) as exc:
+                    self.errors += 1
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+                    if self._snapshot is None:
+                        raise
+                    self._failed_signature = signature
+                    log.warning("Keeping the previous source catalog; %s failed to load: %s", self.path, exc)
+                    return self._snapshot
+            self._snapshot = snapshot
+            self._signature = signature
+            self._failed_signature = None
+            self.reloads += 1
+            return snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "path": str(self.path),
+            "entries": len(snapshot.entries) if snapshot is not None else 0,
+            "mtime_ns": snapshot.mtime_ns if snapshot is not None else None,
+            "reloads": self.reloads,
+            "hits": self.hits,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_catalogs: dict[str, SourceCatalog] = {}
+EMPTY_CATALOG = CatalogSnapshot()
+
+
+def source_catalog(path: str | Path | None = None) -> SourceCatalog:
+    """The shared catalog service for `path` (default: `SOURCE_SEED_PATH`)."""
+    key = str(path or settings.source_seed_path or "")
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = _catalogs[key] = SourceCatalog(key)
+    return catalog
+
+
+def catalog_snapshot(path: str | Path | None = None) -> CatalogSnapshot:
+    if not (path or settings.source_seed_path):
+        return EMPTY_CATALOG
+    return source_catalog(path).snapshot()
+
+
 def load_source_catalog(path: str | Path | None = None) -> tuple[SourceCatalogEntry, ...]:
-    configured_path = path or settings.source_seed_path
-    if not configured_path:
-        return ()
-    catalog_path = Path(configured_path)
-    if not catalog_path.exists():
-        return ()
-
-    raw = json.loads(catalog_path.read_text(encoding="utf-8"))
-    if not isinstance(raw, list):
-        raise ValueError("source catalog must be a JSON array")
+    return catalog_snapshot(path).entries
 
-    return tuple(_entry_from_dict(record) for record in raw)
 
+def catalog_by_id(path: str | Path | None = None) -> Mapping[str, SourceCatalogEntry]:
+    return catalog_snapshot(path).by_id
 
-def catalog_by_id(path: str | Path | None = None) -> dict[str, SourceCatalogEntry]:
-    return {entry.id: entry for entry in load_source_catalog(path)}
 
+def catalog_source_ids(path: str | Path | None = None) -> frozenset[str]:
+    return catalog_snapshot(path).source_ids
 
-def catalog_source_ids(path: str | Path | None = None) -> set[str]:
-    return set(catalog_by_id(path))
 
+def catalog_approved_source_ids(path: str | Path | None = None) -> frozenset[str]:
+    return catalog_snapshot(path).approved_ids
 
-def catalog_approved_source_ids(path: str | Path | None = None) -> set[str]:
-    return {entry.id for entry in load_source_catalog(path) if entry.status == "approved"}
+
+def _parse_catalog(path: Path) -> tuple[SourceCatalogEntry, ...]:
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(raw, list):
+        raise ValueError("source catalog must be a JSON array")
+    return tuple(_entry_from_dict(record) for record in raw)
 
 
 def as_source_model(entry: SourceCatalogEntry) -> Source:
@@ -114,10 +219,20 @@ def _entry_from_dict(record: Any) -> SourceCatalogEntry:
         status=str(record.get("status") or "candidate"),
         health=str(record.get("health") or "good"),
         is_active=bool(record.get("is_active", True)),
-        config_json=dict(record.get("config_json") or {}),
+        config_json=_optional_mapping(record, "config_json"),
     )
 
 
+def _optional_mapping(record: dict[str, Any], key: str) -> dict[str, Any]:
+    """Copy an optional object field of a source catalog record (missing or null is empty)."""
+    value = record.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"source catalog entry {key} must be an object")
+    return dict(value)
+
+
 def _required_str(record: dict[str, Any], key: str) -> str:
     """Require one non-empty string field in a source catalog record."""
     value = record.get(key)
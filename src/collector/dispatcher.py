@@ -13,6 +13,7 @@ from src.collector.github import GitHubAdvisoryCollector
 from src.collector.nvd import NVDCollector
 from src.collector.rss import RSSCollector
 from src.config import settings
+from src.metrics import source_fetch_bytes, source_fetch_seconds
 
 
 @dataclass(frozen=True)
@@ -22,10 +23,14 @@ class SourceFetchResult:
     items: list[RawItem] = field(default_factory=list)
     error: str | None = None
     duration_s: float = 0.0
+    bytes_received: int = 0
+    fetched_at: datetime | None = None
 
     def stats_entry(self) -> dict[str, Any]:
         """Build the per-source stats fragment stored on the run record."""
         data: dict[str, Any] = {"status": self.status, "items": len(self.items), "duration_s": round(self.duration_s, 3)}
+        if self.bytes_received:
+            data["bytes"] = self.bytes_received
         if self.error:
             data["error"] = self.error
         return data
@@ -75,6 +80,7 @@ async def fetch_source(
 ) -> SourceFetchResult:
     """Fetch one source and normalize failures into a structured result."""
     started = time.monotonic()
+    collector = None
     try:
         collector = collector_factory(source)
         items = await collector.fetch(since=since)
@@ -82,21 +88,31 @@ async def fetch_source(
         duration = time.monotonic() - started
         error = classify_fetch_error(exc)
         _mark_source_failure(source, error)
-        return SourceFetchResult(
+        return _observed(SourceFetchResult(
             source_id=source.id,
             status="failed",
             error=error,
             duration_s=duration,
-        )
+            bytes_received=getattr(collector, "bytes_received", 0),
+        ))
 
     duration = time.monotonic() - started
     _mark_source_success(source)
-    return SourceFetchResult(
+    return _observed(SourceFetchResult(
         source_id=source.id,
         status="succeeded",
         items=items,
         duration_s=duration,
-    )
+        bytes_received=getattr(collector, "bytes_received", 0),
+        fetched_at=datetime.now(timezone.utc),
+    ))
+
+
+def _observed(result: SourceFetchResult) -> SourceFetchResult:
+    """Record one fetch's duration and bytes on /metrics."""
+    source_fetch_seconds.observe(result.duration_s, source_id=result.source_id, status=result.status)
+    source_fetch_bytes.inc(result.bytes_received, source_id=result.source_id)
+    return result
 
 
 def classify_fetch_error(exc: Exception) -> str:
@@ -31,6 +31,7 @@ class GitHubAdvisoryCollector(BaseCollector):
             transport=self.config.get("_transport"),
         ) as client:
             resp = await client.get(self.url, params=params)
+            self.count_bytes(resp)
             resp.raise_for_status()
             data = resp.json()
 
@@ -59,6 +60,7 @@ class GitHubAdvisoryCollector(BaseCollector):
                     published_at=published_at,
                     native_id=ghsa_id,
                     metadata={
+                        "ghsa_id": ghsa_id,
                         "severity": advisory.get("severity"),
                         "github_reviewed": advisory.get("github_reviewed"),
                         "cve_ids": cve_ids,
@@ -30,8 +30,14 @@ class NVDCollector(BaseCollector):
             headers["apiKey"] = nvd_key
 
         timeout = httpx.Timeout(float(self.config.get("timeout_s", settings.collector_timeout_s)))
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers=headers) as client:
+        async with httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            headers=headers,
+            transport=self.config.get("_transport"),
+        ) as client:
             resp = await client.get(self.url, params=params)
+            self.count_bytes(resp)
             resp.raise_for_status()
             data = resp.json()
 
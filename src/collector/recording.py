@@ -0,0 +1,237 @@
+"""Record and replay collector HTTP traffic.
+
+A recording holds every request/response pair the collectors exchanged
+during one run, plus the run window and the sources that were fetched, as
+gzip-compressed JSON lines (`<run_id>.jsonl.gz`). Replaying it serves those
+responses back through the collectors' `_transport` hook, so a past day's
+feeds can be run through the current code offline and two code versions
+compared on identical input.
+
+Recording is on for scheduled runs when `COLLECTOR_RECORD_DIR` is set, and
+per run with `run_pipeline.py --record`; `run_pipeline.py --dry-run --replay`
+and `load_harness.py --replay` play a recording back.
+
+Requests are matched on method and full URL, then on method and URL
+without the query string: collectors put the run window into query
+parameters (NVD `pubEndDate`, GitHub `published`), which never repeat
+exactly. Repeated requests get the recorded responses in order.
+"""
+from __future__ import annotations
+
+import base64
+import functools
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from src.collector.dispatcher import collect_sources, create_collector
+
+log = logging.getLogger(__name__)
+
+RECORDING_FORMAT = 1
+SOURCE_FIELDS = ("id", "name", "domain", "type", "url", "auth_mode", "fetch_strategy", "authority", "config_json")
+# Bodies are stored decoded, and never carry cookies.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+class RecordingError(ValueError):
+    pass
+
+
+class TrafficRecording:
+    """Request/response pairs of one run, with the window and sources needed to replay it."""
+
+    def __init__(self, run_id: str = "", *, window_start: datetime | None = None, window_end: datetime | None = None):
+        self.run_id = run_id
+        self.window_start = window_start
+        self.window_end = window_end
+        self.sources: list[dict[str, Any]] = []
+        self.exchanges: list[dict[str, Any]] = []
+
+    def add_sources(self, sources: list[Any]) -> None:
+        known = {source["id"] for source in self.sources}
+        self.sources.extend(
+            {field: getattr(source, field, None) for field in SOURCE_FIELDS}
+            for source in sources
+            if source.id not in known
+        )
+
+    def add_exchange(self, request: httpx.Request, response: httpx.Response) -> None:
+        self.exchanges.append(
+            {
+                "method": request.method,
+                "url": str(request.url),
+                "status": response.status_code,
+                "headers": [list(header) for header in _kept_headers(response.headers)],
+                "body": base64.b64encode(response.content).decode("ascii"),
+            }
+        )
+
+    def save(self, path: str | Path) -> Path:
+        """Write the recording as gzip-compressed JSON lines: a header, then one line per exchange."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "format": RECORDING_FORMAT,
+            "run_id": self.run_id,
+            "window_start": self.window_start.isoformat() if self.window_start else None,
+            "window_end": self.window_end.isoformat() if self.window_end else None,
+            "sources": self.sources,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            handle.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for exchange in self.exchanges:
+                handle.write(json.dumps(exchange) + "\n")
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> TrafficRecording:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                header = json.loads(handle.readline())
+                exchanges = [json.loads(line) for line in handle if line.strip()]
+        except (OSError, ValueError) as exc:
+            raise RecordingError(f"cannot read recording {path}: {exc}") from exc
+        if header.get("format") != RECORDING_FORMAT:
+            raise RecordingError(f"unsupported recording format {header.get('format')!r} in {path}")
+        recording = cls(
+            header.get("run_id") or "",
+            window_start=_parse_time(header.get("window_start")),
+            window_end=_parse_time(header.get("window_end")),
+        )
+        recording.sources = header.get("sources") or []
+        recording.exchanges = exchanges
+        return recording
+
+    def source_models(self) -> list[Any]:
+        """The recorded sources as approved, healthy `Source` rows (not attached to a session)."""
+        from src.models.source import Source
+
+        return [
+            Source(**source, status="approved", health="good", consecutive_failures=0, is_active=True)
+            for source in self.sources
+        ]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Sends requests for real and adds each exchange to `recording`."""
+
+    def __init__(self, recording: TrafficRecording, inner: httpx.AsyncBaseTransport | None = None):
+        self.recording = recording
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        # `aread` decoded the body, so the copy handed on (and stored) drops
+        # the transfer headers that described the encoded one.
+        replayable = httpx.Response(
+            response.status_code, headers=_kept_headers(response.headers), content=content, request=request
+        )
+        self.recording.add_exchange(request, replayable)
+        return replayable
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves a recording's responses; a request that was never recorded gets a 404."""
+
+    def __init__(self, recording: TrafficRecording):
+        self.exact: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self.loose: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for exchange in recording.exchanges:
+            self.exact[(exchange["method"], exchange["url"])].append(exchange)
+            self.loose[(exchange["method"], _without_query(exchange["url"]))].append(exchange)
+        self._served: dict[tuple[str, str, str], int] = defaultdict(int)
+        self.requests = 0
+        self.bytes_served = 0
+        self.misses: list[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        for kind, key in (("exact", (request.method, url)), ("loose", (request.method, _without_query(url)))):
+            candidates = getattr(self, kind).get(key)
+            if candidates:
+                served = self._served[(kind, *key)]
+                self._served[(kind, *key)] = served + 1
+                exchange = candidates[min(served, len(candidates) - 1)]
+                content = base64.b64decode(exchange["body"])
+                self.requests += 1
+                self.bytes_served += len(content)
+                return httpx.Response(exchange["status"], headers=exchange["headers"], content=content, request=request)
+        self.misses.append(f"{request.method} {url}")
+        return httpx.Response(404, text="not in recording", request=request)
+
+
+def with_transport(
+    make_transport: Callable[[], httpx.AsyncBaseTransport], factory=create_collector
+) -> Callable[[Any], Any]:
+    """Collector factory that hands every collector its own transport from `make_transport`."""
+
+    def build(source: Any):
+        collector = factory(source)
+        collector.config = {**collector.config, "_transport": make_transport()}
+        return collector
+
+    return build
+
+
+def recording_collector(recording: TrafficRecording, collect=collect_sources):
+    """A `run_daily_pipeline` collector that fetches for real and records the traffic and sources."""
+
+    async def collect_recorded(sources: list[Any], *, since: datetime | None = None):
+        recording.add_sources(sources)
+        factory = with_transport(functools.partial(RecordingTransport, recording))
+        return await collect(sources, since=since, collector_factory=factory)
+
+    return collect_recorded
+
+
+def replay_collector(recording: TrafficRecording, collect=collect_sources):
+    """A `run_daily_pipeline` collector that serves the recording instead of the network."""
+    transport = ReplayTransport(recording)
+
+    async def collect_replayed(sources: list[Any], *, since: datetime | None = None):
+        # One shared transport, so repeated requests advance through their
+        # recorded responses; closing a client does not close it.
+        return await collect(sources, since=since, collector_factory=with_transport(lambda: transport))
+
+    collect_replayed.transport = transport
+    return collect_replayed
+
+
+def recording_path(run_id: str, directory: str | Path) -> Path:
+    return Path(directory) / f"{run_id}.jsonl.gz"
+
+
+def save_run_recording(recording: TrafficRecording, path: str | Path) -> dict[str, Any]:
+    """Save `recording` and describe it for `runs.stats_json["recording"]`; a failed write never fails the run."""
+    try:
+        saved = recording.save(path)
+    except OSError as exc:
+        log.warning("Could not write collector recording %s: %s", path, exc)
+        return {"path": str(path), "error": str(exc)[:200]}
+    return {"path": str(saved), "exchanges": len(recording.exchanges), "bytes": saved.stat().st_size}
+
+
+def _kept_headers(headers: httpx.Headers) -> list[tuple[str, str]]:
+    return [(name, value) for name, value in headers.multi_items() if name.lower() not in _DROPPED_HEADERS]
+
+
+def _without_query(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
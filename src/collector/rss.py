@@ -92,8 +92,13 @@ class RSSCollector(BaseCollector):
     async def fetch(self, since: datetime | None = None) -> list[RawItem]:
         """Fetch an RSS/Atom feed and convert entries into RawItem records."""
         timeout = httpx.Timeout(float(self.config.get("timeout_s", settings.collector_timeout_s)))
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        async with httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            transport=self.config.get("_transport"),
+        ) as client:
             resp = await client.get(self.url)
+            self.count_bytes(resp)
             resp.raise_for_status()
 
         feed = feedparser.parse(resp.text)
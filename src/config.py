@@ -67,6 +67,53 @@ class Settings(BaseSettings):
     retention_delete_below_score: int = 10
     retention_5_days_below_score: int = 30
     retention_10_days_below_score: int = 50
+    # Chunked retention job (src.pipeline.cleanup), scheduled separately from
+    # the daily run. max_rows_per_run=0 removes the cap.
+    retention_cron: str = "30 17 * * *"
+    retention_chunk_size: int = 500
+    retention_max_rows_per_run: int = 50000
+    retention_chunk_pause_s: float = 0.5
+    retention_archive_enabled: bool = False
+    # Background recompression of digest/deep-report rows stored before the
+    # CompressedText codec (src.pipeline.recompress). Empty cron disables it.
+    recompress_cron: str = "45 17 * * *"
+    recompress_batch_size: int = 50
+    recompress_max_rows_per_run: int = 1000
+
+    # Read API response cache (src.api.cache). Uses Redis when redis_url is set,
+    # an in-process LRU otherwise. Runs change mid-pipeline, so they get a
+    # shorter TTL than the rest.
+    api_cache_enabled: bool = True
+    api_cache_ttl_s: int = 300
+    api_cache_runs_ttl_s: int = 15
+    api_cache_max_entries: int = 512
+
+    # Local SQLite read replica (src.replica) of recent items plus sources, runs
+    # and digests. Reads inside the horizon prefer it while its lag is under
+    # replica_max_lag_s; everything else goes to MySQL.
+    replica_enabled: bool = True
+    replica_path: str = "var/replica.sqlite3"
+    replica_horizon_days: int = 30
+    replica_sync_interval_s: float = 60.0
+    replica_sync_overlap_s: int = 300
+    replica_max_lag_s: float = 600.0
+    replica_page_size: int = 500
+    # TF-IDF index for /items/{id}/related (src.replica.related): the worker
+    # builds it from the replica's search docs and saves it to
+    # related_index_path; API processes load the file after each sync.
+    related_enabled: bool = True
+    related_index_path: str = "var/related_index.bin"
+    related_terms_per_doc: int = 24
+    related_max_postings: int = 256
+    related_max_df: float = 0.2
+
+    # Local Bloom filter of stored dedup hashes (src.pipeline.dedup_filter):
+    # definite misses skip the cross-border dedup lookup. ~1.2 MB per million
+    # entries at 1% false positives.
+    dedup_filter_enabled: bool = True
+    dedup_filter_path: str = "var/dedup_filter.bin"
+    dedup_filter_capacity: int = 200000
+    dedup_filter_fp_rate: float = 0.01
 
     collect_cron: str = "0 16 * * *"
     run_lock_name: str = "intelligence_daily_pipeline"
@@ -79,6 +126,7 @@ class Settings(BaseSettings):
     collector_hn_max_items: int = 50
     collector_hn_max_concurrency: int = 10
     collector_nvd_results_per_page: int = 2000
+    collector_record_dir: str = ""
     api_command: str = "uvicorn src.main:app"
 
     api_host: str = "127.0.0.1"
@@ -92,6 +140,26 @@ class Settings(BaseSettings):
     database_pool_size: int = 5
     database_max_overflow: int = 5
     database_pool_recycle_s: int = 3600
+    database_pre_ping: bool = False
+    database_keepalive_interval_s: float = 60.0
+    database_keepalive_idle_s: float = 120.0
+    database_keepalive_timeout_s: float = 15.0
+    sql_telemetry_enabled: bool = True
+    sql_slow_ms: float = 5000.0
+    sql_slow_log_interval_s: float = 300.0
+    sql_max_fingerprints: int = 500
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+    metrics_queue_ttl_s: float = 60.0
+    loop_watchdog_enabled: bool = True
+    loop_watchdog_interval_s: float = 0.25
+    loop_block_threshold_ms: float = 250.0
+    loop_block_log_interval_s: float = 300.0
+    loop_watchdog_max_sites: int = 100
+    pipeline_profile: str = ""
+    pipeline_profile_dir: str = "var/profiles"
+    pipeline_profile_interval_ms: float = 10.0
+    pipeline_profile_top: int = 20
     database_verify_tls: bool = False
 
     hexo_posts_dir: str = "/opt/blog/source/_posts"
@@ -1,8 +1,10 @@
 import ssl
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from src.config import settings
+from src.pool_monitor import FirstUseRetrySession, install_pool_events
+from src.sql_telemetry import install_sql_telemetry
 
 def build_ssl_context() -> ssl.SSLContext:
     """Build the MySQL TLS context from explicit repository settings.
@@ -31,13 +33,18 @@ engine = create_async_engine(
     pool_size=settings.database_pool_size,
     max_overflow=settings.database_max_overflow,
     pool_recycle=settings.database_pool_recycle_s,
-    # pre_ping refreshes connections gone stale on the long-haul link instead of
-    # hanging; connect_timeout bounds a stuck connect.
-    pool_pre_ping=True,
+    # A checkout pre-ping costs one more cross-border round trip per session.
+    # Stale connections are found by the API's background keepalive
+    # (src/pool_monitor.py) and by the first-use retry in the session class;
+    # connect_timeout bounds a stuck connect.
+    pool_pre_ping=settings.database_pre_ping,
     connect_args={"connect_timeout": 20, "ssl": _ssl_ctx},
 )
+install_pool_events(engine)
+if settings.sql_telemetry_enabled:
+    install_sql_telemetry(engine)
 
-async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_session = async_sessionmaker(engine, class_=FirstUseRetrySession, expire_on_commit=False)
 
 
 async def get_session():
@@ -9,14 +9,17 @@ in the background.
 
 Qualification proper (does the advisory name a repo + single fix commit?) is
 deferred to the worker, which needs a GitHub round-trip anyway. Here we only
-require that an item is a GitHub Security Advisory carrying a GHSA id.
+require that an item is a GitHub Security Advisory carrying a GHSA id. The
+daily pipeline passes the GHSA ids it already extracted into `item_identifiers`
+(`ghsa_by_item`); `extract_ghsa` remains the fallback for callers without them.
 """
 from __future__ import annotations
 
 import re
-from typing import Iterable
+import time
+from typing import Iterable, Mapping
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -73,9 +76,16 @@ async def enqueue_paper(
     return arxiv_id
 
 
-def select_candidates(items: Iterable[Item], *, min_score: int, limit: int) -> list[tuple[Item, str]]:
+def select_candidates(
+    items: Iterable[Item],
+    *,
+    min_score: int,
+    limit: int,
+    ghsa_by_item: Mapping[str, str] | None = None,
+) -> list[tuple[Item, str]]:
     """Security-domain items that carry a GHSA id and clear the score floor,
-    highest insight_score first, capped at `limit`."""
+    highest insight_score first, capped at `limit`. With `ghsa_by_item` the id
+    comes from the identifier index instead of a regex scan per item."""
     scored: list[tuple[int, Item, str]] = []
     for item in items:
         if item.domain != "security":
@@ -83,7 +93,7 @@ def select_candidates(items: Iterable[Item], *, min_score: int, limit: int) -> l
         score = item.insight_score or 0
         if score < min_score:
             continue
-        ghsa = extract_ghsa(item)
+        ghsa = ghsa_by_item.get(item.id) if ghsa_by_item is not None else extract_ghsa(item)
         if ghsa:
             scored.append((score, item, ghsa))
     scored.sort(key=lambda t: t[0], reverse=True)
@@ -91,12 +101,17 @@ def select_candidates(items: Iterable[Item], *, min_score: int, limit: int) -> l
 
 
 async def enqueue_candidates(
-    session: AsyncSession, items: Iterable[Item], *, min_score: int, limit: int
+    session: AsyncSession,
+    items: Iterable[Item],
+    *,
+    min_score: int,
+    limit: int,
+    ghsa_by_item: Mapping[str, str] | None = None,
 ) -> list[str]:
     """Insert `queued` deep_analyses rows for qualifying items. Skips subjects
     that already have a row in any non-failed state (don't re-queue a done or
     in-flight analysis). Returns the GHSA ids newly enqueued."""
-    candidates = select_candidates(items, min_score=min_score, limit=limit)
+    candidates = select_candidates(items, min_score=min_score, limit=limit, ghsa_by_item=ghsa_by_item)
     if not candidates:
         return []
 
@@ -122,3 +137,32 @@ async def enqueue_candidates(
         await session.execute(stmt)
         enqueued.append(ghsa)
     return enqueued
+
+
+async def queue_depths(session: AsyncSession) -> dict[str, int]:
+    """Number of `deep_analyses` rows per status (NULL status counted as ``unknown``)."""
+    rows = await session.execute(select(DeepAnalysis.status, func.count()).group_by(DeepAnalysis.status))
+    return {status or "unknown": int(count) for status, count in rows}
+
+
+def install_queue_metrics(session_factory, *, ttl_s: float) -> None:
+    """Publish `deep_analysis_jobs{status}` on /metrics, re-counted at most every `ttl_s`.
+
+    A scrape costs a cross-border round trip, so the count is cached between
+    scrapes; a failed refresh keeps the previous values.
+    """
+    from src.metrics import registry
+
+    gauge = registry.gauge("deep_analysis_jobs", "deep_analyses rows by status (queue depth).", ("status",))
+    refreshed = {"at": None}
+
+    async def refresh() -> None:
+        now = time.monotonic()
+        if refreshed["at"] is not None and now - refreshed["at"] < ttl_s:
+            return
+        refreshed["at"] = now
+        async with session_factory() as session:
+            depths = await queue_depths(session)
+        gauge.replace({(status,): count for status, count in depths.items()})
+
+    registry.on_collect(refresh)
@@ -356,7 +356,6 @@ export const FIXTURES = (() => {
         stage1: { total: 63, succeeded: 61, failed: 2 },
         stage2: { total: 9, running: 3, succeeded: 6, failed: 0 },
         dedup_skipped: 8,
-        retention_deleted: 0,
       },
       progress: 0.78,
     },
@@ -380,7 +379,6 @@ export const FIXTURES = (() => {
         stage1: { total: 48, succeeded: 47, failed: 1 },
         stage2: { total: 7, succeeded: 7, failed: 0 },
         dedup_skipped: 6,
-        retention_deleted: 5,
       },
       progress: 1,
     },
@@ -403,7 +401,7 @@ export const FIXTURES = (() => {
         },
         stage1: { total: 54, succeeded: 54, failed: 0 },
         stage2: { total: 8, succeeded: 8, failed: 0 },
-        dedup_skipped: 4, retention_deleted: 7,
+        dedup_skipped: 4,
       },
       progress: 1,
     },
@@ -415,7 +413,7 @@ export const FIXTURES = (() => {
         sources: {},
         stage1: { total: 12, succeeded: 12, failed: 0 },
         stage2: { total: 2, succeeded: 2, failed: 0 },
-        dedup_skipped: 1, retention_deleted: 0,
+        dedup_skipped: 1,
       },
       progress: 1,
     },
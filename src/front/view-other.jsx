@@ -200,10 +200,6 @@ const RunCard = ({ run, sources, now }) => {
           <span className="step-name">DIGEST</span>
           <span className="step-val">{run.status === 'running' ? '—' : '✓'}</span>
         </div>
-        <div className={`step ${run.status === 'running' ? '' : 'ok'}`}>
-          <span className="step-name">CLEANUP</span>
-          <span className="step-val">{run.status === 'running' ? '—' : `−${run.stats.retention_deleted}`}</span>
-        </div>
       </div>
 
       {run.stats.sources && Object.keys(run.stats.sources).length > 0 && (
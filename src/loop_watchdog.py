@@ -0,0 +1,232 @@
+"""Event-loop lag and blocking-call detection.
+
+A heartbeat coroutine sleeps `LOOP_WATCHDOG_INTERVAL_S` at a time and
+records how late it wakes up (loop lag). A watchdog thread checks the
+heartbeat's deadline; when the loop is more than `LOOP_BLOCK_THRESHOLD_MS`
+overdue, whatever is running on it is blocking every other coroutine, and
+the thread captures the loop thread's stack at that moment. When the loop
+comes back, the stall's length is attributed to that stack's site (the
+innermost frame in this repo, e.g. `src/collector/rss.py:parse_feed`).
+
+Offenders are reported three ways: a warning with the stack (at most one per
+site every `LOOP_BLOCK_LOG_INTERVAL_S`), the `event_loop_*` metrics, and
+per-site totals served by `/stats/loop` and, for pipeline runs, stored under
+`runs.stats_json["loop"]` (see `BlockReport`).
+
+Started by the API lifespan, the scheduler and `run_pipeline.py`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from src.config import settings
+from src.metrics import registry
+
+log = logging.getLogger(__name__)
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_LIBRARY_DIRS = ("site-packages", "dist-packages")
+
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event-loop heartbeat woke up.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+loop_blocked = registry.counter(
+    "event_loop_blocked_total", "Callbacks that held the event loop past the threshold, by site.", ("site",)
+)
+loop_blocked_seconds = registry.counter(
+    "event_loop_blocked_seconds_total", "Time the event loop was held past the threshold, by site.", ("site",)
+)
+
+
+def blocking_site(frames: list[traceback.FrameSummary]) -> str:
+    """`path:function` of the innermost frame in this repo (the leaf frame when none is)."""
+    for frame in reversed(frames):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_REPO_ROOT) and not any(part in filename for part in _LIBRARY_DIRS):
+            return f"{os.path.relpath(filename, _REPO_ROOT)}:{frame.name}"
+    leaf = frames[-1] if frames else None
+    return f"{os.path.basename(leaf.filename)}:{leaf.name}" if leaf else "unknown"
+
+
+class BlockReport:
+    """Per-site stall totals; one process-wide, plus one per pipeline run while it is open."""
+
+    def __init__(self, max_sites: int | None = None):
+        self.max_sites = max_sites or settings.loop_watchdog_max_sites
+        self.sites: dict[str, dict[str, Any]] = {}
+        self.blocked = 0
+        self.blocked_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.dropped = 0
+
+    def record_lag(self, lag_ms: float) -> None:
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def record_block(self, site: str, stalled_ms: float, stack: list[str]) -> None:
+        self.blocked += 1
+        self.blocked_ms += stalled_ms
+        entry = self.sites.get(site)
+        if entry is None:
+            if len(self.sites) >= self.max_sites:
+                self.dropped += 1
+                return
+            entry = self.sites[site] = {"site": site, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack}
+        entry["count"] += 1
+        entry["total_ms"] += stalled_ms
+        if stalled_ms >= entry["max_ms"]:
+            entry["max_ms"] = stalled_ms
+            entry["stack"] = stack
+
+    def summary(self, limit: int = 10) -> dict[str, Any]:
+        top = sorted(self.sites.values(), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+        return {
+            "blocked": self.blocked,
+            "blocked_ms": round(self.blocked_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "dropped_sites": self.dropped,
+            "offenders": [
+                {**entry, "total_ms": round(entry["total_ms"], 1), "max_ms": round(entry["max_ms"], 1)}
+                for entry in top
+            ],
+        }
+
+
+class LoopWatchdog:
+    """Heartbeat on the loop plus a thread that catches the loop overdue and samples its stack."""
+
+    def __init__(
+        self,
+        *,
+        interval_s: float | None = None,
+        threshold_ms: float | None = None,
+        report: BlockReport | None = None,
+    ):
+        self.interval_s = interval_s or settings.loop_watchdog_interval_s
+        self.threshold_s = (threshold_ms or settings.loop_block_threshold_ms) / 1000
+        self.report = report or BlockReport()
+        self.reports: list[BlockReport] = []
+        self._lock = threading.Lock()
+        self._deadline: float | None = None
+        self._beat = 0
+        self._pending: tuple[int, str, list[str]] | None = None
+        self._last_logged: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop_thread_id: int | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start watching the running loop; call from a coroutine on it."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_s + self.threshold_s)
+        self._task = self._thread = None
+
+    def attach(self, report: BlockReport) -> BlockReport:
+        """Also record into `report` until `detach` (a pipeline run's own totals)."""
+        with self._lock:
+            self.reports.append(report)
+        return report
+
+    def detach(self, report: BlockReport) -> None:
+        with self._lock:
+            if report in self.reports:
+                self.reports.remove(report)
+
+    def snapshot(self, limit: int = 10) -> dict[str, Any]:
+        """Process-wide totals for the status endpoint."""
+        return {
+            "running": self.running,
+            "interval_s": self.interval_s,
+            "threshold_ms": round(self.threshold_s * 1000, 1),
+            **self.report.summary(limit),
+        }
+
+    async def _heartbeat(self) -> None:
+        while True:
+            with self._lock:
+                self._deadline = time.monotonic() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.monotonic()
+            with self._lock:
+                lag_s = max(0.0, now - self._deadline)
+                pending, self._pending = self._pending, None
+                self._beat += 1
+            self._record(lag_s, pending)
+
+    def _watch(self) -> None:
+        poll_s = max(0.005, self.threshold_s / 2)
+        while not self._stop.wait(poll_s):
+            with self._lock:
+                deadline, beat = self._deadline, self._beat
+                overdue = deadline is not None and time.monotonic() - deadline > self.threshold_s
+                captured = self._pending is not None and self._pending[0] == beat
+            if not overdue or captured:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            frames = traceback.extract_stack(frame)
+            stack = [f"{frame.filename}:{frame.lineno} {frame.name}" for frame in frames[-12:]]
+            with self._lock:
+                if self._beat == beat:
+                    self._pending = (beat, blocking_site(frames), stack)
+
+    def _record(self, lag_s: float, pending: tuple[int, str, list[str]] | None) -> None:
+        loop_lag_seconds.observe(lag_s)
+        lag_ms = lag_s * 1000
+        with self._lock:
+            reports = [self.report, *self.reports]
+        for report in reports:
+            report.record_lag(lag_ms)
+        if pending is None or lag_s < self.threshold_s:
+            return
+        _, site, stack = pending
+        loop_blocked.inc(site=site)
+        loop_blocked_seconds.inc(lag_s, site=site)
+        for report in reports:
+            report.record_block(site, lag_ms, stack)
+        now = time.monotonic()
+        last = self._last_logged.get(site)
+        if last is None or now - last >= settings.loop_block_log_interval_s:
+            self._last_logged[site] = now
+            log.warning("Event loop blocked %.0f ms at %s:\n  %s", lag_ms, site, "\n  ".join(stack))
+
+
+loop_watchdog = LoopWatchdog()
+
+
+def start_loop_watchdog() -> LoopWatchdog | None:
+    """Start the process watchdog on the running loop when `LOOP_WATCHDOG_ENABLED`."""
+    if not settings.loop_watchdog_enabled:
+        return None
+    loop_watchdog.start()
+    return loop_watchdog
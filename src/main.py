@@ -1,14 +1,22 @@
 import asyncio
 import logging
+import time
 import uuid
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from src.api import items, digests, sources, runs, stats
+from src.api import dashboard, items, digests, sources, runs, stats
 from src.api.contracts import request_id
-from src.db import engine, warm_pool
+from src.config import settings
+from src.db import async_session, engine, warm_pool
+from src.deep.pipeline import install_queue_metrics
+from src.loop_watchdog import loop_watchdog, start_loop_watchdog
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, http_request_seconds, registry
+from src.pool_monitor import install_pool_metrics, pool_keepalive_loop
+from src.replica import close_replica, open_replica, replica_sync_loop
+from src.sql_telemetry import sql_scope
 
 log = logging.getLogger("uvicorn.error")
 
@@ -27,9 +35,18 @@ async def lifespan(app: FastAPI):
     """Start background warmup on boot and dispose the engine on shutdown."""
     # Warm the cross-border pool in the background so startup is instant; first
     # requests may be slow until the pool fills, but the app serves immediately.
-    task = asyncio.create_task(_warm_pool_bg())
+    tasks = [asyncio.create_task(_warm_pool_bg()), asyncio.create_task(pool_keepalive_loop(engine))]
+    install_pool_metrics(engine)
+    install_queue_metrics(async_session, ttl_s=settings.metrics_queue_ttl_s)
+    start_loop_watchdog()
+    if settings.replica_enabled:
+        # Reads keep going to MySQL until the first sync lands (lag unknown).
+        tasks.append(asyncio.create_task(replica_sync_loop(async_session, open_replica())))
     yield
-    task.cancel()
+    for task in tasks:
+        task.cancel()
+    await loop_watchdog.stop()
+    close_replica()
     await engine.dispose()
 
 
@@ -38,10 +55,31 @@ app = FastAPI(title="Intelligence System", version="0.1.0", lifespan=lifespan)
 
 @app.middleware("http")
 async def attach_request_id(request: Request, call_next):
-    """Attach or propagate a request id and echo it back to the caller."""
+    """Attach or propagate a request id, echo it back with the request's SQL timings, and time the route."""
     request.state.request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
-    response = await call_next(request)
+    started = time.perf_counter()
+    with sql_scope() as sql:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    http_request_seconds.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
     response.headers["x-request-id"] = request.state.request_id
+    timings = []
+    reads = getattr(request.state, "pooled_reads", None)
+    if reads is not None and reads.timings:
+        timings.append(reads.server_timing())
+    if sql.round_trips:
+        timings.append(
+            f'sql;dur={sql.elapsed_ms:.1f};desc="{sql.round_trips} round trips, '
+            f'{sql.rows} rows, {sql.bytes_received} B"'
+        )
+        log.debug("request %s SQL: %s", request.state.request_id, sql.summary())
+    if timings:
+        response.headers["Server-Timing"] = ", ".join(timings)
     return response
 
 
@@ -74,8 +112,14 @@ app.include_router(digests.router, prefix="/api/v1")
 app.include_router(sources.router, prefix="/api/v1")
 app.include_router(runs.router, prefix="/api/v1")
 app.include_router(stats.router, prefix="/api/v1")
+app.include_router(dashboard.router, prefix="/api/v1")
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(await registry.render(), media_type=METRICS_CONTENT_TYPE)
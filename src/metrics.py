@@ -0,0 +1,248 @@
+"""Process metrics in the Prometheus text exposition format.
+
+A small in-process registry (counters, gauges, histograms with labels) shared
+by the API, the collectors, the analyzer and the scheduler. The API serves it
+at `/metrics`; the scheduler process serves the same registry on
+`METRICS_PORT` (see `serve_metrics`) so scheduled runs can be scraped too.
+
+Values that live elsewhere (pool state, the deep-analysis queue) are copied
+into gauges by collect hooks right before each render.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Iterable
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def replace(self, values: dict[tuple[str, ...], float]) -> None:
+        """Swap in a full set of label values (labels missing from `values` disappear)."""
+        with self._lock:
+            self.values = dict(values)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS_S
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self.series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels((*self.labels, "le"), (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+CollectHook = Callable[[], Awaitable[None] | None]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.hooks: list[CollectHook] = []
+
+    def _register(self, metric: Metric) -> Any:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labels != metric.labels:
+                raise ValueError(f"metric {metric.name} already registered with a different shape")
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(
+        self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS_S
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def on_collect(self, hook: CollectHook) -> CollectHook:
+        """Run `hook` (sync or async) before every render; a failing hook is logged and skipped."""
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+        return hook
+
+    async def render(self) -> str:
+        for hook in self.hooks:
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:
+                log.warning("Metrics collect hook %s failed: %s", getattr(hook, "__name__", hook), exc)
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "API request latency by route template.", ("method", "route", "status")
+)
+source_fetch_seconds = registry.histogram(
+    "collector_fetch_duration_seconds", "Source fetch duration.", ("source_id", "status")
+)
+source_fetch_bytes = registry.counter(
+    "collector_fetch_bytes_total", "Response bytes received from each source.", ("source_id",)
+)
+llm_request_seconds = registry.histogram(
+    "llm_request_duration_seconds",
+    "LLM completion latency including retries.",
+    ("stage", "model", "provider", "outcome"),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0, 300.0),
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens reported by the provider.", ("stage", "model", "provider", "kind")
+)
+llm_retries = registry.counter(
+    "llm_retries_total", "Completion attempts beyond the first.", ("stage", "model", "provider")
+)
+llm_errors = registry.counter(
+    "llm_errors_total", "Failed completions by error category.", ("stage", "model", "provider", "category")
+)
+
+pipeline_run_seconds = registry.histogram(
+    "pipeline_run_duration_seconds",
+    "Daily pipeline run duration by final status.",
+    ("status",),
+    buckets=(60.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0, 7200.0),
+)
+pipeline_items = registry.counter(
+    "pipeline_items_total", "Items handled by daily runs by outcome.", ("outcome",)
+)
+
+
+async def serve_metrics(port: int, host: str = "0.0.0.0", metrics: MetricsRegistry = registry) -> asyncio.AbstractServer:
+    """Serve `GET /metrics` from `metrics` on a bare asyncio server (for processes without an ASGI app)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            while (await asyncio.wait_for(reader.readline(), timeout=10)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body, status, content_type = (await metrics.render()).encode("utf-8"), "200 OK", CONTENT_TYPE
+            else:
+                body, status, content_type = b"not found\n", "404 Not Found", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
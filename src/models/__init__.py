@@ -2,9 +2,13 @@ from src.models.base import Base
 from src.models.source import Source
 from src.models.run import Run
 from src.models.item import Item
+from src.models.item_identifier import ItemIdentifier
 from src.models.digest import Digest
+from src.models.daily_item_rollup import DailyItemRollup
+from src.models.source_daily_stat import SourceDailyStat
+from src.models.insight_latency import InsightLatencyDaily
 from src.models.site_experience import SiteExperience
 from src.models.deep_analysis import DeepAnalysis
 from src.models.schema_migration import SchemaMigration
 
-__all__ = ["Base", "Source", "Run", "Item", "Digest", "SiteExperience", "DeepAnalysis", "SchemaMigration"]
+__all__ = ["Base", "Source", "Run", "Item", "ItemIdentifier", "Digest", "DailyItemRollup", "SourceDailyStat", "InsightLatencyDaily", "SiteExperience", "DeepAnalysis", "SchemaMigration"]
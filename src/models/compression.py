@@ -0,0 +1,139 @@
+"""Transparent zlib compression for large text columns.
+
+`CompressedText` stores `str` values as bytes in a MEDIUMBLOB column. Values
+that are worth compressing are written as ``MARKER + zlib(utf-8)``; values
+large enough to try but that do not shrink are written as
+``PLAIN_MARKER + utf-8``, and short values as plain UTF-8. Reads check the
+markers, so rows written before the column was converted (plain UTF-8 bytes
+after the MEDIUMTEXT -> MEDIUMBLOB migration) keep reading correctly, and a
+partially recompressed table is always consistent. A large unmarked value is
+therefore always a pre-codec row: that is what the background recompression
+(src.pipeline.recompress) looks for.
+
+The NUL byte in the markers cannot occur in text produced by this system, so
+plain rows are never mistaken for marked ones.
+
+`items.content_text` is deliberately not compressed: the ngram FULLTEXT index
+behind `/items?q=` needs the plain text in MySQL.
+"""
+from __future__ import annotations
+
+import threading
+import zlib
+from dataclasses import dataclass
+
+from sqlalchemy.dialects.mysql import MEDIUMBLOB
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+MARKER = b"\x00zl1"
+PLAIN_MARKER = b"\x00pl1"
+MIN_COMPRESS_BYTES = 256
+COMPRESSION_LEVEL = 6
+
+
+@dataclass
+class CodecStats:
+    """Process-wide byte counters for compressed columns.
+
+    `*_raw` is the UTF-8 size of the text, `*_stored` what actually crossed the
+    link to or from MySQL.
+    """
+
+    values_written: int = 0
+    bytes_written_raw: int = 0
+    bytes_written_stored: int = 0
+    values_read: int = 0
+    bytes_read_raw: int = 0
+    bytes_read_stored: int = 0
+
+    @property
+    def bytes_saved_on_write(self) -> int:
+        return self.bytes_written_raw - self.bytes_written_stored
+
+    @property
+    def bytes_saved_on_read(self) -> int:
+        return self.bytes_read_raw - self.bytes_read_stored
+
+    @property
+    def write_compression_ratio(self) -> float:
+        return round(self.bytes_written_raw / self.bytes_written_stored, 3) if self.bytes_written_stored else 1.0
+
+    def snapshot(self) -> dict:
+        return {
+            "values_written": self.values_written,
+            "bytes_written_raw": self.bytes_written_raw,
+            "bytes_written_stored": self.bytes_written_stored,
+            "bytes_saved_on_write": self.bytes_saved_on_write,
+            "write_compression_ratio": self.write_compression_ratio,
+            "values_read": self.values_read,
+            "bytes_read_raw": self.bytes_read_raw,
+            "bytes_read_stored": self.bytes_read_stored,
+            "bytes_saved_on_read": self.bytes_saved_on_read,
+        }
+
+
+codec_stats = CodecStats()
+_stats_lock = threading.Lock()
+
+
+def is_compressed(stored: bytes | None) -> bool:
+    return bool(stored) and stored.startswith(MARKER)
+
+
+def compress_text(value: str) -> bytes:
+    """Encode text for storage, compressing only when it actually saves bytes."""
+    raw = value.encode("utf-8")
+    stored = raw
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        stored = pack_stored(raw)
+    with _stats_lock:
+        codec_stats.values_written += 1
+        codec_stats.bytes_written_raw += len(raw)
+        codec_stats.bytes_written_stored += len(stored)
+    return stored
+
+
+def pack_stored(raw: bytes) -> bytes:
+    """Marked form of a value worth trying to compress: zlib when it shrinks, else tagged plain."""
+    packed = MARKER + zlib.compress(raw, COMPRESSION_LEVEL)
+    return packed if len(packed) < len(raw) else PLAIN_MARKER + raw
+
+
+def decompress_text(stored: bytes | str) -> str:
+    """Decode a stored value written by `compress_text` or by the pre-codec schema."""
+    if isinstance(stored, str):
+        return stored
+    stored = bytes(stored)
+    if is_compressed(stored):
+        raw = zlib.decompress(stored[len(MARKER):])
+    elif stored.startswith(PLAIN_MARKER):
+        raw = stored[len(PLAIN_MARKER):]
+    else:
+        raw = stored
+    with _stats_lock:
+        codec_stats.values_read += 1
+        codec_stats.bytes_read_raw += len(raw)
+        codec_stats.bytes_read_stored += len(stored)
+    return raw.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """`str` in Python, marker-prefixed zlib (or plain UTF-8) bytes in MySQL."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(MEDIUMBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_text(value)
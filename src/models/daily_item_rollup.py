@@ -0,0 +1,27 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, SmallInteger, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class DailyItemRollup(Base):
+    """Item counts per fetch day and dashboard dimension, maintained incrementally.
+
+    NULL dimensions are stored as '' (category, confidence) and -1
+    (score_bucket, i.e. not scored yet) so every row has a full primary key.
+    `score_bucket` is `insight_score // 5`, the `/stats` histogram index."""
+
+    __tablename__ = "daily_item_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    domain: Mapped[str] = mapped_column(String(16), primary_key=True)
+    source_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True, default="")
+    confidence: Mapped[str] = mapped_column(String(16), primary_key=True, default="")
+    score_bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=-1)
+    items: Mapped[int] = mapped_column(Integer, default=0)
+    high_value: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -1,10 +1,11 @@
 from datetime import datetime
 
 from sqlalchemy import DateTime, String, func
-from sqlalchemy.dialects.mysql import JSON, MEDIUMTEXT
+from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models.base import Base
+from src.models.compression import CompressedText
 
 
 class DeepAnalysis(Base):
@@ -28,6 +29,6 @@ class DeepAnalysis(Base):
     worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     attempt_count: Mapped[int] = mapped_column(default=0)
     attempts: Mapped[list | None] = mapped_column(JSON, nullable=True)
-    report_md: Mapped[str | None] = mapped_column(MEDIUMTEXT, nullable=True)
+    report_md: Mapped[str | None] = mapped_column(CompressedText, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,10 +1,11 @@
 from datetime import date, datetime
 
 from sqlalchemy import Date, DateTime, String, Text, UniqueConstraint, func
-from sqlalchemy.dialects.mysql import JSON, MEDIUMTEXT
+from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.models.base import Base
+from src.models.compression import CompressedText
 
 
 class Digest(Base):
@@ -18,7 +19,7 @@ class Digest(Base):
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     stats_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     highlights_json: Mapped[list | None] = mapped_column(JSON, nullable=True)
-    content_markdown: Mapped[str] = mapped_column(MEDIUMTEXT)
+    content_markdown: Mapped[str] = mapped_column(CompressedText)
     oss_url: Mapped[str | None] = mapped_column(String(1000), nullable=True)
     generated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
@@ -0,0 +1,22 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, SmallInteger, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class InsightLatencyDaily(Base):
+    """Digested items per digest day, source and time-to-insight bucket.
+
+    `bucket` indexes `src.pipeline.lineage.LATENCY_BUCKETS_S`; the last index
+    counts items slower than the largest bound."""
+
+    __tablename__ = "insight_latency_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    domain: Mapped[str] = mapped_column(String(16), primary_key=True)
+    source_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    items: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -16,13 +16,22 @@ class Item(Base):
     run_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     title: Mapped[str] = mapped_column(String(500))
     canonical_url: Mapped[str] = mapped_column(String(1000))
-    content_text: Mapped[str | None] = mapped_column(MEDIUMTEXT, nullable=True)
+    # Bodies and raw collector metadata are cold: list pages, dedup lookups and
+    # digests never read them, so they are not loaded unless a query asks via
+    # `undefer(...)`. raiseload turns an accidental lazy load (which would be a
+    # hidden cross-border round trip, and fails under asyncio anyway) into an
+    # immediate error. Objects built in-process keep the values they were given.
+    content_text: Mapped[str | None] = mapped_column(MEDIUMTEXT, nullable=True, deferred=True, deferred_raiseload=True)
     author: Mapped[str | None] = mapped_column(String(200), nullable=True)
     published_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     fetched_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     dedup_hash: Mapped[str] = mapped_column(String(64), unique=True)
     also_seen_in: Mapped[list | None] = mapped_column(JSON, nullable=True)
-    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True, deferred_raiseload=True)
+    # [fetched epoch s, persisted, stage 1, stage 2, first digest] with the
+    # later steps as seconds after the fetch (None if not reached); see
+    # src.pipeline.lineage.
+    lineage: Mapped[list | None] = mapped_column(JSON, nullable=True)
 
     # Stage 1
     category: Mapped[str | None] = mapped_column(String(50), nullable=True)
@@ -62,8 +71,12 @@ class Item(Base):
     # Retention
     expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Maintained by MySQL (ON UPDATE CURRENT_TIMESTAMP, migration 006); the
+    # local read replica syncs items incrementally on it.
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     __table_args__ = (
         Index("ix_domain_score", "domain", insight_score.desc()),
         Index("ix_domain_published", "domain", "published_at"),
+        Index("ix_items_updated_at", "updated_at", "id"),
     )
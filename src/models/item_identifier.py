@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class ItemIdentifier(Base):
+    """One CVE / GHSA / CWE / package identifier attached to an item.
+
+    The composite primary key doubles as the lookup index for `/items?cve=`
+    and ingest-time vulnerability merging. `is_primary` marks identifiers taken
+    from a collector's structured metadata (the item *is* that advisory), as
+    opposed to ids merely mentioned in a title."""
+
+    __tablename__ = "item_identifiers"
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    value: Mapped[str] = mapped_column(String(200), primary_key=True)
+    item_id: Mapped[str] = mapped_column(
+        String(96), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class SourceDailyStat(Base):
+    """Fetch and ingest counters per source and UTC day, written by the daily run.
+
+    `items_new` counts items first stored from the source that day (it is not
+    reduced by retention), `fetch_ms` and `bytes` are totals over the day's
+    fetches, and `last_*` describe the most recent fetch."""
+
+    __tablename__ = "source_daily_stats"
+    __table_args__ = (Index("ix_source_daily_stats_day", "day"),)
+
+    source_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    fetches: Mapped[int] = mapped_column(Integer, default=0)
+    failed_fetches: Mapped[int] = mapped_column(Integer, default=0)
+    items_fetched: Mapped[int] = mapped_column(Integer, default=0)
+    items_new: Mapped[int] = mapped_column(Integer, default=0)
+    fetch_ms: Mapped[int] = mapped_column(Integer, default=0)
+    max_fetch_ms: Mapped[int] = mapped_column(Integer, default=0)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    last_fetch_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Maintained by MySQL (ON UPDATE CURRENT_TIMESTAMP); the replica syncs by it.
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -1,5 +1,14 @@
-from src.pipeline.cleanup import delete_expired_items
+from src.pipeline.cleanup import RetentionResult, delete_expired_chunk, run_retention_job
+from src.pipeline.dedup_filter import DedupBloomFilter, prepare_dedup_filter, save_dedup_filter
 from src.pipeline.digest import DigestArtifact, DigestItem, beijing_digest_date, build_digest_artifact, render_digest_markdown
+from src.pipeline.identifiers import (
+    Identifier,
+    VulnMatchIndex,
+    backfill_identifiers,
+    extract_identifiers,
+    load_identifiers,
+    load_vuln_match_index,
+)
 from src.pipeline.ingestion import (
     NormalizationError,
     NormalizedItem,
@@ -25,6 +34,7 @@ from src.pipeline.persistence import (
     persist_normalized_items,
     source_authority_map,
 )
+from src.pipeline.rollups import RollupDeltas, apply_rollup_deltas, rebuild_rollups
 from src.pipeline.run_stats import (
     aggregate_digest_status,
     apply_source_stats,
@@ -47,10 +57,12 @@ from src.pipeline.run_lifecycle import (
     release_run_lock,
     run_with_lifecycle,
 )
+from src.pipeline.source_activity import apply_source_activity, source_activity_rows
 from src.pipeline.runner import PipelineOptions, PipelineRunResult, load_approved_sources, run_daily_pipeline
 
 __all__ = [
     "NormalizationError",
+    "DedupBloomFilter",
     "DigestArtifact",
     "DigestItem",
     "OSSConfig",
@@ -61,6 +73,16 @@ __all__ = [
     "STALE_RUN_TIMEOUT",
     "LifecycleResult",
     "PersistResult",
+    "RetentionResult",
+    "RollupDeltas",
+    "Identifier",
+    "VulnMatchIndex",
+    "backfill_identifiers",
+    "extract_identifiers",
+    "load_identifiers",
+    "load_vuln_match_index",
+    "apply_rollup_deltas",
+    "apply_source_activity",
     "apply_stage1_outcome",
     "apply_stage2_outcome",
     "NormalizedItem",
@@ -74,7 +96,7 @@ __all__ = [
     "compute_progress",
     "compute_run_window",
     "decide_final_run_status",
-    "delete_expired_items",
+    "delete_expired_chunk",
     "create_run_record",
     "digest_result",
     "digest_oss_key",
@@ -88,13 +110,18 @@ __all__ = [
     "normalize_raw_item",
     "oss_config_from_settings",
     "persist_normalized_items",
+    "prepare_dedup_filter",
+    "rebuild_rollups",
     "recompute_confidence_after_dedup",
     "render_digest_markdown",
     "release_run_lock",
     "run_daily_pipeline",
+    "run_retention_job",
     "run_with_lifecycle",
+    "save_dedup_filter",
     "upload_digest_backup",
     "update_digest_stats",
     "write_hexo_post",
     "source_authority_map",
+    "source_activity_rows",
 ]
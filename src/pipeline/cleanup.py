@@ -1,18 +1,167 @@
+"""Retention cleanup for expired items.
+
+`run_retention_job` is the scheduled path: it deletes expired rows in
+primary-key-ordered chunks, each in its own short transaction, with a pause
+between chunks so the cross-border link, row locks and undo log never see one
+unbounded DELETE. Rows can optionally be copied to `items_archive` first; the
+copy is an INSERT ... SELECT on the server, so archived bodies never cross the
+link either.
+
+CLI (manual run with the configured limits):
+    python3 -m src.pipeline.cleanup [--archive] [--max-rows N] [--chunk-size N]
+"""
 from __future__ import annotations
 
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Awaitable, Callable
 
-from sqlalchemy import delete
+from sqlalchemy import column, delete, insert, select, table
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.models.item import Item
+from src.pipeline.rollups import subtract_items_statement
+from src.pipeline.run_lifecycle import find_running_run
+
+# Columns copied into items_archive (migration 004). Kept explicit so later
+# additions to `items` never break archiving before the archive table follows.
+ARCHIVE_COLUMNS = (
+    "id", "source_id", "domain", "run_id", "title", "canonical_url", "content_text", "author",
+    "published_at", "fetched_at", "dedup_hash", "also_seen_in", "metadata_json",
+    "category", "tags", "summary_zh", "insight_score", "credibility",
+    "confidence", "recommendation_reason", "trend_signal", "action_suggestion",
+    "analysis_stage", "stage1_model", "stage1_provider", "stage1_prompt_version", "stage1_analyzed_at",
+    "stage1_error", "stage2_model", "stage2_provider", "stage2_prompt_version", "stage2_analyzed_at",
+    "stage2_error", "expires_at", "created_at",
+)
+items_archive = table("items_archive", *(column(name) for name in ARCHIVE_COLUMNS))
+
+
+@dataclass(frozen=True)
+class RetentionResult:
+    status: str
+    deleted: int = 0
+    archived: int = 0
+    chunks: int = 0
+    duration_s: float = 0.0
+    reached_max_rows: bool = False
+    skipped_reason: str | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "deleted": self.deleted,
+            "archived": self.archived,
+            "chunks": self.chunks,
+            "duration_s": self.duration_s,
+            "reached_max_rows": self.reached_max_rows,
+            "skipped_reason": self.skipped_reason,
+        }
+
+
+async def delete_expired_chunk(
+    session: AsyncSession,
+    cutoff: datetime,
+    *,
+    after_id: str,
+    limit: int,
+    archive: bool = False,
+) -> tuple[list[str], int]:
+    """Delete (and optionally archive) the next `limit` expired items after `after_id`.
+
+    Returns the ids that were selected, in primary-key order, and the number of
+    rows actually deleted. The expiry predicate is repeated on the DELETE so a
+    row whose retention was extended in between is left alone; the same rows
+    are subtracted from `daily_item_rollups` just before they go.
+    """
+    expired = (Item.expires_at.isnot(None), Item.expires_at < cutoff)
+    ids = list(
+        (
+            await session.execute(
+                select(Item.id).where(*expired, Item.id > after_id).order_by(Item.id).limit(limit)
+            )
+        ).scalars().all()
+    )
+    if not ids:
+        return [], 0
+    if archive:
+        source_columns = [Item.__table__.c[name] for name in ARCHIVE_COLUMNS]
+        await session.execute(
+            insert(items_archive)
+            .from_select(list(ARCHIVE_COLUMNS), select(*source_columns).where(Item.id.in_(ids), *expired))
+            .prefix_with("IGNORE")
+        )
+    await session.execute(subtract_items_statement(Item.id.in_(ids), *expired))
+    result = await session.execute(delete(Item).where(Item.id.in_(ids), *expired))
+    return ids, int(result.rowcount or 0)
 
 
-async def delete_expired_items(session: AsyncSession, now: datetime | None = None) -> int:
-    """Delete items whose retention window has elapsed and return the deleted row count."""
+async def run_retention_job(
+    session_factory,
+    *,
+    now: datetime | None = None,
+    chunk_size: int | None = None,
+    max_rows: int | None = None,
+    pause_s: float | None = None,
+    archive: bool | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> RetentionResult:
+    """Delete expired items chunk by chunk, committing after every chunk.
+
+    Cleanup must not race active analysis, so every chunk first checks for a
+    running pipeline run: with one running before the first chunk the pass is
+    skipped, and one that starts mid-pass stops it with status "partial".
+    Either way `skipped_reason` is "run_in_progress". Stops after `max_rows`
+    deletions; the remainder is picked up by the next scheduled run.
+    """
     cutoff = _ensure_utc(now or datetime.now(timezone.utc))
-    result = await session.execute(delete(Item).where(Item.expires_at.isnot(None), Item.expires_at < cutoff))
-    return int(result.rowcount or 0)
+    chunk_size = max(1, chunk_size or settings.retention_chunk_size)
+    max_rows = settings.retention_max_rows_per_run if max_rows is None else max_rows
+    pause_s = settings.retention_chunk_pause_s if pause_s is None else pause_s
+    archive = settings.retention_archive_enabled if archive is None else archive
+
+    started = time.monotonic()
+    deleted = archived = chunks = 0
+    last_id = ""
+    reached_max_rows = False
+    skipped_reason = None
+    while True:
+        limit = chunk_size if max_rows <= 0 else min(chunk_size, max_rows - deleted)
+        if limit <= 0:
+            reached_max_rows = True
+            break
+        async with session_factory() as session:
+            if await find_running_run(session) is not None:
+                skipped_reason = "run_in_progress"
+                break
+            ids, chunk_deleted = await delete_expired_chunk(session, cutoff, after_id=last_id, limit=limit, archive=archive)
+            if not ids:
+                break
+            await session.commit()
+        chunks += 1
+        deleted += chunk_deleted
+        archived += chunk_deleted if archive else 0
+        last_id = ids[-1]
+        if len(ids) < limit:
+            break
+        if pause_s > 0:
+            await sleep(pause_s)
+
+    if skipped_reason is not None and chunks == 0:
+        return RetentionResult(status="skipped", skipped_reason=skipped_reason)
+    return RetentionResult(
+        status="succeeded" if skipped_reason is None else "partial",
+        deleted=deleted,
+        archived=archived,
+        chunks=chunks,
+        duration_s=round(time.monotonic() - started, 3),
+        reached_max_rows=reached_max_rows,
+        skipped_reason=skipped_reason,
+    )
 
 
 def _ensure_utc(value: datetime) -> datetime:
@@ -20,3 +169,24 @@ def _ensure_utc(value: datetime) -> datetime:
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
     return value.astimezone(timezone.utc)
+
+
+def main() -> None:
+    """Run one retention pass from the command line."""
+    import json
+
+    from src.db import async_session
+
+    parser = argparse.ArgumentParser(description="Delete expired items in throttled chunks")
+    parser.add_argument("--archive", action="store_true", default=None, help="copy rows to items_archive first")
+    parser.add_argument("--max-rows", type=int, default=None, help="stop after this many deletions (0 = no cap)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    result = asyncio.run(
+        run_retention_job(async_session, max_rows=args.max_rows, chunk_size=args.chunk_size, archive=args.archive)
+    )
+    print(json.dumps(result.as_dict(), sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
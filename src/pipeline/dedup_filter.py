@@ -0,0 +1,183 @@
+"""Local Bloom filter of stored `dedup_hash` values.
+
+Most feeds return largely the same entries every day, so the bulk of each
+run's candidate hashes are already stored. Asking MySQL about all of them
+ships every hash across the border just to learn that. The filter answers
+"definitely new" locally; only possible hits are verified with the database.
+
+The filter never has false negatives for rows it was built from, so it is
+rebuilt from `items` whenever the local copy cannot be trusted:
+
+- the file is missing, unreadable, or was sized for different settings,
+- it has absorbed more hashes than its capacity (false-positive rate degrades),
+- it was last synced for a run other than the latest finished one (e.g. the
+  process died between the DB commit and the file save).
+
+Otherwise it is extended incrementally with each run's inserted hashes and
+saved after commit. Hashes of items removed by retention stay in the filter
+and surface as verified false positives until the next rebuild.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.item import Item
+from src.models.run import Run
+
+MAGIC = b"DABF1"
+# magic, num_bits, num_hashes, capacity, count, fp_rate, synced_run_id length
+HEADER = struct.Struct(">5sQIQQdH")
+
+
+class DedupBloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest."""
+
+    def __init__(
+        self,
+        *,
+        num_bits: int,
+        num_hashes: int,
+        capacity: int,
+        fp_rate: float,
+        bits: bytearray | None = None,
+        count: int = 0,
+        synced_run_id: str | None = None,
+    ):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+        self.synced_run_id = synced_run_id
+
+    @classmethod
+    def with_capacity(cls, capacity: int, fp_rate: float) -> DedupBloomFilter:
+        """Size the filter for `capacity` entries at the target false-positive rate."""
+        capacity = max(1, capacity)
+        fp_rate = min(max(fp_rate, 1e-9), 0.5)
+        num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits=num_bits, num_hashes=num_hashes, capacity=capacity, fp_rate=fp_rate)
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def to_bytes(self) -> bytes:
+        run_id = (self.synced_run_id or "").encode("utf-8")
+        header = HEADER.pack(MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count, self.fp_rate, len(run_id))
+        return header + run_id + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> DedupBloomFilter:
+        """Decode a serialized filter, raising ValueError on any corruption."""
+        if len(payload) < HEADER.size:
+            raise ValueError("truncated bloom filter header")
+        magic, num_bits, num_hashes, capacity, count, fp_rate, run_id_len = HEADER.unpack_from(payload)
+        if magic != MAGIC:
+            raise ValueError("not a dedup bloom filter")
+        bits = payload[HEADER.size + run_id_len :]
+        if len(bits) != (num_bits + 7) // 8 or num_hashes < 1:
+            raise ValueError("bloom filter size mismatch")
+        run_id = payload[HEADER.size : HEADER.size + run_id_len].decode("utf-8") or None
+        return cls(
+            num_bits=num_bits,
+            num_hashes=num_hashes,
+            capacity=capacity,
+            fp_rate=fp_rate,
+            bits=bytearray(bits),
+            count=count,
+            synced_run_id=run_id,
+        )
+
+    def _positions(self, value: str) -> list[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+
+def load_dedup_filter(path: str | Path) -> DedupBloomFilter | None:
+    """Read a saved filter, or None when the file is missing or unreadable."""
+    try:
+        return DedupBloomFilter.from_bytes(Path(path).read_bytes())
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def save_dedup_filter(bloom: DedupBloomFilter, path: str | Path) -> None:
+    """Write the filter atomically so a crash never leaves a half-written file."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(bloom.to_bytes())
+    os.replace(tmp, target)
+
+
+async def rebuild_dedup_filter(session: AsyncSession, *, capacity: int, fp_rate: float) -> DedupBloomFilter:
+    """Build a fresh filter from every stored dedup hash (one narrow query)."""
+    hashes = (await session.execute(select(Item.dedup_hash))).scalars().all()
+    bloom = DedupBloomFilter.with_capacity(max(capacity, len(hashes) * 2), fp_rate)
+    bloom.update(hashes)
+    return bloom
+
+
+async def latest_finished_run_id(session: AsyncSession) -> str | None:
+    result = await session.execute(
+        select(Run.id).where(Run.status != "running").order_by(Run.started_at.desc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def prepare_dedup_filter(
+    session: AsyncSession,
+    *,
+    path: str | Path | None = None,
+    capacity: int | None = None,
+    fp_rate: float | None = None,
+) -> tuple[DedupBloomFilter | None, str]:
+    """Load the local filter or rebuild it from the database when it is not trustworthy.
+
+    Returns the filter (None when disabled) and how it was obtained:
+    "disabled", "loaded", or "rebuilt:<reason>".
+    """
+    if not settings.dedup_filter_enabled:
+        return None, "disabled"
+    path = path or settings.dedup_filter_path
+    capacity = capacity or settings.dedup_filter_capacity
+    fp_rate = fp_rate or settings.dedup_filter_fp_rate
+
+    bloom = load_dedup_filter(path)
+    if bloom is None:
+        reason = "missing"
+    elif bloom.saturated:
+        reason = "saturated"
+    elif bloom.capacity < capacity or not math.isclose(bloom.fp_rate, fp_rate):
+        reason = "settings_changed"
+    elif bloom.synced_run_id != await latest_finished_run_id(session):
+        reason = "stale"
+    else:
+        return bloom, "loaded"
+    return await rebuild_dedup_filter(session, capacity=capacity, fp_rate=fp_rate), f"rebuilt:{reason}"
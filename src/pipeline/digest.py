@@ -29,6 +29,8 @@ class DigestArtifact:
     highlights_json: list[dict[str, Any]]
     content_markdown: str
     generated_at: datetime
+    # Every item the digest mentions (highlights and lower-value list).
+    item_ids: tuple[str, ...] = ()
 
     @property
     def hexo_path(self) -> str:
@@ -103,6 +105,10 @@ def build_digest_artifact(
         highlights_json=highlights,
         content_markdown=content,
         generated_at=generated_at,
+        item_ids=tuple(
+            [item_id for group in highlights for item_id in group["item_ids"]]
+            + [item.id for item in lower_value_items]
+        ),
     )
 
 
@@ -0,0 +1,303 @@
+"""Ingest-time extraction and lookup of vulnerability identifiers.
+
+NVD rows carry `cve_id`, GHSA rows carry `ghsa_id` / `cve_ids` and package
+lists, and RSS items mention CVEs in their titles. Extracting those once at
+ingest into `item_identifiers` turns cross-source correlation into indexed
+lookups:
+
+- persistence merges a new advisory into an existing item describing the same
+  vulnerability (skipping a second round of LLM calls),
+- `/items?cve=` filters through the composite primary key,
+- deep-analysis enqueueing reads GHSA ids from here instead of regex scans.
+
+Identifiers read from structured collector metadata are *primary* (the item is
+that advisory); ids only mentioned in a title or URL are indexed for search but
+never drive a merge.
+
+CLI (one-off backfill for rows ingested before the table existed):
+    python3 -m src.pipeline.identifiers backfill [--batch 500]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.item import Item
+from src.models.item_identifier import ItemIdentifier
+
+VULN_KINDS = ("cve", "ghsa")
+IdentifierKey = tuple[str, str]
+
+CVE_RE = re.compile(r"CVE-\d{4}-\d{4,7}", re.I)
+GHSA_RE = re.compile(r"GHSA-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}", re.I)
+CWE_RE = re.compile(r"CWE-\d{1,5}", re.I)
+# One pass over free text; the upper-cased substring pre-check below skips the
+# regex entirely for the common case of a title with no identifiers at all.
+TEXT_ID_RE = re.compile(
+    r"(?P<cve>CVE-\d{4}-\d{4,7})|(?P<ghsa>GHSA-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4})|(?P<cwe>CWE-\d{1,5})",
+    re.I,
+)
+TEXT_HINTS = ("CVE-", "GHSA-", "CWE-")
+MAX_VALUE_LEN = 200
+
+
+@dataclass(frozen=True)
+class Identifier:
+    kind: str
+    value: str
+    is_primary: bool = False
+
+    @property
+    def key(self) -> IdentifierKey:
+        return (self.kind, self.value)
+
+
+def extract_identifiers(
+    *,
+    title: str | None,
+    canonical_url: str | None,
+    metadata: dict[str, Any] | None,
+) -> tuple[Identifier, ...]:
+    """Collect CVE/GHSA/CWE/package identifiers from one item's fields.
+
+    Structured metadata wins over text mentions, so an id that appears both in
+    `cve_ids` and in the title is recorded once, as primary.
+    """
+    found: dict[IdentifierKey, Identifier] = {}
+
+    def add(kind: str, value: str | None, primary: bool) -> None:
+        normalized = normalize_identifier(kind, value)
+        if normalized is None:
+            return
+        key = (kind, normalized)
+        current = found.get(key)
+        if current is None or (primary and not current.is_primary):
+            found[key] = Identifier(kind, normalized, primary)
+
+    meta = metadata or {}
+    add("cve", meta.get("cve_id"), True)
+    for value in _as_list(meta.get("cve_ids")):
+        add("cve", value, True)
+    add("ghsa", meta.get("ghsa_id"), True)
+    for value in _as_list(meta.get("cwe_ids")):
+        add("cwe", value, False)
+    for vulnerability in _as_list(meta.get("vulnerabilities")):
+        package = vulnerability.get("package") if isinstance(vulnerability, dict) else None
+        if isinstance(package, dict) and package.get("name"):
+            add("package", f"{package.get('ecosystem') or 'unknown'}:{package['name']}", False)
+
+    for text in (title, canonical_url):
+        if not text:
+            continue
+        upper = text.upper()
+        if not any(hint in upper for hint in TEXT_HINTS):
+            continue
+        for match in TEXT_ID_RE.finditer(text):
+            add(match.lastgroup or "", match.group(0), False)
+
+    return tuple(found.values())
+
+
+def normalize_identifier(kind: str, value: Any) -> str | None:
+    """Canonicalize one identifier value, or None when it is not well formed."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if kind == "cve":
+        return value.upper() if CVE_RE.fullmatch(value) else None
+    if kind == "ghsa":
+        # Same canonical form as src.deep.pipeline.extract_ghsa: upper prefix,
+        # lowercase suffix, which is what the GitHub API expects.
+        return "GHSA-" + value[5:].lower() if GHSA_RE.fullmatch(value) else None
+    if kind == "cwe":
+        return value.upper() if CWE_RE.fullmatch(value) else None
+    if kind == "package":
+        return value.lower()[:MAX_VALUE_LEN] if value else None
+    return None
+
+
+def first_identifier(identifiers: Iterable[Identifier], kind: str) -> str | None:
+    """Pick one identifier value of `kind`, preferring structured (primary) ones."""
+    best: Identifier | None = None
+    for identifier in identifiers:
+        if identifier.kind != kind:
+            continue
+        if best is None or (identifier.is_primary and not best.is_primary):
+            best = identifier
+    return best.value if best else None
+
+
+def identifier_models(item_id: str, identifiers: Iterable[Identifier]) -> list[ItemIdentifier]:
+    return [
+        ItemIdentifier(kind=i.kind, value=i.value, item_id=item_id, is_primary=i.is_primary)
+        for i in identifiers
+    ]
+
+
+def primary_vuln_keys(identifiers: Iterable[Identifier]) -> list[IdentifierKey]:
+    return [i.key for i in identifiers if i.is_primary and i.kind in VULN_KINDS]
+
+
+@dataclass
+class VulnMatchIndex:
+    """Primary vulnerability ids -> the item that already represents them.
+
+    Seeded from the database in one query and extended with items inserted
+    earlier in the same batch, so two sources reporting one CVE in the same run
+    also collapse into a single analyzed item.
+    """
+
+    items_by_key: dict[IdentifierKey, Any] = field(default_factory=dict)
+    known_by_item: dict[str, dict[IdentifierKey, bool]] = field(default_factory=dict)
+
+    def register(self, item: Any, identifiers: Iterable[Identifier]) -> None:
+        """Record an item's identifiers so later batch members can match it."""
+        known = self.known_by_item.setdefault(item.id, {})
+        for identifier in identifiers:
+            known[identifier.key] = known.get(identifier.key, False) or identifier.is_primary
+            if identifier.is_primary and identifier.kind in VULN_KINDS:
+                self.items_by_key.setdefault(identifier.key, item)
+
+    def match(self, identifiers: Iterable[Identifier]) -> Any | None:
+        """Find an item sharing a primary vuln id without a conflicting one.
+
+        Two GHSA advisories for the same CVE in different ecosystems share the
+        CVE but carry different GHSA ids; those stay separate items.
+        """
+        identifiers = tuple(identifiers)
+        for key in primary_vuln_keys(identifiers):
+            candidate = self.items_by_key.get(key)
+            if candidate is None:
+                continue
+            known = self.known_by_item.get(candidate.id, {})
+            if not _conflicts(identifiers, known):
+                return candidate
+        return None
+
+    def missing_for(self, item_id: str, identifiers: Iterable[Identifier]) -> list[Identifier]:
+        known = self.known_by_item.get(item_id, {})
+        return [i for i in identifiers if i.key not in known]
+
+
+async def load_vuln_match_index(session: AsyncSession, keys: Iterable[IdentifierKey]) -> VulnMatchIndex:
+    """Load stored items whose primary ids intersect `keys`, with all their identifiers.
+
+    One round trip: the subquery resolves matching item ids through the
+    (kind, value, item_id) primary key, the outer join returns every identifier
+    of those items so merges can add only the ones not already stored.
+    """
+    index = VulnMatchIndex()
+    keys = sorted(set(keys))
+    if not keys:
+        return index
+
+    matched_ids = select(ItemIdentifier.item_id).where(
+        ItemIdentifier.is_primary.is_(True),
+        tuple_(ItemIdentifier.kind, ItemIdentifier.value).in_(keys),
+    )
+    result = await session.execute(
+        select(ItemIdentifier.kind, ItemIdentifier.value, ItemIdentifier.is_primary, Item)
+        .join(Item, Item.id == ItemIdentifier.item_id)
+        .where(ItemIdentifier.item_id.in_(matched_ids))
+    )
+    for kind, value, is_primary, item in result.all():
+        index.register(item, [Identifier(kind, value, bool(is_primary))])
+    return index
+
+
+async def load_identifiers(
+    session: AsyncSession,
+    item_ids: Iterable[str],
+    *,
+    kind: str | None = None,
+) -> dict[str, tuple[Identifier, ...]]:
+    """Read stored identifiers for a set of items, optionally limited to one kind."""
+    item_ids = list(item_ids)
+    if not item_ids:
+        return {}
+    stmt = select(ItemIdentifier.item_id, ItemIdentifier.kind, ItemIdentifier.value, ItemIdentifier.is_primary).where(
+        ItemIdentifier.item_id.in_(item_ids)
+    )
+    if kind:
+        stmt = stmt.where(ItemIdentifier.kind == kind)
+    grouped: dict[str, list[Identifier]] = {}
+    for item_id, row_kind, value, is_primary in (await session.execute(stmt)).all():
+        grouped.setdefault(item_id, []).append(Identifier(row_kind, value, bool(is_primary)))
+    return {item_id: tuple(values) for item_id, values in grouped.items()}
+
+
+async def backfill_identifiers(session_factory, *, batch_size: int = 500) -> int:
+    """Extract identifiers for already-stored items in primary-key order.
+
+    INSERT IGNORE keeps the pass idempotent, so it can be re-run after an
+    interruption. Only the small columns the extractor reads are selected.
+    Returns the rows actually inserted (identifiers already stored are not
+    counted), so a re-run reports 0.
+    """
+    written = 0
+    last_id = ""
+    while True:
+        async with session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(Item.id, Item.title, Item.canonical_url, Item.metadata_json)
+                    .where(Item.id > last_id)
+                    .order_by(Item.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                return written
+            values = [
+                {"kind": i.kind, "value": i.value, "item_id": item_id, "is_primary": i.is_primary}
+                for item_id, title, url, metadata in rows
+                for i in extract_identifiers(title=title, canonical_url=url, metadata=metadata)
+            ]
+            if values:
+                result = await session.execute(mysql_insert(ItemIdentifier).prefix_with("IGNORE"), values)
+                await session.commit()
+                written += int(result.rowcount or 0)
+            last_id = rows[-1][0]
+
+
+def _conflicts(identifiers: Iterable[Identifier], known: dict[IdentifierKey, bool]) -> bool:
+    """True when both sides carry a primary id of the same kind and they differ."""
+    known_primary: dict[str, set[str]] = {}
+    for (kind, value), is_primary in known.items():
+        if is_primary:
+            known_primary.setdefault(kind, set()).add(value)
+    for identifier in identifiers:
+        if not identifier.is_primary or identifier.kind not in VULN_KINDS:
+            continue
+        existing = known_primary.get(identifier.kind)
+        if existing and identifier.value not in existing:
+            return True
+    return False
+
+
+def _as_list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else []
+
+
+def main() -> None:
+    """Run the identifier backfill CLI."""
+    from src.db import async_session
+
+    parser = argparse.ArgumentParser(description="Backfill item_identifiers from stored items")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    backfill = sub.add_parser("backfill")
+    backfill.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    written = asyncio.run(backfill_identifiers(async_session, batch_size=args.batch))
+    print(f"identifiers written: {written}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Per-item lineage timestamps and the time-to-insight rollup.
+
+Every item stored by a daily run carries `items.lineage`: when it was
+fetched (Unix seconds), then when it was persisted, finished stage 1 and
+stage 2, and first went into a digest, each as whole seconds after the fetch
+(None for a step the item has not reached). Five small integers instead of
+five DATETIME columns.
+
+Time to insight runs from publication (the fetch when the source gives no
+date) to first digest inclusion. Each digested item adds one to its
+(digest day, domain, source, latency bucket) row of `insight_latency_daily`
+in the run's transaction; `/stats/time-to-insight` turns those bucket counts
+into p50/p95 per domain and source.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.insight_latency import InsightLatencyDaily
+
+LINEAGE_STEPS = ("fetched", "persisted", "stage1", "stage2", "digest")
+# Upper bounds (seconds) of the latency buckets: 15 min .. 14 days; one more
+# bucket holds anything slower.
+LATENCY_BUCKETS_S = (
+    900, 1800, 3600, 7200, 14400, 21600, 28800, 43200, 64800,
+    86400, 129600, 172800, 259200, 345600, 604800, 1209600,
+)
+
+
+def _epoch(at: datetime) -> float:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+def start_lineage(item: Any, *, fetched_at: datetime, persisted_at: datetime) -> None:
+    fetched = int(_epoch(fetched_at))
+    item.lineage = [fetched, max(0, int(_epoch(persisted_at)) - fetched), None, None, None]
+
+
+def mark_lineage(item: Any, step: str, at: datetime | None) -> None:
+    """Record `step` at `at` unless the item has no lineage or already reached the step."""
+    index = LINEAGE_STEPS.index(step)
+    if at is None or not item.lineage or item.lineage[index] is not None:
+        return
+    lineage = list(item.lineage)  # a new list, so the JSON column is seen as changed
+    lineage[index] = max(0, int(_epoch(at)) - lineage[0])
+    item.lineage = lineage
+
+
+def lineage_times(lineage: list | None) -> dict[str, datetime | None]:
+    """Step name -> UTC time for a stored lineage list."""
+    if not lineage:
+        return dict.fromkeys(LINEAGE_STEPS)
+    fetched = lineage[0]
+    times = {"fetched": datetime.fromtimestamp(fetched, timezone.utc)}
+    for step, offset in zip(LINEAGE_STEPS[1:], lineage[1:]):
+        times[step] = datetime.fromtimestamp(fetched + offset, timezone.utc) if offset is not None else None
+    return times
+
+
+def insight_latency_s(item: Any) -> int | None:
+    """Seconds from publication (else fetch) to first digest inclusion; None when not digested."""
+    if not item.lineage or item.lineage[-1] is None:
+        return None
+    digested = item.lineage[0] + item.lineage[-1]
+    started = _epoch(item.published_at) if item.published_at is not None else item.lineage[0]
+    return max(0, int(digested - started))
+
+
+def latency_bucket(seconds: int) -> int:
+    return bisect_left(LATENCY_BUCKETS_S, seconds)
+
+
+def insight_latency_rows(items: Iterable[Any], *, day: date) -> list[dict]:
+    """One counter row per (domain, source, bucket) for the items digested on `day`."""
+    counts: Counter[tuple[str, str, int]] = Counter()
+    for item in items:
+        latency = insight_latency_s(item)
+        if latency is not None:
+            counts[(item.domain, item.source_id, latency_bucket(latency))] += 1
+    return [
+        {"day": day, "domain": domain, "source_id": source_id, "bucket": bucket, "items": count}
+        for (domain, source_id, bucket), count in sorted(counts.items())
+    ]
+
+
+def upsert_insight_latency_statement(rows: list[dict]):
+    stmt = mysql_insert(InsightLatencyDaily).values(rows)
+    return stmt.on_duplicate_key_update({"items": InsightLatencyDaily.items + stmt.inserted.items})
+
+
+async def apply_insight_latency(session: AsyncSession, rows: list[dict]) -> int:
+    """Add latency counts in the caller's transaction; returns the rows sent."""
+    if rows:
+        await session.execute(upsert_insight_latency_statement(rows))
+    return len(rows)
+
+
+def latency_percentiles(bucket_counts: dict[int, int], quantiles: tuple[int, ...] = (50, 95)) -> dict[str, Any]:
+    """Item count and the bucket bound each quantile falls under (None past the last bound)."""
+    total = sum(bucket_counts.values())
+    summary: dict[str, Any] = {"items": total}
+    for q in quantiles:
+        summary[f"p{q}_s"] = None
+        if not total:
+            continue
+        rank, seen = max(1, -(-q * total // 100)), 0
+        for bucket in sorted(bucket_counts):
+            seen += bucket_counts[bucket]
+            if seen >= rank:
+                summary[f"p{q}_s"] = LATENCY_BUCKETS_S[bucket] if bucket < len(LATENCY_BUCKETS_S) else None
+                break
+    return summary
@@ -8,11 +8,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.ai.analyzer import Stage1Outcome, Stage2Outcome
 from src.models.item import Item
+from src.pipeline.dedup_filter import DedupBloomFilter
+from src.pipeline.identifiers import (
+    Identifier,
+    VulnMatchIndex,
+    extract_identifiers,
+    identifier_models,
+    load_vuln_match_index,
+    primary_vuln_keys,
+)
 from src.pipeline.ingestion import (
     NormalizedItem,
     append_source_occurrence,
     recompute_confidence_after_dedup,
 )
+from src.pipeline.rollups import RollupDeltas
+
+
+DEDUP_LOOKUP_CHUNK = 500
 
 
 @dataclass(frozen=True)
@@ -20,6 +33,11 @@ class PersistResult:
     inserted: list[Item] = field(default_factory=list)
     duplicates: int = 0
     errors: int = 0
+    vuln_merges: int = 0
+    identifiers: dict[str, tuple[Identifier, ...]] = field(default_factory=dict)
+    dedup_checked: int = 0
+    dedup_lookups_saved: int = 0
+    dedup_false_positives: int = 0
 
 
 async def persist_normalized_items(
@@ -27,33 +45,120 @@ async def persist_normalized_items(
     items: list[NormalizedItem],
     *,
     source_authority_by_id: dict[str, str],
+    dedup_filter: DedupBloomFilter | None = None,
+    rollups: RollupDeltas | None = None,
 ) -> PersistResult:
-    """Insert new normalized items and merge cross-source duplicates in place."""
+    """Insert new normalized items and merge cross-source duplicates in place.
+
+    Stored duplicates are resolved with one batched `dedup_hash IN (...)`
+    lookup. With a `dedup_filter`, hashes the filter rules out are known to be
+    new and are not sent at all (`dedup_lookups_saved`); possible hits that
+    turn out to be absent count as `dedup_false_positives`. Inserted hashes
+    are added to the filter; the caller persists it after commit.
+
+    Besides exact `dedup_hash` matches, an advisory whose primary CVE/GHSA id
+    is already represented by a stored (or earlier in-batch) item is merged as
+    another occurrence of that item, so the same vulnerability reported by NVD
+    and GHSA is analyzed once. `vuln_merges` counts those identifier merges;
+    they are included in `duplicates` as well.
+
+    With `rollups`, a merge into an already stored item moves that item's
+    rollup count when the merge changes its confidence. Inserted items are
+    left to the caller, which counts them once they are analyzed.
+    """
     inserted: list[Item] = []
+    inserted_ids: set[str] = set()
     duplicates = 0
     errors = 0
-
-    for item in items:
+    vuln_merges = 0
+    identifiers_by_item: dict[str, tuple[Identifier, ...]] = {}
+
+    candidate_hashes = list(dict.fromkeys(item.dedup_hash for item in items))
+    lookup_hashes = candidate_hashes
+    if dedup_filter is not None:
+        lookup_hashes = [dedup_hash for dedup_hash in candidate_hashes if dedup_hash in dedup_filter]
+    try:
+        by_hash = await find_items_by_dedup_hashes(session, lookup_hashes)
+    except Exception:
+        return PersistResult(errors=len(items))
+    stored_hits = len(by_hash)
+
+    extracted = [
+        extract_identifiers(title=item.title, canonical_url=item.canonical_url, metadata=item.metadata_json)
+        for item in items
+    ]
+    try:
+        vuln_index = await load_vuln_match_index(
+            session, [key for identifiers in extracted for key in primary_vuln_keys(identifiers)]
+        )
+    except Exception:
+        # Identifier merging is an optimization; without the index we still
+        # dedup by hash exactly as before.
+        vuln_index = VulnMatchIndex()
+
+    for item, identifiers in zip(items, extracted):
         try:
-            existing = await find_item_by_dedup_hash(session, item.dedup_hash)
+            existing = by_hash.get(item.dedup_hash)
+            if existing is None:
+                existing = vuln_index.match(identifiers)
+                if existing is not None:
+                    vuln_merges += 1
             if existing:
+                stored = rollups is not None and existing.id not in inserted_ids
+                if stored:
+                    rollups.remove(existing)
                 merge_duplicate_occurrence(existing, item, source_authority_by_id)
+                if stored:
+                    rollups.add(existing)
+                # Only extend items whose stored identifier set is known (loaded
+                # via the index or inserted in this batch); a plain dedup-hash
+                # re-fetch already has its identifiers from the first insert.
+                if existing.id in vuln_index.known_by_item:
+                    _attach_identifiers(session, vuln_index, existing, identifiers)
                 duplicates += 1
                 continue
 
             model = item_model_from_normalized(item)
             session.add(model)
             inserted.append(model)
+            inserted_ids.add(model.id)
+            by_hash[model.dedup_hash] = model
+            if dedup_filter is not None:
+                dedup_filter.add(model.dedup_hash)
+            _attach_identifiers(session, vuln_index, model, identifiers)
+            identifiers_by_item[model.id] = identifiers
         except Exception:
             errors += 1
 
-    return PersistResult(inserted=inserted, duplicates=duplicates, errors=errors)
+    return PersistResult(
+        inserted=inserted,
+        duplicates=duplicates,
+        errors=errors,
+        vuln_merges=vuln_merges,
+        identifiers=identifiers_by_item,
+        dedup_checked=len(candidate_hashes),
+        dedup_lookups_saved=len(candidate_hashes) - len(lookup_hashes),
+        dedup_false_positives=len(lookup_hashes) - stored_hits if dedup_filter is not None else 0,
+    )
+
+
+def _attach_identifiers(session: AsyncSession, vuln_index: VulnMatchIndex, item: Item, identifiers: tuple[Identifier, ...]) -> None:
+    """Stage identifier rows the item does not have yet and index them for the rest of the batch."""
+    missing = vuln_index.missing_for(item.id, identifiers)
+    for model in identifier_models(item.id, missing):
+        session.add(model)
+    vuln_index.register(item, missing)
 
 
-async def find_item_by_dedup_hash(session: AsyncSession, dedup_hash: str) -> Item | None:
-    """Look up an existing item by the dedup hash used across collectors."""
-    result = await session.execute(select(Item).where(Item.dedup_hash == dedup_hash))
-    return result.scalar_one_or_none()
+async def find_items_by_dedup_hashes(session: AsyncSession, dedup_hashes: list[str]) -> dict[str, Item]:
+    """Resolve many dedup hashes to stored items, one IN query per chunk."""
+    found: dict[str, Item] = {}
+    for start in range(0, len(dedup_hashes), DEDUP_LOOKUP_CHUNK):
+        chunk = dedup_hashes[start : start + DEDUP_LOOKUP_CHUNK]
+        result = await session.execute(select(Item).where(Item.dedup_hash.in_(chunk)))
+        for item in result.scalars().all():
+            found[item.dedup_hash] = item
+    return found
 
 
 def item_model_from_normalized(item: NormalizedItem) -> Item:
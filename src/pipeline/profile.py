@@ -0,0 +1,171 @@
+"""Where a daily run spends its time (`runs.stats_json["profile"]`).
+
+The runner marks each stage with `RunProfile.enter`; the profile keeps
+wall-clock and process CPU time per stage, the items the stage handled
+(for items/s), and for the LLM stages the latency of every call plus how
+long it waited for a concurrency slot. `/runs/{id}/profile` compares a run
+against the median of the runs before it (`compare_profiles`).
+"""
+from __future__ import annotations
+
+import math
+import statistics
+import time
+from typing import Any, Callable
+
+from src.sql_telemetry import enter_sql_stage
+
+# A stage whose wall time is at least this multiple of the trailing median is flagged.
+REGRESSION_RATIO = 1.5
+# ...unless it is also within this many seconds of the median (noise on short stages).
+REGRESSION_MIN_DELTA_S = 5.0
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (`q` in 0-100); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class StageTimer:
+    def __init__(self):
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.items: int | None = None
+        self.calls: list[float] = []
+        self.waits: list[float] = []
+
+    def summary(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"wall_s": round(self.wall_s, 3), "cpu_s": round(self.cpu_s, 3)}
+        if self.items is not None:
+            data["items"] = self.items
+            data["items_per_s"] = round(self.items / self.wall_s, 2) if self.wall_s > 0 else None
+        if self.calls:
+            data["calls"] = {
+                "count": len(self.calls),
+                "p50_ms": _ms(percentile(self.calls, 50)),
+                "p95_ms": _ms(percentile(self.calls, 95)),
+                "max_ms": _ms(max(self.calls)),
+            }
+        if self.waits:
+            data["queue_wait"] = {
+                "p50_ms": _ms(percentile(self.waits, 50)),
+                "p95_ms": _ms(percentile(self.waits, 95)),
+                "max_ms": _ms(max(self.waits)),
+            }
+        return data
+
+
+class RunProfile:
+    """Stage clock for one run. Entering a stage closes the previous one; `finish()` closes the last.
+
+    CPU time is the process's (`time.process_time`), so it includes anything
+    else the process ran during the stage.
+    """
+
+    def __init__(
+        self, clock=time.perf_counter, cpu_clock=time.process_time, *, on_enter: Callable[[str], None] | None = None
+    ):
+        self.clock = clock
+        self.on_enter = on_enter
+        self.cpu_clock = cpu_clock
+        self.stages: dict[str, StageTimer] = {}
+        self.started = clock()
+        self.finished: float | None = None
+        self._current: str | None = None
+        self._entered = (0.0, 0.0)
+
+    def enter(self, name: str, *, items: int | None = None) -> None:
+        """Start stage `name` (also the SQL telemetry stage); `items` is what it will process."""
+        self._close()
+        if self.on_enter is not None:  # outside both stages' clocks
+            self.on_enter(name)
+        self._current = name
+        self._entered = (self.clock(), self.cpu_clock())
+        stage = self.stages.setdefault(name, StageTimer())
+        if items is not None:
+            stage.items = (stage.items or 0) + items
+        enter_sql_stage(name)
+
+    def record_call(self, stage: str, seconds: float, *, waited_s: float | None = None) -> None:
+        timer = self.stages.setdefault(stage, StageTimer())
+        timer.calls.append(seconds)
+        if waited_s is not None:
+            timer.waits.append(waited_s)
+
+    def finish(self) -> None:
+        self._close()
+        self.finished = self.clock()
+
+    def summary(self) -> dict[str, Any]:
+        end = self.finished if self.finished is not None else self.clock()
+        return {
+            "wall_s": round(end - self.started, 3),
+            "stages": {name: timer.summary() for name, timer in self.stages.items()},
+        }
+
+    def _close(self) -> None:
+        if self._current is None:
+            return
+        wall_started, cpu_started = self._entered
+        timer = self.stages[self._current]
+        timer.wall_s += self.clock() - wall_started
+        timer.cpu_s += self.cpu_clock() - cpu_started
+        self._current = None
+
+
+def _stage_value(stage: dict[str, Any], path: tuple[str, ...]) -> float | None:
+    value: Any = stage
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+COMPARED_FIELDS = {
+    "wall_s": ("wall_s",),
+    "cpu_s": ("cpu_s",),
+    "items_per_s": ("items_per_s",),
+    "calls_p95_ms": ("calls", "p95_ms"),
+    "queue_wait_p95_ms": ("queue_wait", "p95_ms"),
+}
+
+
+def compare_profiles(profile: dict[str, Any], baseline: list[dict[str, Any]]) -> dict[str, Any]:
+    """Per-stage median of `baseline` profiles and this profile's ratio to it.
+
+    A stage is a regression when its wall time is `REGRESSION_RATIO` times
+    the median and at least `REGRESSION_MIN_DELTA_S` slower.
+    """
+    stages: dict[str, Any] = {}
+    for name, stage in (profile.get("stages") or {}).items():
+        previous = [p["stages"][name] for p in baseline if name in (p.get("stages") or {})]
+        medians: dict[str, float | None] = {}
+        ratios: dict[str, float | None] = {}
+        for field, path in COMPARED_FIELDS.items():
+            history = [v for v in (_stage_value(s, path) for s in previous) if v is not None]
+            median = statistics.median(history) if history else None
+            current = _stage_value(stage, path)
+            medians[field] = round(median, 3) if median is not None else None
+            ratios[field] = round(current / median, 2) if current is not None and median else None
+        wall, median_wall = _stage_value(stage, ("wall_s",)), medians["wall_s"]
+        stages[name] = {
+            "median": medians,
+            "ratio": ratios,
+            "regression": bool(
+                wall is not None
+                and median_wall
+                and wall >= REGRESSION_RATIO * median_wall
+                and wall - median_wall >= REGRESSION_MIN_DELTA_S
+            ),
+            "baseline_runs": len(previous),
+        }
+    return {"baseline_runs": len(baseline), "stages": stages}
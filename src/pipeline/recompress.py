@@ -0,0 +1,155 @@
+"""Background recompression of rows written before the CompressedText codec.
+
+After migration 005 old digests and deep-analysis reports are plain UTF-8
+bytes in MEDIUMBLOB columns. This task walks each table in primary-key order,
+picks rows that are large enough and not yet marker-prefixed, and rewrites
+them compressed. Only the id and the one column are read; each batch is its
+own transaction. Rows whose text does not shrink are rewritten with the
+codec's plain marker instead, so the next pass does not pick them up again.
+
+CLI:
+    python3 -m src.pipeline.recompress [--table digests|deep_analyses] [--max-rows N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import LargeBinary, column, func, select, table, type_coerce, update
+
+from src.config import settings
+from src.models.compression import MARKER, MIN_COMPRESS_BYTES, PLAIN_MARKER, pack_stored
+from src.models.deep_analysis import DeepAnalysis
+from src.models.digest import Digest
+
+TARGETS = {
+    "digests": Digest.content_markdown,
+    "deep_analyses": DeepAnalysis.report_md,
+}
+
+
+@dataclass
+class RecompressResult:
+    rows_scanned: int = 0
+    rows_rewritten: int = 0
+    rows_marked_plain: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    duration_s: float = 0.0
+    tables: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "rows_rewritten": self.rows_rewritten,
+            "rows_marked_plain": self.rows_marked_plain,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "bytes_saved": self.bytes_before - self.bytes_after,
+            "duration_s": self.duration_s,
+            "tables": self.tables,
+        }
+
+
+def pending_rows_query(attribute, *, after_id: str, limit: int):
+    """Select (id, raw bytes) for uncompressed rows worth compressing, in PK order."""
+    model = attribute.class_
+    raw = type_coerce(attribute, LargeBinary())
+    return (
+        select(model.id, raw)
+        .where(
+            model.id > after_id,
+            attribute.is_not(None),
+            func.length(attribute) >= MIN_COMPRESS_BYTES,
+            func.left(attribute, len(MARKER)).not_in(
+                [type_coerce(MARKER, LargeBinary()), type_coerce(PLAIN_MARKER, LargeBinary())]
+            ),
+        )
+        .order_by(model.id)
+        .limit(limit)
+    )
+
+
+async def recompress_table(
+    session_factory,
+    name: str,
+    *,
+    batch_size: int,
+    max_rows: int,
+    result: RecompressResult,
+) -> None:
+    """Recompress one table's pending rows, stopping after `max_rows` scanned (0 = no cap)."""
+    attribute = TARGETS[name]
+    # Lightweight, untyped table so the packed bytes bypass the codec on write.
+    raw_table = table(name, column("id"), column(attribute.key))
+    last_id = ""
+    scanned = 0
+    while max_rows <= 0 or scanned < max_rows:
+        limit = batch_size if max_rows <= 0 else min(batch_size, max_rows - scanned)
+        async with session_factory() as session:
+            rows = (await session.execute(pending_rows_query(attribute, after_id=last_id, limit=limit))).all()
+            if not rows:
+                break
+            for row_id, stored in rows:
+                stored = bytes(stored)
+                packed = pack_stored(stored)
+                result.rows_scanned += 1
+                await session.execute(
+                    update(raw_table).where(raw_table.c.id == row_id).values({attribute.key: packed})
+                )
+                if not packed.startswith(MARKER):
+                    result.rows_marked_plain += 1
+                    continue
+                result.rows_rewritten += 1
+                result.bytes_before += len(stored)
+                result.bytes_after += len(packed)
+                result.tables[name] = result.tables.get(name, 0) + 1
+            await session.commit()
+        scanned += len(rows)
+        last_id = rows[-1][0]
+        if len(rows) < limit:
+            break
+
+
+async def run_recompression(
+    session_factory,
+    *,
+    tables: list[str] | None = None,
+    batch_size: int | None = None,
+    max_rows: int | None = None,
+) -> RecompressResult:
+    """Recompress pending rows across the codec-backed tables."""
+    started = time.monotonic()
+    result = RecompressResult()
+    for name in tables or list(TARGETS):
+        await recompress_table(
+            session_factory,
+            name,
+            batch_size=max(1, batch_size or settings.recompress_batch_size),
+            max_rows=settings.recompress_max_rows_per_run if max_rows is None else max_rows,
+            result=result,
+        )
+    result.duration_s = round(time.monotonic() - started, 3)
+    return result
+
+
+def main() -> None:
+    """Run one recompression pass from the command line."""
+    from src.db import async_session
+
+    parser = argparse.ArgumentParser(description="Compress rows stored before the CompressedText codec")
+    parser.add_argument("--table", choices=sorted(TARGETS), action="append", help="limit to one table (repeatable)")
+    parser.add_argument("--batch", type=int, default=None)
+    parser.add_argument("--max-rows", type=int, default=None, help="rows to scan per table (0 = no cap)")
+    args = parser.parse_args()
+    result = asyncio.run(
+        run_recompression(async_session, tables=args.table, batch_size=args.batch, max_rows=args.max_rows)
+    )
+    print(json.dumps(result.as_dict(), sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Incremental daily item rollups behind `/stats`.
+
+`daily_item_rollups` counts items per fetch day and (domain, source,
+category, confidence, score bucket). The counters move with the items:
+
+- the daily pipeline collects deltas in a `RollupDeltas` (new items at their
+  analyzed state, cross-source merges that change a stored item's confidence)
+  and writes them with one upsert before the run commits;
+- retention subtracts the rows of each chunk it deletes, server-side, in the
+  chunk's transaction;
+- `rebuild_rollups` recomputes days from `items` for backfills and repairs.
+
+CLI:
+    python3 -m src.pipeline.rollups --rebuild [--since YYYY-MM-DD]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, NamedTuple
+
+from sqlalchemy import Date, Integer, String, and_, case, delete, func, literal_column, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.daily_item_rollup import DailyItemRollup
+from src.models.item import Item
+
+KEY_COLUMNS = ("day", "domain", "source_id", "category", "confidence", "score_bucket")
+COUNTER_COLUMNS = ("items", "high_value", "failed")
+
+
+class RollupKey(NamedTuple):
+    day: date
+    domain: str
+    source_id: str
+    category: str
+    confidence: str
+    score_bucket: int
+
+
+def score_bucket(score: int | None) -> int:
+    return -1 if score is None else score // 5
+
+
+def rollup_key(item: Any) -> RollupKey:
+    """The rollup row an item (ORM object or anything with the same attributes) counts towards."""
+    fetched_at = item.fetched_at
+    if fetched_at.tzinfo is not None:
+        fetched_at = fetched_at.astimezone(timezone.utc)
+    return RollupKey(
+        day=fetched_at.date(),
+        domain=item.domain,
+        source_id=item.source_id,
+        category=item.category or "",
+        confidence=item.confidence or "",
+        score_bucket=score_bucket(item.insight_score),
+    )
+
+
+def rollup_counters(item: Any) -> tuple[int, int, int]:
+    high_value = int(item.insight_score is not None and item.insight_score >= settings.stage2_threshold)
+    return 1, high_value, int(item.stage1_error is not None)
+
+
+class RollupDeltas:
+    """Counter changes accumulated in memory and flushed as one upsert."""
+
+    def __init__(self):
+        self.deltas: dict[RollupKey, list[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def add(self, item: Any, sign: int = 1) -> None:
+        counters = self.deltas[rollup_key(item)]
+        for index, value in enumerate(rollup_counters(item)):
+            counters[index] += sign * value
+
+    def remove(self, item: Any) -> None:
+        self.add(item, sign=-1)
+
+    def rows(self) -> list[dict]:
+        """Non-zero deltas as rollup rows (keys plus counter increments)."""
+        return [
+            {**key._asdict(), **dict(zip(COUNTER_COLUMNS, counters))}
+            for key, counters in sorted(self.deltas.items())
+            if any(counters)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.rows())
+
+
+def upsert_deltas_statement(rows: list[dict]):
+    """One multi-row INSERT ... ON DUPLICATE KEY UPDATE adding each delta to its row."""
+    stmt = mysql_insert(DailyItemRollup).values(rows)
+    return stmt.on_duplicate_key_update(
+        {name: getattr(DailyItemRollup, name) + stmt.inserted[name] for name in COUNTER_COLUMNS}
+    )
+
+
+async def apply_rollup_deltas(session: AsyncSession, deltas: RollupDeltas) -> int:
+    """Write accumulated deltas in the caller's transaction; returns the rows touched."""
+    rows = deltas.rows()
+    if rows:
+        await session.execute(upsert_deltas_statement(rows))
+    return len(rows)
+
+
+def rollup_source_select(*where):
+    """Items grouped into rollup rows, computed by MySQL."""
+    keys = (
+        func.date(Item.fetched_at, type_=Date),
+        Item.domain,
+        Item.source_id,
+        func.coalesce(Item.category, literal_column("''"), type_=String),
+        func.coalesce(Item.confidence, literal_column("''"), type_=String),
+        func.coalesce(Item.insight_score // literal_column("5", Integer), literal_column("-1")),
+    )
+    counters = (
+        func.count(),
+        func.sum(case((Item.insight_score >= settings.stage2_threshold, 1), else_=0)),
+        func.sum(case((Item.stage1_error.isnot(None), 1), else_=0)),
+    )
+    # Group by the expressions, not the aliases: MySQL resolves GROUP BY names
+    # against `items` first, which would split NULL and '' categories. Literal
+    # constants keep the SELECT and GROUP BY expressions textually identical
+    # for ONLY_FULL_GROUP_BY.
+    labelled = [expr.label(name) for expr, name in zip(keys + counters, KEY_COLUMNS + COUNTER_COLUMNS)]
+    return select(*labelled).where(*where).group_by(*keys)
+
+
+def subtract_items_statement(*where):
+    """UPDATE the rollups by the grouped counts of the items matching `where`.
+
+    Used by retention right before it deletes those items, so the counts leave
+    the rollups in the same transaction; no item rows cross the link.
+    """
+    removed = rollup_source_select(*where).subquery("removed")
+    rollups = DailyItemRollup.__table__
+    return (
+        update(rollups)
+        .where(and_(*(rollups.c[name] == removed.c[name] for name in KEY_COLUMNS)))
+        .values({name: rollups.c[name] - removed.c[name] for name in COUNTER_COLUMNS})
+    )
+
+
+async def rebuild_rollups(session: AsyncSession, *, since: date | None = None) -> int:
+    """Recompute rollups from `items` (all days, or days from `since`); the caller commits."""
+    rollups = DailyItemRollup.__table__
+    cleared = delete(rollups)
+    item_filter = ()
+    if since is not None:
+        cleared = cleared.where(rollups.c.day >= since)
+        item_filter = (Item.fetched_at >= datetime(since.year, since.month, since.day),)
+    await session.execute(cleared)
+    result = await session.execute(
+        mysql_insert(rollups).from_select(
+            [*KEY_COLUMNS, *COUNTER_COLUMNS], rollup_source_select(*item_filter)
+        )
+    )
+    return int(result.rowcount or 0)
+
+
+def main() -> None:
+    """Rebuild rollups from the command line."""
+    from src.db import async_session, engine
+
+    parser = argparse.ArgumentParser(description="Maintain daily_item_rollups")
+    parser.add_argument("--rebuild", action="store_true", required=True, help="recompute rollups from items")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="only days on or after YYYY-MM-DD")
+    args = parser.parse_args()
+
+    async def run() -> int:
+        try:
+            async with async_session() as session:
+                rows = await rebuild_rollups(session, since=args.since)
+                await session.commit()
+                return rows
+        finally:
+            await engine.dispose()
+
+    rows = asyncio.run(run())
+    print(json.dumps({"rebuilt_rows": rows, "since": args.since.isoformat() if args.since else None}))
+
+
+if __name__ == "__main__":
+    main()
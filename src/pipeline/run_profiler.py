@@ -0,0 +1,239 @@
+"""Opt-in CPU and memory profiling of one pipeline run.
+
+Enabled per run with `run_pipeline.py --profile {cpu,memory,all}` or for
+scheduled runs with `PIPELINE_PROFILE`; with the mode off no profiler exists
+and the runner's stage hook is a None check.
+
+- cpu: a daemon thread samples the event-loop thread's Python stack every
+  `PIPELINE_PROFILE_INTERVAL_MS` (`sys._current_frames`) and counts stacks.
+  Stacks are written in collapsed ("folded") form for flame-graph tools.
+- memory: `tracemalloc` traces allocations; at every stage boundary the
+  profiler records current and peak traced memory for the stage that ended
+  and dumps a snapshot (load with `tracemalloc.Snapshot.load`).
+
+Files go to `PIPELINE_PROFILE_DIR/<run_id>/`; the hottest functions and the
+top allocators (growth since the run started) are summarized into
+`runs.stats_json["profiling"]`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from src.config import settings
+
+log = logging.getLogger(__name__)
+
+PROFILE_MODES = {"cpu": frozenset({"cpu"}), "memory": frozenset({"memory"}), "all": frozenset({"cpu", "memory"})}
+
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def parse_profile_mode(value: str | None) -> frozenset[str]:
+    """Profilers named by a mode string; empty for "" / "off"."""
+    mode = (value or "").strip().lower()
+    if mode in ("", "off", "none"):
+        return frozenset()
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode {value!r}; expected one of {', '.join(PROFILE_MODES)} or off")
+    return PROFILE_MODES[mode]
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _short_path(filename: str) -> str:
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return filename
+    return filename if relative.startswith("..") else relative
+
+
+class StackSampler:
+    """Counts the Python stacks of one thread, sampled from a daemon thread."""
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="run-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def hot_functions(self, limit: int) -> list[dict[str, Any]]:
+        """Functions by samples spent in them (`self`) and under them (`total`)."""
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        samples = self.samples or 1
+        return [
+            {
+                "function": label,
+                "self_pct": round(100 * count / samples, 1),
+                "total_pct": round(100 * total[label] / samples, 1),
+            }
+            for label, count in own.most_common(limit)
+        ]
+
+    def write_folded(self, path: Path) -> None:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+
+class RunProfiler:
+    """CPU sampling and/or `tracemalloc` snapshots for one run, marked at stage boundaries."""
+
+    def __init__(
+        self,
+        run_id: str,
+        modes: frozenset[str],
+        *,
+        directory: str | Path | None = None,
+        interval_ms: float | None = None,
+        top: int | None = None,
+    ):
+        self.run_id = run_id
+        self.modes = modes
+        self.directory = Path(directory or settings.pipeline_profile_dir) / run_id
+        self.interval_s = (interval_ms or settings.pipeline_profile_interval_ms) / 1000
+        self.top = top or settings.pipeline_profile_top
+        self.sampler: StackSampler | None = None
+        self.stages: list[dict[str, Any]] = []
+        self._stage: str | None = None
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._last: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start profiling on the calling thread (the event loop's)."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:  # profiling must never fail the run
+            log.warning("Run profiling disabled, cannot create %s: %s", self.directory, exc)
+            self.modes = frozenset()
+            return
+        if "memory" in self.modes:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._baseline = self._snapshot()
+            tracemalloc.reset_peak()
+        if "cpu" in self.modes:
+            self.sampler = StackSampler(threading.get_ident(), self.interval_s)
+            self.sampler.start()
+
+    def mark(self, stage: str) -> None:
+        """Close the stage in progress (memory figures and a snapshot) and start `stage`."""
+        self._close_stage()
+        self._stage = stage
+
+    def stop(self) -> dict[str, Any]:
+        """Stop profiling, write the files and return the `stats_json["profiling"]` summary."""
+        summary: dict[str, Any] = {"dir": str(self.directory)}
+        try:
+            if self.sampler is not None:
+                self.sampler.stop()
+                self.sampler.write_folded(self.directory / "cpu.folded")
+                summary["cpu"] = {
+                    "samples": self.sampler.samples,
+                    "interval_ms": round(self.interval_s * 1000, 1),
+                    "file": "cpu.folded",
+                    "hot_functions": self.sampler.hot_functions(self.top),
+                }
+            if "memory" in self.modes:
+                self._close_stage()
+                summary["memory"] = {"stages": self.stages, "top_allocators": self._top_allocators()}
+        except OSError as exc:  # profiling must never fail the run
+            log.warning("Could not write run profile to %s: %s", self.directory, exc)
+            summary["error"] = str(exc)[:200]
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+            self._baseline = self._last = None
+        return summary
+
+    def _close_stage(self) -> None:
+        if "memory" not in self.modes or self._stage is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        index = len(self.stages) + 1
+        filename = f"{index:02d}-{self._stage}.tracemalloc"
+        self._last = self._snapshot()
+        try:
+            self._last.dump(str(self.directory / filename))
+        except OSError as exc:
+            log.warning("Could not write memory snapshot %s: %s", filename, exc)
+            filename = None
+        self.stages.append(
+            {"stage": self._stage, "current_kb": current // 1024, "peak_kb": peak // 1024, "snapshot": filename}
+        )
+        tracemalloc.reset_peak()
+        self._stage = None
+
+    def _top_allocators(self) -> list[dict[str, Any]]:
+        if self._baseline is None or self._last is None:
+            return []
+        return [
+            {
+                "location": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_kb": stat.size // 1024,
+                "size_diff_kb": stat.size_diff // 1024,
+                "count_diff": stat.count_diff,
+            }
+            for stat in self._last.compare_to(self._baseline, "lineno")[: self.top]
+        ]
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+
+def run_profiler(run_id: str, mode: str | None = None) -> RunProfiler | None:
+    """Profiler for `run_id` in `mode` (`PIPELINE_PROFILE` when None), or None when profiling is off.
+
+    An unknown mode is logged and treated as off: it is read inside the run's
+    lifecycle, and profiling must never fail the run.
+    """
+    try:
+        modes = parse_profile_mode(settings.pipeline_profile if mode is None else mode)
+    except ValueError as exc:
+        log.warning("Profiling disabled for %s: %s", run_id, exc)
+        return None
+    return RunProfiler(run_id, modes) if modes else None
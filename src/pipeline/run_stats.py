@@ -10,7 +10,6 @@ def initial_run_stats(source_ids: list[str]) -> dict[str, Any]:
         "stage1": {"total": 0, "succeeded": 0, "failed": 0},
         "stage2": {"total": 0, "succeeded": 0, "failed": 0},
         "dedup_skipped": 0,
-        "retention_deleted": 0,
         "digest": {
             "status": "pending",
             "security": None,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,20 +15,27 @@ from src.ai.analyzer import Analyzer, should_run_stage2
 from src.collector.catalog import catalog_approved_source_ids
 from src.collector.dispatcher import collect_sources
 from src.deep.pipeline import enqueue_candidates
+from src.loop_watchdog import BlockReport, loop_watchdog
 from src.config import parse_csv, settings
+from src.metrics import pipeline_items, pipeline_run_seconds
 from src.models.digest import Digest
 from src.models.item import Item
 from src.models.source import Source
-from src.pipeline.cleanup import delete_expired_items
+from src.pipeline.dedup_filter import DedupBloomFilter
 from src.pipeline.digest import DigestArtifact, DigestItem, beijing_digest_date, build_digest_artifact
+from src.pipeline.identifiers import Identifier, first_identifier
 from src.pipeline.ingestion import NormalizationError, normalize_raw_item
+from src.pipeline.lineage import apply_insight_latency, insight_latency_rows, mark_lineage, start_lineage
 from src.pipeline.output import OSSConfig, OutputError, upload_digest_backup, write_hexo_post
+from src.pipeline.profile import RunProfile
+from src.pipeline.run_profiler import RunProfiler
 from src.pipeline.persistence import (
     apply_stage1_outcome,
     apply_stage2_outcome,
     persist_normalized_items,
     source_authority_map,
 )
+from src.pipeline.rollups import RollupDeltas, apply_rollup_deltas
 from src.pipeline.run_stats import (
     apply_source_stats,
     decide_final_run_status,
@@ -35,6 +43,8 @@ from src.pipeline.run_stats import (
     initial_run_stats,
     update_digest_stats,
 )
+from src.pipeline.source_activity import apply_source_activity, source_activity_rows
+from src.sql_telemetry import SqlStages, sql_scope
 
 
 @dataclass(frozen=True)
@@ -44,7 +54,6 @@ class PipelineRunResult:
     inserted_count: int
     duplicate_count: int
     normalized_error_count: int
-    cleanup_deleted: int
 
 
 @dataclass(frozen=True)
@@ -54,6 +63,8 @@ class PipelineOptions:
     window_end: datetime
     hexo_posts_dir: str | Path
     oss_config: OSSConfig | None = None
+    dedup_filter: DedupBloomFilter | None = None
+    profiler: RunProfiler | None = None
 
 
 async def run_daily_pipeline(
@@ -66,17 +77,80 @@ async def run_daily_pipeline(
     oss_uploader=upload_digest_backup,
     stats_updater: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
 ) -> PipelineRunResult:
-    """Run the full daily ingestion, analysis, digest, and cleanup workflow."""
+    """Run the full daily ingestion, analysis, and digest workflow.
+
+    Retention cleanup is not part of the run; it is a separate, chunked job
+    (`src.pipeline.cleanup.run_retention_job`) scheduled by the worker.
+    SQL round trips, time and bytes per stage are reported under
+    `stats_json["sql"]`; wall/CPU time, throughput and LLM call latency per
+    stage under `stats_json["profile"]`. With `options.profiler` set, CPU
+    samples and memory snapshots are taken too (`stats_json["profiling"]`).
+    Callbacks that blocked the event loop during the run are listed under
+    `stats_json["loop"]` when the loop watchdog is running.
+    """
+    started = time.monotonic()
+    profiler = options.profiler
+    profile = RunProfile(on_enter=profiler.mark if profiler is not None else None)
+    loop_report = loop_watchdog.attach(BlockReport()) if loop_watchdog.running else None
+    if profiler is not None:
+        profiler.start()
+    # Stays "failed" when an exception propagates (run_with_lifecycle marks the run failed).
+    status = "failed"
+    try:
+        with sql_scope(SqlStages()) as sql_stages:
+            result = await _run_daily_pipeline(
+                session,
+                analyzer,
+                options,
+                profile=profile,
+                collector=collector,
+                hexo_writer=hexo_writer,
+                oss_uploader=oss_uploader,
+                stats_updater=stats_updater,
+            )
+        profile.finish()
+        status = result.status
+    finally:
+        profiling = profiler.stop() if profiler is not None else None
+        if loop_report is not None:
+            loop_watchdog.detach(loop_report)
+        pipeline_run_seconds.observe(time.monotonic() - started, status=status)
+    result.stats_json["sql"] = sql_stages.summary()
+    result.stats_json["profile"] = profile.summary()
+    if profiling is not None:
+        result.stats_json["profiling"] = profiling
+    if loop_report is not None:
+        result.stats_json["loop"] = loop_report.summary()
+    pipeline_items.inc(result.inserted_count, outcome="inserted")
+    pipeline_items.inc(result.duplicate_count, outcome="duplicate")
+    pipeline_items.inc(result.normalized_error_count, outcome="error")
+    return result
+
+
+async def _run_daily_pipeline(
+    session: AsyncSession,
+    analyzer: Analyzer,
+    options: PipelineOptions,
+    *,
+    profile: RunProfile,
+    collector,
+    hexo_writer,
+    oss_uploader,
+    stats_updater: Callable[[dict[str, Any]], Awaitable[None]] | None,
+) -> PipelineRunResult:
+    profile.enter("sources")
     sources = await load_approved_sources(session)
     stats = initial_run_stats([source.id for source in sources])
     await _emit_stats(stats, stats_updater)
 
+    profile.enter("collect", items=len(sources))
     fetch_results = await collector(sources, since=options.window_start)
     for result in fetch_results:
         stats = apply_source_stats(stats, result.source_id, result.stats_entry())
         await _emit_stats(stats, stats_updater)
 
     raw_items = [raw for result in fetch_results for raw in result.items]
+    profile.enter("normalize", items=len(raw_items))
     normalized_items = []
     normalized_error_count = 0
     source_by_id = {source.id: source for source in sources}
@@ -98,45 +172,85 @@ async def run_daily_pipeline(
         except NormalizationError:
             normalized_error_count += 1
 
+    profile.enter("persist", items=len(normalized_items))
+    rollups = RollupDeltas()
     persist_result = await persist_normalized_items(
         session,
         normalized_items,
         source_authority_by_id=source_authority_map(sources),
+        dedup_filter=options.dedup_filter,
+        rollups=rollups,
     )
+    persisted_at = datetime.now(timezone.utc)
+    fetched_at_by_source = {result.source_id: result.fetched_at for result in fetch_results if result.fetched_at}
+    for item in persist_result.inserted:
+        fetched_at = fetched_at_by_source.get(item.source_id, options.window_end)
+        start_lineage(item, fetched_at=fetched_at, persisted_at=persisted_at)
     stats["dedup_skipped"] = persist_result.duplicates
+    stats["vuln_merged"] = persist_result.vuln_merges
+    if options.dedup_filter is not None:
+        stats["dedup_bloom"] = {
+            "checked": persist_result.dedup_checked,
+            "lookups_saved": persist_result.dedup_lookups_saved,
+            "false_positives": persist_result.dedup_false_positives,
+        }
+    try:
+        stats["source_activity_rows"] = await apply_source_activity(
+            session, source_activity_rows(fetch_results, persist_result.inserted, fetched_at=options.window_end)
+        )
+    except Exception as exc:  # history only; never fail the run over it
+        stats["source_activity_rows"] = 0
+        stats["source_activity_error"] = str(exc)[:200]
     await _emit_stats(stats, stats_updater)
 
     inserted_items = persist_result.inserted
+    profile.enter("stage1", items=len(inserted_items))
     stats["stage1"] = {"total": len(inserted_items), "succeeded": 0, "failed": 0}
     await _emit_stats(stats, stats_updater)
-    async for item, outcome in _iter_stage1_results(analyzer, inserted_items, source_by_id):
+    async for item, outcome in _iter_stage1_results(analyzer, inserted_items, source_by_id, profile):
         apply_stage1_outcome(item, outcome)
         if outcome.error:
             stats["stage1"]["failed"] += 1
         else:
             stats["stage1"]["succeeded"] += 1
+            mark_lineage(item, "stage1", outcome.analyzed_at)
         await _emit_stats(stats, stats_updater)
 
     stage2_items = [item for item in inserted_items if should_run_stage2(item.insight_score)]
+    profile.enter("stage2", items=len(stage2_items))
     stats["stage2"] = {"total": len(stage2_items), "succeeded": 0, "failed": 0}
     await _emit_stats(stats, stats_updater)
-    async for item, outcome in _iter_stage2_results(analyzer, stage2_items, source_by_id):
+    async for item, outcome in _iter_stage2_results(analyzer, stage2_items, source_by_id, profile):
         apply_stage2_outcome(item, outcome)
         if outcome.error:
             stats["stage2"]["failed"] += 1
         else:
             stats["stage2"]["succeeded"] += 1
+            mark_lineage(item, "stage2", outcome.analyzed_at)
         await _emit_stats(stats, stats_updater)
 
+    profile.enter("rollups", items=len(inserted_items))
+    # /stats reads daily_item_rollups; count the new items at their analyzed
+    # state in the run's transaction so the rollups commit with them.
+    for item in inserted_items:
+        rollups.add(item)
+    try:
+        stats["rollup_rows"] = await apply_rollup_deltas(session, rollups)
+    except Exception as exc:  # repairable with `python3 -m src.pipeline.rollups --rebuild`
+        stats["rollup_rows"] = 0
+        stats["rollup_error"] = str(exc)[:200]
+
     # Deep-analysis: enqueue qualifying security items for the out-of-band pi
     # Finder worker (fast DB inserts here; the slow agentic run happens in
     # src.deep.worker). Never block the daily pipeline on pi.
     if settings.deep_analysis_enabled:
+        profile.enter("deep")
         try:
             enqueued = await enqueue_candidates(
                 session, inserted_items,
                 min_score=settings.deep_analysis_min_score,
                 limit=settings.deep_analysis_max_per_run,
+                ghsa_by_item=_ghsa_by_item(persist_result.identifiers),
             )
             stats["deep_queued"] = len(enqueued)
         except Exception as exc:  # deep-analysis is best-effort; never fail the run
@@ -144,15 +258,17 @@ async def run_daily_pipeline(
             stats["deep_error"] = str(exc)[:200]
         await _emit_stats(stats, stats_updater)
 
+    profile.enter("digest", items=len(inserted_items))
     stats["digest"]["status"] = "running"
     await _emit_stats(stats, stats_updater)
     digest_date = beijing_digest_date(options.window_end)
     generated_digests = []
     for domain in parse_csv(settings.digest_domains):
+        domain_items = [item for item in inserted_items if item.domain == domain]
         domain_result = await _generate_and_store_digest(
             domain=domain,
             digest_date=digest_date,
-            items=[item for item in inserted_items if item.domain == domain],
+            items=domain_items,
             run_id=options.run_id,
             stats=stats,
             analyzer=analyzer,
@@ -160,17 +276,25 @@ async def run_daily_pipeline(
             oss_config=options.oss_config,
             hexo_writer=hexo_writer,
             oss_uploader=oss_uploader,
+            profile=profile,
         )
         generated_digests.extend(domain_result["digests"])
+        included = set(domain_result.get("included", ()))
+        for item in domain_items:
+            if item.id in included:
+                mark_lineage(item, "digest", domain_result["digests"][0].generated_at)
         stats = update_digest_stats(stats, **{domain: domain_result["result"]})
         await _emit_stats(stats, stats_updater)
 
     for digest in generated_digests:
         session.add(digest)
-
-    cleanup_deleted = await delete_expired_items(session, options.window_end)
-    stats["retention_deleted"] = cleanup_deleted
-    await _emit_stats(stats, stats_updater)
+    try:
+        stats["insight_latency_rows"] = await apply_insight_latency(
+            session, insight_latency_rows(inserted_items, day=digest_date)
+        )
+    except Exception as exc:  # SLO history only; never fail the run over it
+        stats["insight_latency_rows"] = 0
+        stats["insight_latency_error"] = str(exc)[:200]
 
     final_status = decide_final_run_status(stats)
     return PipelineRunResult(
@@ -179,7 +303,6 @@ async def run_daily_pipeline(
         inserted_count=len(inserted_items),
         duplicate_count=persist_result.duplicates,
         normalized_error_count=normalized_error_count + persist_result.errors,
-        cleanup_deleted=cleanup_deleted,
     )
 
 
@@ -199,14 +322,20 @@ async def load_approved_sources(session: AsyncSession) -> list[Source]:
     return list(result.scalars().all())
 
 
-async def _iter_stage1_results(analyzer: Analyzer, items: list[Item], source_by_id: dict[str, Source]):
+async def _iter_stage1_results(
+    analyzer: Analyzer, items: list[Item], source_by_id: dict[str, Source], profile: RunProfile | None = None
+):
     """Yield stage-1 analysis results as they complete under the configured concurrency cap."""
     sem = asyncio.Semaphore(max(1, settings.stage1_concurrency))
 
     async def run_one(item: Item):
+        queued = time.perf_counter()
         async with sem:
+            started = time.perf_counter()
             source = source_by_id[item.source_id]
             outcome = await analyzer.analyze_stage1(_item_payload(item), _source_payload(source))
+            if profile is not None:
+                profile.record_call("stage1", time.perf_counter() - started, waited_s=started - queued)
             return item, outcome
 
     tasks = [asyncio.create_task(run_one(item)) for item in items]
@@ -219,14 +348,20 @@ async def _iter_stage1_results(analyzer: Analyzer, items: list[Item], source_by_
                 task.cancel()
 
 
-async def _iter_stage2_results(analyzer: Analyzer, items: list[Item], source_by_id: dict[str, Source]):
+async def _iter_stage2_results(
+    analyzer: Analyzer, items: list[Item], source_by_id: dict[str, Source], profile: RunProfile | None = None
+):
     """Yield stage-2 analysis results as they complete under the configured concurrency cap."""
     sem = asyncio.Semaphore(max(1, settings.stage2_concurrency))
 
     async def run_one(item: Item):
+        queued = time.perf_counter()
         async with sem:
+            started = time.perf_counter()
             source = source_by_id[item.source_id]
             outcome = await analyzer.analyze_stage2(_item_payload(item), _source_payload(source), item.also_seen_in)
+            if profile is not None:
+                profile.record_call("stage2", time.perf_counter() - started, waited_s=started - queued)
             return item, outcome
 
     tasks = [asyncio.create_task(run_one(item)) for item in items]
@@ -251,6 +386,7 @@ async def _generate_and_store_digest(
     oss_config: OSSConfig | None,
     hexo_writer,
     oss_uploader,
+    profile: RunProfile | None = None,
 ) -> dict[str, Any]:
     """Build, persist, and optionally upload one domain digest for this pipeline run."""
     digest_items = [_digest_item(item) for item in items if item.analysis_stage >= 1 and item.insight_score is not None]
@@ -258,7 +394,10 @@ async def _generate_and_store_digest(
     if not candidate_items:
         return {"result": digest_result(status="skipped"), "digests": []}
 
+    started = time.perf_counter()
     overview = await _generate_digest_overview(analyzer, domain, candidate_items)
+    if profile is not None:
+        profile.record_call("digest", time.perf_counter() - started)
     artifact = build_digest_artifact(
         digest_date=digest_date,
         domain=domain,
@@ -291,6 +430,7 @@ async def _generate_and_store_digest(
     return {
         "result": digest_result(status="succeeded", digest_id=digest.id, hexo_path=artifact.hexo_path, oss_url=oss_url),
         "digests": [digest],
+        "included": artifact.item_ids,
     }
 
 
@@ -360,6 +500,16 @@ def _item_payload(item: Item) -> dict[str, Any]:
     }
 
 
+def _ghsa_by_item(identifiers: dict[str, tuple[Identifier, ...]]) -> dict[str, str]:
+    """Map inserted item ids to the GHSA id extracted for them at ingest."""
+    mapping = {}
+    for item_id, item_identifiers in identifiers.items():
+        ghsa = first_identifier(item_identifiers, "ghsa")
+        if ghsa:
+            mapping[item_id] = ghsa
+    return mapping
+
+
 def _source_payload(source: Source) -> dict[str, Any]:
     """Serialize the source attributes that influence model prompts and confidence."""
     return {
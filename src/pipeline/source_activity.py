@@ -0,0 +1,79 @@
+"""Per-source daily fetch and ingest counters (`source_daily_stats`).
+
+The daily run turns its fetch results and newly stored items into one row per
+source for the run's UTC day and adds them with a single upsert in the run
+transaction. `/sources` sparklines and source history read these rows instead
+of grouping `items`.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.source_daily_stat import SourceDailyStat
+
+SUMMED_COLUMNS = ("fetches", "failed_fetches", "items_fetched", "items_new", "fetch_ms", "bytes")
+LATEST_COLUMNS = ("last_status", "last_error", "last_fetch_at")
+
+
+def activity_day(fetched_at: datetime) -> date:
+    if fetched_at.tzinfo is not None:
+        fetched_at = fetched_at.astimezone(timezone.utc)
+    return fetched_at.date()
+
+
+def source_activity_rows(fetch_results: list[Any], inserted: list[Any], *, fetched_at: datetime) -> list[dict]:
+    """One counter row per fetched source (and per source that stored items) for the run's day."""
+    day = activity_day(fetched_at)
+    last_fetch_at = fetched_at.astimezone(timezone.utc).replace(tzinfo=None) if fetched_at.tzinfo else fetched_at
+    rows: dict[str, dict] = {}
+
+    def row(source_id: str) -> dict:
+        if source_id not in rows:
+            rows[source_id] = {
+                "source_id": source_id,
+                "day": day,
+                **dict.fromkeys(SUMMED_COLUMNS, 0),
+                "max_fetch_ms": 0,
+                **dict.fromkeys(LATEST_COLUMNS),
+            }
+        return rows[source_id]
+
+    for result in fetch_results:
+        entry = row(result.source_id)
+        fetch_ms = int(round(result.duration_s * 1000))
+        entry["fetches"] += 1
+        entry["failed_fetches"] += int(result.status == "failed")
+        entry["items_fetched"] += len(result.items)
+        entry["fetch_ms"] += fetch_ms
+        entry["max_fetch_ms"] = max(entry["max_fetch_ms"], fetch_ms)
+        entry["bytes"] += result.bytes_received
+        entry["last_status"] = result.status
+        entry["last_error"] = result.error
+        entry["last_fetch_at"] = last_fetch_at
+    for item in inserted:
+        row(item.source_id)["items_new"] += 1
+    return [rows[source_id] for source_id in sorted(rows)]
+
+
+def upsert_source_activity_statement(rows: list[dict]):
+    """Add counters to existing (source, day) rows; the latest fetch's fields replace the old ones."""
+    stmt = mysql_insert(SourceDailyStat).values(rows)
+    updates = {name: getattr(SourceDailyStat, name) + stmt.inserted[name] for name in SUMMED_COLUMNS}
+    updates["max_fetch_ms"] = func.greatest(SourceDailyStat.max_fetch_ms, stmt.inserted.max_fetch_ms)
+    # A row that only gained items (no fetch this run) keeps its last fetch.
+    for name in LATEST_COLUMNS:
+        updates[name] = case((stmt.inserted.fetches > 0, stmt.inserted[name]), else_=getattr(SourceDailyStat, name))
+    return stmt.on_duplicate_key_update(updates)
+
+
+async def apply_source_activity(session: AsyncSession, rows: list[dict]) -> int:
+    """Write source activity rows in the caller's transaction; returns the rows sent."""
+    if rows:
+        await session.execute(upsert_source_activity_statement(rows))
+    return len(rows)
+
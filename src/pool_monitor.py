@@ -0,0 +1,227 @@
+"""Background health checks for the MySQL connection pool.
+
+`pool_pre_ping` would spend one extra cross-border round trip (~1-6s) on
+every checkout. Instead the API process runs `pool_keepalive_loop`: on an
+interval it takes idle connections out of the pool one at a time (oldest
+first; the pool is FIFO), pings those idle for at least
+`DATABASE_KEEPALIVE_IDLE_S`, invalidates the ones that fail and reconnects
+them in place. Requests never wait on a ping.
+
+A connection can still die between two passes. `FirstUseRetrySession`
+retries a statement once on a fresh connection when it failed with a
+disconnect before the session had done anything else, so nothing in the
+transaction can be lost.
+
+Counters and the ping round-trip histogram are served by `/stats/pool`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.config import settings
+
+log = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the round-trip histogram buckets; the last bucket is open-ended.
+RTT_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+class PoolHealth:
+    """Counters shared by the pool events, the keepalive loop and first-use retries."""
+
+    def __init__(self):
+        self.connects = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.evicted = 0
+        self.reconnects = 0
+        self.reconnect_failures = 0
+        self.first_use_retries = 0
+        self.passes = 0
+        self.last_pass_at: str | None = None
+        self.last_error: str | None = None
+        self.rtt_counts = [0] * (len(RTT_BUCKETS_MS) + 1)
+        self.rtt_total_ms = 0.0
+
+    def record_rtt(self, elapsed_ms: float) -> None:
+        self.rtt_counts[bisect_left(RTT_BUCKETS_MS, elapsed_ms)] += 1
+        self.rtt_total_ms += elapsed_ms
+
+    def histogram(self) -> dict[str, int]:
+        labels = [f"le_{bound}" for bound in RTT_BUCKETS_MS] + [f"gt_{RTT_BUCKETS_MS[-1]}"]
+        return dict(zip(labels, self.rtt_counts))
+
+    def snapshot(self, pool=None) -> dict[str, Any]:
+        """Counters plus the live pool state for the status endpoint."""
+        measured = sum(self.rtt_counts)
+        data = {
+            "connects": self.connects,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "evicted": self.evicted,
+            "reconnects": self.reconnects,
+            "reconnect_failures": self.reconnect_failures,
+            "first_use_retries": self.first_use_retries,
+            "keepalive_passes": self.passes,
+            "last_pass_at": self.last_pass_at,
+            "last_error": self.last_error,
+            "rtt_ms": {
+                "count": measured,
+                "avg": round(self.rtt_total_ms / measured, 1) if measured else None,
+                "histogram": self.histogram(),
+            },
+        }
+        if pool is not None:
+            data["pool"] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return data
+
+
+pool_health = PoolHealth()
+
+
+def install_pool_events(engine: AsyncEngine, health: PoolHealth = pool_health) -> None:
+    """Count new connections and stamp each connection with the time it went idle."""
+    pool_target = engine.sync_engine
+
+    @event.listens_for(pool_target, "connect")
+    def _on_connect(_dbapi_connection, record):
+        health.connects += 1
+        record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(pool_target, "checkin")
+    def _on_checkin(_dbapi_connection, record):
+        record.info["idle_since"] = time.monotonic()
+
+
+async def ping_idle_connections(engine: AsyncEngine, health: PoolHealth = pool_health, *, idle_s: float) -> int:
+    """One keepalive pass; returns the number of connections pinged.
+
+    Each connection is held only for its own ping, so concurrent requests
+    keep the rest of the pool. A connection idle for less than `idle_s`
+    ends the pass: everything behind it in the FIFO is younger.
+    """
+    pool = engine.sync_engine.pool
+    pinged = 0
+    for _ in range(pool.checkedin()):
+        if pool.checkedin() == 0:
+            break
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            idle_since = raw.info.get("idle_since", time.monotonic())
+            if time.monotonic() - idle_since < idle_s:
+                break
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(conn.exec_driver_sql("SELECT 1"), timeout=settings.database_keepalive_timeout_s)
+            except (DBAPIError, OSError, asyncio.TimeoutError) as exc:
+                health.ping_failures += 1
+                health.evicted += 1
+                health.last_error = f"{type(exc).__name__}: {exc}"
+                await conn.invalidate()
+                await _reconnect(conn, health)
+                continue
+            finally:
+                pinged += 1
+                health.pings += 1
+            health.record_rtt((time.perf_counter() - started) * 1000)
+    health.passes += 1
+    health.last_pass_at = datetime.now(timezone.utc).isoformat()
+    return pinged
+
+
+async def _reconnect(conn, health: PoolHealth) -> None:
+    """Open a new connection in an evicted one's pool slot, so no request pays the connect."""
+    try:
+        await conn.rollback()
+        await conn.execute(text("SELECT 1"))
+    except Exception as exc:
+        health.reconnect_failures += 1
+        health.last_error = f"{type(exc).__name__}: {exc}"
+        log.warning("Pool keepalive could not reconnect an evicted connection: %s", exc)
+    else:
+        health.reconnects += 1
+
+
+async def pool_keepalive_loop(engine: AsyncEngine, health: PoolHealth = pool_health) -> None:
+    """Run keepalive passes until cancelled; a failed pass is logged and retried next interval."""
+    interval = settings.database_keepalive_interval_s
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await ping_idle_connections(engine, health, idle_s=settings.database_keepalive_idle_s)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            health.last_error = f"{type(exc).__name__}: {exc}"
+            log.warning("Pool keepalive pass failed: %s", exc)
+
+
+class FirstUseRetrySession(AsyncSession):
+    """`AsyncSession` that retries a statement once when its connection was found dead on first use.
+
+    Only when the session had no transaction open and nothing pending to
+    flush: the failed statement was then the only work, and it is re-run on
+    a new connection after a rollback.
+    """
+
+    async def execute(self, *args, **kwargs):
+        return await self._retry_first_use(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._retry_first_use(super().scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._retry_first_use(super().get, *args, **kwargs)
+
+    async def _retry_first_use(self, call, *args, **kwargs):
+        first_use = not self.in_transaction() and not (self.new or self.dirty or self.deleted)
+        try:
+            return await call(*args, **kwargs)
+        except DBAPIError as exc:
+            if not (first_use and exc.connection_invalidated):
+                raise
+            log.info("Retrying a statement whose pooled connection was dead: %s", exc.orig)
+            pool_health.first_use_retries += 1
+            await self.rollback()
+            return await call(*args, **kwargs)
+
+
+def install_pool_metrics(engine: AsyncEngine, health: PoolHealth = pool_health) -> None:
+    """Publish pool utilization and keepalive counters on /metrics."""
+    from src.metrics import registry
+
+    state = registry.gauge("db_pool_connections", "Pooled MySQL connections by state.", ("state",))
+    counters = registry.gauge("db_pool_events", "Pool health counters since process start.", ("event",))
+    rtt = registry.gauge("db_pool_ping_rtt_ms_avg", "Average keepalive ping round trip (ms).")
+
+    def collect() -> None:
+        snapshot = health.snapshot(engine.sync_engine.pool)
+        pool = snapshot["pool"]
+        state.replace({
+            ("size",): pool["size"],
+            ("checked_out",): pool["checked_out"],
+            ("checked_in",): pool["checked_in"],
+            ("overflow",): pool["overflow"],
+        })
+        counters.replace({
+            (name,): snapshot[name]
+            for name in ("connects", "pings", "ping_failures", "evicted", "reconnects", "first_use_retries")
+        })
+        if snapshot["rtt_ms"]["avg"] is not None:
+            rtt.set(snapshot["rtt_ms"]["avg"])
+
+    registry.on_collect(collect)
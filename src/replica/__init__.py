@@ -0,0 +1,31 @@
+from src.replica.related import RelatedIndex, build_related_index, related_index
+from src.replica.store import (
+    LocalReplica,
+    ReplicaSession,
+    active_replica,
+    close_replica,
+    open_replica,
+    read_newest,
+    read_one,
+    read_replica,
+    replica_status,
+)
+from src.replica.sync import ReplicaSyncResult, replica_sync_loop, sync_replica
+
+__all__ = [
+    "LocalReplica",
+    "RelatedIndex",
+    "ReplicaSession",
+    "ReplicaSyncResult",
+    "active_replica",
+    "build_related_index",
+    "close_replica",
+    "open_replica",
+    "read_newest",
+    "read_one",
+    "read_replica",
+    "related_index",
+    "replica_status",
+    "replica_sync_loop",
+    "sync_replica",
+]
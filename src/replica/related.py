@@ -0,0 +1,369 @@
+""""More like this" index behind `/items/{id}/related`.
+
+Built from the replica's search docs (every unexpired item, see
+src.replica.search), so it costs no MySQL round trips. Each item becomes a
+sparse TF-IDF vector over its title terms (counted twice) and summary terms,
+keeping only its `related_terms_per_doc` heaviest terms, L2-normalized and
+stored as float32 arrays. The vocabulary is pruned to terms that can relate
+two items without matching most of them: document frequency of at least 2
+and at most `related_max_df` of the corpus. An inverted index maps each kept
+term to the items carrying it, truncated at rebuild to its
+`related_max_postings` heaviest entries, so a lookup touches at most
+terms x postings entries however large the corpus grows.
+
+Building is pure-Python CPU work (tens of seconds for 100k items), so the
+API never does it. The worker refreshes the index after its post-commit
+replica sync (`build_related_index`, also run by `python3 -m
+src.replica.sync`) and saves it atomically to `related_index_path`, next to
+the replica file; each API process reloads that file when it changes after
+a replica sync. Like the dedup Bloom filter the index is extended
+incrementally: items changed since the last refresh get new vectors under
+the current IDF (terms shared within the changed batch join the vocabulary)
+and removed items are tombstoned. Once changes since the last rebuild pass
+`REBUILD_CHURN` of the corpus, the next refresh rebuilds it (fresh IDF,
+compacted postings). Until a file has been loaded the index is cold and the
+endpoint says so.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import pickle
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import select
+
+from src.config import settings
+from src.replica.search import search_docs
+
+MAGIC = b"DARI1"
+REBUILD_CHURN = 0.25
+TITLE_WEIGHT = 2
+_DOC_COLUMNS = (
+    search_docs.c.id, search_docs.c.domain, search_docs.c.source_id, search_docs.c.updated_at,
+    search_docs.c.title_terms, search_docs.c.summary_terms,
+)
+
+
+@dataclass
+class _State:
+    # Kept term -> (term id, idf); terms dropped as too common stay out.
+    kept: dict[str, tuple[int, float]] = field(default_factory=dict)
+    common: set[str] = field(default_factory=set)
+    docs: int = 0
+    ids: list[str | None] = field(default_factory=list)
+    slot_of: dict[str, int] = field(default_factory=dict)
+    # (domain, source_id, updated_at) per slot.
+    meta: list[tuple[str, str, Any]] = field(default_factory=list)
+    vectors: list[tuple[array, array] | None] = field(default_factory=list)
+    postings: dict[int, tuple[array, array]] = field(default_factory=dict)
+
+
+class RelatedIndex:
+    def __init__(
+        self,
+        *,
+        terms_per_doc: int | None = None,
+        max_postings: int | None = None,
+        max_df: float | None = None,
+    ):
+        self.terms_per_doc = settings.related_terms_per_doc if terms_per_doc is None else terms_per_doc
+        self.max_postings = settings.related_max_postings if max_postings is None else max_postings
+        self.max_df = settings.related_max_df if max_df is None else max_df
+        self.watermark: datetime | None = None
+        self.changed_since_rebuild = 0
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.last_refresh: dict[str, Any] = {}
+        # False until a rebuild or a saved index has been loaded.
+        self.ready = False
+        self._state = _State()
+        self._file_signature: tuple[int, int] | None = None
+        # Lookups take `_lock` only while reading; refreshes compute outside it
+        # and hold it just to publish, so the event loop never waits on a rebuild.
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state.slot_of)
+
+    def rebuild(self, load: Callable[[], Iterable[dict[str, Any]]]) -> None:
+        """Replace the index with one built from the search doc dicts `load()` yields.
+
+        Two passes over `load()` (document frequencies, then vectors), so no
+        per-doc term counts are held; over-long postings are cut at the end.
+        Both passes yield the GIL after every doc, so a rebuild on a thread
+        does not hold up the process's event loop.
+        """
+        state = _State()
+        df: Counter[str] = Counter()
+        for row in load():
+            state.docs += 1
+            df.update(self._terms(row))
+            time.sleep(0)
+        max_df = max(2, self.max_df * state.docs)
+        for term, count in df.items():
+            if count > max_df:
+                state.common.add(term)
+            elif count >= 2:
+                state.kept[term] = (len(state.kept), math.log(state.docs / count + 1))
+        del df
+        watermark = None
+        for row in load():
+            vector = self._vector(state, self._term_counts(row))
+            self._post(state.postings, self._place(state, row, vector), vector)
+            if row.get("updated_at") and (watermark is None or row["updated_at"] > watermark):
+                watermark = row["updated_at"]
+            time.sleep(0)
+        # Terms no vector kept cannot relate the indexed items; drop them too.
+        state.kept = {term: entry for term, entry in state.kept.items() if entry[0] in state.postings}
+        for term_id, (slots, weights) in state.postings.items():
+            if len(slots) > self.max_postings:
+                keep = heapq.nlargest(self.max_postings, range(len(slots)), key=weights.__getitem__)
+                state.postings[term_id] = (array("I", (slots[i] for i in keep)), array("f", (weights[i] for i in keep)))
+        with self._lock:
+            self._state = state
+        self.watermark = watermark
+        self.changed_since_rebuild = 0
+        self.rebuilds += 1
+        self.ready = True
+
+    def apply(self, changed: Iterable[dict[str, Any]], live_ids: set[str] | None = None) -> dict[str, int]:
+        """Re-vector `changed` rows and tombstone ids missing from `live_ids`.
+
+        Terms that appear in two or more changed rows join the vocabulary
+        (so items of one daily batch relate to each other); existing terms
+        keep the IDF of the last rebuild.
+        """
+        state = self._state
+        rows = []
+        for row in changed:
+            slot = state.slot_of.get(row["id"])
+            if slot is not None and state.meta[slot][2] == row.get("updated_at"):
+                continue  # re-read inside the overlap window, unchanged
+            rows.append(row)
+            if slot is None:
+                state.docs += 1
+            if row.get("updated_at") and (self.watermark is None or row["updated_at"] > self.watermark):
+                self.watermark = row["updated_at"]
+        batch_df = Counter(term for row in rows for term in self._terms(row))
+        for term, count in batch_df.items():
+            if count >= 2 and term not in state.kept and term not in state.common:
+                state.kept[term] = (len(state.kept), math.log(state.docs / count + 1))
+        prepared = [(row, self._vector(state, self._term_counts(row))) for row in rows]
+        removed = [item_id for item_id in state.slot_of if live_ids is not None and item_id not in live_ids]
+        with self._lock:
+            for item_id in removed:
+                self._tombstone(state, item_id)
+            for row, vector in prepared:
+                self._tombstone(state, row["id"])
+                self._post(state.postings, self._place(state, row, vector), vector)
+        state.docs = max(0, state.docs - len(removed))
+        self.changed_since_rebuild += len(prepared) + len(removed)
+        return {"changed": len(prepared), "removed": len(removed)}
+
+    def refresh(self, replica) -> dict[str, Any]:
+        """Bring the index up to date with `replica`'s search docs; rebuild when due."""
+        with self._refresh_lock:
+            started = time.monotonic()
+            with replica.engine.connect() as conn:
+                rebuild = self.watermark is None or self.changed_since_rebuild > REBUILD_CHURN * max(1, len(self))
+                if rebuild:
+                    self.rebuild(lambda: (dict(row._mapping) for row in conn.execute(select(*_DOC_COLUMNS))))
+                    summary: dict[str, Any] = {"rebuilt": True, "docs": len(self)}
+                else:
+                    # Same overlap as the replica sync: rows committed late carry older stamps.
+                    since = self.watermark - timedelta(seconds=settings.replica_sync_overlap_s)
+                    changed = [
+                        dict(row._mapping)
+                        for row in conn.execute(select(*_DOC_COLUMNS).where(search_docs.c.updated_at >= since))
+                    ]
+                    live_ids = set(conn.execute(select(search_docs.c.id)).scalars())
+                    summary = {"rebuilt": False, **self.apply(changed, live_ids), "docs": len(self)}
+            summary["duration_s"] = round(time.monotonic() - started, 3)
+            self.refreshes += 1
+            self.last_refresh = summary
+            return summary
+
+    def save(self, path: str | Path) -> None:
+        """Write the index atomically so readers never load a half-written file."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "params": self._params(),
+            "watermark": self.watermark,
+            "changed_since_rebuild": self.changed_since_rebuild,
+            "rebuilds": self.rebuilds,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+            "state": self._state,
+        }
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(MAGIC + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp, target)
+
+    def load(self, path: str | Path, *, require_params: bool = False) -> bool:
+        """Replace the index with the one saved at `path` when that file changed since the last load.
+
+        Returns whether a new index was loaded. A missing or unreadable file
+        (or, with `require_params`, one built with other settings) leaves the
+        current index in place.
+        """
+        target = Path(path)
+        try:
+            stat = target.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._file_signature:
+                return False
+            payload = target.read_bytes()
+            if not payload.startswith(MAGIC):
+                raise ValueError("not a related index")
+            saved = pickle.loads(payload[len(MAGIC) :])
+            if not isinstance(saved, dict) or not isinstance(saved.get("state"), _State):
+                raise ValueError("malformed related index")
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+            return False
+        if require_params and tuple(saved["params"]) != self._params():
+            return False
+        with self._lock:
+            self._state = saved["state"]
+        self.watermark = saved["watermark"]
+        self.changed_since_rebuild = saved["changed_since_rebuild"]
+        self.rebuilds = saved["rebuilds"]
+        self.refreshes = saved["refreshes"]
+        self.last_refresh = saved["last_refresh"]
+        self.ready = True
+        self._file_signature = signature
+        return True
+
+    def lookup(
+        self, item_id: str, *, limit: int, allow: Callable[[str, str], bool] | None = None
+    ) -> list[tuple[str, float]] | None:
+        """Up to `limit` (id, cosine similarity) pairs most like `item_id`, best first.
+
+        `allow(domain, source_id)` is the visibility allowlist, applied to the
+        candidates and to the item itself. None when the item is not indexed
+        or not allowed.
+        """
+        with self._lock:
+            state = self._state
+            slot = state.slot_of.get(item_id)
+            if slot is None or (allow is not None and not allow(*state.meta[slot][:2])):
+                return None
+            scores: dict[int, float] = defaultdict(float)
+            for term_id, weight in zip(*state.vectors[slot]):
+                posting = state.postings.get(term_id)
+                if posting is None:
+                    continue
+                for other, other_weight in zip(*posting):
+                    scores[other] += weight * other_weight
+            scores.pop(slot, None)
+            best = heapq.nlargest(
+                limit,
+                (
+                    (score, state.ids[other])
+                    for other, score in scores.items()
+                    if state.ids[other] is not None and (allow is None or allow(*state.meta[other][:2]))
+                ),
+            )
+        return [(other_id, round(score, 4)) for score, other_id in best]
+
+    def stats(self) -> dict[str, Any]:
+        state = self._state
+        return {
+            "ready": self.ready,
+            "docs": len(state.slot_of),
+            "slots": len(state.ids),
+            "vocabulary": len(state.kept),
+            "postings": sum(len(slots) for slots, _ in state.postings.values()),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "changed_since_rebuild": self.changed_since_rebuild,
+            "rebuilds": self.rebuilds,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+        }
+
+    def _params(self) -> tuple[int, int, float]:
+        return (self.terms_per_doc, self.max_postings, self.max_df)
+
+    @staticmethod
+    def _terms(row: dict[str, Any]) -> set[str]:
+        return set((row.get("title_terms") or "").split()) | set((row.get("summary_terms") or "").split())
+
+    @staticmethod
+    def _term_counts(row: dict[str, Any]) -> Counter[str]:
+        counts: Counter[str] = Counter()
+        for term in (row.get("title_terms") or "").split():
+            counts[term] += TITLE_WEIGHT
+        counts.update((row.get("summary_terms") or "").split())
+        return counts
+
+    def _vector(self, state: _State, counts: Counter[str]) -> tuple[array, array]:
+        """The doc's heaviest kept terms with L2-normalized TF-IDF weights."""
+        kept = state.kept
+        weighted = [
+            ((1 + math.log(count)) * entry[1], entry[0])
+            for term, count in counts.items()
+            if (entry := kept.get(term)) is not None
+        ]
+        top = heapq.nlargest(self.terms_per_doc, weighted)
+        norm = math.sqrt(sum(weight * weight for weight, _ in top)) or 1.0
+        return array("I", (term_id for _, term_id in top)), array("f", (weight / norm for weight, _ in top))
+
+    @staticmethod
+    def _place(state: _State, row: dict[str, Any], vector: tuple[array, array]) -> int:
+        slot = len(state.ids)
+        state.ids.append(row["id"])
+        state.meta.append((row.get("domain") or "", row.get("source_id") or "", row.get("updated_at")))
+        state.vectors.append(vector)
+        state.slot_of[row["id"]] = slot
+        return slot
+
+    @staticmethod
+    def _post(postings: dict[int, tuple[array, array]], slot: int, vector: tuple[array, array]) -> None:
+        for term_id, weight in zip(*vector):
+            entry = postings.get(term_id)
+            if entry is None:
+                entry = postings[term_id] = (array("I"), array("f"))
+            entry[0].append(slot)
+            entry[1].append(weight)
+
+    @staticmethod
+    def _tombstone(state: _State, item_id: str) -> None:
+        slot = state.slot_of.pop(item_id, None)
+        if slot is not None:
+            state.ids[slot] = None
+            state.vectors[slot] = None
+
+
+_index: RelatedIndex | None = None
+
+
+def related_index() -> RelatedIndex:
+    """This process's related-items index (cold until a saved index is loaded)."""
+    global _index
+    if _index is None:
+        _index = RelatedIndex()
+    return _index
+
+
+def build_related_index(replica, path: str | Path | None = None) -> dict[str, Any]:
+    """Bring the saved index at `path` up to date with `replica` and save it (worker / CLI side).
+
+    Starts from the saved index when it was built with the current settings,
+    otherwise from scratch (a full rebuild).
+    """
+    path = path or settings.related_index_path
+    index = RelatedIndex()
+    index.load(path, require_params=True)
+    summary = index.refresh(replica)
+    index.save(path)
+    return summary
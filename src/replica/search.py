@@ -0,0 +1,197 @@
+"""Local full-text index behind `/items?q=`.
+
+`search_docs` holds one row per unexpired item with no horizon limit: the
+filter columns `/items` accepts and the searchable text, pre-split into
+terms. `search_fts` (FTS5, external content, kept current by triggers)
+indexes those terms, and queries rank with `bm25()`; title matches weigh
+more than summary matches, which weigh more than body matches.
+
+Terms follow MySQL's ngram parser: a run of CJK characters becomes its
+overlapping bigrams, anything else splits into lowercased words, so a
+two-character Chinese word is found (FTS5's own trigram tokenizer cannot
+match fewer than three characters). Queries use the same terms, each query
+word as a phrase, with the boolean-mode operators `+word`, `-word`,
+`"a phrase"` and a trailing `word*` for prefixes.
+
+The index lives in the replica file and is synced with it (src.replica.sync),
+including the sync the worker runs after each daily commit.
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Any, Iterable
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, and_, func, literal_column, or_, select
+
+# Only the start of long bodies is indexed (and pulled across the border).
+SEARCH_CONTENT_CHARS = 10_000
+# bm25() column weights: title, summary, content.
+SEARCH_WEIGHTS = (4.0, 2.0, 1.0)
+FILTER_COLUMNS = (
+    "source_id", "domain", "category", "insight_score", "analysis_stage", "confidence", "trend_signal",
+    "published_at", "expires_at",
+)
+
+_metadata = MetaData()
+search_docs = Table(
+    "search_docs",
+    _metadata,
+    Column("id", String, primary_key=True),
+    Column("source_id", String),
+    Column("domain", String),
+    Column("category", String),
+    Column("insight_score", Integer),
+    Column("analysis_stage", Integer),
+    Column("confidence", String),
+    Column("trend_signal", String),
+    Column("published_at", DateTime),
+    Column("expires_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("title_terms", Text),
+    Column("summary_terms", Text),
+    Column("content_terms", Text),
+)
+
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "title_terms, summary_terms, content_terms, content='search_docs', content_rowid='rowid', tokenize='unicode61')",
+    """CREATE TRIGGER IF NOT EXISTS search_fts_ai AFTER INSERT ON search_docs BEGIN
+        INSERT INTO search_fts (rowid, title_terms, summary_terms, content_terms)
+        VALUES (new.rowid, new.title_terms, new.summary_terms, new.content_terms);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_fts_ad AFTER DELETE ON search_docs BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title_terms, summary_terms, content_terms)
+        VALUES ('delete', old.rowid, old.title_terms, old.summary_terms, old.content_terms);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_fts_au
+    AFTER UPDATE OF title_terms, summary_terms, content_terms ON search_docs BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title_terms, summary_terms, content_terms)
+        VALUES ('delete', old.rowid, old.title_terms, old.summary_terms, old.content_terms);
+        INSERT INTO search_fts (rowid, title_terms, summary_terms, content_terms)
+        VALUES (new.rowid, new.title_terms, new.summary_terms, new.content_terms);
+    END""",
+    "CREATE INDEX IF NOT EXISTS ix_search_docs_expires_at ON search_docs (expires_at)",
+    "CREATE INDEX IF NOT EXISTS ix_search_docs_updated_at ON search_docs (updated_at)",
+)
+
+# Kana, CJK ideographs (with extension A and compatibility forms), Hangul.
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_CJK_CHAR = re.compile(rf"[{_CJK}]")
+_TERM_RUN = re.compile(rf"[{_CJK}]+|(?:(?![{_CJK}])[^\W_])+")
+_QUERY_WORD = re.compile(r'(?P<op>[+-]?)(?:"(?P<phrase>[^"]*)"?|(?P<word>\S+))')
+_FTS = literal_column("search_fts")
+_fts_table = Table("search_fts", _metadata, Column("rowid", Integer))
+
+
+def search_terms(value: str | None) -> list[str]:
+    """Index terms of `value`: bigrams of CJK runs (a lone character stays whole), lowercased words otherwise."""
+    terms: list[str] = []
+    for run in _TERM_RUN.findall(value or ""):
+        if _CJK_CHAR.match(run):
+            terms.extend(run[i : i + 2] for i in range(max(1, len(run) - 1)))
+        else:
+            terms.append(run.lower())
+    return terms
+
+
+def search_doc(row: dict[str, Any]) -> dict[str, Any]:
+    """A `search_docs` row from an item's filter columns, title, summary and (truncated) body."""
+    doc = {name: row.get(name) for name in ("id", *FILTER_COLUMNS, "updated_at")}
+    doc["title_terms"] = " ".join(search_terms(row.get("title")))
+    doc["summary_terms"] = " ".join(search_terms(row.get("summary_zh")))
+    doc["content_terms"] = " ".join(search_terms((row.get("content_text") or "")[:SEARCH_CONTENT_CHARS]))
+    return doc
+
+
+def search_match(q: str) -> str | None:
+    """FTS5 MATCH expression for a boolean-mode query; None when nothing in it can match on its own.
+
+    `+` words are all required; without any, at least one plain word must
+    match. `-` words exclude. Every word is a phrase of its terms, so CJK
+    text matches as a contiguous substring.
+    """
+    required: list[str] = []
+    optional: list[str] = []
+    excluded: list[str] = []
+    for found in _QUERY_WORD.finditer(q):
+        word = found["word"]
+        terms = search_terms(found["phrase"] if word is None else word)
+        if not terms:
+            continue
+        # A lone CJK character matches the bigrams it starts.
+        prefix = (word is not None and word.endswith("*")) or (len(terms) == 1 and bool(_CJK_CHAR.fullmatch(terms[0])))
+        phrase = '"' + " ".join(terms) + '"' + ("*" if prefix else "")
+        {"+": required, "-": excluded}.get(found["op"], optional).append(phrase)
+    if required:
+        positive = " AND ".join(required)
+    elif optional:
+        positive = " OR ".join(optional)
+    else:
+        return None
+    return "(" + positive + ")" + "".join(f" NOT {phrase}" for phrase in excluded)
+
+
+def search_rank():
+    """Relevance of the current match, higher is better (bm25() is lower-is-better)."""
+    return -func.bm25(_FTS, *SEARCH_WEIGHTS)
+
+
+def search_statement(
+    match: str,
+    *,
+    limit: int,
+    after: tuple[float, int, str] | None = None,
+    domains: Iterable[str] = (),
+    source_ids: Iterable[str] = (),
+    domain: str | None = None,
+    category: str | None = None,
+    min_score: int | None = None,
+    analysis_stage: int | None = None,
+    confidence: str | None = None,
+    trend_signal: str | None = None,
+    source_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """Matching ids ranked by relevance, then score, then id, with every filter applied in SQLite.
+
+    `domains` / `source_ids` are the visibility allowlist; `after` is the
+    (rank, score, id) of the previous page's last row.
+    """
+    docs = search_docs.c
+    rank = search_rank()
+    score = func.coalesce(docs.insight_score, -1)
+    stmt = (
+        select(docs.id, rank.label("rank"), score.label("insight_score"))
+        .select_from(search_docs.join(_fts_table, _fts_table.c.rowid == literal_column("search_docs.rowid")))
+        .where(_FTS.op("MATCH")(match))
+        .where(docs.domain.in_(list(domains)), docs.source_id.in_(sorted(source_ids)))
+    )
+    equal_filters = {
+        "domain": domain if domain != "all" else None,
+        "category": category,
+        "analysis_stage": analysis_stage,
+        "confidence": confidence,
+        "trend_signal": trend_signal,
+        "source_id": source_id,
+    }
+    for name, value in equal_filters.items():
+        if value is not None and value != "":
+            stmt = stmt.where(docs[name] == value)
+    if min_score is not None:
+        stmt = stmt.where(docs.insight_score >= min_score)
+    if since is not None:
+        stmt = stmt.where(docs.published_at >= since)
+    if until is not None:
+        stmt = stmt.where(docs.published_at <= until)
+    if after is not None:
+        after_rank, after_score, after_id = after
+        stmt = stmt.where(
+            or_(
+                rank < after_rank,
+                and_(rank == after_rank, or_(score < after_score, and_(score == after_score, docs.id > after_id))),
+            )
+        )
+    return stmt.order_by(rank.desc(), score.desc(), docs.id.asc()).limit(limit)
+
@@ -0,0 +1,395 @@
+"""Embedded SQLite read model for the API process.
+
+Holds the hot columns of recent items (fetched or published inside the
+horizon), every source, and the runs, digests and per-source daily stats of
+the same horizon. Tables
+keep the MySQL table and column names, so the routers' ORM statements run
+unchanged against it through `ReplicaSession`. The same file holds the
+`/items?q=` search index (src.replica.search), which covers every unexpired
+item rather than the horizon.
+
+The file is disposable: when the mirrored columns change it is recreated, and
+the next sync (src.replica.sync) refills it.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import Column, create_engine, delete, event, func, or_, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.digest import Digest
+from src.models.item import Item
+from src.models.run import Run
+from src.models.source import Source
+from src.models.source_daily_stat import SourceDailyStat
+from src.replica.related import related_index
+from src.replica.search import SEARCH_SCHEMA, search_doc, search_docs
+
+SCHEMA_VERSION = 2
+REPLICATED_MODELS = (Source, Run, Item, Digest, SourceDailyStat)
+# Rows are kept one day past the served horizon: `fetched_at` is written by the
+# MySQL server clock and `published_at` by collectors, so the slack keeps
+# boundary days complete whichever clock a row came from.
+HORIZON_SLACK = timedelta(days=1)
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_items_score ON items (insight_score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS ix_items_fetched_at ON items (fetched_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_published_at ON items (published_at)",
+    "CREATE INDEX IF NOT EXISTS ix_items_source_fetched ON items (source_id, fetched_at)",
+    "CREATE INDEX IF NOT EXISTS ix_runs_started_at ON runs (started_at)",
+    "CREATE INDEX IF NOT EXISTS ix_digests_domain_date ON digests (domain, date)",
+    "CREATE INDEX IF NOT EXISTS ix_source_daily_stats_day ON source_daily_stats (day)",
+)
+
+
+def replicated_columns(model) -> list[Column]:
+    """Mapped columns the replica stores: everything the ORM loads by default."""
+    return [prop.columns[0] for prop in model.__mapper__.column_attrs if not prop.deferred]
+
+
+def in_horizon(start: datetime):
+    """Items fetched or published since `start` (NULL publish dates fall back to fetch time)."""
+    return or_(Item.fetched_at >= start, func.coalesce(Item.published_at, Item.fetched_at) >= start)
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Drop tzinfo after converting to UTC, matching how DATETIME values are stored."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _schema_fingerprint() -> str:
+    layout = {model.__tablename__: [c.name for c in replicated_columns(model)] for model in REPLICATED_MODELS}
+    layout[search_docs.name] = [column.name for column in search_docs.columns]
+    payload = json.dumps({"version": SCHEMA_VERSION, "tables": layout}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ReplicaSession:
+    """The part of `AsyncSession` the read routers use, run against SQLite on a thread.
+
+    Each call uses its own short-lived session; results are buffered before
+    they leave the thread, and returned ORM objects are detached.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def execute(self, statement):
+        def run():
+            with Session(self.engine) as session:
+                return session.execute(statement).freeze()
+
+        frozen = await asyncio.to_thread(run)
+        return frozen()
+
+    async def scalar(self, statement):
+        return await asyncio.to_thread(self._with_session, lambda session: session.scalar(statement))
+
+    async def get(self, model, ident):
+        return await asyncio.to_thread(self._with_session, lambda session: session.get(model, ident))
+
+    def _with_session(self, fn: Callable[[Session], Any]) -> Any:
+        with Session(self.engine) as session:
+            return fn(session)
+
+
+@dataclass
+class ReplicaStatus:
+    """What this process knows about the replica's freshness."""
+
+    synced_through: datetime | None = None
+    last_attempt_at: datetime | None = None
+    last_error: str | None = None
+    last_sync: dict = field(default_factory=dict)
+    syncs: int = 0
+    failures: int = 0
+
+
+class LocalReplica:
+    def __init__(self, path: str | Path, *, horizon_days: int | None = None, max_lag_s: float | None = None):
+        self.path = Path(path)
+        self.horizon_days = settings.replica_horizon_days if horizon_days is None else horizon_days
+        self.max_lag_s = settings.replica_max_lag_s if max_lag_s is None else max_lag_s
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.engine = create_engine(
+            f"sqlite:///{self.path}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        event.listen(self.engine, "connect", _configure_connection)
+        self.session = ReplicaSession(self.engine)
+        self.status = ReplicaStatus()
+        self._write_lock = threading.Lock()
+
+    def open(self) -> "LocalReplica":
+        """Create (or recreate, on a layout change) the schema and load the saved sync point."""
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS replica_meta (key TEXT PRIMARY KEY, value TEXT)")
+            fingerprint = _schema_fingerprint()
+            stored = conn.execute(text("SELECT value FROM replica_meta WHERE key = 'schema'")).scalar()
+            if stored != fingerprint:
+                _drop_replicated_tables(conn)
+                conn.exec_driver_sql("DELETE FROM replica_meta")
+            for model in REPLICATED_MODELS:
+                conn.exec_driver_sql(_create_table_sql(model))
+            search_docs.create(conn, checkfirst=True)
+            for statement in (*INDEXES, *SEARCH_SCHEMA):
+                conn.exec_driver_sql(statement)
+            _set_meta(conn, "schema", fingerprint)
+        synced_through = self.get_meta("synced_through")
+        self.status.synced_through = datetime.fromisoformat(synced_through) if synced_through else None
+        return self
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+    def horizon_start(self, now: datetime | None = None) -> datetime:
+        """Oldest timestamp reads may rely on the replica for (naive UTC)."""
+        now = utc_naive(now or datetime.now(timezone.utc))
+        return now - timedelta(days=self.horizon_days)
+
+    def covers(self, since: datetime, now: datetime | None = None) -> bool:
+        return utc_naive(since) >= self.horizon_start(now)
+
+    def lag_s(self, now: datetime | None = None) -> float | None:
+        if self.status.synced_through is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        return round((now - self.status.synced_through).total_seconds(), 3)
+
+    def is_fresh(self, now: datetime | None = None) -> bool:
+        lag = self.lag_s(now)
+        return lag is not None and lag <= self.max_lag_s
+
+    def mark_synced(self, started_at: datetime, summary: dict) -> None:
+        """Record a successful sync; data is current as of when it started."""
+        self.set_meta("synced_through", started_at.isoformat())
+        self.status.synced_through = started_at
+        self.status.last_sync = summary
+        self.status.last_error = None
+        self.status.syncs += 1
+
+    def mark_failed(self, exc: BaseException) -> None:
+        self.status.last_error = f"{type(exc).__name__}: {exc}"
+        self.status.failures += 1
+
+    def get_meta(self, key: str) -> str | None:
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT value FROM replica_meta WHERE key = :key"), {"key": key}).scalar()
+
+    def set_meta(self, key: str, value: str | None) -> None:
+        with self._write_lock, self.engine.begin() as conn:
+            _set_meta(conn, key, value)
+
+    def upsert(self, model, rows: list[dict]) -> int:
+        """Insert or replace rows (dicts keyed by column name) in one transaction."""
+        if not rows:
+            return 0
+        table = model.__table__
+        names = [column.name for column in replicated_columns(model)]
+        stmt = sqlite_insert(table)
+        keys = [column.name for column in table.primary_key.columns]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in names if name not in keys},
+        )
+        with self._write_lock, self.engine.begin() as conn:
+            conn.execute(stmt, [{name: row.get(name) for name in names} for row in rows])
+        return len(rows)
+
+    def delete_ids(self, model, ids: Iterable[str]) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        deleted = 0
+        with self._write_lock, self.engine.begin() as conn:
+            for offset in range(0, len(ids), 500):
+                chunk = ids[offset : offset + 500]
+                deleted += conn.execute(delete(model.__table__).where(model.__table__.c.id.in_(chunk))).rowcount
+        return deleted
+
+    def upsert_search_docs(self, rows: list[dict]) -> int:
+        """Index items (dicts with the filter columns, title, summary_zh and content_text) for search."""
+        if not rows:
+            return 0
+        stmt = sqlite_insert(search_docs)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={column.name: stmt.excluded[column.name] for column in search_docs.columns if column.name != "id"},
+        )
+        docs = [search_doc(row) for row in rows]
+        with self._write_lock, self.engine.begin() as conn:
+            conn.execute(stmt, docs)
+        return len(docs)
+
+    def prune_search_docs(self, now: datetime) -> int:
+        """Drop expired items from the search index."""
+        expires_at = search_docs.c.expires_at
+        stmt = delete(search_docs).where(expires_at.is_not(None), expires_at <= utc_naive(now))
+        with self._write_lock, self.engine.begin() as conn:
+            return conn.execute(stmt).rowcount
+
+    def search_doc_count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(search_docs)).scalar() or 0
+
+    def versions(self, model, columns: list[Column]) -> dict[str, tuple]:
+        """Map id -> values of `columns` for every row of `model` in the replica."""
+        table = model.__table__
+        stmt = select(table.c.id, *(table.c[column.name] for column in columns))
+        with self.engine.connect() as conn:
+            return {row[0]: tuple(row[1:]) for row in conn.execute(stmt)}
+
+    def prune_items(self, horizon: datetime, now: datetime) -> int:
+        """Drop items that left the kept horizon or have already expired."""
+        table = Item.__table__
+        stmt = delete(table).where(
+            ~in_horizon(horizon) | (table.c.expires_at.is_not(None) & (table.c.expires_at <= utc_naive(now)))
+        )
+        with self._write_lock, self.engine.begin() as conn:
+            return conn.execute(stmt).rowcount
+
+    def prune_source_days(self, before: date) -> int:
+        """Drop per-source daily stats older than the kept horizon."""
+        table = SourceDailyStat.__table__
+        with self._write_lock, self.engine.begin() as conn:
+            return conn.execute(delete(table).where(table.c.day < before)).rowcount
+
+    def row_counts(self) -> dict[str, int]:
+        with self.engine.connect() as conn:
+            return {
+                model.__tablename__: conn.execute(select(func.count()).select_from(model.__table__)).scalar() or 0
+                for model in REPLICATED_MODELS
+            }
+
+
+def _configure_connection(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    # WAL lets API reads proceed while the sync (or the worker) writes.
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _create_table_sql(model) -> str:
+    # Untyped columns: SQLAlchemy's bind/result processing on the model types
+    # decides storage (ISO strings for datetimes, JSON text, codec bytes).
+    keys = [column.name for column in model.__table__.primary_key.columns]
+    columns = [
+        f'"{column.name}"' + (" PRIMARY KEY" if keys == [column.name] else "") for column in replicated_columns(model)
+    ]
+    if len(keys) > 1:
+        columns.append("PRIMARY KEY (" + ", ".join(f'"{name}"' for name in keys) + ")")
+    return f'CREATE TABLE IF NOT EXISTS "{model.__tablename__}" ({", ".join(columns)})'
+
+
+def _drop_replicated_tables(conn) -> None:
+    # `items_fts` is the search index of schema version 1.
+    conn.exec_driver_sql("DROP TABLE IF EXISTS items_fts")
+    conn.exec_driver_sql("DROP TABLE IF EXISTS search_fts")
+    conn.exec_driver_sql("DROP TABLE IF EXISTS search_docs")
+    for model in REPLICATED_MODELS:
+        conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{model.__tablename__}"')
+
+
+def _set_meta(conn, key: str, value: str | None) -> None:
+    conn.execute(
+        text("INSERT INTO replica_meta (key, value) VALUES (:key, :value) ON CONFLICT(key) DO UPDATE SET value = :value"),
+        {"key": key, "value": value},
+    )
+
+
+_active: LocalReplica | None = None
+
+
+def open_replica(path: str | Path | None = None) -> LocalReplica:
+    """Open the configured replica once per process and make it the active one."""
+    global _active
+    if _active is None:
+        _active = LocalReplica(path or settings.replica_path).open()
+    return _active
+
+
+def close_replica() -> None:
+    global _active
+    if _active is not None:
+        _active.close()
+        _active = None
+
+
+def active_replica() -> LocalReplica | None:
+    return _active
+
+
+def read_replica(now: datetime | None = None) -> LocalReplica | None:
+    """The active replica if it has synced within `replica_max_lag_s`, else None."""
+    replica = _active
+    if replica is None or not replica.is_fresh(now):
+        return None
+    return replica
+
+
+async def read_one(db, statement):
+    """First entity matching `statement`, from a fresh replica when it has it, else from `db`."""
+    replica = read_replica()
+    if replica is not None:
+        found = (await replica.session.execute(statement)).scalar_one_or_none()
+        if found is not None:
+            return found
+    return (await db.execute(statement)).scalar_one_or_none()
+
+
+async def read_newest(db, statement, *, limit: int) -> list:
+    """Up to `limit` entities ordered newest-first by `statement`.
+
+    The replica holds every row inside the horizon, so when it returns a full
+    page the newest `limit` rows are all there; a short page may be missing
+    older rows and is re-read from `db`.
+    """
+    replica = read_replica()
+    if replica is not None:
+        rows = (await replica.session.execute(statement)).scalars().all()
+        if len(rows) >= limit:
+            return rows
+    return (await db.execute(statement)).scalars().all()
+
+
+def replica_status(now: datetime | None = None) -> dict:
+    """Lag and sync state of this process's replica, for the status endpoint."""
+    replica = _active
+    if replica is None:
+        return {"enabled": settings.replica_enabled, "open": False, "serving": False}
+    status = replica.status
+    return {
+        "enabled": settings.replica_enabled,
+        "open": True,
+        "serving": replica.is_fresh(now),
+        "path": str(replica.path),
+        "horizon_days": replica.horizon_days,
+        "max_lag_s": replica.max_lag_s,
+        "lag_s": replica.lag_s(now),
+        "synced_through": status.synced_through.isoformat() if status.synced_through else None,
+        "items_watermark": replica.get_meta("items_watermark"),
+        "search_watermark": replica.get_meta("search_watermark"),
+        "search_docs": replica.search_doc_count(),
+        "last_attempt_at": status.last_attempt_at.isoformat() if status.last_attempt_at else None,
+        "last_sync": status.last_sync,
+        "last_error": status.last_error,
+        "syncs": status.syncs,
+        "failures": status.failures,
+        "rows": replica.row_counts(),
+        "related": related_index().stats(),
+    }
+
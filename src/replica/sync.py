@@ -0,0 +1,316 @@
+"""Incremental MySQL -> local replica sync.
+
+Items are pulled by `(updated_at, id)` keyset from the last watermark minus
+`replica_sync_overlap_s`, limited to the kept horizon, in pages of
+`replica_page_size` (one round trip each). Sources, runs and digests are small:
+one query fetches their ids and version columns, and only rows that are new or
+changed are fetched in full; rows gone from MySQL (or out of the horizon) are
+dropped locally. Per-source daily stats are pulled by their own `updated_at`
+watermark in one query. The search index (src.replica.search) pulls every
+unexpired item, whatever its age, on its own `updated_at` watermark. Expired
+and out-of-horizon rows are pruned after each sync.
+
+The daily pipeline writes in one long transaction, so rows it stamps early
+only become visible at commit. While it holds the run lock the items
+watermark is not advanced, and the next sync after commit re-reads them. The
+worker also runs a sync right after its commit, so the shared replica file is
+fresh before the API's next interval.
+
+CLI (also refreshes the saved related-items index):
+    python3 -m src.replica.sync [--full]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import and_, func, or_, select, text
+
+from src.config import settings
+from src.models.digest import Digest
+from src.models.item import Item
+from src.models.run import Run
+from src.models.source import Source
+from src.models.source_daily_stat import SourceDailyStat
+from src.replica.related import build_related_index, related_index
+from src.replica.search import FILTER_COLUMNS, SEARCH_CONTENT_CHARS, search_docs
+from src.replica.store import HORIZON_SLACK, LocalReplica, in_horizon, replicated_columns, utc_naive
+
+log = logging.getLogger(__name__)
+
+FETCH_CHUNK = 200
+WATERMARK_KEY = "items_watermark"
+SOURCE_DAYS_WATERMARK_KEY = "source_days_watermark"
+SEARCH_WATERMARK_KEY = "search_watermark"
+
+
+@dataclass
+class ReplicaSyncResult:
+    upserted: dict[str, int] = field(default_factory=dict)
+    deleted: dict[str, int] = field(default_factory=dict)
+    items_pruned: int = 0
+    items_watermark: str | None = None
+    watermark_held: bool = False
+    round_trips: int = 0
+    duration_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "upserted": self.upserted,
+            "deleted": self.deleted,
+            "items_pruned": self.items_pruned,
+            "items_watermark": self.items_watermark,
+            "watermark_held": self.watermark_held,
+            "round_trips": self.round_trips,
+            "duration_s": self.duration_s,
+        }
+
+
+async def pipeline_lock_held(session) -> bool:
+    """Whether a daily run currently holds the MySQL advisory run lock."""
+    result = await session.execute(text("SELECT IS_USED_LOCK(:name)"), {"name": settings.run_lock_name})
+    return result.scalar() is not None
+
+
+async def _pull_changed(
+    session,
+    *,
+    columns: list,
+    where: tuple,
+    watermark: datetime | None,
+    apply: Callable[[list[dict]], int],
+    result: ReplicaSyncResult,
+) -> tuple[int, datetime | None]:
+    """Page items changed since `watermark` (less the overlap) by `(updated_at, id)` into `apply`.
+
+    Returns the rows applied and the newest `updated_at` seen.
+    """
+    since = watermark - timedelta(seconds=settings.replica_sync_overlap_s) if watermark else None
+    page_size = max(1, settings.replica_page_size)
+    newest = watermark
+    after: tuple[datetime, str] | None = None
+    applied = 0
+    while True:
+        stmt = select(*columns).where(*where)
+        if since is not None:
+            stmt = stmt.where(Item.updated_at >= since)
+        if after is not None:
+            stmt = stmt.where(or_(Item.updated_at > after[0], and_(Item.updated_at == after[0], Item.id > after[1])))
+        rows = [dict(row._mapping) for row in await session.execute(stmt.order_by(Item.updated_at, Item.id).limit(page_size))]
+        result.round_trips += 1
+        if not rows:
+            break
+        applied += await asyncio.to_thread(apply, rows)
+        after = (rows[-1]["updated_at"], rows[-1]["id"])
+        newest = after[0] if newest is None else max(newest, after[0])
+        if len(rows) < page_size:
+            break
+    return applied, newest
+
+
+async def sync_items(
+    session,
+    replica: LocalReplica,
+    *,
+    kept_since: datetime,
+    hold_watermark: bool,
+    full: bool,
+    result: ReplicaSyncResult,
+) -> None:
+    """Upsert items changed since the watermark (or every kept item when `full`)."""
+    stored = None if full else replica.get_meta(WATERMARK_KEY)
+    watermark = datetime.fromisoformat(stored) if stored else None
+    upserted, newest = await _pull_changed(
+        session,
+        columns=replicated_columns(Item),
+        where=(in_horizon(kept_since),),
+        watermark=watermark,
+        apply=lambda rows: replica.upsert(Item, rows),
+        result=result,
+    )
+    result.upserted["items"] = upserted
+    if newest is not None and not hold_watermark:
+        await asyncio.to_thread(replica.set_meta, WATERMARK_KEY, newest.isoformat())
+        watermark = newest
+    result.items_watermark = watermark.isoformat() if watermark else None
+
+
+async def sync_search_docs(
+    session,
+    replica: LocalReplica,
+    *,
+    now: datetime,
+    hold_watermark: bool,
+    full: bool,
+    result: ReplicaSyncResult,
+) -> None:
+    """Index every unexpired item changed since the search watermark, whatever its age."""
+    stored = None if full else replica.get_meta(SEARCH_WATERMARK_KEY)
+    columns = [
+        Item.id,
+        Item.updated_at,
+        *(Item.__table__.c[name] for name in FILTER_COLUMNS),
+        Item.title,
+        Item.summary_zh,
+        func.substr(Item.content_text, 1, SEARCH_CONTENT_CHARS).label("content_text"),
+    ]
+    upserted, newest = await _pull_changed(
+        session,
+        columns=columns,
+        where=(or_(Item.expires_at.is_(None), Item.expires_at > utc_naive(now)),),
+        watermark=datetime.fromisoformat(stored) if stored else None,
+        apply=replica.upsert_search_docs,
+        result=result,
+    )
+    result.upserted[search_docs.name] = upserted
+    if newest is not None and not hold_watermark:
+        await asyncio.to_thread(replica.set_meta, SEARCH_WATERMARK_KEY, newest.isoformat())
+
+
+async def sync_source_days(
+    session,
+    replica: LocalReplica,
+    *,
+    kept_since: datetime,
+    hold_watermark: bool,
+    full: bool,
+    result: ReplicaSyncResult,
+) -> None:
+    """Upsert per-source daily stats changed since their watermark (one query: sources x days is small)."""
+    stored = None if full else replica.get_meta(SOURCE_DAYS_WATERMARK_KEY)
+    stmt = select(*replicated_columns(SourceDailyStat)).where(SourceDailyStat.day >= kept_since.date())
+    if stored:
+        stmt = stmt.where(
+            SourceDailyStat.updated_at >= datetime.fromisoformat(stored) - timedelta(seconds=settings.replica_sync_overlap_s)
+        )
+    rows = [dict(row._mapping) for row in await session.execute(stmt)]
+    result.round_trips += 1
+    result.upserted[SourceDailyStat.__tablename__] = await asyncio.to_thread(replica.upsert, SourceDailyStat, rows)
+    if rows and not hold_watermark:
+        newest = max(row["updated_at"] for row in rows)
+        if not stored or newest > datetime.fromisoformat(stored):
+            await asyncio.to_thread(replica.set_meta, SOURCE_DAYS_WATERMARK_KEY, newest.isoformat())
+
+
+async def sync_keyed(session, replica: LocalReplica, model, *, version_columns: list, where: tuple, result: ReplicaSyncResult) -> None:
+    """Mirror a small table: refetch rows whose version columns changed, drop rows gone upstream."""
+    name = model.__tablename__
+    remote = {
+        row[0]: tuple(row[1:])
+        for row in await session.execute(select(model.id, *version_columns).where(*where))
+    }
+    result.round_trips += 1
+    local = await asyncio.to_thread(replica.versions, model, version_columns)
+    changed = [row_id for row_id, version in remote.items() if local.get(row_id) != version]
+    columns = replicated_columns(model)
+    upserted = 0
+    for offset in range(0, len(changed), FETCH_CHUNK):
+        chunk = changed[offset : offset + FETCH_CHUNK]
+        rows = [dict(row._mapping) for row in await session.execute(select(*columns).where(model.id.in_(chunk)))]
+        result.round_trips += 1
+        upserted += await asyncio.to_thread(replica.upsert, model, rows)
+    result.upserted[name] = upserted
+    result.deleted[name] = await asyncio.to_thread(replica.delete_ids, model, [row_id for row_id in local if row_id not in remote])
+
+
+async def sync_replica(
+    session_factory,
+    replica: LocalReplica,
+    *,
+    now: datetime | None = None,
+    full: bool = False,
+) -> ReplicaSyncResult:
+    """Bring the replica up to date with MySQL and record the sync as its new lag baseline."""
+    started = time.monotonic()
+    now = now or datetime.now(timezone.utc)
+    replica.status.last_attempt_at = now
+    kept_since = replica.horizon_start(now) - HORIZON_SLACK
+    result = ReplicaSyncResult()
+    try:
+        async with session_factory() as session:
+            result.watermark_held = await pipeline_lock_held(session)
+            result.round_trips += 1
+            await sync_items(
+                session, replica, kept_since=kept_since, hold_watermark=result.watermark_held, full=full, result=result
+            )
+            await sync_search_docs(
+                session, replica, now=now, hold_watermark=result.watermark_held, full=full, result=result
+            )
+            await sync_keyed(session, replica, Source, version_columns=[Source.updated_at], where=(), result=result)
+            await sync_keyed(
+                session,
+                replica,
+                Run,
+                version_columns=[Run.status, Run.finished_at],
+                where=(Run.started_at >= kept_since,),
+                result=result,
+            )
+            await sync_keyed(
+                session,
+                replica,
+                Digest,
+                version_columns=[Digest.generated_at, Digest.run_id],
+                where=(Digest.date >= kept_since.date(),),
+                result=result,
+            )
+            await sync_source_days(
+                session, replica, kept_since=kept_since, hold_watermark=result.watermark_held, full=full, result=result
+            )
+        result.items_pruned = await asyncio.to_thread(replica.prune_items, kept_since, utc_naive(now))
+        await asyncio.to_thread(replica.prune_source_days, kept_since.date())
+        result.deleted[search_docs.name] = await asyncio.to_thread(replica.prune_search_docs, now)
+    except Exception as exc:
+        replica.mark_failed(exc)
+        raise
+    result.duration_s = round(time.monotonic() - started, 3)
+    replica.mark_synced(now, result.as_dict())
+    return result
+
+
+async def replica_sync_loop(session_factory, replica: LocalReplica, *, interval_s: float | None = None) -> None:
+    """Sync on a fixed interval, then load the worker's related-items index if it changed; failures are logged and retried next tick."""
+    interval_s = settings.replica_sync_interval_s if interval_s is None else interval_s
+    while True:
+        try:
+            result = await sync_replica(session_factory, replica)
+            log.info("Replica synced: %s", result.as_dict())
+        except Exception as exc:
+            log.warning("Replica sync failed (serving from MySQL once lag exceeds %.0fs): %s", replica.max_lag_s, exc)
+        else:
+            if settings.related_enabled:
+                index = related_index()
+                if await asyncio.to_thread(index.load, settings.related_index_path):
+                    log.info("Related index loaded: %s", index.stats())
+        await asyncio.sleep(interval_s)
+
+
+def main() -> None:
+    """Run one replica sync from the command line."""
+    from src.db import async_session, engine
+    from src.replica.store import open_replica
+
+    parser = argparse.ArgumentParser(description="Sync the local SQLite read replica from MySQL")
+    parser.add_argument("--full", action="store_true", help="ignore the items watermark and reload the horizon")
+    args = parser.parse_args()
+
+    async def run() -> dict:
+        replica = open_replica()
+        try:
+            summary = (await sync_replica(async_session, replica, full=args.full)).as_dict()
+        finally:
+            await engine.dispose()
+        if settings.related_enabled:
+            summary["related"] = build_related_index(replica)
+        return summary
+
+    print(json.dumps(asyncio.run(run()), sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,41 @@ from datetime import datetime, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from src.ai.analyzer import Analyzer
+from src.api.cache import invalidate_response_cache
+from src.collector.dispatcher import collect_sources
+from src.collector.recording import TrafficRecording, recording_collector, recording_path, save_run_recording
 from src.config import settings
 from src.db import async_session
+from src.loop_watchdog import loop_watchdog, start_loop_watchdog
+from src.pipeline.cleanup import run_retention_job
+from src.pipeline.dedup_filter import prepare_dedup_filter, save_dedup_filter
+from src.models.compression import codec_stats
 from src.pipeline.output import oss_config_from_settings
+from src.pipeline.recompress import run_recompression
 from src.pipeline.run_lifecycle import compute_run_window, run_with_lifecycle
+from src.pipeline.run_profiler import run_profiler
 from src.pipeline.runner import PipelineOptions, load_approved_sources, run_daily_pipeline
+from src.replica import build_related_index, open_replica, sync_replica
 
 logging.basicConfig(level=getattr(logging, settings.log_level.upper()))
 log = logging.getLogger(__name__)
 
 
-async def daily_pipeline():
-    """Run one scheduled daily pipeline execution inside the lifecycle wrapper."""
+async def daily_pipeline(profile_mode: str | None = None):
+    """Run one scheduled daily pipeline execution inside the lifecycle wrapper.
+
+    `profile_mode` (cpu / memory / all / off) overrides `PIPELINE_PROFILE`.
+    With `COLLECTOR_RECORD_DIR` set, the run's collector traffic is recorded
+    there for offline replay.
+    """
     now = datetime.now(timezone.utc)
     async with async_session() as session:
         sources = await load_approved_sources(session)
         source_ids = [source.id for source in sources]
         window_start, window_end = await compute_run_window(session, now)
+        dedup_filter, filter_origin = await prepare_dedup_filter(session)
+        if dedup_filter is not None:
+            log.info("Dedup filter %s: %d hashes, %d bits", filter_origin, dedup_filter.count, dedup_filter.num_bits)
 
         async def runner(run):
             async def update_stats(stats_json):
@@ -34,13 +52,23 @@ async def daily_pipeline():
                 window_end=run.window_end,
                 hexo_posts_dir=settings.hexo_posts_dir,
                 oss_config=oss_config_from_settings() if settings.oss_bucket else None,
+                dedup_filter=dedup_filter,
+                profiler=run_profiler(run.id, profile_mode),
             )
+            recording = None
+            if settings.collector_record_dir:
+                recording = TrafficRecording(run.id, window_start=run.window_start, window_end=run.window_end)
             result = await run_daily_pipeline(
                 session,
                 Analyzer.nvidia_from_settings(),
                 options,
+                collector=recording_collector(recording) if recording is not None else collect_sources,
                 stats_updater=update_stats,
             )
+            if recording is not None:
+                result.stats_json["recording"] = save_run_recording(
+                    recording, recording_path(run.id, settings.collector_record_dir)
+                )
             return result.status, result.stats_json
 
         lifecycle = await run_with_lifecycle(
@@ -54,10 +82,64 @@ async def daily_pipeline():
             runner=runner,
         )
         await session.commit()
+    if dedup_filter is not None and lifecycle.status != "skipped" and lifecycle.run is not None:
+        # Saved only after commit, so the recorded run id always names a run
+        # whose inserts are in the DB; a crash before this point leaves the old
+        # id behind and the next run rebuilds instead of missing hashes.
+        dedup_filter.synced_run_id = lifecycle.run.id
+        try:
+            save_dedup_filter(dedup_filter, settings.dedup_filter_path)
+        except OSError as exc:
+            log.warning("Could not save dedup filter: %s", exc)
     if lifecycle.status == "skipped":
         log.info("Daily pipeline skipped: %s", lifecycle.skipped_reason)
         return
+    if settings.replica_enabled:
+        # Feed the shared replica file now rather than at the API's next tick.
+        replica = open_replica()
+        try:
+            sync_result = await sync_replica(async_session, replica)
+            log.info("Replica synced after run: %s", sync_result.as_dict())
+        except Exception as exc:
+            log.warning("Replica sync after run failed: %s", exc)
+        else:
+            if settings.related_enabled:
+                # Built here, not in the API: a rebuild is tens of seconds of CPU.
+                try:
+                    log.info("Related index saved: %s", await asyncio.to_thread(build_related_index, replica))
+                except Exception as exc:
+                    log.warning("Related index build failed: %s", exc)
+    # The run row, its items and the day's digests are committed together, so
+    # one invalidation covers "run finished" and "digest stored".
+    await invalidate_response_cache()
     log.info("Daily pipeline finished: status=%s stats=%s", lifecycle.status, lifecycle.run.stats_json if lifecycle.run else None)
+    log.info("Compressed column bytes: %s", codec_stats.snapshot())
+
+
+async def retention_job():
+    """Run one chunked retention pass outside the daily pipeline's transaction."""
+    result = await run_retention_job(async_session)
+    if result.status == "skipped":
+        log.info("Retention skipped: %s", result.skipped_reason)
+        return
+    if result.deleted:
+        await invalidate_response_cache()
+    log.info(
+        "Retention finished: status=%s deleted=%d archived=%d chunks=%d duration_s=%.1f reached_max_rows=%s stopped=%s",
+        result.status,
+        result.deleted,
+        result.archived,
+        result.chunks,
+        result.duration_s,
+        result.reached_max_rows,
+        result.skipped_reason,
+    )
+
+
+async def recompression_job():
+    """Compress a bounded batch of rows written before the CompressedText codec."""
+    result = await run_recompression(async_session)
+    log.info("Recompression finished: %s", result.as_dict())
 
 
 async def _serve():
@@ -67,12 +149,50 @@ async def _serve():
     scheduler = AsyncIOScheduler()
     minute, hour, *_ = settings.collect_cron.split()
     scheduler.add_job(daily_pipeline, "cron", hour=int(hour), minute=int(minute), id="daily_pipeline")
+    retention_minute, retention_hour, *_ = settings.retention_cron.split()
+    scheduler.add_job(
+        retention_job, "cron", hour=int(retention_hour), minute=int(retention_minute), id="retention", max_instances=1
+    )
+    if settings.recompress_cron:
+        recompress_minute, recompress_hour, *_ = settings.recompress_cron.split()
+        scheduler.add_job(
+            recompression_job,
+            "cron",
+            hour=int(recompress_hour),
+            minute=int(recompress_minute),
+            id="recompression",
+            max_instances=1,
+        )
     scheduler.start()
-    log.info("Scheduler started — daily pipeline at %02d:%02d UTC", int(hour), int(minute))
+    start_loop_watchdog()
+    metrics_server = await _start_metrics_server()
+    log.info(
+        "Scheduler started — daily pipeline at %02d:%02d UTC, retention at %02d:%02d UTC",
+        int(hour), int(minute), int(retention_hour), int(retention_minute),
+    )
     try:
         await asyncio.Event().wait()  # run until the process is stopped
     finally:
         scheduler.shutdown(wait=False)
+        await loop_watchdog.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+
+
+async def _start_metrics_server():
+    """Serve this process's metrics (pipeline, collectors, LLM calls, pool) when METRICS_PORT is set."""
+    if not settings.metrics_port:
+        return None
+    from src.db import engine
+    from src.deep.pipeline import install_queue_metrics
+    from src.metrics import serve_metrics
+    from src.pool_monitor import install_pool_metrics
+
+    install_pool_metrics(engine)
+    install_queue_metrics(async_session, ttl_s=settings.metrics_queue_ttl_s)
+    server = await serve_metrics(settings.metrics_port, settings.metrics_host)
+    log.info("Metrics served on %s:%d/metrics", settings.metrics_host, settings.metrics_port)
+    return server
 
 
 def main():
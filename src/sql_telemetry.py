@@ -0,0 +1,291 @@
+"""Per-statement SQL telemetry from engine events.
+
+Every statement on an instrumented engine is recorded with its fingerprint
+(the SQL text with literals and `IN (...)` lists collapsed), latency, rows
+returned and approximate payload bytes (statement + parameters sent; the
+buffered result rows received). Each statement plus each COMMIT/ROLLBACK is
+one round trip on the cross-border link.
+
+Records go to three places:
+
+- the `SqlScope` bound to the current context: one per HTTP request (see the
+  request-id middleware in `src/main.py`) and one per pipeline stage
+  (`SqlStages`, stored under `runs.stats_json["sql"]`);
+- process-wide per-fingerprint totals, served by `/stats/sql`;
+- the log, for statements slower than `SQL_SLOW_MS`, sampled to at most one
+  line per fingerprint every `SQL_SLOW_LOG_INTERVAL_S`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterator
+
+from sqlalchemy import event
+
+from src.config import settings
+
+log = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?|:\w+)(?:\s*,\s*(?:%s|\?|:\w+))+\s*\)")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement text with literals, placeholder lists and whitespace collapsed."""
+    sql = _STRING.sub("?", statement)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?+)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """(12-char id, normalized text) for one statement."""
+    normalized = normalize_sql(statement)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+def value_size(value: Any) -> int:
+    """Approximate wire size of one parameter or column value."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    if isinstance(value, (datetime, date)):
+        return len(value.isoformat())
+    if isinstance(value, (int, float, Decimal, bool)):
+        return len(str(value))
+    return len(str(value).encode("utf-8"))
+
+
+def parameters_size(parameters: Any) -> int:
+    if parameters is None:
+        return 0
+    if isinstance(parameters, dict):
+        return sum(value_size(value) for value in parameters.values())
+    if isinstance(parameters, (list, tuple)):
+        return sum(
+            parameters_size(value) if isinstance(value, (dict, list, tuple)) else value_size(value)
+            for value in parameters
+        )
+    return value_size(parameters)
+
+
+class SqlScope:
+    """Totals for the statements of one request or one pipeline stage."""
+
+    def __init__(self):
+        self.statements = 0
+        self.round_trips = 0
+        self.elapsed_ms = 0.0
+        self.rows = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.slowest_ms = 0.0
+        self.slowest: str | None = None
+
+    def record(self, fid: str, elapsed_ms: float, rows: int, sent: int, received: int) -> None:
+        self.statements += 1
+        self.round_trips += 1
+        self.elapsed_ms += elapsed_ms
+        self.rows += rows
+        self.bytes_sent += sent
+        self.bytes_received += received
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest = fid
+
+    def record_round_trip(self) -> None:
+        self.round_trips += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "statements": self.statements,
+            "round_trips": self.round_trips,
+            "ms": round(self.elapsed_ms, 1),
+            "rows": self.rows,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "slowest": {"fingerprint": self.slowest, "ms": round(self.slowest_ms, 1)} if self.slowest else None,
+        }
+
+
+class SqlStages:
+    """Routes statements to the scope of the pipeline stage in progress.
+
+    `enter(name)` starts a stage and ends the previous one; re-entering a
+    stage adds to its totals. Statements before the first stage are not
+    attributed.
+    """
+
+    def __init__(self):
+        self.scopes: dict[str, SqlScope] = {}
+        self.current: SqlScope | None = None
+
+    def enter(self, name: str) -> None:
+        self.current = self.scopes.setdefault(name, SqlScope())
+
+    def record(self, *args) -> None:
+        if self.current is not None:
+            self.current.record(*args)
+
+    def record_round_trip(self) -> None:
+        if self.current is not None:
+            self.current.record_round_trip()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        return {name: scope.summary() for name, scope in self.scopes.items()}
+
+
+_scope: ContextVar[SqlScope | SqlStages | None] = ContextVar("sql_scope", default=None)
+
+
+@contextmanager
+def sql_scope(scope: SqlScope | SqlStages | None = None) -> Iterator[SqlScope | SqlStages]:
+    """Bind `scope` (a new `SqlScope` by default) to statements run in this context."""
+    scope = scope if scope is not None else SqlScope()
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def enter_sql_stage(name: str) -> None:
+    """Start pipeline stage `name` when the current context records `SqlStages`; no-op otherwise."""
+    scope = _scope.get()
+    if isinstance(scope, SqlStages):
+        scope.enter(name)
+
+
+class FingerprintStats:
+    """Process-wide totals per statement fingerprint, bounded to `max_entries`."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.dropped = 0
+        self.slow = 0
+        self._last_logged: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, fid: str, sql: str, elapsed_ms: float, rows: int, sent: int, received: int) -> None:
+        with self._lock:
+            entry = self.entries.get(fid)
+            if entry is None:
+                if len(self.entries) >= self.max_entries:
+                    self.dropped += 1
+                    return
+                entry = self.entries[fid] = {
+                    "fingerprint": fid, "sql": sql[:500], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "rows": 0, "bytes_sent": 0, "bytes_received": 0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += rows
+            entry["bytes_sent"] += sent
+            entry["bytes_received"] += received
+
+    def should_log_slow(self, fid: str, now: float) -> bool:
+        """Count a slow statement; True when its fingerprint has not been logged within the interval."""
+        with self._lock:
+            self.slow += 1
+            last = self._last_logged.get(fid)
+            if last is not None and now - last < settings.sql_slow_log_interval_s:
+                return False
+            self._last_logged[fid] = now
+            return True
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self.entries.values(), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+            return [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 1),
+                }
+                for entry in entries
+            ]
+
+    def summary(self, limit: int) -> dict[str, Any]:
+        return {
+            "fingerprints": len(self.entries),
+            "dropped": self.dropped,
+            "slow_statements": self.slow,
+            "slow_ms": settings.sql_slow_ms,
+            "top": self.top(limit),
+        }
+
+
+fingerprint_stats = FingerprintStats(settings.sql_max_fingerprints)
+
+
+def record_statement(
+    statement: str, parameters: Any, elapsed_ms: float, rows: int, received: int, *, stats: FingerprintStats | None = None
+) -> None:
+    """Add one executed statement to the current scope, the fingerprint totals and the slow log."""
+    stats = stats or fingerprint_stats
+    fid, sql = fingerprint(statement)
+    sent = len(statement.encode("utf-8")) + parameters_size(parameters)
+    scope = _scope.get()
+    if scope is not None:
+        scope.record(fid, elapsed_ms, rows, sent, received)
+    stats.record(fid, sql, elapsed_ms, rows, sent, received)
+    if elapsed_ms >= settings.sql_slow_ms and stats.should_log_slow(fid, time.monotonic()):
+        log.warning(
+            "Slow SQL %s: %.0f ms, %d rows, %d B sent, %d B received: %s",
+            fid, elapsed_ms, rows, sent, received, sql[:300],
+        )
+
+
+def _result_size(cursor) -> tuple[int, int]:
+    """(rows, bytes) of a buffered result; async adapters hold it in `_rows` before the caller fetches."""
+    buffered = getattr(cursor, "_rows", None)
+    if buffered is not None:
+        return len(buffered), sum(value_size(value) for row in buffered for value in row)
+    rowcount = getattr(cursor, "rowcount", -1)
+    return max(rowcount or 0, 0), 0
+
+
+def install_sql_telemetry(engine) -> None:
+    """Record every statement and transaction end on `engine` (sync or async)."""
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(_conn, _cursor, _statement, _parameters, context, _executemany):
+        context._sql_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(_conn, cursor, statement, parameters, context, _executemany):
+        elapsed_ms = (time.perf_counter() - context._sql_started) * 1000
+        rows, received = _result_size(cursor)
+        record_statement(statement, parameters, elapsed_ms, rows, received)
+
+    @event.listens_for(target, "commit")
+    def _commit(_conn):
+        scope = _scope.get()
+        if scope is not None:
+            scope.record_round_trip()
+
+    @event.listens_for(target, "rollback")
+    def _rollback(_conn):
+        scope = _scope.get()
+        if scope is not None:
+            scope.record_round_trip()
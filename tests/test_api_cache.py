@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import cache as cache_module
+from src.api.cache import MemoryBackend, ResponseCache, cache_key
+from src.api.runs import list_runs
+from src.config import settings
+
+
+class FakeRequest:
+    headers = {}
+
+    def __init__(self):
+        from types import SimpleNamespace
+
+        self.state = SimpleNamespace()
+
+
+class BrokenBackend:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ttl_s):
+        raise ConnectionError("redis down")
+
+    async def clear(self):
+        raise ConnectionError("redis down")
+
+
+def test_cache_key_drops_unset_params_and_sorts_the_rest():
+    assert cache_key("digests/latest", {"format": "json", "domain": "ai", "q": None, "x": ""}) == (
+        "intel:api:v1:digests/latest?domain=ai&format=json"
+    )
+    assert cache_key("stats", {"date": None}) == cache_key("stats", {})
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_and_expires():
+    backend = MemoryBackend(max_entries=2)
+    await backend.set("a", "1", 60)
+    await backend.set("b", "2", 60)
+    assert await backend.get("a") == "1"
+    await backend.set("c", "3", 60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == "1"
+
+    await backend.set("gone", "x", -1)
+    assert await backend.get("gone") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load_and_later_calls_hit():
+    cache = ResponseCache(MemoryBackend(8))
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"total": 3}
+
+    waiting = [asyncio.create_task(cache.get_or_load("stats", {"date": "2026-06-01"}, loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiting)
+
+    assert results == [{"total": 3}] * 5
+    assert calls == 1
+    assert await cache.get_or_load("stats", {"date": "2026-06-01"}, loader) == {"total": 3}
+    assert calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_loader_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResponseCache(MemoryBackend(8))
+    calls = 0
+
+    async def missing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise HTTPException(status_code=404)
+
+    results = await asyncio.gather(
+        cache.get_or_load("runs/latest", {}, missing),
+        cache.get_or_load("runs/latest", {}, missing),
+        return_exceptions=True,
+    )
+
+    assert [getattr(r, "status_code", None) for r in results] == [404, 404]
+    assert calls == 1
+    with pytest.raises(HTTPException):
+        await cache.get_or_load("runs/latest", {}, missing)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_invalidates_entries():
+    cache = ResponseCache(MemoryBackend(8))
+    version = 1
+
+    async def loader():
+        return version
+
+    assert await cache.get_or_load("runs", {"limit": 20}, loader) == 1
+    version = 2
+    assert await cache.get_or_load("runs", {"limit": 20}, loader) == 1
+    assert await cache.clear() == 1
+    assert await cache.get_or_load("runs", {"limit": 20}, loader) == 2
+
+
+@pytest.mark.asyncio
+async def test_backend_failures_fall_back_to_direct_loads():
+    cache = ResponseCache(BrokenBackend())
+
+    async def loader():
+        return ["fresh"]
+
+    assert await cache.get_or_load("sources", {}, loader) == ["fresh"]
+    assert await cache.clear() == 0
+    assert cache.stats()["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_route_serves_cached_data_with_the_current_request_id(monkeypatch):
+    cache = ResponseCache(MemoryBackend(8))
+    monkeypatch.setattr("src.api.runs.response_cache", cache)
+
+    class Session:
+        executed = 0
+
+        async def execute(self, _statement):
+            Session.executed += 1
+
+            class Result:
+                def scalars(self):
+                    return self
+
+                def all(self):
+                    return []
+
+            return Result()
+
+    first = await list_runs(FakeRequest(), limit=5, db=Session())
+    second = await list_runs(FakeRequest(), limit=5, db=Session())
+
+    assert Session.executed == 1
+    assert first["data"] == second["data"] == []
+    assert first["meta"]["request_id"] != second["meta"]["request_id"]
+
+
+def test_module_cache_uses_memory_backend_without_redis_url():
+    if settings.redis_url:
+        pytest.skip("REDIS_URL configured")
+    assert isinstance(cache_module.response_cache.backend, MemoryBackend)
@@ -1,35 +1,114 @@
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 import pytest
 
-from src.pipeline.cleanup import delete_expired_items
+from src.pipeline.cleanup import run_retention_job
 
 
-class FakeDeleteResult:
-    rowcount = 3
+class ChunkSession:
+    """Session over an in-memory set of expired item ids, one instance per chunk."""
 
+    def __init__(self, store):
+        self.store = store
 
-class FakeSession:
-    def __init__(self):
-        self.statements = []
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
 
     async def execute(self, statement):
-        """Capture the delete statement issued by the cleanup routine."""
-        self.statements.append(statement)
-        return FakeDeleteResult()
+        sql = str(statement)
+        self.store["statements"].append(sql)
+        if "FROM runs" in sql:
+            return SimpleNamespace(scalar_one_or_none=lambda: self.store.get("running"))
+        params = statement.compile().params
+        if sql.startswith("SELECT items.id"):
+            after = params["id_1"]
+            ids = sorted(i for i in self.store["expired"] if i > after)[: params["param_1"]]
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: ids))
+        if sql.startswith("INSERT IGNORE INTO items_archive"):
+            return SimpleNamespace(rowcount=len(params["id_1"]))
+        if sql.startswith("UPDATE daily_item_rollups"):
+            assert "items.id IN" in sql
+            return SimpleNamespace(rowcount=1)
+        if sql.startswith("DELETE FROM items"):
+            ids = [i for i in params["id_1"] if i in self.store["expired"]]
+            self.store["expired"] -= set(ids)
+            return SimpleNamespace(rowcount=len(ids))
+        raise AssertionError(sql)
+
+    async def commit(self):
+        self.store["commits"] += 1
+
+
+def _chunk_store(count, running=None):
+    return {"expired": {f"item-{i:03d}" for i in range(count)}, "statements": [], "commits": 0, "running": running}
+
+
+@pytest.mark.asyncio
+async def test_run_retention_job_deletes_in_committed_pk_chunks_with_pauses():
+    store = _chunk_store(7)
+    pauses = []
+
+    async def sleep(seconds):
+        pauses.append(seconds)
+
+    result = await run_retention_job(
+        lambda: ChunkSession(store),
+        now=datetime(2026, 5, 26, tzinfo=timezone.utc),
+        chunk_size=3,
+        max_rows=0,
+        pause_s=0.25,
+        archive=False,
+        sleep=sleep,
+    )
+
+    assert (result.status, result.deleted, result.chunks, result.archived) == ("succeeded", 7, 3, 0)
+    assert store["expired"] == set()
+    assert store["commits"] == 3
+    assert pauses == [0.25, 0.25]
+    assert not any("items_archive" in sql for sql in store["statements"])
+    assert all("ORDER BY items.id" in sql for sql in store["statements"] if sql.startswith("SELECT items.id"))
 
 
 @pytest.mark.asyncio
-async def test_delete_expired_items_uses_expires_at_cutoff():
-    session = FakeSession()
-    now = datetime(2026, 5, 26, 8, 0, tzinfo=timezone.utc)
-
-    count = await delete_expired_items(session, now)
-
-    assert count == 3
-    assert len(session.statements) == 1
-    statement = session.statements[0]
-    compiled = str(statement.compile(compile_kwargs={"literal_binds": True}))
-    assert "DELETE FROM items" in compiled
-    assert "items.expires_at IS NOT NULL" in compiled
-    assert "items.expires_at < '2026-05-26 08:00:00+00:00'" in compiled
+async def test_run_retention_job_respects_max_rows_and_archives_first():
+    store = _chunk_store(10)
+
+    result = await run_retention_job(
+        lambda: ChunkSession(store),
+        chunk_size=4,
+        max_rows=6,
+        pause_s=0,
+        archive=True,
+    )
+
+    assert (result.deleted, result.archived, result.chunks, result.reached_max_rows) == (6, 6, 2, True)
+    assert len(store["expired"]) == 4
+    statements = [sql.split()[0] for sql in store["statements"] if not sql.startswith("SELECT runs")]
+    assert statements == ["SELECT", "INSERT", "UPDATE", "DELETE", "SELECT", "INSERT", "UPDATE", "DELETE"]
+
+
+@pytest.mark.asyncio
+async def test_run_retention_job_skips_while_pipeline_runs():
+    store = _chunk_store(3, running=SimpleNamespace(id="run_1"))
+
+    result = await run_retention_job(lambda: ChunkSession(store), chunk_size=2, max_rows=0, pause_s=0)
+
+    assert (result.status, result.skipped_reason, result.deleted) == ("skipped", "run_in_progress", 0)
+    assert len(store["expired"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_run_retention_job_stops_when_a_run_starts_mid_pass():
+    store = _chunk_store(7)
+
+    async def sleep(_seconds):
+        store["running"] = SimpleNamespace(id="run_2")  # a run starts during the pause
+
+    result = await run_retention_job(lambda: ChunkSession(store), chunk_size=3, max_rows=0, pause_s=0.1, sleep=sleep)
+
+    assert (result.status, result.skipped_reason, result.deleted, result.chunks) == ("partial", "run_in_progress", 3, 1)
+    assert len(store["expired"]) == 4
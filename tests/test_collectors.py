@@ -9,6 +9,8 @@ import pytest
 from src.collector.api import GenericAPICollector, HackerNewsCollector
 from src.collector.dispatcher import collect_sources, collection_stats, create_collector, fetch_source
 from src.collector.github import GitHubAdvisoryCollector
+from src.collector.nvd import NVDCollector
+from src.collector.recording import RecordingTransport, ReplayTransport, TrafficRecording
 from src.collector.rss import RSSCollector
 
 
@@ -45,6 +47,7 @@ async def test_github_advisory_collector_parses_advisories_with_cve_metadata():
     assert items[0].source_id == "security_github_advisories"
     assert items[0].native_id == "GHSA-7q4f-pgqx-h3vh"
     assert items[0].metadata["cve_ids"] == ["CVE-2026-31415"]
+    assert items[0].metadata["ghsa_id"] == "GHSA-7q4f-pgqx-h3vh"
     assert items[0].metadata["severity"] == "high"
 
 
@@ -255,3 +258,45 @@ async def test_fetch_source_failure_degrades_then_disables_source():
     assert source.consecutive_failures == 3
     assert source.health == "disabled"
     assert source.last_fetch_status == "source_parse_error"
+
+
+@pytest.mark.asyncio
+async def test_recorded_collector_traffic_replays_offline(tmp_path):
+    rss = (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+        "<item><title>Recorded post</title><link>https://example.com/p/1</link><guid>p1</guid>"
+        "<pubDate>Tue, 26 May 2026 06:00:00 GMT</pubDate></item></channel></rss>"
+    )
+    nvd = {"totalResults": 1, "vulnerabilities": [{"cve": {
+        "id": "CVE-2026-1111", "published": "2026-05-26T05:00:00.000",
+        "descriptions": [{"lang": "en", "value": "Heap overflow"}],
+    }}]}
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "feeds.example.com":
+            return httpx.Response(200, text=rss, headers={"content-type": "application/rss+xml"})
+        return httpx.Response(200, json=nvd)
+
+    since = datetime(2026, 5, 25, tzinfo=timezone.utc)
+    recording = TrafficRecording("run_1", window_start=since, window_end=datetime(2026, 5, 26, tzinfo=timezone.utc))
+
+    def collectors(transport):
+        return (
+            RSSCollector("security_blog", "https://feeds.example.com/rss", {"_transport": transport}),
+            NVDCollector("security_nvd_cve", "https://services.nvd.example/cves", {"_transport": transport}),
+        )
+
+    recorded = [await c.fetch(since=since) for c in collectors(RecordingTransport(recording, httpx.MockTransport(upstream)))]
+    path = recording.save(tmp_path / "run_1.jsonl.gz")
+    loaded = TrafficRecording.load(path)
+    replay = ReplayTransport(loaded)
+    replayed = [await c.fetch(since=since) for c in collectors(replay)]  # NVD's pubEndDate differs now
+    missing = await httpx.AsyncClient(transport=replay).get("https://feeds.example.com/other")
+
+    assert len(loaded.exchanges) == 2 and loaded.window_start == since
+    assert [[item.title for item in items] for items in replayed] == [
+        [item.title for item in items] for items in recorded
+    ] == [["Recorded post"], ["CVE-2026-1111: Heap overflow"]]
+    assert replay.requests == 2 and replay.misses == ["GET https://feeds.example.com/other"]
+    assert missing.status_code == 404
+
@@ -0,0 +1,118 @@
+import os
+import zlib
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from src.models.compression import (
+    MARKER,
+    PLAIN_MARKER,
+    CodecStats,
+    CompressedText,
+    compress_text,
+    decompress_text,
+    pack_stored,
+)
+from src.models.digest import Digest
+from src.pipeline.recompress import pending_rows_query, run_recompression
+
+
+def test_compress_text_round_trips_and_only_compresses_when_it_pays(monkeypatch):
+    stats = CodecStats()
+    monkeypatch.setattr("src.models.compression.codec_stats", stats)
+    markdown = "# 情报日报\n\n" + "- CVE-2026-1000 影响 linux kernel\n" * 200
+
+    packed = compress_text(markdown)
+    short = compress_text("short digest")
+
+    assert packed.startswith(MARKER)
+    assert len(packed) < len(markdown.encode("utf-8")) / 5
+    assert short == b"short digest"
+    assert decompress_text(packed) == markdown
+    assert decompress_text(short) == "short digest"
+    assert stats.values_written == 2 and stats.values_read == 2
+    assert stats.bytes_saved_on_write == stats.bytes_saved_on_read > 0
+    assert stats.snapshot()["write_compression_ratio"] > 4
+
+
+def test_decompress_text_reads_rows_from_before_the_codec():
+    legacy = "# 旧日报\n".encode("utf-8") * 100
+
+    assert decompress_text(legacy) == "# 旧日报\n" * 100
+    assert decompress_text(memoryview(MARKER + zlib.compress(b"abc"))) == "abc"
+    assert decompress_text(PLAIN_MARKER + b"abc") == "abc"
+    assert decompress_text("already text") == "already text"
+
+
+def test_compressed_text_column_is_mediumblob_on_mysql():
+    column_type = Digest.__table__.c.content_markdown.type
+
+    assert isinstance(column_type, CompressedText)
+    assert column_type.load_dialect_impl(mysql.dialect()).__class__.__name__ == "MEDIUMBLOB"
+
+
+def test_pending_rows_query_skips_small_and_already_compressed_rows():
+    sql = str(pending_rows_query(Digest.content_markdown, after_id="d1", limit=10).compile(dialect=mysql.dialect()))
+
+    assert "length(digests.content_markdown) >=" in sql
+    assert "left(digests.content_markdown, %s) NOT IN" in sql
+    assert "ORDER BY digests.id" in sql
+
+
+def test_incompressible_values_are_stored_with_the_plain_marker():
+    noise = os.urandom(400)
+
+    assert pack_stored(noise) == PLAIN_MARKER + noise
+    assert pack_stored(b"a" * 400).startswith(MARKER)
+
+
+class RecompressSession:
+    """One batch session over an in-memory `digests` table: {id: stored bytes}."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if statement.is_select:
+            pending = sorted(
+                (row_id, stored)
+                for row_id, stored in self.rows.items()
+                if row_id > params["id_1"]
+                and len(stored) >= params["length_1"]
+                and not stored.startswith((MARKER, PLAIN_MARKER))
+            )
+            return _Rows(pending[: params["param_3"]])
+        self.rows[params["id_1"]] = params["content_markdown"]
+
+    async def commit(self):
+        pass
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_recompression_gets_past_a_batch_of_incompressible_rows():
+    digest = ("# 情报日报\n" + "- CVE-2026-1000 影响 linux kernel\n" * 50).encode("utf-8")
+    rows = {f"d{i:02d}": os.urandom(400) for i in range(4)}
+    rows.update({f"d{i:02d}": digest for i in range(4, 6)})
+
+    first = await run_recompression(lambda: RecompressSession(rows), tables=["digests"], batch_size=4, max_rows=4)
+    second = await run_recompression(lambda: RecompressSession(rows), tables=["digests"], batch_size=4, max_rows=4)
+
+    assert (first.rows_scanned, first.rows_marked_plain, first.rows_rewritten) == (4, 4, 0)
+    assert (second.rows_scanned, second.rows_marked_plain, second.rows_rewritten) == (2, 0, 2)
+    assert all(stored.startswith(PLAIN_MARKER) for row_id, stored in rows.items() if row_id < "d04")
+    assert decompress_text(rows["d05"]) == digest.decode("utf-8")
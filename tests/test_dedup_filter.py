@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.pipeline.dedup_filter import (
+    DedupBloomFilter,
+    load_dedup_filter,
+    prepare_dedup_filter,
+    save_dedup_filter,
+)
+
+
+class FakeSession:
+    def __init__(self, hashes=(), latest_run_id=None):
+        self.hashes = list(hashes)
+        self.latest_run_id = latest_run_id
+        self.statements = []
+
+    async def execute(self, statement):
+        """Answer the dedup-hash scan and latest-run lookups."""
+        sql = str(statement)
+        self.statements.append(sql)
+        if "FROM runs" in sql:
+            return SimpleNamespace(scalar_one_or_none=lambda: self.latest_run_id)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.hashes))
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = DedupBloomFilter.with_capacity(1000, 0.01)
+    bloom.update(f"known-{i}" for i in range(1000))
+
+    assert all(f"known-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"unknown-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert not bloom.saturated
+
+
+def test_bloom_filter_round_trips_through_file_and_rejects_corruption(tmp_path):
+    bloom = DedupBloomFilter.with_capacity(100, 0.01)
+    bloom.update(["a", "b"])
+    bloom.synced_run_id = "run_20260526_160000"
+    path = tmp_path / "var" / "dedup.bin"
+
+    save_dedup_filter(bloom, path)
+    loaded = load_dedup_filter(path)
+
+    assert loaded.synced_run_id == "run_20260526_160000"
+    assert loaded.count == 2 and "a" in loaded and loaded.bits == bloom.bits
+    path.write_bytes(path.read_bytes()[:-3])
+    assert load_dedup_filter(path) is None
+    assert load_dedup_filter(tmp_path / "missing.bin") is None
+
+
+@pytest.mark.asyncio
+async def test_prepare_dedup_filter_reuses_synced_file_and_rebuilds_stale_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "dedup_filter_enabled", True)
+    path = tmp_path / "dedup.bin"
+    session = FakeSession(hashes=["h1", "h2"], latest_run_id="run_2")
+
+    bloom, origin = await prepare_dedup_filter(session, path=path, capacity=100, fp_rate=0.01)
+    assert origin == "rebuilt:missing"
+    assert "h1" in bloom and "h2" in bloom
+
+    bloom.synced_run_id = "run_2"
+    save_dedup_filter(bloom, path)
+    session.statements.clear()
+    reused, origin = await prepare_dedup_filter(session, path=path, capacity=100, fp_rate=0.01)
+    assert origin == "loaded"
+    assert not any("FROM items" in sql for sql in session.statements)
+
+    session.latest_run_id = "run_3"
+    _, origin = await prepare_dedup_filter(session, path=path, capacity=100, fp_rate=0.01)
+    assert origin == "rebuilt:stale"
+
+
+@pytest.mark.asyncio
+async def test_prepare_dedup_filter_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "dedup_filter_enabled", False)
+
+    assert await prepare_dedup_filter(FakeSession()) == (None, "disabled")
@@ -102,6 +102,20 @@ def test_select_candidates_filters_security_ghsa_items_by_score():
     assert selected == [(high, "GHSA-7q4f-pgqx-h3vh")]
 
 
+def test_select_candidates_prefers_ingest_time_ghsa_mapping():
+    mapped = _item(id="security_nvd_cve:CVE-2026-1000", source_id="security_nvd_cve", title="CVE-2026-1000", canonical_url="https://nvd.nist.gov/vuln/detail/CVE-2026-1000")
+    unmapped = _item(insight_score=95)
+
+    selected = select_candidates(
+        [mapped, unmapped],
+        min_score=50,
+        limit=5,
+        ghsa_by_item={"security_nvd_cve:CVE-2026-1000": "GHSA-7q4f-pgqx-h3vh"},
+    )
+
+    assert selected == [(mapped, "GHSA-7q4f-pgqx-h3vh")]
+
+
 @pytest.mark.asyncio
 async def test_enqueue_candidates_inserts_without_committing_outer_transaction():
     session = FakeSession()
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.items import list_items
+from src.pipeline.identifiers import (
+    Identifier,
+    VulnMatchIndex,
+    backfill_identifiers,
+    extract_identifiers,
+    first_identifier,
+    normalize_identifier,
+)
+
+
+def test_extract_identifiers_prefers_structured_metadata_over_text_mentions():
+    identifiers = extract_identifiers(
+        title="CVE-2026-1000 and cve-2026-2000 in pkg (CWE-79)",
+        canonical_url="https://github.com/advisories/GHSA-7Q4F-pgqx-h3vh",
+        metadata={
+            "ghsa_id": "GHSA-7q4f-pgqx-h3vh",
+            "cve_ids": ["CVE-2026-1000"],
+            "vulnerabilities": [{"package": {"ecosystem": "pip", "name": "Django"}}],
+        },
+    )
+
+    assert set(identifiers) == {
+        Identifier("cve", "CVE-2026-1000", True),
+        Identifier("ghsa", "GHSA-7q4f-pgqx-h3vh", True),
+        Identifier("package", "pip:django", False),
+        Identifier("cve", "CVE-2026-2000", False),
+        Identifier("cwe", "CWE-79", False),
+    }
+
+
+def test_extract_identifiers_skips_plain_titles_and_malformed_values():
+    assert extract_identifiers(title="Weekly roundup", canonical_url=None, metadata={"cve_id": "CVE-1"}) == ()
+    assert normalize_identifier("ghsa", "GHSA-too-short") is None
+    assert normalize_identifier("cve", 42) is None
+
+
+def test_first_identifier_prefers_primary_values():
+    identifiers = (Identifier("ghsa", "GHSA-aaaa-aaaa-aaaa"), Identifier("ghsa", "GHSA-bbbb-bbbb-bbbb", True))
+
+    assert first_identifier(identifiers, "ghsa") == "GHSA-bbbb-bbbb-bbbb"
+    assert first_identifier(identifiers, "cve") is None
+
+
+def test_vuln_match_index_ignores_text_mentions_and_conflicting_primaries():
+    index = VulnMatchIndex()
+    stored = SimpleNamespace(id="security_nvd_cve:CVE-2026-1000")
+    index.register(stored, [Identifier("cve", "CVE-2026-1000", True), Identifier("ghsa", "GHSA-aaaa-aaaa-aaaa", True)])
+
+    assert index.match([Identifier("cve", "CVE-2026-1000", False)]) is None
+    assert index.match([Identifier("cve", "CVE-2026-1000", True)]) is stored
+    assert (
+        index.match([Identifier("cve", "CVE-2026-1000", True), Identifier("ghsa", "GHSA-bbbb-bbbb-bbbb", True)])
+        is None
+    )
+    assert index.missing_for(stored.id, [Identifier("cwe", "CWE-79"), Identifier("cve", "CVE-2026-1000", True)]) == [
+        Identifier("cwe", "CWE-79")
+    ]
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        """Record the list query and return an empty page."""
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: [])
+
+
+@pytest.mark.asyncio
+async def test_list_items_filters_by_normalized_cve():
+    session = CapturingSession()
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    await list_items(request, cve=" cve-2026-1000 ", limit=10, db=session)
+
+    sql = str(session.statements[0])
+    assert "items.id IN (SELECT item_identifiers.item_id" in sql
+    assert session.statements[0].compile().params["value_1"] == "CVE-2026-1000"
+
+
+class BackfillSession:
+    """One batch session over a fixed item list whose identifier table ignores duplicates."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        if params is None:
+            after = statement.compile().params["id_1"]
+            rows = [row for row in self.store["items"] if row[0] > after]
+            return SimpleNamespace(all=lambda: rows)
+        keys = {(row["kind"], row["value"], row["item_id"]) for row in params}
+        inserted = keys - self.store["identifiers"]
+        self.store["identifiers"] |= inserted
+        return SimpleNamespace(rowcount=len(inserted))
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_backfill_identifiers_counts_only_inserted_rows():
+    store = {
+        "items": [("a", "CVE-2026-1000 fixed", "https://example.com/a", {}), ("b", "Plain title", "https://example.com/b", {})],
+        "identifiers": set(),
+    }
+
+    assert await backfill_identifiers(lambda: BackfillSession(store)) == 1
+    assert await backfill_identifiers(lambda: BackfillSession(store)) == 0
@@ -70,3 +70,57 @@ def test_item_cursor_encoding_is_opaque_but_decodable_by_contract():
 
     assert "security_nvd_cve" not in cursor
     assert ":" not in cursor
+
+
+def test_items_list_query_leaves_cold_columns_out_unless_benchmarking_eager_shape():
+    import bench_items_page
+
+    lean = str(bench_items_page.list_statement(eager=False, limit=20, after=None))
+    eager = str(bench_items_page.list_statement(eager=True, limit=20, after=(90, "item-1")))
+
+    assert "items.content_text" not in lean
+    assert "items.metadata_json" not in lean
+    assert "items.content_text" in eager and "items.metadata_json" in eager
+    assert bench_items_page.rows_size([("abc", None, {"k": "é"}, 42)]) == 3 + 0 + len('{"k": "é"}'.encode()) + 2
+
+    from src.api.items import item_columns
+
+    projected = str(bench_items_page.page_statement(item_columns(("title",)), limit=20, after=None))
+    assert projected.startswith("SELECT items.id, items.insight_score, items.title \nFROM items")
+
+
+@pytest.mark.asyncio
+async def test_items_list_projects_rows_to_the_serialized_shape(tmp_path):
+    import json
+    from types import SimpleNamespace
+
+    from sqlalchemy import select
+
+    from src.api.contracts import allowed_source_ids
+    from src.api.items import list_items
+    from src.models.item import Item
+    from src.replica.store import LocalReplica
+
+    db = LocalReplica(tmp_path / "upstream.sqlite3").open()
+    item = FakeItem()
+    row = {name: value for name, value in vars(item).items()}
+    row.update(
+        source_id=sorted(allowed_source_ids())[0], dedup_hash="hash-1", created_at=item.fetched_at,
+        updated_at=item.fetched_at, content_text="cold body", metadata_json={"raw": True},
+    )
+    db.upsert(Item, [row])
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    response = await list_items(request, limit=10, fields=None, db=db.session)
+    trimmed = await list_items(request, limit=10, fields="title, insight_score", db=db.session)
+    stored = (await db.session.execute(select(Item))).scalars().one()
+    with pytest.raises(HTTPException) as exc:
+        await list_items(request, limit=10, fields="title,content_text", db=db.session)
+    db.close()
+
+    data = json.loads(response.body)["data"]
+    assert data == [json.loads(json.dumps(_serialize_item(stored), default=lambda value: value.isoformat()))]
+    assert "content_text" not in data[0] and "metadata_json" not in data[0]
+    assert json.loads(trimmed.body)["data"] == [{"title": "CVE-2026-31415", "insight_score": 92}]
+    assert exc.value.status_code == 400
+    assert exc.value.detail["code"] == "invalid_param"
@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.pipeline.lineage import (
+    LATENCY_BUCKETS_S,
+    insight_latency_rows,
+    latency_bucket,
+    latency_percentiles,
+    lineage_times,
+    mark_lineage,
+    start_lineage,
+)
+
+FETCHED = datetime(2026, 5, 26, 7, 0, tzinfo=timezone.utc)
+
+
+def _item(published_at=None, source_id="security_nvd_cve"):
+    return SimpleNamespace(lineage=None, published_at=published_at, domain="security", source_id=source_id)
+
+
+def test_lineage_records_each_step_once_as_offsets_from_the_fetch():
+    item = _item(published_at=datetime(2026, 5, 26, 1, 0))
+
+    start_lineage(item, fetched_at=FETCHED, persisted_at=FETCHED + timedelta(seconds=40))
+    mark_lineage(item, "stage1", FETCHED + timedelta(minutes=5))
+    mark_lineage(item, "stage1", FETCHED + timedelta(minutes=9))
+    mark_lineage(item, "digest", (FETCHED + timedelta(minutes=20)).replace(tzinfo=None))
+    untracked = _item()
+    mark_lineage(untracked, "stage1", FETCHED)
+
+    assert item.lineage == [int(FETCHED.timestamp()), 40, 300, None, 1200]
+    times = lineage_times(item.lineage)
+    assert times["stage1"] == FETCHED + timedelta(minutes=5)
+    assert times["stage2"] is None
+    assert untracked.lineage is None
+    rows = insight_latency_rows([item, untracked], day=date(2026, 5, 26))
+    # published 01:00, digested 07:20 -> 6h20m, in the (6h, 8h] bucket
+    assert rows == [{"day": date(2026, 5, 26), "domain": "security", "source_id": "security_nvd_cve", "bucket": 6, "items": 1}]
+
+
+def test_latency_percentiles_report_bucket_bounds():
+    counts = {latency_bucket(600): 10, latency_bucket(5000): 8, latency_bucket(10**7): 2}
+
+    summary = latency_percentiles(counts)
+
+    assert summary == {"items": 20, "p50_s": 900, "p95_s": None}
+    assert latency_percentiles({}) == {"items": 0, "p50_s": None, "p95_s": None}
+    assert latency_bucket(LATENCY_BUCKETS_S[-1] + 1) == len(LATENCY_BUCKETS_S)
+
+
+@pytest.mark.asyncio
+async def test_time_to_insight_groups_bucket_counts_by_domain_and_source():
+    from src.api.stats import compute_time_to_insight
+
+    class Session:
+        async def execute(self, _statement):
+            return [("security", "src_a", 2, 3), ("security", "src_b", 9, 1), ("ai", "src_c", 0, 4)]
+
+    data = await compute_time_to_insight(Session(), 7)
+
+    assert data["overall"] == {"items": 8, "p50_s": 900, "p95_s": 86400}
+    assert data["by_domain"]["security"] == {"items": 4, "p50_s": 3600, "p95_s": 86400}
+    assert data["by_source"]["src_c"] == {"domain": "ai", "items": 4, "p50_s": 900, "p95_s": 900}
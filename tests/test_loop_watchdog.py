@@ -0,0 +1,50 @@
+import asyncio
+import time
+import traceback
+
+import pytest
+
+from src.loop_watchdog import BlockReport, LoopWatchdog, blocking_site, loop_blocked
+
+
+def blocking_call(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_attributes_a_blocking_call_to_its_site():
+    watchdog = LoopWatchdog(interval_s=0.01, threshold_ms=50)
+    run_report = watchdog.attach(BlockReport())
+    before = loop_blocked.value(site="tests/test_loop_watchdog.py:blocking_call")
+
+    watchdog.start()
+    await asyncio.sleep(0.05)
+    blocking_call(0.3)
+    await asyncio.sleep(0.05)
+    watchdog.detach(run_report)
+    blocking_call(0.3)
+    await asyncio.sleep(0.05)
+    await watchdog.stop()
+
+    site = "tests/test_loop_watchdog.py:blocking_call"
+    process = watchdog.snapshot()
+    assert process["running"] is False
+    assert process["blocked"] == 2
+    [offender] = process["offenders"]
+    assert offender["site"] == site and offender["count"] == 2
+    assert offender["max_ms"] >= 200
+    assert any("blocking_call" in line for line in offender["stack"])
+    assert run_report.summary()["blocked"] == 1
+    assert run_report.summary()["max_lag_ms"] >= 200
+    assert loop_blocked.value(site=site) == before + 2
+
+
+def test_blocking_site_skips_library_frames():
+    repo_file = __file__.replace("tests/test_loop_watchdog.py", "src/collector/rss.py")
+    frames = [
+        traceback.FrameSummary(repo_file, 10, "parse_feed"),
+        traceback.FrameSummary("/usr/lib/python3/site-packages/feedparser/api.py", 200, "parse"),
+    ]
+
+    assert blocking_site(frames) == "src/collector/rss.py:parse_feed"
+    assert blocking_site(frames[1:]) == "api.py:parse"
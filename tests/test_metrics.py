@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.ai.analyzer import Analyzer, ModelPolicy
+from src.ai.client import OpenAICompatibleClient
+from src.metrics import MetricsRegistry, llm_errors, llm_request_seconds, llm_retries, llm_tokens, serve_metrics
+
+
+def test_registry_renders_text_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.histogram("req_seconds", "Request latency.", ("route",), buckets=(0.1, 1.0))
+    fetched = registry.counter("fetch_bytes_total", "Bytes.", ("source_id",))
+    requests.observe(0.05, route="/api/v1/items")
+    requests.observe(2.0, route="/api/v1/items")
+    fetched.inc(512, source_id='we"ird')
+
+    text = asyncio.run(registry.render())
+
+    assert "# TYPE req_seconds histogram" in text
+    assert 'req_seconds_bucket{route="/api/v1/items",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{route="/api/v1/items",le="+Inf"} 2' in text
+    assert 'req_seconds_count{route="/api/v1/items"} 2' in text
+    assert 'fetch_bytes_total{source_id="we\\"ird"} 512' in text
+    with pytest.raises(ValueError):
+        fetched.inc(source="x")
+
+
+@pytest.mark.asyncio
+async def test_analyzer_records_llm_latency_tokens_retries_and_errors():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, text="busy")
+        if len(calls) == 2:
+            return httpx.Response(
+                200,
+                json={"choices": [{"message": {"content": "not json"}}], "usage": {"prompt_tokens": 7, "completion_tokens": 3}},
+            )
+        return httpx.Response(400, text="bad request")
+
+    client = OpenAICompatibleClient("https://example.test/v1", "k", "metrics-test", transport=httpx.MockTransport(handler))
+    policy = ModelPolicy(timeout_s=5, retries=1, retry_backoff_s=(0.0,), temperature=0.1, max_tokens=64)
+    analyzer = Analyzer(client, stage1_model="m-metrics", stage2_model="m-metrics", stage1_policy=policy)
+    labels = {"stage": "stage1", "model": "m-metrics", "provider": "metrics-test"}
+    try:
+        outcome = await analyzer.analyze_stage1({"id": "i", "title": "t", "content_text": "c"}, {"id": "s"})
+    finally:
+        await client.aclose()
+
+    assert outcome.error == "model_provider_error"
+    assert llm_request_seconds.count(outcome="ok", **labels) == 1
+    assert llm_request_seconds.count(outcome="error", **labels) == 1
+    assert llm_tokens.value(kind="prompt", **labels) == 7
+    assert llm_retries.value(**labels) == 1
+    assert llm_errors.value(category="model_provider_error", **labels) == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.gauge("queue_depth", "Depth.", ("status",))
+    registry.on_collect(lambda: registry.metrics["queue_depth"].set(3, status="queued"))
+    server = await serve_metrics(0, "127.0.0.1", registry)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient() as http:
+            ok = await http.get(f"http://127.0.0.1:{port}/metrics")
+            missing = await http.get(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert ok.status_code == 200 and ok.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'queue_depth{status="queued"} 3' in ok.text
+    assert missing.status_code == 404
@@ -1,11 +1,15 @@
 import asyncio
-from datetime import datetime, timezone
+import json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 
 import add_sources
+import bench_hot_paths
+import load_api
+import load_harness
 import migrate
 import run_pipeline
 import verify_production
@@ -82,11 +86,26 @@ def test_list_migration_files_rejects_invalid_names(tmp_path):
         migrate.list_migration_files(tmp_path)
 
 
+def _repo_migration_names():
+    return [path.name for path in migrate.list_migration_files(Path("migrations"))]
+
+
 def test_repo_migrations_are_numbered_and_latest_runtime_patch_exists():
     files = migrate.list_migration_files(Path("migrations"))
 
-    assert [path.name for path in files] == ["001_init.sql", "002_deep_analysis_runtime_columns.sql"]
-    assert "claimed_at" in files[-1].read_text(encoding="utf-8")
+    assert [path.name for path in files] == [
+        "001_init.sql",
+        "002_deep_analysis_runtime_columns.sql",
+        "003_item_identifiers.sql",
+        "004_items_archive.sql",
+        "005_compressed_text_columns.sql",
+        "006_items_updated_at.sql",
+        "007_daily_item_rollups.sql",
+        "008_source_daily_stats.sql",
+        "009_item_lineage.sql",
+    ]
+    assert "claimed_at" in files[1].read_text(encoding="utf-8")
+    assert "item_identifiers" in files[2].read_text(encoding="utf-8")
 
 
 def test_build_ssl_context_respects_verify_tls_setting(monkeypatch):
@@ -216,6 +235,7 @@ async def test_run_pipeline_dry_run_rolls_back_and_reports_summary(monkeypatch):
 
     async def fake_run_daily_pipeline(session, analyzer, options, *, collector, stats_updater):
         assert options.oss_config is None
+        assert options.profiler is None
         assert callable(collector)
         await stats_updater({"stage": "fetch"})
         await stats_updater({"stage": "done"})
@@ -249,6 +269,7 @@ async def test_run_pipeline_dry_run_rolls_back_and_reports_summary(monkeypatch):
         load_approved_sources=fake_load_approved_sources,
         run_daily_pipeline=fake_run_daily_pipeline,
         run_with_lifecycle=fake_run_with_lifecycle,
+        run_profiler=lambda run_id, mode: None,
     )
     monkeypatch.setattr(run_pipeline, "_pipeline_deps", lambda: fake_deps)
 
@@ -380,7 +401,7 @@ def test_verify_production_accepts_latest_partial_run_with_persisted_artifacts(t
             "item_count": 115,
             "analyzed_count": 45,
             "digests": [security_digest, ai_digest],
-            "applied_migrations": ["001_init.sql", "002_deep_analysis_runtime_columns.sql"],
+            "applied_migrations": _repo_migration_names(),
         },
         domains=["security", "ai"],
         posts_dir=tmp_path,
@@ -421,7 +442,7 @@ def test_verify_production_rejects_missing_hexo_or_digest_mismatch(tmp_path):
             "item_count": 1,
             "analyzed_count": 1,
             "digests": [digest],
-            "applied_migrations": ["001_init.sql", "002_deep_analysis_runtime_columns.sql"],
+            "applied_migrations": _repo_migration_names(),
         },
         domains=["security"],
         posts_dir=tmp_path,
@@ -484,5 +505,103 @@ def test_verify_production_rejects_pending_migrations(tmp_path):
     )
 
     assert ok is False
-    assert summary["migrations"]["pending"] == ["002_deep_analysis_runtime_columns.sql"]
+    assert summary["migrations"]["pending"] == _repo_migration_names()[1:]
     assert "migration_policy_failed" in summary["errors"]
+
+
+def test_bench_hot_paths_saves_a_baseline_and_flags_regressions(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+
+    assert bench_hot_paths.main(["--sizes", "20", "--repeat", "1", "--save", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    assert set(saved["results"]) == {benchmark.name for benchmark in bench_hot_paths.BENCHMARKS}
+    assert saved["results"]["normalize_raw_item"]["20"]["median_s"] > 0
+
+    current = {"normalize_raw_item": {"20": {"median_s": 0.3}}, "canonicalize_url": {"20": {"median_s": 0.1}}}
+    previous = {"normalize_raw_item": {"20": {"median_s": 0.2}}, "canonicalize_url": {"20": {"median_s": 0.1}}}
+    rows = bench_hot_paths.compare(current, previous, threshold=1.2)
+    assert [(row["benchmark"], row["regression"]) for row in rows] == [
+        ("normalize_raw_item", True),
+        ("canonicalize_url", False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_load_harness_runs_the_pipeline_against_local_stand_ins(tmp_path):
+    args = load_harness.parse_args([
+        "--feeds", "1", "--items-per-feed", "5", "--feed-latency-ms", "0", "--llm-latency-ms", "0",
+        "--llm-429-rate", "0.1", "--llm-malformed-rate", "0.1", "--no-retry-backoff", "--seed", "3",
+    ])
+
+    report = await load_harness.run_load(args)
+
+    assert report["feeds"] == {"sources": 4, "requests": 4, "bytes": report["feeds"]["bytes"]}
+    assert report["inserted"] + report["duplicates"] == 20
+    assert report["duplicates"] > 0  # GHSA and NVD entries share CVE ids
+    assert {"collect", "persist", "stage1", "digest"} <= set(report["profile"]["stages"])
+    assert report["profile"]["stages"]["stage1"]["calls"]["count"] == report["inserted"]
+    assert report["llm"]["rate_limited"] + report["llm"]["malformed"] > 0
+    assert report["oss"]["objects"] == sum(
+        1 for result in report["stats"]["digest"].values() if isinstance(result, dict) and result.get("oss_url")
+    )
+    assert "stage1" in load_harness.format_report(report)
+
+
+@pytest.mark.asyncio
+async def test_load_harness_replays_a_collector_recording(tmp_path):
+    from src.collector.dispatcher import collect_sources
+    from src.collector.recording import TrafficRecording, recording_collector
+
+    now = datetime.now(timezone.utc)
+    feeds = load_harness.FeedServer(items_per_feed=3, content_bytes=200, latency_s=0, now=now)
+    server = load_harness.LocalHTTPServer(feeds.handle)
+    sources = load_harness.synthetic_sources(await server.start(), 1)
+    recording = TrafficRecording("run_rec", window_start=now - timedelta(hours=24), window_end=now)
+    try:
+        await recording_collector(recording, collect_sources)(sources, since=recording.window_start)
+    finally:
+        await server.close()
+    path = recording.save(tmp_path / "run_rec.jsonl.gz")
+    args = load_harness.parse_args(["--replay", str(path), "--llm-latency-ms", "0"])
+
+    report = await load_harness.run_load(args)
+
+    assert report["feeds"]["sources"] == 4 and report["feeds"]["requests"] == 4
+    assert report["feeds"]["misses"] == []
+    assert report["inserted"] + report["duplicates"] == 12
+    assert "not in recording" in load_harness.format_report(report)
+
+
+@pytest.mark.asyncio
+async def test_load_api_reports_latency_per_shape_and_flags_scans_and_filesorts():
+    import httpx
+
+    plan = {"query_block": {
+        "ordering_operation": {"using_filesort": True, "nested_loop": [
+            {"table": {"table_name": "items", "access_type": "ALL", "rows_examined_per_scan": 2000000}},
+            {"table": {"table_name": "item_identifiers", "access_type": "ref", "key": "PRIMARY"}},
+        ]},
+    }}
+    assert load_api.plan_findings(plan) == ["filesort", "full scan of items (~2000000 rows)"]
+    assert load_api.plan_findings({"query_block": {"table": {"table_name": "items", "access_type": "range"}}}) == []
+
+    mix = load_api.query_mix(60, ["security", "ai"], seed=4)
+    assert mix == load_api.query_mix(60, ["security", "ai"], seed=4)
+    seen = []
+
+    async def app(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url)
+        if "missing" in str(request.url) or request.url.params.get("category") == "other":
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json={"data": [], "meta": {"next_cursor": "c2"}})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(app), base_url="http://api") as client:
+        latency = await load_api.drive(client, mix, concurrency=4, sources=[("security_nvd_cve", "security")])
+
+    assert sum(row["requests"] for row in latency.values()) == 60
+    assert set(latency) == {shape for shape, _ in mix}
+    assert all(row["p50_ms"] <= row["p99_ms"] <= row["max_ms"] for row in latency.values())
+    assert any(url.params.get("cursor") == "c2" for url in seen) == ("cursor" in latency)
+    assert any(url.path.startswith("/api/v1/items/security_nvd_cve:load-") for url in seen) == ("detail" in latency)
+    assert "FLAG filesort" in load_api.format_report(latency, {"list": [{"sql": "SELECT", "findings": ["filesort"]}]})
+
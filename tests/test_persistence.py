@@ -5,6 +5,7 @@ import pytest
 
 from src.ai.analyzer import Stage1Outcome, Stage2Outcome
 from src.ai.contracts import Stage1Analysis, Stage2Analysis
+from src.pipeline.dedup_filter import DedupBloomFilter
 from src.pipeline.ingestion import NormalizedItem
 from src.pipeline.persistence import (
     apply_stage1_outcome,
@@ -17,27 +18,35 @@ from src.pipeline.persistence import (
 
 
 class FakeResult:
-    def __init__(self, item):
-        self.item = item
+    def __init__(self, items=(), rows=None):
+        self.items = list(items)
+        self.rows = rows or []
 
-    def scalar_one_or_none(self):
-        """Return the prepared item for fake scalar lookups."""
-        return self.item
+    def scalars(self):
+        """Return the prepared items for fake scalar lookups."""
+        return SimpleNamespace(all=lambda: self.items)
+
+    def all(self):
+        return self.rows
 
 
 class FakeSession:
-    def __init__(self, existing_by_hash=None, fail_on_execute=False):
+    def __init__(self, existing_by_hash=None, fail_on_execute=False, identifier_rows=None):
         self.existing_by_hash = existing_by_hash or {}
         self.fail_on_execute = fail_on_execute
+        self.identifier_rows = identifier_rows or []
+        self.looked_up = []
         self.added = []
 
     async def execute(self, stmt):
-        """Return fake dedup lookups or raise a configured DB failure."""
+        """Return fake dedup/identifier lookups or raise a configured DB failure."""
         if self.fail_on_execute:
             raise RuntimeError("db failed")
+        if "FROM item_identifiers" in str(stmt):
+            return FakeResult(rows=self.identifier_rows)
         where = list(stmt._where_criteria)[0]
-        dedup_hash = where.right.value
-        return FakeResult(self.existing_by_hash.get(dedup_hash))
+        self.looked_up.extend(where.right.value)
+        return FakeResult(self.existing_by_hash[h] for h in where.right.value if h in self.existing_by_hash)
 
     def add(self, item):
         """Record inserted ORM items."""
@@ -134,6 +143,101 @@ async def test_persist_normalized_items_inserts_new_and_counts_duplicates():
     assert existing.also_seen_in[0]["source_id"] == "security_github_advisories"
 
 
+@pytest.mark.asyncio
+async def test_persist_normalized_items_merges_advisory_sharing_stored_cve():
+    existing = item_model_from_normalized(
+        _normalized(id="security_nvd_cve:CVE-2026-1000", metadata_json={"cve_id": "CVE-2026-1000"})
+    )
+    advisory = _normalized(
+        id="security_github_advisories:GHSA-abcd-efgh-ijkl",
+        source_id="security_github_advisories",
+        dedup_hash="hash-advisory",
+        canonical_url="https://github.com/advisories/GHSA-abcd-efgh-ijkl",
+        metadata_json={"ghsa_id": "GHSA-ABCD-efgh-ijkl", "cve_ids": ["cve-2026-1000"], "cwe_ids": ["CWE-79"]},
+    )
+    session = FakeSession(identifier_rows=[("cve", "CVE-2026-1000", True, existing)])
+
+    result = await persist_normalized_items(
+        session,
+        [advisory],
+        source_authority_by_id={"security_nvd_cve": "official", "security_github_advisories": "official"},
+    )
+
+    assert result.inserted == []
+    assert result.duplicates == 1
+    assert result.vuln_merges == 1
+    assert existing.also_seen_in[0]["source_id"] == "security_github_advisories"
+    assert sorted((row.kind, row.value, row.item_id) for row in session.added) == [
+        ("cwe", "CWE-79", "security_nvd_cve:CVE-2026-1000"),
+        ("ghsa", "GHSA-abcd-efgh-ijkl", "security_nvd_cve:CVE-2026-1000"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_persist_normalized_items_keeps_advisories_with_conflicting_ghsa_separate():
+    first = _normalized(
+        id="security_github_advisories:GHSA-aaaa-aaaa-aaaa",
+        source_id="security_github_advisories",
+        dedup_hash="hash-a",
+        metadata_json={"ghsa_id": "GHSA-aaaa-aaaa-aaaa", "cve_ids": ["CVE-2026-2000"]},
+    )
+    second = _normalized(
+        id="security_github_advisories:GHSA-bbbb-bbbb-bbbb",
+        source_id="security_github_advisories",
+        dedup_hash="hash-b",
+        metadata_json={"ghsa_id": "GHSA-bbbb-bbbb-bbbb", "cve_ids": ["CVE-2026-2000"]},
+    )
+    nvd = _normalized(
+        id="security_nvd_cve:CVE-2026-2000",
+        dedup_hash="hash-c",
+        metadata_json={"cve_id": "CVE-2026-2000"},
+    )
+    session = FakeSession()
+
+    result = await persist_normalized_items(
+        session,
+        [first, second, nvd],
+        source_authority_by_id={"security_nvd_cve": "official", "security_github_advisories": "official"},
+    )
+
+    assert [item.id for item in result.inserted] == [
+        "security_github_advisories:GHSA-aaaa-aaaa-aaaa",
+        "security_github_advisories:GHSA-bbbb-bbbb-bbbb",
+    ]
+    assert result.vuln_merges == 1
+    assert result.inserted[0].also_seen_in[0]["source_id"] == "security_nvd_cve"
+    assert [i.value for i in result.identifiers["security_github_advisories:GHSA-bbbb-bbbb-bbbb"]] == [
+        "CVE-2026-2000",
+        "GHSA-bbbb-bbbb-bbbb",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_persist_normalized_items_only_looks_up_possible_bloom_hits():
+    existing = item_model_from_normalized(_normalized(dedup_hash="hash-existing"))
+    dedup_filter = DedupBloomFilter.with_capacity(100, 0.001)
+    dedup_filter.update(["hash-existing", "hash-retained-elsewhere"])
+    session = FakeSession(existing_by_hash={"hash-existing": existing})
+
+    result = await persist_normalized_items(
+        session,
+        [
+            _normalized(id="security_nvd_cve:CVE-1", dedup_hash="hash-existing"),
+            _normalized(id="security_nvd_cve:CVE-2", dedup_hash="hash-new"),
+            _normalized(id="security_nvd_cve:CVE-3", dedup_hash="hash-new"),
+            _normalized(id="security_nvd_cve:CVE-4", dedup_hash="hash-retained-elsewhere"),
+        ],
+        source_authority_by_id={"security_nvd_cve": "official"},
+        dedup_filter=dedup_filter,
+    )
+
+    assert session.looked_up == ["hash-existing", "hash-retained-elsewhere"]
+    assert [item.id for item in result.inserted] == ["security_nvd_cve:CVE-2", "security_nvd_cve:CVE-4"]
+    assert result.duplicates == 2
+    assert (result.dedup_checked, result.dedup_lookups_saved, result.dedup_false_positives) == (3, 1, 1)
+    assert "hash-new" in dedup_filter
+
+
 @pytest.mark.asyncio
 async def test_persist_normalized_items_counts_per_item_errors():
     session = FakeSession(fail_on_execute=True)
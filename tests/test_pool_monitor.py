@@ -0,0 +1,87 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from src.pool_monitor import FirstUseRetrySession, PoolHealth, ping_idle_connections
+
+
+class FakeConnection:
+    def __init__(self, engine, record):
+        self.engine = engine
+        self.record = record
+
+    async def __aenter__(self):
+        self.engine.idle.remove(self.record)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.record["idle_since"] = time.monotonic()
+        self.engine.idle.append(self.record)
+        return False
+
+    async def get_raw_connection(self):
+        return SimpleNamespace(info=self.record)
+
+    async def exec_driver_sql(self, sql):
+        if self.record.get("broken"):
+            raise DBAPIError(sql, {}, ConnectionResetError("gone"), connection_invalidated=True)
+
+    async def execute(self, statement):
+        self.engine.connects += 1
+
+    async def rollback(self):
+        pass
+
+    async def invalidate(self):
+        self.record.pop("broken")
+
+
+class FakeEngine:
+    """FIFO pool of idle connection records."""
+
+    def __init__(self, records):
+        self.idle = list(records)
+        self.connects = 0
+        self.sync_engine = SimpleNamespace(pool=SimpleNamespace(checkedin=lambda: len(self.idle)))
+
+    def connect(self):
+        return FakeConnection(self, self.idle[0])
+
+
+@pytest.mark.asyncio
+async def test_keepalive_pings_idle_connections_and_replaces_dead_ones():
+    old = time.monotonic() - 600
+    engine = FakeEngine([{"idle_since": old}, {"idle_since": old, "broken": True}, {"idle_since": time.monotonic()}])
+    health = PoolHealth()
+
+    pinged = await ping_idle_connections(engine, health, idle_s=60)
+
+    assert pinged == 2
+    assert (health.pings, health.ping_failures, health.evicted, health.reconnects) == (2, 1, 1, 1)
+    assert sum(health.rtt_counts) == 1
+    assert engine.connects == 1
+    assert len(engine.idle) == 3 and not any(record.get("broken") for record in engine.idle)
+    assert health.snapshot()["rtt_ms"]["histogram"]["le_50"] == 1
+
+
+@pytest.mark.asyncio
+async def test_first_use_disconnect_is_retried_once():
+    session = FirstUseRetrySession()
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise DBAPIError("SELECT 1", {}, ConnectionResetError("gone"), connection_invalidated=True)
+        return "rows"
+
+    assert await session._retry_first_use(flaky) == "rows"
+    assert len(calls) == 2
+
+    async def failing():
+        raise DBAPIError("SELECT 1", {}, ValueError("bad"), connection_invalidated=False)
+
+    with pytest.raises(DBAPIError):
+        await session._retry_first_use(failing)
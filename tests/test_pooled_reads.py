@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from src.api.reads import PooledReads, execute_all
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def freeze(self):
+        return lambda: FakeResult(list(self.rows))
+
+    def all(self):
+        return self.rows
+
+
+class FakeSessions:
+    """Session factory whose sessions take one tick per query and track overlap."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return FakeResult([statement])
+
+
+@pytest.mark.asyncio
+async def test_pooled_reads_run_statements_concurrently_up_to_the_limit():
+    sessions = FakeSessions()
+    reads = PooledReads(sessions, limit=2)
+
+    results = await execute_all(reads, a="A", b="B", c="C")
+
+    assert {name: result.all() for name, result in results.items()} == {"a": ["A"], "b": ["B"], "c": ["C"]}
+    assert sessions.opened == 3
+    assert sessions.peak == 2
+    header = reads.server_timing()
+    assert [entry.split(";dur=")[0] for entry in header.split(", ")] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_execute_all_runs_one_after_another_on_a_plain_session():
+    sessions = FakeSessions()
+
+    results = await execute_all(sessions, stats_daily_counts="A", stats_source_health="B")
+
+    assert [result.all() for result in results.values()] == [["A"], ["B"]]
+    assert sessions.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_dashboard_combines_cached_parts(monkeypatch):
+    from types import SimpleNamespace
+
+    from src.api import dashboard
+
+    async def part(name):
+        return name
+
+    monkeypatch.setattr(dashboard, "cached_stats", lambda db, date: part({"date": date}))
+    monkeypatch.setattr(dashboard, "cached_latest_run", lambda db: part(None))
+    monkeypatch.setattr(dashboard, "cached_source_views", lambda db: part([{"id": "src-a"}]))
+    monkeypatch.setattr(dashboard, "cached_recent_digests", lambda db, domain: part([]))
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    body = await dashboard.get_dashboard(request, db=PooledReads(FakeSessions()))
+
+    assert body["data"] == {"stats": {"date": None}, "latest_run": None, "sources": [{"id": "src-a"}], "digests": []}
@@ -0,0 +1,418 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+
+from src.api.contracts import allowed_source_ids
+from src.config import settings
+from src.models.digest import Digest
+from src.models.item import Item
+from src.models.run import Run
+from src.models.source import Source
+from src.models.source_daily_stat import SourceDailyStat
+from src.replica import store as replica_store
+from src.replica import sync as replica_sync
+from src.replica.store import LocalReplica, read_newest, read_one, read_replica
+from src.replica.sync import sync_replica
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _item(item_id, *, fetched_days_ago, updated, score=50, title="title", expires_at=None):
+    fetched = NOW.replace(tzinfo=None) - timedelta(days=fetched_days_ago)
+    return {
+        "id": item_id,
+        "source_id": sorted(allowed_source_ids())[0],
+        "domain": "security",
+        "title": title,
+        "canonical_url": f"https://example.com/{item_id}",
+        "published_at": fetched,
+        "fetched_at": fetched,
+        "dedup_hash": f"hash-{item_id}",
+        "tags": ["tag"],
+        "summary_zh": f"{title} 摘要",
+        "insight_score": score,
+        "credibility": "high",
+        "analysis_stage": 1,
+        "expires_at": expires_at,
+        "created_at": fetched,
+        "updated_at": updated,
+    }
+
+
+def _source(source_id, updated):
+    return {
+        "id": source_id,
+        "name": source_id,
+        "domain": "security",
+        "type": "rss",
+        "url": "https://example.com/feed",
+        "fetch_strategy": "l1_rss",
+        "authority": "regular",
+        "status": "approved",
+        "health": "good",
+        "consecutive_failures": 0,
+        "is_active": True,
+        "updated_at": updated,
+    }
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """A SQLite database shaped like MySQL, standing in for the remote side."""
+    db = LocalReplica(tmp_path / "upstream.sqlite3", horizon_days=30).open()
+    with db.engine.begin() as conn:
+        # The replica leaves the (deferred) body out; MySQL has it for the search index.
+        conn.exec_driver_sql("ALTER TABLE items ADD COLUMN content_text")
+    t0 = datetime(2026, 6, 1, 8, 0)
+    db.upsert(
+        Item,
+        [
+            _item("recent-1", fetched_days_ago=1, updated=t0),
+            _item("recent-2", fetched_days_ago=2, updated=t0 + timedelta(minutes=1), score=80),
+            _item("old", fetched_days_ago=90, updated=t0),
+        ],
+    )
+    db.upsert(Source, [_source(sorted(allowed_source_ids())[0], t0), _source("src-b", t0)])
+    db.upsert(
+        Run,
+        [
+            {"id": "run_new", "kind": "daily", "status": "succeeded", "window_start": t0, "window_end": t0,
+             "started_at": t0, "finished_at": t0, "stats_json": {"items": 2}},
+            {"id": "run_old", "kind": "daily", "status": "succeeded", "window_start": t0, "window_end": t0,
+             "started_at": t0 - timedelta(days=60), "finished_at": t0 - timedelta(days=60)},
+        ],
+    )
+    db.upsert(
+        Digest,
+        [{"id": "2026-06-01:security", "date": date(2026, 6, 1), "domain": "security", "title": "Daily",
+          "content_markdown": "# Daily\n" * 100, "generated_at": t0}],
+    )
+    db.upsert(
+        SourceDailyStat,
+        [{"source_id": sorted(allowed_source_ids())[0], "day": date(2026, 5, 31), "fetches": 1, "items_new": 2,
+          "updated_at": t0},
+         {"source_id": sorted(allowed_source_ids())[0], "day": date(2026, 3, 1), "fetches": 1, "updated_at": t0}],
+    )
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    local = LocalReplica(tmp_path / "replica.sqlite3", horizon_days=30, max_lag_s=600).open()
+    monkeypatch.setattr(replica_store, "_active", local)
+    yield local
+    local.close()
+
+
+def _factory(upstream):
+    @asynccontextmanager
+    async def factory():
+        yield upstream.session
+
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def lock_free(monkeypatch):
+    async def held(_session):
+        return False
+
+    monkeypatch.setattr(replica_sync, "pipeline_lock_held", held)
+
+
+@pytest.mark.asyncio
+async def test_first_sync_copies_the_horizon_and_records_the_watermark(upstream, replica):
+    result = await sync_replica(_factory(upstream), replica, now=NOW)
+
+    assert replica.row_counts() == {"sources": 2, "runs": 1, "items": 2, "digests": 1, "source_daily_stats": 1}
+    assert result.items_watermark == "2026-06-01T08:01:00"
+    assert read_replica(NOW + timedelta(minutes=1)) is replica
+
+    items = (await replica.session.execute(select(Item).order_by(Item.insight_score.desc()))).scalars().all()
+    assert [item.id for item in items] == ["recent-2", "recent-1"]
+    assert items[0].tags == ["tag"]
+    assert isinstance(items[0].fetched_at, datetime)
+    digest = (await replica.session.execute(select(Digest))).scalar_one()
+    assert digest.content_markdown.startswith("# Daily")
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_applies_changes_deletions_and_expiry(upstream, replica):
+    await sync_replica(_factory(upstream), replica, now=NOW)
+    later = datetime(2026, 6, 1, 9, 0)
+    upstream.upsert(Item, [_item("recent-1", fetched_days_ago=1, updated=later, title="renamed")])
+    upstream.upsert(Item, [_item("recent-3", fetched_days_ago=0, updated=later, expires_at=datetime(2026, 5, 1))])
+    upstream.delete_ids(Source, ["src-b"])
+    upstream.upsert(Run, [{"id": "run_next", "kind": "daily", "status": "partial", "window_start": later,
+                           "window_end": later, "started_at": later}])
+
+    result = await sync_replica(_factory(upstream), replica, now=NOW + timedelta(hours=1))
+
+    # recent-2 is re-read too: it sits inside the watermark overlap window.
+    assert result.upserted["items"] == 3
+    assert result.items_pruned == 1
+    assert result.deleted["sources"] == 1
+    assert result.upserted["runs"] == 1
+    assert result.upserted["digests"] == 0
+    renamed = (await replica.session.execute(select(Item).where(Item.id == "recent-1"))).scalar_one()
+    assert renamed.title == "renamed"
+    with replica.engine.connect() as conn:
+        hits = conn.execute(text("SELECT rowid FROM search_fts WHERE search_fts MATCH 'renamed'")).all()
+        indexed = conn.execute(text("SELECT id FROM search_docs ORDER BY id")).scalars().all()
+    assert len(hits) == 1
+    # The search index keeps items past the horizon, but not expired ones.
+    assert indexed == ["old", "recent-1", "recent-2"]
+
+
+@pytest.mark.asyncio
+async def test_watermark_is_held_while_a_run_holds_the_lock(upstream, replica, monkeypatch):
+    await sync_replica(_factory(upstream), replica, now=NOW)
+
+    async def held(_session):
+        return True
+
+    monkeypatch.setattr(replica_sync, "pipeline_lock_held", held)
+    upstream.upsert(Item, [_item("recent-4", fetched_days_ago=0, updated=datetime(2026, 6, 1, 10, 0))])
+    result = await sync_replica(_factory(upstream), replica, now=NOW)
+
+    assert result.watermark_held is True
+    assert result.upserted["items"] >= 1
+    assert replica.get_meta("items_watermark") == "2026-06-01T08:01:00"
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_mysql_when_stale_or_incomplete(upstream, replica):
+    class MySQLSession:
+        calls = 0
+
+        async def execute(self, statement):
+            MySQLSession.calls += 1
+            return await upstream.session.execute(statement)
+
+    await sync_replica(_factory(upstream), replica, now=NOW)
+    replica.max_lag_s = float("inf")
+    db = MySQLSession()
+
+    assert (await read_one(db, select(Run).where(Run.id == "run_new"))).id == "run_new"
+    assert MySQLSession.calls == 0
+    assert (await read_one(db, select(Run).where(Run.id == "run_old"))).id == "run_old"
+    assert MySQLSession.calls == 1
+
+    runs = await read_newest(db, select(Run).order_by(Run.started_at.desc()).limit(2), limit=2)
+    assert [run.id for run in runs] == ["run_new", "run_old"]
+    assert MySQLSession.calls == 2
+
+    replica.max_lag_s = 600
+    assert read_replica(NOW + timedelta(minutes=5)) is replica
+    assert read_replica(NOW + timedelta(hours=1)) is None
+
+
+def test_replica_covers_only_its_horizon(replica):
+    assert replica.covers(NOW - timedelta(days=29), NOW)
+    assert not replica.covers(NOW - timedelta(days=31), NOW)
+
+
+def test_layout_change_recreates_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "replica.sqlite3"
+    first = LocalReplica(path).open()
+    first.upsert(Source, [_source("src-a", datetime(2026, 6, 1))])
+    first.set_meta("synced_through", NOW.isoformat())
+    first.close()
+
+    monkeypatch.setattr(replica_store, "SCHEMA_VERSION", replica_store.SCHEMA_VERSION + 1)
+    reopened = LocalReplica(path).open()
+
+    assert reopened.row_counts()["sources"] == 0
+    assert reopened.status.synced_through is None
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_router_statements_run_unchanged_on_the_replica(upstream, replica):
+    from src.api.sources import load_source_views
+    from src.api.stats import compute_stats
+
+    await sync_replica(_factory(upstream), replica, now=NOW)
+
+    stats = await compute_stats(replica.session, "2026-05-31")
+    assert stats["items"]["total"] == 1
+    assert stats["items"]["by_domain"] == {"security": 1}
+    assert stats["score_histogram"]["counts"][10] == 1
+    views = await load_source_views(replica.session)
+    assert [view["id"] for view in views] == [sorted(allowed_source_ids())[0]]
+    assert len(views[0]["spark"]) == settings.source_spark_days
+
+
+def test_search_terms_split_cjk_into_bigrams_and_queries_into_phrases():
+    from src.replica.search import search_match, search_terms
+
+    assert search_terms("Linux 内核漏洞 CVE-2026-1") == ["linux", "内核", "核漏", "漏洞", "cve", "2026", "1"]
+    assert search_match("漏洞") == '("漏洞")'
+    assert search_match('+内核漏洞 +"heap overflow" -poc') == '("内核 核漏 漏洞" AND "heap overflow") NOT "poc"'
+    assert search_match("kern* 洞") == '("kern"* OR "洞"*)'
+    assert search_match("-poc") is None
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_filters_and_pages_from_the_index(upstream, replica):
+    import json
+
+    from src.api.items import list_items
+
+    class MySQLSession:
+        statements = []
+
+        async def execute(self, statement):
+            MySQLSession.statements.append(str(statement))
+            return await upstream.session.execute(statement)
+
+    t0 = datetime(2026, 6, 1, 8, 0)
+    rows = {
+        "title-hit": _item("title-hit", fetched_days_ago=1, updated=t0, score=40, title="Linux 内核漏洞"),
+        "summary-hit": _item("summary-hit", fetched_days_ago=2, updated=t0, score=90, title="weekly notes"),
+        "old-hit": _item("old-hit", fetched_days_ago=90, updated=t0, score=70, title="内核漏洞 roundup"),
+        "miss": _item("miss", fetched_days_ago=1, updated=t0, title="内核 update"),
+    }
+    rows["summary-hit"]["summary_zh"] = "本周内核漏洞汇总"
+    upstream.upsert(Item, list(rows.values()))
+    await sync_replica(_factory(upstream), replica, now=NOW)
+    replica.max_lag_s = float("inf")
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    async def page(**params):
+        response = await list_items(request, fields="id,title", db=MySQLSession(), **params)
+        body = json.loads(response.body)
+        return [row["id"] for row in body["data"]], body["meta"]["next_cursor"]
+
+    ids, cursor = await page(q="漏洞", limit=10)
+    assert ids == ["old-hit", "title-hit", "summary-hit"]
+    # Only the item past the replica's horizon is read from MySQL, by primary key.
+    assert len(MySQLSession.statements) == 1 and "items.id IN" in MySQLSession.statements[0]
+
+    walked, cursor = [], None
+    for _ in range(4):
+        found, cursor = await page(q="漏洞", limit=1, cursor=cursor)
+        walked += found
+        if cursor is None:
+            break
+    assert walked == ids
+
+    assert (await page(q="漏洞", min_score=60, limit=10))[0] == ["old-hit", "summary-hit"]
+    assert (await page(q="+内核 -漏洞", limit=10))[0] == ["miss"]
+    assert (await page(q="漏洞", since=(NOW - timedelta(days=30)).isoformat(), limit=10))[0] == [
+        "title-hit", "summary-hit"
+    ]
+
+    replica.max_lag_s = 0
+    fallback = CapturingSession()
+    await list_items(request, q="漏洞", limit=10, db=fallback)
+    sql = str(fallback.statements[0])
+    assert "MATCH(title, summary_zh, content_text) AGAINST" in sql
+    assert "ORDER BY items.insight_score DESC, items.id" in sql
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: [])
+
+
+def _doc(item_id, title, summary="", *, updated=datetime(2026, 6, 1, 8, 0), domain="security"):
+    from src.replica.search import search_terms
+
+    return {
+        "id": item_id, "domain": domain, "source_id": "src-a", "updated_at": updated,
+        "title_terms": " ".join(search_terms(title)), "summary_terms": " ".join(search_terms(summary)),
+    }
+
+
+def test_related_index_ranks_by_tfidf_cosine_and_applies_changes():
+    from src.replica.related import RelatedIndex
+
+    rows = [
+        _doc("openssl-1", "OpenSSL 远程代码执行漏洞", "openssl heap overflow"),
+        _doc("openssl-2", "OpenSSL heap overflow patched", "远程代码执行"),
+        _doc("kernel", "Linux kernel privilege escalation", "内核提权"),
+        _doc("kernel-2", "Linux kernel race condition", "内核竞争条件"),
+        _doc("llm", "LLM agents benchmark", "模型评测", domain="ai"),
+    ]
+    index = RelatedIndex(terms_per_doc=16, max_postings=8, max_df=0.5)
+    index.rebuild(lambda: rows)
+
+    related = index.lookup("openssl-1", limit=3)
+    assert [item_id for item_id, _ in related] == ["openssl-2"]
+    assert 0 < related[0][1] <= 1
+    assert index.lookup("kernel", limit=3)[0][0] == "kernel-2"
+    assert index.lookup("missing", limit=3) is None
+    assert index.lookup("kernel", limit=3, allow=lambda domain, _source: domain == "ai") is None
+
+    later = datetime(2026, 6, 2, 8, 0)
+    summary = index.apply(
+        [
+            _doc("openssl-1", "OpenSSL 远程代码执行漏洞", "openssl heap overflow"),  # unchanged stamp: skipped
+            _doc("zeroday-1", "Exchange zeroday exploited", "邮件服务器", updated=later),
+            _doc("zeroday-2", "Exchange zeroday mitigations", "邮件服务器", updated=later),
+        ],
+        live_ids={"openssl-1", "kernel", "kernel-2", "llm", "zeroday-1", "zeroday-2"},
+    )
+
+    assert summary == {"changed": 2, "removed": 1}
+    assert index.lookup("openssl-1", limit=3) == []
+    # Terms new to the index relate the items of the same batch.
+    assert index.lookup("zeroday-1", limit=3)[0][0] == "zeroday-2"
+    assert index.watermark == later
+
+
+@pytest.mark.asyncio
+async def test_related_endpoint_serves_the_saved_index_and_404s_unknown_items(upstream, replica, monkeypatch, tmp_path):
+    import json
+
+    from fastapi import HTTPException
+
+    from src.api.items import get_related_items
+    from src.replica import related
+    from src.replica.related import RelatedIndex, build_related_index
+
+    t0 = datetime(2026, 6, 1, 8, 0)
+    upstream.upsert(
+        Item,
+        [
+            _item("kernel-1", fetched_days_ago=1, updated=t0, title="Linux 内核提权漏洞"),
+            _item("kernel-2", fetched_days_ago=2, updated=t0, title="Linux 内核提权补丁"),
+            _item("kernel-old", fetched_days_ago=60, updated=t0, title="Linux 内核提权分析"),
+        ],
+    )
+    await sync_replica(_factory(upstream), replica, now=NOW)
+    replica.max_lag_s = float("inf")
+    monkeypatch.setattr(settings, "related_max_df", 0.5)
+    monkeypatch.setattr(related, "_index", RelatedIndex())
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    # Nothing loaded yet: the endpoint says so instead of answering [].
+    with pytest.raises(HTTPException) as exc:
+        await get_related_items("kernel-1", request, limit=5, db=upstream.session)
+    assert exc.value.status_code == 503
+
+    path = tmp_path / "related_index.bin"
+    assert build_related_index(replica, path)["rebuilt"] is True
+    assert related.related_index().load(path) is True
+    assert related.related_index().load(path) is False  # unchanged file is not re-read
+
+    response = await get_related_items("kernel-1", request, limit=5, db=upstream.session)
+    data = json.loads(response.body)["data"]
+
+    # kernel-old is past the replica horizon: its row comes from MySQL.
+    assert sorted(row["id"] for row in data) == ["kernel-2", "kernel-old"]
+    assert all(0 < row["similarity"] <= 1 and row["title"] for row in data)
+    # The worker's next build starts from the saved index.
+    assert build_related_index(replica, path)["rebuilt"] is False
+    with pytest.raises(HTTPException) as exc:
+        await get_related_items("missing", request, limit=5, db=upstream.session)
+    assert exc.value.status_code == 404
@@ -0,0 +1,142 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql
+
+from src.api.contracts import allowed_source_ids
+from src.api.stats import compute_stats
+from src.models.daily_item_rollup import DailyItemRollup
+from src.models.item import Item
+from src.models.source import Source
+from src.pipeline.ingestion import NormalizedItem
+from src.pipeline.persistence import persist_normalized_items
+from src.pipeline.rollups import (
+    COUNTER_COLUMNS,
+    KEY_COLUMNS,
+    RollupDeltas,
+    rollup_key,
+    rollup_source_select,
+    subtract_items_statement,
+    upsert_deltas_statement,
+)
+from src.replica.store import LocalReplica
+
+
+def _item(item_id, *, fetched_at, score=None, category=None, confidence=None, error=None, source_id="src-a"):
+    return SimpleNamespace(
+        id=item_id,
+        fetched_at=fetched_at,
+        domain="security",
+        source_id=source_id,
+        category=category,
+        confidence=confidence,
+        insight_score=score,
+        stage1_error=error,
+    )
+
+
+def test_deltas_count_items_and_move_them_between_rows():
+    deltas = RollupDeltas()
+    scored = _item("a", fetched_at=datetime(2026, 6, 1, 23, 30), score=88, category="exploit", confidence="firm")
+    deltas.add(scored)
+    deltas.add(_item("b", fetched_at=datetime(2026, 6, 2, 1, 0, tzinfo=timezone.utc), error="timeout"))
+
+    deltas.remove(scored)
+    scored.confidence = "confirmed"
+    deltas.add(scored)
+
+    rows = deltas.rows()
+    assert [(row["day"], row["confidence"], row["score_bucket"], row["items"], row["high_value"], row["failed"])
+            for row in rows] == [
+        (date(2026, 6, 1), "confirmed", 17, 1, 1, 0),
+        (date(2026, 6, 2), "", -1, 1, 0, 1),
+    ]
+    assert rollup_key(scored).category == "exploit"
+
+
+def test_rollup_statements_stay_on_the_server():
+    deltas = RollupDeltas()
+    deltas.add(_item("a", fetched_at=datetime(2026, 6, 1), score=10))
+    upsert = str(upsert_deltas_statement(deltas.rows()).compile(dialect=mysql.dialect()))
+    assert "ON DUPLICATE KEY UPDATE items = (daily_item_rollups.items + VALUES(items))" in upsert
+
+    subtract = str(subtract_items_statement(Item.id.in_(["a"])).compile(dialect=mysql.dialect()))
+    assert subtract.startswith("UPDATE daily_item_rollups, (SELECT date(items.fetched_at) AS day")
+    assert "GROUP BY date(items.fetched_at), items.domain" in subtract
+    assert "SET daily_item_rollups.items=(daily_item_rollups.items - removed.items)" in subtract
+
+
+@pytest.mark.asyncio
+async def test_merges_into_stored_items_move_their_rollup_count():
+    stored = Item(
+        id="stored", source_id="src-a", domain="security", title="t", canonical_url="https://a.example/1",
+        fetched_at=datetime(2026, 5, 30), dedup_hash="hash-1", also_seen_in=[], analysis_stage=2,
+        confidence="tentative", insight_score=70,
+    )
+
+    class Session:
+        async def execute(self, statement):
+            rows = [stored] if "dedup_hash" in str(statement) else []
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+        def add(self, _model):
+            pass
+
+    duplicate = NormalizedItem(
+        id="dup", source_id="src-b", domain="security", run_id="run_1", title="t",
+        canonical_url="https://b.example/1", content_text=None, author=None, published_at=None,
+        fetched_at=datetime(2026, 6, 1), dedup_hash="hash-1", also_seen_in=[], metadata_json={},
+    )
+    deltas = RollupDeltas()
+    await persist_normalized_items(
+        Session(), [duplicate], source_authority_by_id={"src-a": "regular", "src-b": "regular"}, rollups=deltas
+    )
+
+    assert stored.confidence != "tentative"
+    moved = {row["confidence"]: row["items"] for row in deltas.rows()}
+    assert moved == {"tentative": -1, stored.confidence: 1}
+
+
+@pytest.mark.asyncio
+async def test_stats_from_rollups_match_stats_from_items(tmp_path):
+    db = LocalReplica(tmp_path / "upstream.sqlite3").open()
+    DailyItemRollup.__table__.create(db.engine)
+    source_id = sorted(allowed_source_ids())[0]
+    rows = []
+    for index, (day, score, category, confidence, error) in enumerate([
+        (31, 88, "exploit", "firm", None),
+        (31, 40, None, None, None),
+        (31, None, None, None, "timeout"),
+        (30, 60, "tool", None, None),
+    ]):
+        fetched = datetime(2026, 5, day, 6 + index)
+        rows.append({
+            "id": f"item-{index}", "source_id": source_id, "domain": "security", "title": "t",
+            "canonical_url": f"https://example.com/{index}", "fetched_at": fetched, "created_at": fetched,
+            "updated_at": fetched, "dedup_hash": f"hash-{index}", "insight_score": score,
+            "category": category, "confidence": confidence, "stage1_error": error,
+            "analysis_stage": 1, "credibility": "high",
+        })
+    db.upsert(Item, rows)
+    db.upsert(Source, [{
+        "id": source_id, "name": source_id, "domain": "security", "type": "rss", "url": "https://example.com",
+        "fetch_strategy": "l1_rss", "authority": "regular", "status": "approved", "health": "good",
+        "consecutive_failures": 0, "is_active": True,
+    }])
+    with db.engine.begin() as conn:
+        conn.execute(insert(DailyItemRollup.__table__).from_select(
+            [*KEY_COLUMNS, *COUNTER_COLUMNS], rollup_source_select()
+        ))
+
+    from_items = await compute_stats(db.session, "2026-05-31")
+    from_rollups = await compute_stats(db.session, "2026-05-31", from_rollups=True)
+    db.close()
+
+    assert from_rollups == from_items
+    assert from_items["items"] == {
+        "total": 3, "by_domain": {"security": 3}, "high_value": 1, "failed_analyses": 1, "delta_vs_yesterday": 2,
+    }
+    assert from_items["category_counts"] == {"exploit": 1}
+    assert from_items["confidence_breakdown"] == {"firm": 1}
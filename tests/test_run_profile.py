@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.cache import MemoryBackend, ResponseCache
+from src.models.run import Run
+from src.pipeline.profile import RunProfile, compare_profiles, percentile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_run_profile_times_stages_and_llm_calls():
+    wall, cpu = FakeClock(), FakeClock()
+    profile = RunProfile(clock=wall, cpu_clock=cpu)
+
+    profile.enter("collect", items=4)
+    wall.now, cpu.now = 2.0, 0.5
+    profile.enter("stage1", items=10)
+    for seconds in (1.0, 2.0, 3.0, 4.0, 10.0):
+        profile.record_call("stage1", seconds, waited_s=seconds / 2)
+    wall.now, cpu.now = 7.0, 1.0
+    profile.finish()
+    summary = profile.summary()
+
+    assert summary["wall_s"] == 7.0
+    assert summary["stages"]["collect"] == {"wall_s": 2.0, "cpu_s": 0.5, "items": 4, "items_per_s": 2.0}
+    stage1 = summary["stages"]["stage1"]
+    assert (stage1["wall_s"], stage1["cpu_s"], stage1["items_per_s"]) == (5.0, 0.5, 2.0)
+    assert stage1["calls"] == {"count": 5, "p50_ms": 3000.0, "p95_ms": 10000.0, "max_ms": 10000.0}
+    assert stage1["queue_wait"]["p50_ms"] == 1500.0
+    assert percentile([], 50) is None
+    assert percentile([5, 1, 3, 2], 50) == 2
+
+
+def test_compare_profiles_flags_slow_stages_against_the_median():
+    def profile(collect_s, stage1_s):
+        return {"stages": {"collect": {"wall_s": collect_s}, "stage1": {"wall_s": stage1_s, "calls": {"p95_ms": 900.0}}}}
+
+    baseline = [profile(10.0, 100.0), profile(12.0, 120.0), profile(11.0, 110.0)]
+
+    comparison = compare_profiles(profile(14.0, 400.0), baseline)
+
+    assert comparison["baseline_runs"] == 3
+    collect, stage1 = comparison["stages"]["collect"], comparison["stages"]["stage1"]
+    assert collect["median"]["wall_s"] == 11.0 and collect["regression"] is False
+    assert stage1["ratio"]["wall_s"] == round(400 / 110, 2) and stage1["regression"] is True
+    assert stage1["ratio"]["calls_p95_ms"] == 1.0
+    assert stage1["median"]["cpu_s"] is None
+
+
+@pytest.mark.asyncio
+async def test_run_profile_endpoint_compares_with_previous_runs_of_the_same_kind(tmp_path, monkeypatch):
+    from src.api.runs import get_run_profile
+    from src.replica.store import LocalReplica
+
+    monkeypatch.setattr("src.api.runs.response_cache", ResponseCache(MemoryBackend(8)))
+    db = LocalReplica(tmp_path / "upstream.sqlite3").open()
+    start = datetime(2026, 5, 20, 8, 0)
+
+    def run(run_id, day, kind, wall_s):
+        return {
+            "id": run_id, "kind": kind, "status": "succeeded", "window_start": start, "window_end": start,
+            "started_at": start + timedelta(days=day),
+            "stats_json": {"profile": {"wall_s": wall_s, "stages": {"stage1": {"wall_s": wall_s}}}},
+        }
+
+    db.upsert(Run, [
+        run("run_1", 0, "daily", 100.0),
+        run("run_2", 1, "daily", 120.0),
+        run("run_backfill", 2, "backfill", 900.0),
+        run("run_3", 3, "daily", 400.0),
+        run("run_4", 4, "daily", 50.0),
+    ])
+    request = SimpleNamespace(headers={}, state=SimpleNamespace())
+
+    body = await get_run_profile("run_3", request, db=db.session)
+    with pytest.raises(HTTPException) as exc:
+        await get_run_profile("run_missing", request, db=db.session)
+    db.close()
+
+    data = body["data"]
+    assert data["run_id"] == "run_3"
+    assert data["profile"]["wall_s"] == 400.0
+    assert data["comparison"]["baseline_runs"] == 2
+    assert data["comparison"]["stages"]["stage1"]["median"]["wall_s"] == 110.0
+    assert data["comparison"]["stages"]["stage1"]["regression"] is True
+    assert exc.value.status_code == 404
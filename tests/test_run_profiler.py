@@ -0,0 +1,62 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from src.pipeline.profile import RunProfile
+from src.pipeline.run_profiler import RunProfiler, StackSampler, parse_profile_mode, run_profiler
+
+
+def busy_leaf():
+    return sum(i * i for i in range(20_000))
+
+
+def test_stack_sampler_counts_the_sampled_threads_stacks(tmp_path):
+    sampler = StackSampler(threading.get_ident(), interval_s=1.0)
+
+    for _ in range(3):
+        sampler.sample()
+    sampler.write_folded(tmp_path / "cpu.folded")
+
+    assert sampler.samples == 3
+    [hot] = sampler.hot_functions(50)
+    assert hot["function"].startswith("sample (src/pipeline/run_profiler.py:")
+    assert hot["self_pct"] == hot["total_pct"] == 100.0
+    folded = (tmp_path / "cpu.folded").read_text().splitlines()
+    assert len(folded) == 1 and folded[0].endswith(" 3")
+    assert "test_stack_sampler_counts_the_sampled_threads_stacks" in folded[0]
+
+
+def test_memory_profiler_snapshots_each_stage_and_summarizes_allocators(tmp_path):
+    profiler = RunProfiler("run_1", parse_profile_mode("all"), directory=tmp_path, interval_ms=1, top=5)
+    profile = RunProfile(on_enter=profiler.mark)
+    was_tracing = tracemalloc.is_tracing()
+
+    profiler.start()
+    profile.enter("collect")
+    kept = [bytearray(64 * 1024) for _ in range(16)]
+    profile.enter("stage1")
+    busy_leaf()
+    profile.finish()
+    summary = profiler.stop()
+
+    assert len(kept) == 16
+    assert tracemalloc.is_tracing() == was_tracing
+    memory = summary["memory"]
+    assert [stage["stage"] for stage in memory["stages"]] == ["collect", "stage1"]
+    assert memory["stages"][0]["peak_kb"] >= 1024
+    assert (tmp_path / "run_1" / "01-collect.tracemalloc").exists()
+    assert tracemalloc.Snapshot.load(str(tmp_path / "run_1" / "02-stage1.tracemalloc")).traces
+    assert memory["top_allocators"][0]["location"].startswith("tests/test_run_profiler.py:")
+    assert memory["top_allocators"][0]["size_diff_kb"] >= 1024
+    assert summary["cpu"]["file"] == "cpu.folded" and (tmp_path / "run_1" / "cpu.folded").exists()
+
+
+def test_profile_mode_off_builds_no_profiler():
+    assert run_profiler("run_1", "off") is None
+    assert run_profiler("run_1", "") is None
+    assert run_profiler("run_1", "cpu").modes == {"cpu"}
+    with pytest.raises(ValueError):
+        parse_profile_mode("heap")
+    # A typo in PIPELINE_PROFILE must not fail the run it is read in.
+    assert run_profiler("run_1", "heap") is None
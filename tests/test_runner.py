@@ -60,8 +60,8 @@ class FakeSession:
             return FakeExecuteResult(scalar_values=self.sources)
         if "FROM items" in text and "SELECT" in text:
             where = list(statement._where_criteria)[0]
-            dedup_hash = where.right.value
-            return FakeExecuteResult(scalar_one=self.items_by_hash.get(dedup_hash))
+            hashes = where.right.value
+            return FakeExecuteResult(scalar_values=[self.items_by_hash[h] for h in hashes if h in self.items_by_hash])
         if "DELETE FROM items" in text:
             return FakeExecuteResult(rowcount=0)
         return FakeExecuteResult()
@@ -259,8 +259,15 @@ async def test_run_daily_pipeline_success_path_writes_digest_and_stats(tmp_path)
     ]
     assert stats_updates[0]["sources"]["security_nvd_cve"]["status"] == "pending"
     assert any(update["stage1"] == {"total": 1, "succeeded": 1, "failed": 0} for update in stats_updates)
-    assert stats_updates[-1]["retention_deleted"] == 0
+    assert "retention_deleted" not in stats_updates[-1]
     assert session.commits == 0
+    profile = result.stats_json["profile"]
+    assert {"collect", "normalize", "persist", "stage1", "stage2", "digest"} <= set(profile["stages"])
+    assert profile["stages"]["stage1"]["items"] == 1
+    assert profile["stages"]["stage1"]["calls"]["count"] == 1
+    assert profile["stages"]["digest"]["calls"]["count"] == 1
+    [stored] = [obj for obj in session.added if obj.__class__.__name__ == "Item"]
+    assert stored.lineage[0] > 0 and None not in stored.lineage
 
 
 @pytest.mark.asyncio
@@ -361,6 +368,22 @@ async def test_run_daily_pipeline_failed_when_hexo_write_fails(tmp_path):
     assert result.stats_json["digest"]["security"]["error"] == "hexo_write_error"
 
 
+@pytest.mark.asyncio
+async def test_run_daily_pipeline_records_crashed_runs_as_failed(tmp_path):
+    from src.metrics import pipeline_run_seconds
+
+    session = FakeSession([_source()])
+
+    async def collector(sources, since=None):
+        raise RuntimeError("collector crashed")
+
+    before = pipeline_run_seconds.count(status="failed")
+    with pytest.raises(RuntimeError):
+        await run_daily_pipeline(session, FakeAnalyzer(), _options(tmp_path), collector=collector)
+
+    assert pipeline_run_seconds.count(status="failed") == before + 1
+
+
 @pytest.mark.asyncio
 async def test_run_daily_pipeline_oss_failure_does_not_fail_digest(tmp_path):
     session = FakeSession([_source()])
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from src.api.contracts import allowed_source_ids
+from src.api.sources import load_source_views, serialize_source, serialize_source_day
+from src.collector.dispatcher import SourceFetchResult, fetch_source
+from src.config import settings
+from src.models.source import Source
+from src.models.source_daily_stat import SourceDailyStat
+from src.pipeline.source_activity import source_activity_rows, upsert_source_activity_statement
+from src.replica.store import LocalReplica
+
+
+def test_activity_rows_combine_fetch_results_and_new_items():
+    rows = source_activity_rows(
+        [
+            SourceFetchResult(source_id="src-a", status="succeeded", items=[1, 2, 3], duration_s=1.25, bytes_received=4096),
+            SourceFetchResult(source_id="src-b", status="failed", error="source_timeout", duration_s=30.0),
+        ],
+        [SimpleNamespace(source_id="src-a"), SimpleNamespace(source_id="src-a"), SimpleNamespace(source_id="src-c")],
+        fetched_at=datetime(2026, 6, 1, 23, 30, tzinfo=timezone.utc),
+    )
+
+    by_source = {row["source_id"]: row for row in rows}
+    assert by_source["src-a"]["day"].isoformat() == "2026-06-01"
+    assert (by_source["src-a"]["items_fetched"], by_source["src-a"]["items_new"], by_source["src-a"]["bytes"]) == (3, 2, 4096)
+    assert (by_source["src-b"]["failed_fetches"], by_source["src-b"]["fetch_ms"], by_source["src-b"]["last_error"]) == (
+        1, 30000, "source_timeout",
+    )
+    assert (by_source["src-c"]["fetches"], by_source["src-c"]["items_new"], by_source["src-c"]["last_status"]) == (0, 1, None)
+
+    sql = str(upsert_source_activity_statement(rows).compile(dialect=mysql.dialect()))
+    assert "items_new = (source_daily_stats.items_new + VALUES(items_new))" in sql
+    assert "max_fetch_ms = greatest(source_daily_stats.max_fetch_ms, VALUES(max_fetch_ms))" in sql
+    assert "last_error = CASE WHEN (VALUES(fetches) > %s) THEN VALUES(last_error)" in sql
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_reports_bytes_received():
+    class Collector:
+        bytes_received = 0
+
+        async def fetch(self, since=None):
+            self.bytes_received += 2048
+            return ["raw"]
+
+    source = SimpleNamespace(id="src-a", consecutive_failures=0)
+    result = await fetch_source(source, collector_factory=lambda _source: Collector())
+
+    assert result.bytes_received == 2048
+    assert result.stats_entry()["bytes"] == 2048
+
+
+@pytest.mark.asyncio
+async def test_source_views_read_daily_stats(tmp_path):
+    db = LocalReplica(tmp_path / "upstream.sqlite3").open()
+    source_id = sorted(allowed_source_ids())[0]
+    now = datetime.now(timezone.utc)
+    db.upsert(Source, [{
+        "id": source_id, "name": source_id, "domain": "security", "type": "rss", "url": "https://example.com",
+        "fetch_strategy": "l1_rss", "authority": "regular", "status": "approved", "health": "good",
+        "consecutive_failures": 0, "is_active": True,
+    }])
+    db.upsert(SourceDailyStat, [
+        {"source_id": source_id, "day": now.date(), "fetches": 2, "items_new": 5, "fetch_ms": 3000,
+         "max_fetch_ms": 2000, "bytes": 10, "last_status": "succeeded", "updated_at": now},
+        {"source_id": source_id, "day": (now - timedelta(days=2)).date(), "fetches": 1, "items_new": 7,
+         "updated_at": now},
+        {"source_id": source_id, "day": (now - timedelta(days=settings.source_spark_days)).date(), "items_new": 99,
+         "updated_at": now},
+    ])
+
+    views = await load_source_views(db.session)
+    detail = await serialize_source((await db.session.get(Source, source_id)), db.session)
+    db.close()
+
+    assert views[0]["today_items"] == 5
+    assert views[0]["spark"][-3:] == [7, 0, 5]
+    assert sum(views[0]["spark"]) == 12
+    assert detail["spark"] == views[0]["spark"]
+    assert detail["today"]["avg_fetch_ms"] == 1500
+    assert serialize_source_day(now.date(), None)["avg_fetch_ms"] is None
@@ -1,12 +1,15 @@
 import json
+import os
 from pathlib import Path
 
 import pytest
 
 from src.collector.catalog import (
+    SourceCatalog,
     as_source_model,
     catalog_approved_source_ids,
     catalog_by_id,
+    catalog_snapshot,
     load_source_catalog,
     seed_candidate_sources,
 )
@@ -210,3 +213,58 @@ async def test_seed_candidate_sources_updates_config_without_erasing_runtime_hea
     assert session.source.health == "degraded"
     assert session.source.consecutive_failures == 2
     assert session.source.last_fetch_status == "source_timeout"
+
+
+def _write_catalog(path, *ids, status="approved"):
+    path.write_text(
+        json.dumps([
+            {"id": source_id, "name": source_id, "domain": "security", "type": "rss", "url": "https://example.com",
+             "authority": "regular", "fetch_strategy": "l1_rss", "status": status}
+            for source_id in ids
+        ]),
+        encoding="utf-8",
+    )
+
+
+def test_catalog_service_reloads_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "sources.json"
+    _write_catalog(path, "src-a")
+    catalog = SourceCatalog(path)
+
+    first = catalog.snapshot()
+    assert catalog.snapshot() is first
+    assert (catalog.reloads, catalog.hits) == (1, 1)
+    assert first.approved_ids == frozenset({"src-a"})
+
+    _write_catalog(path, "src-a", "src-b", status="candidate")
+    os.utime(path, ns=(first.mtime_ns + 1_000_000, first.mtime_ns + 1_000_000))
+    second = catalog.snapshot()
+    assert second.source_ids == frozenset({"src-a", "src-b"})
+    assert second.approved_ids == frozenset()
+    assert catalog.reloads == 2
+
+    path.write_text("{broken", encoding="utf-8")
+    os.utime(path, ns=(first.mtime_ns + 2_000_000, first.mtime_ns + 2_000_000))
+    assert catalog.snapshot() is second
+    assert catalog.stats()["errors"] == 1
+    # The broken version is not re-read on every lookup.
+    assert catalog.snapshot() is second
+    assert catalog.stats()["errors"] == 1
+
+    _write_catalog(path, "src-a")
+    path.write_text(path.read_text(encoding="utf-8").replace('"status"', '"config_json": [1], "status"'), encoding="utf-8")
+    os.utime(path, ns=(first.mtime_ns + 3_000_000, first.mtime_ns + 3_000_000))
+    assert catalog.snapshot() is second
+    assert catalog.stats()["errors"] == 2
+
+    _write_catalog(path, "src-c")
+    os.utime(path, ns=(first.mtime_ns + 4_000_000, first.mtime_ns + 4_000_000))
+    assert catalog.snapshot().source_ids == frozenset({"src-c"})
+
+
+def test_visibility_filters_are_built_once_per_catalog_version():
+    from src.api.contracts import visible_item_filters, visible_source_filters, visibility
+
+    assert visible_item_filters() is visible_item_filters()
+    assert visible_source_filters(only_active=True)[:2] == visible_source_filters()
+    assert visibility().source_ids == catalog_snapshot().source_ids
@@ -0,0 +1,69 @@
+import logging
+from collections import deque
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+
+from src.config import settings
+from src.sql_telemetry import (
+    FingerprintStats,
+    SqlScope,
+    SqlStages,
+    _result_size,
+    enter_sql_stage,
+    fingerprint,
+    install_sql_telemetry,
+    record_statement,
+    sql_scope,
+)
+
+
+def test_fingerprint_collapses_literals_and_placeholder_lists():
+    one, sql = fingerprint("SELECT id FROM items WHERE id IN (%s, %s, %s) AND score > 80  LIMIT %s")
+    other, _ = fingerprint("SELECT id FROM items\n WHERE id IN (%s, %s) AND score > 75 LIMIT %s")
+
+    assert one == other
+    assert sql == "SELECT id FROM items WHERE id IN (?+) AND score > ? LIMIT %s"
+    assert _result_size(SimpleNamespace(_rows=deque([("abc", 42), ("é", None)]))) == (2, 3 + 2 + 2)
+
+
+def test_engine_statements_land_in_the_current_scope_and_pipeline_stage(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'telemetry.sqlite3'}")
+    install_sql_telemetry(engine)
+
+    with sql_scope() as request_scope:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (v TEXT)"))
+            conn.execute(text("INSERT INTO t VALUES (:v)"), {"v": "hello"})
+
+    stages = SqlStages()
+    with sql_scope(stages):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            enter_sql_stage("persist")
+            conn.execute(text("SELECT v FROM t")).all()
+    engine.dispose()
+
+    assert isinstance(request_scope, SqlScope)
+    assert request_scope.statements == 2
+    assert request_scope.round_trips == 3  # + COMMIT
+    assert request_scope.bytes_sent >= len("INSERT INTO t VALUES (?)") + len("hello")
+    summary = stages.summary()
+    assert list(summary) == ["persist"]
+    assert summary["persist"]["statements"] == 1
+    assert summary["persist"]["round_trips"] == 2  # + the ROLLBACK when the connection closes
+
+
+def test_slow_statements_are_logged_once_per_interval(caplog, monkeypatch):
+    monkeypatch.setattr(settings, "sql_slow_ms", 100.0)
+    stats = FingerprintStats(max_entries=1)
+
+    with caplog.at_level(logging.WARNING, logger="src.sql_telemetry"):
+        for elapsed_ms in (150.0, 900.0, 10.0):
+            record_statement("SELECT * FROM items WHERE id = %s", ("a",), elapsed_ms, 1, 20, stats=stats)
+        record_statement("SELECT * FROM runs", None, 5.0, 0, 0, stats=stats)
+
+    assert len(caplog.records) == 1
+    top = stats.summary(limit=5)
+    assert (top["slow_statements"], top["dropped"], top["fingerprints"]) == (2, 1, 1)
+    assert top["top"][0]["count"] == 3 and top["top"][0]["max_ms"] == 900.0